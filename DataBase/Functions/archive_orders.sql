@@ -0,0 +1,100 @@
+--완료된 주문 보관(hot/cold 분리)
+--입고가 끝난 지 일정 기간이 지난 주문과 주문 상세를 보관 테이블로 옮겨서 운영 테이블
+--(PURCHASE_ORDERS/PURCHASE_ITEMS)은 최근 주문 + 배송중 주문 정도의 일정한 크기로 유지.
+--리포트/내보내기는 두 쪽을 합친 *_ALL 뷰를 읽는다.
+--PURCHASE_SPEND_MONTHLY / SUPPLIER_LEAD_TIMES 는 삭제 트리거가 없으므로 보관 후에도 그대로 유지됨
+
+--매장 구분 (LOCATIONS 외래키는 0006_locations.sql 에서 추가)
+alter table "PURCHASE_ORDERS" add column if not exists location_id int not null default 1;
+
+create table if not exists "PURCHASE_ORDERS_ARCHIVE" (
+    order_id int primary key,
+    supplier_id int not null,
+    total_price int not null default 0,
+    status text not null,
+    ordered_at timestamptz not null,
+    received_at timestamptz,
+    archived_at timestamptz not null default now(),
+    location_id int not null default 1
+);
+
+alter table "PURCHASE_ORDERS_ARCHIVE" add column if not exists location_id int not null default 1;
+
+create table if not exists "PURCHASE_ITEMS_ARCHIVE" (
+    id int primary key,
+    order_id int not null references "PURCHASE_ORDERS_ARCHIVE" (order_id) on delete cascade,
+    item_id int not null,
+    actual_qty int not null,
+    status text,
+    ordered_at timestamptz not null,
+    archived_at timestamptz not null default now()
+);
+
+create index if not exists purchase_orders_archive_supplier_idx on "PURCHASE_ORDERS_ARCHIVE" (supplier_id, ordered_at);
+create index if not exists purchase_items_archive_order_idx on "PURCHASE_ITEMS_ARCHIVE" (order_id);
+
+--보관 대상 탐색용 부분 인덱스 (운영 테이블의 완료 주문만)
+create index if not exists purchase_orders_closed_idx
+    on "PURCHASE_ORDERS" (order_id) include (received_at, ordered_at)
+    where status in ('입고완료', '배송완료');
+
+--운영 + 보관을 합친 조회용 뷰 (archived_at 이 null 이면 운영 테이블의 행)
+--create or replace view 는 칼럼을 뒤에 덧붙이는 것만 허용하므로 새 칼럼은 끝에 추가
+create or replace view "PURCHASE_ORDERS_ALL" as
+    select order_id, supplier_id, total_price, status, ordered_at, received_at, null::timestamptz as archived_at, location_id
+    from "PURCHASE_ORDERS"
+    union all
+    select order_id, supplier_id, total_price, status, ordered_at, received_at, archived_at, location_id
+    from "PURCHASE_ORDERS_ARCHIVE";
+
+create or replace view "PURCHASE_ITEMS_ALL" as
+    select id, order_id, item_id, actual_qty, status, ordered_at, null::timestamptz as archived_at
+    from "PURCHASE_ITEMS"
+    union all
+    select id, order_id, item_id, actual_qty, status, ordered_at, archived_at
+    from "PURCHASE_ITEMS_ARCHIVE";
+
+--입고(또는 주문) 후 p_older_than 이 지난 완료 주문을 최대 p_batch 건 보관 테이블로 이동.
+--한 문장(데이터 변경 CTE)으로 삭제와 복사를 같이 하므로 중간에 실패해도 반쯤 옮겨진 주문이 없고,
+--skip locked 로 입고 처리 중인 주문이나 동시에 도는 다른 보관 작업과 부딪히지 않음.
+--옮기는 것은 변경이 아니므로 변경 이력(audit_log.sql)은 이 작업 동안 끔
+--반환값: 이번에 옮긴 주문 수 (0 이면 더 옮길 것이 없음)
+create or replace function archive_purchase_orders(p_older_than interval default interval '180 days',
+                                                   p_batch int default 1000)
+returns int as $$
+declare
+    moved int;
+begin
+    perform set_config('inventory.audit', 'off', true);
+    with targets as (
+        select order_id
+        from "PURCHASE_ORDERS"
+        where status in ('입고완료', '배송완료')
+        and coalesce(received_at, ordered_at) < now() - p_older_than
+        order by order_id
+        limit p_batch
+        for update skip locked
+    ), moved_orders as (
+        delete from "PURCHASE_ORDERS" po
+        using targets t
+        where po.order_id = t.order_id
+        returning po.order_id, po.supplier_id, po.total_price, po.status, po.ordered_at, po.received_at, po.location_id
+    ), archived_orders as (
+        insert into "PURCHASE_ORDERS_ARCHIVE" (order_id, supplier_id, total_price, status, ordered_at, received_at, location_id)
+        select * from moved_orders
+        on conflict (order_id) do nothing
+    ), moved_items as (
+        delete from "PURCHASE_ITEMS" pi
+        using targets t
+        where pi.order_id = t.order_id
+        returning pi.id, pi.order_id, pi.item_id, pi.actual_qty, pi.status, pi.ordered_at
+    ), archived_items as (
+        insert into "PURCHASE_ITEMS_ARCHIVE" (id, order_id, item_id, actual_qty, status, ordered_at)
+        select * from moved_items
+        on conflict (id) do nothing
+    )
+    select count(*) into moved from moved_orders;
+    perform set_config('inventory.audit', '', true);
+    return moved;
+end;
+$$ language plpgsql;
@@ -0,0 +1,122 @@
+--변경 이력(감사 로그): STOCKS, SUPPLIER_DETAILS, PURCHASE_ORDERS, PURCHASE_ITEMS 의 insert/update/delete 를
+--문장 단위 after 트리거가 전이 테이블(old/new table)로 한 번에 기록한다.
+--앱 쪽 요청은 늘지 않고(입고, 실사, 관리자 편집, 서버 함수 모두 같은 경로), 한 문장에서 바뀐 행들은 insert ... select 한 번으로 쌓임.
+--update 는 바뀐 칼럼만 before/after 에 남기고, 자동으로 바뀌는 칼럼(version, last_checked_at)만 바뀐 행은 남기지 않음.
+--누가: 요청 헤더 x-inventory-actor (앱의 INVENTORY_ACTOR 설정) > JWT sub > JWT role > DB 사용자
+--같은 트랜잭션(한 번의 입고 처리 등)에서 생긴 이력은 tx 가 같다.
+create table if not exists "AUDIT_LOG" (
+    id bigint generated always as identity primary key,
+    changed_at timestamptz not null default now(),
+    table_name text not null,
+    op text not null,
+    --조회 필터용 엔터티 칼럼 (테이블에 없는 칼럼은 null)
+    location_id int,
+    item_id int,
+    supplier_id int,
+    order_id int,
+    row_key jsonb not null,
+    before jsonb,
+    after jsonb,
+    actor text not null,
+    tx bigint not null default txid_current()
+);
+
+--조회 화면: 기간 + 테이블 / 품목 / 주문 / 작업자 필터, 최신순
+create index if not exists audit_log_changed_at_idx on "AUDIT_LOG" (changed_at desc);
+create index if not exists audit_log_table_idx on "AUDIT_LOG" (table_name, changed_at desc);
+create index if not exists audit_log_item_idx on "AUDIT_LOG" (item_id, changed_at desc) where item_id is not null;
+create index if not exists audit_log_order_idx on "AUDIT_LOG" (order_id, changed_at desc) where order_id is not null;
+create index if not exists audit_log_actor_idx on "AUDIT_LOG" (actor, changed_at desc);
+
+create or replace function audit_actor()
+returns text as $$
+    select coalesce(
+        nullif(current_setting('request.headers', true), '')::json->>'x-inventory-actor',
+        nullif(current_setting('request.jwt.claims', true), '')::json->>'sub',
+        nullif(current_setting('request.jwt.claims', true), '')::json->>'role',
+        current_user
+    );
+$$ language sql stable;
+
+--키 칼럼만 뽑은 jsonb (이전/이후 행을 맞추는 기준)
+create or replace function audit_key(p_row jsonb, p_cols text[])
+returns jsonb as $$
+    select jsonb_object_agg(c, p_row->c) from unnest(p_cols) c;
+$$ language sql immutable;
+
+--update 전후에서 값이 바뀐 칼럼만: (before, after). 자동 갱신 칼럼만 바뀌었으면 둘 다 null
+create or replace function audit_diff(p_old jsonb, p_new jsonb, out before jsonb, out after jsonb) as $$
+    select jsonb_object_agg(n.key, o.value), jsonb_object_agg(n.key, n.value)
+    from jsonb_each(p_new) n
+    join jsonb_each(p_old) o using (key)
+    where n.value is distinct from o.value
+    and n.key not in ('version', 'last_checked_at');
+$$ language sql immutable;
+
+--트리거 인자: 테이블의 키 칼럼들. 전이 테이블 이름은 모든 트리거에서 old_rows / new_rows
+--보관 작업(archive_purchase_orders)처럼 이력을 남기지 않을 작업은 inventory.audit = 'off' 로 끔
+create or replace function audit_changes()
+returns trigger as $$
+begin
+    if current_setting('inventory.audit', true) = 'off' then
+        return null;
+    end if;
+
+    if TG_OP = 'INSERT' then
+        insert into "AUDIT_LOG" (table_name, op, location_id, item_id, supplier_id, order_id, row_key, before, after, actor)
+        select TG_TABLE_NAME, 'insert', (r->>'location_id')::int, (r->>'item_id')::int, (r->>'supplier_id')::int,
+               (r->>'order_id')::int, audit_key(r, TG_ARGV), null, r, audit_actor()
+        from (select to_jsonb(n) as r from new_rows n) x;
+    elsif TG_OP = 'DELETE' then
+        insert into "AUDIT_LOG" (table_name, op, location_id, item_id, supplier_id, order_id, row_key, before, after, actor)
+        select TG_TABLE_NAME, 'delete', (r->>'location_id')::int, (r->>'item_id')::int, (r->>'supplier_id')::int,
+               (r->>'order_id')::int, audit_key(r, TG_ARGV), r, null, audit_actor()
+        from (select to_jsonb(o) as r from old_rows o) x;
+    else
+        --키로 전후 행을 맞춤. 키 칼럼을 바꾼 update 는 한쪽만 있으므로 delete + insert 로 남김
+        insert into "AUDIT_LOG" (table_name, op, location_id, item_id, supplier_id, order_id, row_key, before, after, actor)
+        select TG_TABLE_NAME,
+               case when o.r is null then 'insert' when n.r is null then 'delete' else 'update' end,
+               (k.r->>'location_id')::int, (k.r->>'item_id')::int, (k.r->>'supplier_id')::int, (k.r->>'order_id')::int,
+               audit_key(k.r, TG_ARGV),
+               case when n.r is null then o.r when o.r is not null then d.before end,
+               case when o.r is null then n.r when n.r is not null then d.after end,
+               audit_actor()
+        from (select to_jsonb(o) as r from old_rows o) o
+        full join (select to_jsonb(n) as r from new_rows n) n on audit_key(o.r, TG_ARGV) = audit_key(n.r, TG_ARGV)
+        cross join lateral (select coalesce(n.r, o.r) as r) k
+        left join lateral audit_diff(o.r, n.r) d on o.r is not null and n.r is not null
+        where o.r is null or n.r is null or d.after is not null;
+    end if;
+    return null;
+end;
+$$ language plpgsql;
+
+--테이블별 insert/update/delete 문장 트리거 (PURCHASE_ITEMS 는 파티션 부모에 걸면 모든 파티션에 적용)
+do $$
+declare
+    t record;
+    ev text;
+begin
+    for t in select * from (values
+        ('STOCKS', 'stocks', array['location_id', 'item_id', 'supplier_id']),
+        ('SUPPLIER_DETAILS', 'supplier_details', array['item_id', 'supplier_id']),
+        ('PURCHASE_ORDERS', 'purchase_orders', array['order_id']),
+        ('PURCHASE_ITEMS', 'purchase_items', array['id'])
+    ) v (table_name, prefix, keys)
+    loop
+        foreach ev in array array['insert', 'update', 'delete']
+        loop
+            execute format('drop trigger if exists %I on %I', t.prefix || '_audit_' || ev, t.table_name);
+            execute format(
+                'create trigger %I after %s on %I referencing %s for each statement execute function audit_changes(%s)',
+                t.prefix || '_audit_' || ev, ev, t.table_name,
+                case ev when 'insert' then 'new table as new_rows'
+                        when 'delete' then 'old table as old_rows'
+                        else 'old table as old_rows new table as new_rows' end,
+                (select string_agg(quote_literal(k), ', ') from unnest(t.keys) k)
+            );
+        end loop;
+    end loop;
+end;
+$$;
@@ -14,9 +14,12 @@ begin
     update "STOCKS" s
     set stock = s.stock + pi.actual_qty
     from "PURCHASE_ITEMS" pi
+    join "PURCHASE_ORDERS" po on po.order_id = pi.order_id
     where pi.order_id = p_order_id
+    and s.location_id = po.location_id
     and s.item_id = pi.item_id;
 
 exception when others then
 raise exception '입고 처리 중 오류가 발생했습니다.%',sqlerrm;
 end;
+$$ language plpgsql;
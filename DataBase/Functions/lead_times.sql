@@ -0,0 +1,107 @@
+--공급처 리드타임(발주~입고 소요일) 기록
+--주문이 배송중 -> 입고완료/배송완료 로 바뀌는 시각을 received_at 에 남기고,
+--(공급처, 품목)별 리드타임 통계(건수, 평균, 분산용 m2, 최근 20건, p90)를 입고 시점에 증분 갱신
+alter table "PURCHASE_ORDERS" add column if not exists received_at timestamptz;
+
+create table if not exists "SUPPLIER_LEAD_TIMES" (
+    supplier_id int not null,
+    item_id int not null,
+    n int not null default 0,
+    mean_days numeric not null default 0,
+    m2 numeric not null default 0,
+    recent_days numeric[] not null default '{}',
+    p90_days numeric,
+    updated_at timestamptz not null default now(),
+    primary key (supplier_id, item_id)
+);
+
+--입고 시각 기록 (before update)
+create or replace function stamp_received_at()
+returns trigger as $$
+begin
+    if old.status = '배송중' and new.status in ('입고완료', '배송완료') and new.received_at is null then
+        new.received_at = now();
+    end if;
+    return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists purchase_orders_stamp_received_at on "PURCHASE_ORDERS";
+create trigger purchase_orders_stamp_received_at
+before update on "PURCHASE_ORDERS"
+for each row
+execute function stamp_received_at();
+
+--최근 리드타임 목록의 p90
+create or replace function lead_time_p90(p_days numeric[])
+returns numeric as $$
+    select percentile_cont(0.9) within group (order by d)::numeric from unnest(p_days) d;
+$$ language sql immutable;
+
+--최근 20건만 유지
+create or replace function lead_time_recent(p_days numeric[])
+returns numeric[] as $$
+    select coalesce(p_days[greatest(1, cardinality(p_days) - 19):], '{}');
+$$ language sql immutable;
+
+--입고된 주문의 리드타임을 (공급처, 품목)별로 묶어 기존 통계와 병합 (평균/분산은 병렬 Welford 결합)
+create or replace function accumulate_lead_times()
+returns trigger as $$
+begin
+    insert into "SUPPLIER_LEAD_TIMES" as l (supplier_id, item_id, n, mean_days, m2, recent_days, p90_days, updated_at)
+    select b.supplier_id, b.item_id, b.n, b.mean_days, b.m2, lead_time_recent(b.days), lead_time_p90(lead_time_recent(b.days)), now()
+    from (
+        select n.supplier_id,
+               pi.item_id,
+               count(*) as n,
+               avg(d.days) as mean_days,
+               coalesce(var_pop(d.days), 0) * count(*) as m2,
+               array_agg(d.days order by n.received_at) as days
+        from new_orders n
+        join old_orders o on o.order_id = n.order_id
+        join "PURCHASE_ITEMS" pi on pi.order_id = n.order_id
+        cross join lateral (select extract(epoch from (n.received_at - n.ordered_at))::numeric / 86400 as days) d
+        where o.received_at is null
+        and n.received_at is not null
+        group by n.supplier_id, pi.item_id
+    ) b
+    on conflict (supplier_id, item_id) do update
+    set n = l.n + excluded.n,
+        mean_days = l.mean_days + (excluded.mean_days - l.mean_days) * excluded.n / (l.n + excluded.n),
+        m2 = l.m2 + excluded.m2 + power(excluded.mean_days - l.mean_days, 2) * l.n * excluded.n / (l.n + excluded.n),
+        recent_days = lead_time_recent(l.recent_days || excluded.recent_days),
+        p90_days = lead_time_p90(lead_time_recent(l.recent_days || excluded.recent_days)),
+        updated_at = now();
+    return null;
+end;
+$$ language plpgsql;
+
+drop trigger if exists purchase_orders_accumulate_lead_times on "PURCHASE_ORDERS";
+create trigger purchase_orders_accumulate_lead_times
+after update on "PURCHASE_ORDERS"
+referencing old table as old_orders new table as new_orders
+for each statement
+execute function accumulate_lead_times();
+
+--최초 적재 / 통계 보정용 전체 재계산 (received_at 이 기록된 주문만 대상, 보관된 주문 포함)
+create or replace function refresh_lead_times()
+returns void as $$
+begin
+    truncate "SUPPLIER_LEAD_TIMES";
+    insert into "SUPPLIER_LEAD_TIMES" (supplier_id, item_id, n, mean_days, m2, recent_days, p90_days)
+    select b.supplier_id, b.item_id, b.n, b.mean_days, b.m2, lead_time_recent(b.days), lead_time_p90(lead_time_recent(b.days))
+    from (
+        select po.supplier_id,
+               pi.item_id,
+               count(*) as n,
+               avg(d.days) as mean_days,
+               coalesce(var_pop(d.days), 0) * count(*) as m2,
+               array_agg(d.days order by po.received_at) as days
+        from "PURCHASE_ORDERS_ALL" po
+        join "PURCHASE_ITEMS_ALL" pi on pi.order_id = po.order_id
+        cross join lateral (select extract(epoch from (po.received_at - po.ordered_at))::numeric / 86400 as days) d
+        where po.received_at is not null
+        group by po.supplier_id, pi.item_id
+    ) b;
+end;
+$$ language plpgsql;
@@ -0,0 +1,132 @@
+--예측 재고/발주점을 서버에서 집합 연산으로 계산 (Streamlit/stock_ops.py 의 predict_stocks + attach_reorder_points 와 같은 결과)
+--재고 전체를 앱으로 내려받지 않고 예측 결과(또는 발주점 미달 품목만)를 바로 돌려준다
+
+--요일별 소모 가중치 (0 = 월요일, 나머지 요일 1.0)
+--아래 값은 stock_ops.WEEKDAY_FACTORS, db_backend.DEFAULT_WEEKDAY_WEIGHTS 와 항상 같게 유지할 것
+--(파이썬 엔진과 서버 함수의 예측이 갈라짐). 값을 바꾸면 세 곳을 같이 고치고 새 마이그레이션에서 이 파일을 다시 실행
+create table if not exists "WEEKDAY_WEIGHTS" (
+    weekday smallint primary key check (weekday between 0 and 6),
+    weight numeric not null
+);
+
+insert into "WEEKDAY_WEIGHTS" (weekday, weight)
+values (0, 0.8), (1, 1.0), (2, 1.0), (3, 1.0), (4, 1.2), (5, 1.5), (6, 1.3)
+on conflict (weekday) do update set weight = excluded.weight;
+
+--날짜별 가중치와 누적 합계. 두 날짜 사이 가중치 합 = 끝 날짜 cum_weight - 시작 날짜 cum_weight
+--(날짜 수와 무관하게 행마다 조회 2번).
+--WEEKDAY_WEIGHTS 를 바꾼 뒤에는 refresh_calendar() 로 날짜별 가중치와 누적값을 다시 맞춘다.
+--특정 날짜(공휴일 등)의 weight 를 바꾼 뒤에는 refresh_calendar_totals() 로 누적값만 재계산
+--(refresh_calendar() 는 요일 가중치로 되돌리므로 날짜별 예외는 그 뒤에 다시 넣을 것)
+create table if not exists "CALENDAR" (
+    day date primary key,
+    weekday smallint not null,
+    weight numeric not null,
+    cum_weight numeric not null
+);
+
+create or replace function refresh_calendar_totals()
+returns void as $$
+    update "CALENDAR" c
+    set cum_weight = s.cum_weight
+    from (select day, sum(weight) over (order by day) as cum_weight from "CALENDAR") s
+    where c.day = s.day and c.cum_weight is distinct from s.cum_weight;
+$$ language sql;
+
+create or replace function refresh_calendar(
+    p_from date default '2000-01-01',
+    p_to date default '2099-12-31'
+)
+returns void as $$
+begin
+    insert into "CALENDAR" (day, weekday, weight, cum_weight)
+    select d::date, extract(isodow from d)::int - 1, w.weight, 0
+    from generate_series(p_from, p_to, interval '1 day') d
+    join "WEEKDAY_WEIGHTS" w on w.weekday = extract(isodow from d)::int - 1
+    on conflict (day) do update set weight = excluded.weight
+    where "CALENDAR".weight is distinct from excluded.weight;
+
+    perform refresh_calendar_totals();
+end;
+$$ language plpgsql;
+
+select refresh_calendar();
+
+--p_location_id: null 이면 전체 매장, p_only_alerts: 예측 재고 < 발주점 인 행만
+--발주점 = 일평균 소모량(요일 가중치 평균 반영) x 리드타임(p90) + 안전재고
+--리드타임: (공급처, 품목) 입고 p_min_samples 건 이상이면 그 p90, 아니면 공급처 전체의 건수 가중 평균, 없으면 p_default_lead_days
+--가중치 합은 stock_ops.total_weights 와 같이 마지막 실사 다음 날부터 p_now 까지 UTC 날짜 기준으로 센다
+--item_count: 필터 전 전체 재고 행 수 (알림만 받아도 요약을 만들 수 있도록)
+create or replace function predicted_stocks(
+    p_location_id int default null,
+    p_only_alerts boolean default false,
+    p_now timestamptz default now(),
+    p_min_samples int default 3,
+    p_default_lead_days numeric default 2.0
+)
+returns table (
+    location_id int,
+    item_id int,
+    supplier_id int,
+    item_name text,
+    category text,
+    stock numeric,
+    avg_consumption numeric,
+    last_checked_at timestamptz,
+    predicted_stock numeric,
+    safety_stock numeric,
+    lead_days numeric,
+    reorder_point numeric,
+    base_unit text,
+    needs_reorder boolean,
+    item_count bigint
+) as $$
+    with lt as (
+        select l.supplier_id, l.item_id, l.n, coalesce(l.p90_days, l.mean_days) as days
+        from "SUPPLIER_LEAD_TIMES" l
+    ),
+    sup_lt as (
+        select lt.supplier_id, sum(lt.days * lt.n) / nullif(sum(lt.n), 0) as days
+        from lt
+        group by lt.supplier_id
+    ),
+    daily as (
+        select avg(weight) as factor from "WEEKDAY_WEIGHTS"
+    ),
+    base as (
+        select s.location_id, s.item_id, s.supplier_id,
+               coalesce(i.name, 'N/A') as item_name,
+               coalesce(i.category, '기타') as category,
+               s.stock, s.avg_consumption, s.last_checked_at,
+               d.safety_stock, d.base_unit,
+               (s.last_checked_at at time zone 'UTC')::date as start_day,
+               greatest(0, floor(extract(epoch from p_now - s.last_checked_at) / 86400))::int as n_days
+        from "STOCKS" s
+        left join "ITEMS" i on i.id = s.item_id
+        left join "SUPPLIER_DETAILS" d on d.item_id = s.item_id and d.supplier_id = s.supplier_id
+        where p_location_id is null or s.location_id = p_location_id
+    ),
+    pred as (
+        select b.*,
+               round(greatest(0, b.stock - b.avg_consumption
+                                      * coalesce(c1.cum_weight - c0.cum_weight, b.n_days * daily.factor)), 2) as predicted_stock,
+               coalesce(item_lt.days, sup_lt.days, p_default_lead_days) as lead_days,
+               round(b.avg_consumption * daily.factor * coalesce(item_lt.days, sup_lt.days, p_default_lead_days)
+                     + coalesce(b.safety_stock, 0), 2) as reorder_point,
+               count(*) over () as item_count
+        from base b
+        cross join daily
+        --달력 범위 밖 날짜는 평균 가중치로 대신함
+        left join "CALENDAR" c0 on c0.day = b.start_day
+        left join "CALENDAR" c1 on c1.day = b.start_day + b.n_days
+        left join lt item_lt on item_lt.supplier_id = b.supplier_id and item_lt.item_id = b.item_id
+                            and item_lt.n >= p_min_samples
+        left join sup_lt on sup_lt.supplier_id = b.supplier_id
+    )
+    select p.location_id, p.item_id, p.supplier_id, p.item_name, p.category, p.stock, p.avg_consumption,
+           p.last_checked_at, p.predicted_stock, p.safety_stock, round(p.lead_days, 2), p.reorder_point, p.base_unit,
+           p.predicted_stock < p.reorder_point, p.item_count
+    from pred p
+    where not p_only_alerts or p.predicted_stock < p.reorder_point
+    order by p.location_id, p.category, p.item_name;
+$$ language sql stable;
@@ -0,0 +1,148 @@
+--구매 분석용 월별 집계 테이블 (주문월 x 매장 x 공급처 x 품목)
+--주문 상세가 들어올 때 / 주문이 입고될 때 트리거로 증분 반영하고,
+--분석 화면은 원본 PURCHASE_ORDERS/PURCHASE_ITEMS 대신 이 테이블을 집계한 작은 결과만 받아감
+create table if not exists "PURCHASE_SPEND_MONTHLY" (
+    month date not null,
+    location_id int not null default 1,
+    supplier_id int not null,
+    item_id int not null,
+    category text,
+    line_count int not null default 0,
+    ordered_qty numeric not null default 0,
+    ordered_spend numeric not null default 0,
+    received_qty numeric not null default 0,
+    received_spend numeric not null default 0,
+    primary key (month, location_id, supplier_id, item_id)
+);
+
+--주문 상세 insert: 문장 단위로 (주문월, 매장, 공급처, 품목)별로 묶어서 한 번에 더함
+create or replace function accumulate_ordered_spend()
+returns trigger as $$
+begin
+    insert into "PURCHASE_SPEND_MONTHLY" as m (month, location_id, supplier_id, item_id, category, line_count, ordered_qty, ordered_spend)
+    select date_trunc('month', po.ordered_at at time zone 'Asia/Seoul')::date,
+           po.location_id,
+           po.supplier_id,
+           n.item_id,
+           max(i.category),
+           count(*),
+           sum(n.actual_qty),
+           sum(n.actual_qty * coalesce(sd.order_unit_price, 0))
+    from new_lines n
+    join "PURCHASE_ORDERS" po on po.order_id = n.order_id
+    left join "SUPPLIER_DETAILS" sd on sd.item_id = n.item_id and sd.supplier_id = po.supplier_id
+    left join "ITEMS" i on i.id = n.item_id
+    group by 1, 2, 3, 4
+    on conflict (month, location_id, supplier_id, item_id) do update
+    set line_count = m.line_count + excluded.line_count,
+        ordered_qty = m.ordered_qty + excluded.ordered_qty,
+        ordered_spend = m.ordered_spend + excluded.ordered_spend,
+        category = coalesce(excluded.category, m.category);
+    return null;
+end;
+$$ language plpgsql;
+
+drop trigger if exists purchase_items_accumulate_spend on "PURCHASE_ITEMS";
+create trigger purchase_items_accumulate_spend
+after insert on "PURCHASE_ITEMS"
+referencing new table as new_lines
+for each statement
+execute function accumulate_ordered_spend();
+
+--주문 상태가 배송중 -> 입고완료/배송완료 로 바뀐 주문만 입고 금액에 더함 (주문월 기준)
+create or replace function accumulate_received_spend()
+returns trigger as $$
+begin
+    insert into "PURCHASE_SPEND_MONTHLY" as m (month, location_id, supplier_id, item_id, category, received_qty, received_spend)
+    select date_trunc('month', n.ordered_at at time zone 'Asia/Seoul')::date,
+           n.location_id,
+           n.supplier_id,
+           pi.item_id,
+           max(i.category),
+           sum(pi.actual_qty),
+           sum(pi.actual_qty * coalesce(sd.order_unit_price, 0))
+    from new_orders n
+    join old_orders o on o.order_id = n.order_id
+    join "PURCHASE_ITEMS" pi on pi.order_id = n.order_id
+    left join "SUPPLIER_DETAILS" sd on sd.item_id = pi.item_id and sd.supplier_id = n.supplier_id
+    left join "ITEMS" i on i.id = pi.item_id
+    where o.status = '배송중'
+    and n.status in ('입고완료', '배송완료')
+    group by 1, 2, 3, 4
+    on conflict (month, location_id, supplier_id, item_id) do update
+    set received_qty = m.received_qty + excluded.received_qty,
+        received_spend = m.received_spend + excluded.received_spend,
+        category = coalesce(excluded.category, m.category);
+    return null;
+end;
+$$ language plpgsql;
+
+drop trigger if exists purchase_orders_accumulate_received on "PURCHASE_ORDERS";
+create trigger purchase_orders_accumulate_received
+after update on "PURCHASE_ORDERS"
+referencing old table as old_orders new table as new_orders
+for each statement
+execute function accumulate_received_spend();
+
+--최초 적재 / 집계 보정용 전체 재계산 (보관된 주문 포함)
+create or replace function refresh_purchase_spend()
+returns void as $$
+begin
+    truncate "PURCHASE_SPEND_MONTHLY";
+    insert into "PURCHASE_SPEND_MONTHLY" (month, location_id, supplier_id, item_id, category, line_count,
+                                          ordered_qty, ordered_spend, received_qty, received_spend)
+    select date_trunc('month', po.ordered_at at time zone 'Asia/Seoul')::date,
+           po.location_id,
+           po.supplier_id,
+           pi.item_id,
+           max(i.category),
+           count(*),
+           sum(pi.actual_qty),
+           sum(pi.actual_qty * coalesce(sd.order_unit_price, 0)),
+           coalesce(sum(pi.actual_qty) filter (where po.status in ('입고완료', '배송완료')), 0),
+           coalesce(sum(pi.actual_qty * coalesce(sd.order_unit_price, 0)) filter (where po.status in ('입고완료', '배송완료')), 0)
+    from "PURCHASE_ITEMS_ALL" pi
+    join "PURCHASE_ORDERS_ALL" po on po.order_id = pi.order_id
+    left join "SUPPLIER_DETAILS" sd on sd.item_id = pi.item_id and sd.supplier_id = po.supplier_id
+    left join "ITEMS" i on i.id = pi.item_id
+    group by 1, 2, 3, 4;
+end;
+$$ language plpgsql;
+
+--공급처별 월 지출 (p_location_id 가 null 이면 전체 매장)
+create or replace function spend_by_supplier_month(p_from date, p_to date, p_location_id int default null)
+returns table (month date, supplier_id int, supplier_name text, line_count bigint,
+               ordered_spend numeric, received_spend numeric) as $$
+    select m.month, m.supplier_id, s.name, sum(m.line_count), sum(m.ordered_spend), sum(m.received_spend)
+    from "PURCHASE_SPEND_MONTHLY" m
+    left join "SUPPLIERS" s on s.id = m.supplier_id
+    where m.month between p_from and p_to
+    and (p_location_id is null or m.location_id = p_location_id)
+    group by m.month, m.supplier_id, s.name
+    order by m.month, m.supplier_id;
+$$ language sql stable;
+
+--카테고리별 월 지출 추이
+create or replace function spend_by_category_month(p_from date, p_to date, p_location_id int default null)
+returns table (month date, category text, ordered_spend numeric, received_spend numeric) as $$
+    select m.month, coalesce(m.category, '기타'), sum(m.ordered_spend), sum(m.received_spend)
+    from "PURCHASE_SPEND_MONTHLY" m
+    where m.month between p_from and p_to
+    and (p_location_id is null or m.location_id = p_location_id)
+    group by m.month, coalesce(m.category, '기타')
+    order by m.month, 2;
+$$ language sql stable;
+
+--기간 내 지출 상위 품목
+create or replace function top_items_by_spend(p_from date, p_to date, p_limit int default 20,
+                                              p_location_id int default null)
+returns table (item_id int, item_name text, category text, ordered_qty numeric, ordered_spend numeric) as $$
+    select m.item_id, i.name, max(m.category), sum(m.ordered_qty), sum(m.ordered_spend)
+    from "PURCHASE_SPEND_MONTHLY" m
+    left join "ITEMS" i on i.id = m.item_id
+    where m.month between p_from and p_to
+    and (p_location_id is null or m.location_id = p_location_id)
+    group by m.item_id, i.name
+    order by sum(m.ordered_spend) desc
+    limit p_limit;
+$$ language sql stable;
@@ -0,0 +1,36 @@
+--입고완료 일괄 처리: 배송중인 주문만 입고완료로 바꾸고 환산계수를 적용해 재고에 더함
+--이미 입고된 주문은 건너뛰므로 같은 요청을 재시도해도 재고가 두 번 더해지지 않음
+--재고는 주문한 매장(location_id)의 STOCKS 행에 더함
+create or replace function receive_orders(
+    p_order_ids INT[]
+)
+returns setof INT as $$
+begin
+    return query
+    with targets as (
+        update "PURCHASE_ORDERS"
+        set status = '입고완료'
+        where order_id = any(p_order_ids)
+        and status = '배송중'
+        returning order_id, supplier_id, location_id
+    ), incoming as (
+        select t.location_id, pi.item_id, t.supplier_id, sum(pi.actual_qty * coalesce(sd.conversion_factor, 1)) as qty
+        from targets t
+        join "PURCHASE_ITEMS" pi on pi.order_id = t.order_id
+        left join "SUPPLIER_DETAILS" sd on sd.item_id = pi.item_id and sd.supplier_id = t.supplier_id
+        group by t.location_id, pi.item_id, t.supplier_id
+    ), stocked as (
+        update "STOCKS" s
+        set stock = s.stock + i.qty
+        from incoming i
+        where s.location_id = i.location_id
+        and s.item_id = i.item_id
+        and s.supplier_id = i.supplier_id
+        returning s.item_id
+    )
+    select t.order_id from targets t;
+
+exception when others then
+raise exception '입고 처리 중 오류가 발생했습니다.%',sqlerrm;
+end;
+$$ language plpgsql;
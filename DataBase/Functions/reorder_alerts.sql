@@ -0,0 +1,25 @@
+--발주 알림 사전 계산 결과 (Streamlit/alert_worker.py 가 갱신)
+--예측 재고가 발주점 미만인 품목만 저장하므로 행 수는 전체 품목 수가 아니라 알림 수에 비례
+create table if not exists "REORDER_ALERTS" (
+    location_id int not null default 1,
+    item_id int not null,
+    supplier_id int not null,
+    item_name text,
+    category text,
+    predicted_stock numeric,
+    reorder_point numeric,
+    safety_stock numeric,
+    lead_days numeric,
+    base_unit text,
+    computed_at timestamptz not null default now(),
+    primary key (location_id, item_id, supplier_id)
+);
+
+--매장별 마지막 계산 요약
+create table if not exists "REORDER_ALERT_STATUS" (
+    location_id int primary key,
+    computed_at timestamptz not null,
+    item_count int not null,
+    alert_count int not null,
+    duration_ms numeric
+);
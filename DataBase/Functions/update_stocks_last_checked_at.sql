@@ -1,4 +1,5 @@
 --재고 업데이트 시 자동으로 현재 시각을 last_checked_at 칼럼에 추가
+drop trigger if exists update_stocks_last_checked_at on "STOCKS";
 create trigger update_stocks_last_checked_at
 before update on "STOCKS"
 for each row
@@ -0,0 +1,59 @@
+--기본 스키마: 앱이 사용하는 6개 테이블과 복합 키
+--(item_id, supplier_id) 는 SUPPLIER_DETAILS / STOCKS 의 기본키이자 모든 페이지의 조회/수정 조건
+create table if not exists "ITEMS" (
+    id int generated by default as identity primary key,
+    name text not null unique,
+    category text
+);
+
+create table if not exists "SUPPLIERS" (
+    id int generated by default as identity primary key,
+    name text not null unique
+);
+
+create table if not exists "SUPPLIER_DETAILS" (
+    item_id int not null references "ITEMS" (id) on delete cascade,
+    supplier_id int not null references "SUPPLIERS" (id) on delete cascade,
+    order_url text,
+    order_unit text,
+    "MOQ" int not null default 1,
+    order_unit_price int not null default 0,
+    safety_stock numeric not null default 0,
+    base_unit text,
+    conversion_factor numeric not null default 1,
+    primary key (item_id, supplier_id)
+);
+
+create table if not exists "STOCKS" (
+    item_id int not null references "ITEMS" (id) on delete cascade,
+    supplier_id int not null references "SUPPLIERS" (id) on delete cascade,
+    stock numeric not null default 0,
+    avg_consumption numeric not null default 0,
+    last_checked_at timestamptz not null default now(),
+    primary key (item_id, supplier_id)
+);
+
+create table if not exists "PURCHASE_ORDERS" (
+    order_id int generated by default as identity primary key,
+    supplier_id int not null references "SUPPLIERS" (id),
+    total_price int not null default 0,
+    status text not null default '배송중' check (status in ('배송중', '입고완료', '배송완료')),
+    ordered_at timestamptz not null default now()
+);
+
+create table if not exists "PURCHASE_ITEMS" (
+    id int generated by default as identity primary key,
+    order_id int not null references "PURCHASE_ORDERS" (order_id) on delete cascade,
+    item_id int not null references "ITEMS" (id),
+    actual_qty int not null,
+    status text
+);
+
+--update_stocks_last_checked_at 트리거가 사용하는 함수
+create or replace function update_last_checked_at_column()
+returns trigger as $$
+begin
+    new.last_checked_at = now();
+    return new;
+end;
+$$ language plpgsql;
@@ -0,0 +1,23 @@
+--조회 패턴별 인덱스
+--(item_id, supplier_id) 로 시작하는 조회는 기본키 인덱스를 그대로 사용하므로
+--여기서는 supplier_id 로 시작하는 조인/필터와 주문 관련 조회만 추가
+
+--배송중 주문만 담는 부분 인덱스: 대시보드/입고 화면이 매번 status = '배송중' 으로 조회하지만
+--전체 주문 중 배송중은 일부이므로 인덱스 크기가 주문 이력과 무관하게 작게 유지됨
+create index if not exists purchase_orders_open_idx
+    on "PURCHASE_ORDERS" (order_id) include (supplier_id, total_price, ordered_at)
+    where status = '배송중';
+
+--공급처별 주문 이력 (분석/리드타임 재계산)
+create index if not exists purchase_orders_supplier_idx on "PURCHASE_ORDERS" (supplier_id, ordered_at);
+
+--주문 상세 조인 키
+create index if not exists purchase_items_order_idx on "PURCHASE_ITEMS" (order_id);
+create index if not exists purchase_items_item_idx on "PURCHASE_ITEMS" (item_id);
+
+--공급처 기준 조인 (SUPPLIERS 임베드, 공급처별 발주 화면)
+create index if not exists supplier_details_supplier_idx on "SUPPLIER_DETAILS" (supplier_id);
+create index if not exists stocks_supplier_idx on "STOCKS" (supplier_id);
+
+--알림 워커의 변경 감지 (최신 last_checked_at 1건)
+create index if not exists stocks_last_checked_idx on "STOCKS" (last_checked_at desc);
@@ -0,0 +1,77 @@
+--PURCHASE_ITEMS 월별 파티션 (주문 시각 기준)
+--파티션 키는 기본키에 포함되어야 하므로 ordered_at 칼럼을 추가하고 기본키는 (id, ordered_at)
+--앱은 ordered_at 을 보내지 않으므로 insert 시각(= 주문 시각)이 기본값으로 들어감
+--order_id 조회는 파티션마다 있는 purchase_items_order_idx 로 처리되고,
+--오래된 달은 파티션 단위로 분리/보관할 수 있음
+
+--기존(일반 테이블) PURCHASE_ITEMS 는 이름을 바꿔 두고 아래에서 옮겨 담음
+do $$
+begin
+    if exists (select 1 from pg_class c join pg_namespace n on n.oid = c.relnamespace
+               where c.relname = 'PURCHASE_ITEMS' and c.relkind = 'r' and n.nspname = current_schema()) then
+        alter table "PURCHASE_ITEMS" rename to "PURCHASE_ITEMS_unpartitioned";
+        alter index if exists "PURCHASE_ITEMS_pkey" rename to "PURCHASE_ITEMS_unpartitioned_pkey";
+        drop index if exists purchase_items_order_idx;
+        drop index if exists purchase_items_item_idx;
+    end if;
+end $$;
+
+--파티션 테이블은 identity 칼럼을 쓸 수 없으므로(PG17 미만) 시퀀스 기본값 사용
+create sequence if not exists purchase_items_id_seq;
+
+create table if not exists "PURCHASE_ITEMS" (
+    id int not null default nextval('purchase_items_id_seq'),
+    order_id int not null references "PURCHASE_ORDERS" (order_id) on delete cascade,
+    item_id int not null references "ITEMS" (id),
+    actual_qty int not null,
+    status text,
+    ordered_at timestamptz not null default now(),
+    primary key (id, ordered_at)
+) partition by range (ordered_at);
+
+alter sequence purchase_items_id_seq owned by "PURCHASE_ITEMS".id;
+
+--범위를 벗어난 행을 받는 기본 파티션
+create table if not exists "PURCHASE_ITEMS_default" partition of "PURCHASE_ITEMS" default;
+
+create index if not exists purchase_items_order_idx on "PURCHASE_ITEMS" (order_id);
+create index if not exists purchase_items_item_idx on "PURCHASE_ITEMS" (item_id);
+
+--p_from ~ p_to 가 걸치는 달의 파티션을 만듦 (이미 있으면 건너뜀). 반환값: 새로 만든 파티션 수
+--매달 미리 호출해 둘 것: select ensure_purchase_items_partitions(current_date, current_date + 90);
+create or replace function ensure_purchase_items_partitions(p_from date, p_to date)
+returns int as $$
+declare
+    m date := date_trunc('month', p_from)::date;
+    part text;
+    made int := 0;
+begin
+    while m <= p_to loop
+        part := 'PURCHASE_ITEMS_' || to_char(m, 'YYYYMM');
+        if to_regclass(format('%I', part)) is null then
+            execute format('create table %I partition of "PURCHASE_ITEMS" for values from (%L) to (%L)',
+                           part, m, (m + interval '1 month')::date);
+            made := made + 1;
+        end if;
+        m := (m + interval '1 month')::date;
+    end loop;
+    return made;
+end;
+$$ language plpgsql;
+
+--기존 데이터 이관: 주문의 ordered_at 을 복사해서 해당 월 파티션으로 보냄
+do $$
+begin
+    if to_regclass('"PURCHASE_ITEMS_unpartitioned"') is not null then
+        perform ensure_purchase_items_partitions(
+            coalesce((select min(ordered_at)::date from "PURCHASE_ORDERS"), current_date), current_date + 90);
+        insert into "PURCHASE_ITEMS" (id, order_id, item_id, actual_qty, status, ordered_at)
+        select pi.id, pi.order_id, pi.item_id, pi.actual_qty, pi.status, coalesce(po.ordered_at, now())
+        from "PURCHASE_ITEMS_unpartitioned" pi
+        left join "PURCHASE_ORDERS" po on po.order_id = pi.order_id;
+        perform setval('purchase_items_id_seq', coalesce((select max(id) from "PURCHASE_ITEMS"), 0) + 1, false);
+        drop table "PURCHASE_ITEMS_unpartitioned";
+    else
+        perform ensure_purchase_items_partitions(current_date, current_date + 90);
+    end if;
+end $$;
@@ -0,0 +1,343 @@
+--서버 함수와 트리거 (DataBase/Functions) 적용
+--이 시점의 정의를 그대로 담는다 (이후 Functions 파일이 바뀌어도 이 마이그레이션의 의미는 그대로)
+--[Functions/update_stocks_last_checked_at.sql 의 이 시점 정의]
+--재고 업데이트 시 자동으로 현재 시각을 last_checked_at 칼럼에 추가
+drop trigger if exists update_stocks_last_checked_at on "STOCKS";
+create trigger update_stocks_last_checked_at
+before update on "STOCKS"
+for each row
+execute function update_last_checked_at_column();
+--[Functions/delivery_completed.sql 의 이 시점 정의]
+create or replace function delivery_completed(
+    p_order_id INT
+)
+returns void as $$
+begin
+    update "PURCHASE_ORDERS"
+    set status = '배송완료'
+    where order_id = p_order_id;
+
+    update "PURCHASE_ITEMS"
+    set status = '배송완료'
+    where order_id = p_order_id;
+
+    update "STOCKS" s
+    set stock = s.stock + pi.actual_qty
+    from "PURCHASE_ITEMS" pi
+    where pi.order_id = p_order_id
+    and s.item_id = pi.item_id;
+
+exception when others then
+raise exception '입고 처리 중 오류가 발생했습니다.%',sqlerrm;
+end;
+$$ language plpgsql;
+--[Functions/receive_orders.sql 의 이 시점 정의]
+--입고완료 일괄 처리: 배송중인 주문만 입고완료로 바꾸고 환산계수를 적용해 재고에 더함
+--이미 입고된 주문은 건너뛰므로 같은 요청을 재시도해도 재고가 두 번 더해지지 않음
+create or replace function receive_orders(
+    p_order_ids INT[]
+)
+returns setof INT as $$
+begin
+    return query
+    with targets as (
+        update "PURCHASE_ORDERS"
+        set status = '입고완료'
+        where order_id = any(p_order_ids)
+        and status = '배송중'
+        returning order_id, supplier_id
+    ), incoming as (
+        select pi.item_id, t.supplier_id, sum(pi.actual_qty * coalesce(sd.conversion_factor, 1)) as qty
+        from targets t
+        join "PURCHASE_ITEMS" pi on pi.order_id = t.order_id
+        left join "SUPPLIER_DETAILS" sd on sd.item_id = pi.item_id and sd.supplier_id = t.supplier_id
+        group by pi.item_id, t.supplier_id
+    ), stocked as (
+        update "STOCKS" s
+        set stock = s.stock + i.qty
+        from incoming i
+        where s.item_id = i.item_id
+        and s.supplier_id = i.supplier_id
+        returning s.item_id
+    )
+    select t.order_id from targets t;
+
+exception when others then
+raise exception '입고 처리 중 오류가 발생했습니다.%',sqlerrm;
+end;
+$$ language plpgsql;
+--[Functions/purchase_analytics.sql 의 이 시점 정의]
+--구매 분석용 월별 집계 테이블 (주문월 x 공급처 x 품목)
+--주문 상세가 들어올 때 / 주문이 입고될 때 트리거로 증분 반영하고,
+--분석 화면은 원본 PURCHASE_ORDERS/PURCHASE_ITEMS 대신 이 테이블을 집계한 작은 결과만 받아감
+create table if not exists "PURCHASE_SPEND_MONTHLY" (
+    month date not null,
+    supplier_id int not null,
+    item_id int not null,
+    category text,
+    line_count int not null default 0,
+    ordered_qty numeric not null default 0,
+    ordered_spend numeric not null default 0,
+    received_qty numeric not null default 0,
+    received_spend numeric not null default 0,
+    primary key (month, supplier_id, item_id)
+);
+
+--주문 상세 insert: 문장 단위로 (주문월, 공급처, 품목)별로 묶어서 한 번에 더함
+create or replace function accumulate_ordered_spend()
+returns trigger as $$
+begin
+    insert into "PURCHASE_SPEND_MONTHLY" as m (month, supplier_id, item_id, category, line_count, ordered_qty, ordered_spend)
+    select date_trunc('month', po.ordered_at at time zone 'Asia/Seoul')::date,
+           po.supplier_id,
+           n.item_id,
+           max(i.category),
+           count(*),
+           sum(n.actual_qty),
+           sum(n.actual_qty * coalesce(sd.order_unit_price, 0))
+    from new_lines n
+    join "PURCHASE_ORDERS" po on po.order_id = n.order_id
+    left join "SUPPLIER_DETAILS" sd on sd.item_id = n.item_id and sd.supplier_id = po.supplier_id
+    left join "ITEMS" i on i.id = n.item_id
+    group by 1, 2, 3
+    on conflict (month, supplier_id, item_id) do update
+    set line_count = m.line_count + excluded.line_count,
+        ordered_qty = m.ordered_qty + excluded.ordered_qty,
+        ordered_spend = m.ordered_spend + excluded.ordered_spend,
+        category = coalesce(excluded.category, m.category);
+    return null;
+end;
+$$ language plpgsql;
+
+drop trigger if exists purchase_items_accumulate_spend on "PURCHASE_ITEMS";
+create trigger purchase_items_accumulate_spend
+after insert on "PURCHASE_ITEMS"
+referencing new table as new_lines
+for each statement
+execute function accumulate_ordered_spend();
+
+--주문 상태가 배송중 -> 입고완료/배송완료 로 바뀐 주문만 입고 금액에 더함 (주문월 기준)
+create or replace function accumulate_received_spend()
+returns trigger as $$
+begin
+    insert into "PURCHASE_SPEND_MONTHLY" as m (month, supplier_id, item_id, category, received_qty, received_spend)
+    select date_trunc('month', n.ordered_at at time zone 'Asia/Seoul')::date,
+           n.supplier_id,
+           pi.item_id,
+           max(i.category),
+           sum(pi.actual_qty),
+           sum(pi.actual_qty * coalesce(sd.order_unit_price, 0))
+    from new_orders n
+    join old_orders o on o.order_id = n.order_id
+    join "PURCHASE_ITEMS" pi on pi.order_id = n.order_id
+    left join "SUPPLIER_DETAILS" sd on sd.item_id = pi.item_id and sd.supplier_id = n.supplier_id
+    left join "ITEMS" i on i.id = pi.item_id
+    where o.status = '배송중'
+    and n.status in ('입고완료', '배송완료')
+    group by 1, 2, 3
+    on conflict (month, supplier_id, item_id) do update
+    set received_qty = m.received_qty + excluded.received_qty,
+        received_spend = m.received_spend + excluded.received_spend,
+        category = coalesce(excluded.category, m.category);
+    return null;
+end;
+$$ language plpgsql;
+
+drop trigger if exists purchase_orders_accumulate_received on "PURCHASE_ORDERS";
+create trigger purchase_orders_accumulate_received
+after update on "PURCHASE_ORDERS"
+referencing old table as old_orders new table as new_orders
+for each statement
+execute function accumulate_received_spend();
+
+--최초 적재 / 집계 보정용 전체 재계산
+create or replace function refresh_purchase_spend()
+returns void as $$
+begin
+    truncate "PURCHASE_SPEND_MONTHLY";
+    insert into "PURCHASE_SPEND_MONTHLY" (month, supplier_id, item_id, category, line_count,
+                                          ordered_qty, ordered_spend, received_qty, received_spend)
+    select date_trunc('month', po.ordered_at at time zone 'Asia/Seoul')::date,
+           po.supplier_id,
+           pi.item_id,
+           max(i.category),
+           count(*),
+           sum(pi.actual_qty),
+           sum(pi.actual_qty * coalesce(sd.order_unit_price, 0)),
+           coalesce(sum(pi.actual_qty) filter (where po.status in ('입고완료', '배송완료')), 0),
+           coalesce(sum(pi.actual_qty * coalesce(sd.order_unit_price, 0)) filter (where po.status in ('입고완료', '배송완료')), 0)
+    from "PURCHASE_ITEMS" pi
+    join "PURCHASE_ORDERS" po on po.order_id = pi.order_id
+    left join "SUPPLIER_DETAILS" sd on sd.item_id = pi.item_id and sd.supplier_id = po.supplier_id
+    left join "ITEMS" i on i.id = pi.item_id
+    group by 1, 2, 3;
+end;
+$$ language plpgsql;
+
+--공급처별 월 지출
+create or replace function spend_by_supplier_month(p_from date, p_to date)
+returns table (month date, supplier_id int, supplier_name text, line_count bigint,
+               ordered_spend numeric, received_spend numeric) as $$
+    select m.month, m.supplier_id, s.name, sum(m.line_count), sum(m.ordered_spend), sum(m.received_spend)
+    from "PURCHASE_SPEND_MONTHLY" m
+    left join "SUPPLIERS" s on s.id = m.supplier_id
+    where m.month between p_from and p_to
+    group by m.month, m.supplier_id, s.name
+    order by m.month, m.supplier_id;
+$$ language sql stable;
+
+--카테고리별 월 지출 추이
+create or replace function spend_by_category_month(p_from date, p_to date)
+returns table (month date, category text, ordered_spend numeric, received_spend numeric) as $$
+    select m.month, coalesce(m.category, '기타'), sum(m.ordered_spend), sum(m.received_spend)
+    from "PURCHASE_SPEND_MONTHLY" m
+    where m.month between p_from and p_to
+    group by m.month, coalesce(m.category, '기타')
+    order by m.month, 2;
+$$ language sql stable;
+
+--기간 내 지출 상위 품목
+create or replace function top_items_by_spend(p_from date, p_to date, p_limit int default 20)
+returns table (item_id int, item_name text, category text, ordered_qty numeric, ordered_spend numeric) as $$
+    select m.item_id, i.name, max(m.category), sum(m.ordered_qty), sum(m.ordered_spend)
+    from "PURCHASE_SPEND_MONTHLY" m
+    left join "ITEMS" i on i.id = m.item_id
+    where m.month between p_from and p_to
+    group by m.item_id, i.name
+    order by sum(m.ordered_spend) desc
+    limit p_limit;
+$$ language sql stable;
+--[Functions/lead_times.sql 의 이 시점 정의]
+--공급처 리드타임(발주~입고 소요일) 기록
+--주문이 배송중 -> 입고완료/배송완료 로 바뀌는 시각을 received_at 에 남기고,
+--(공급처, 품목)별 리드타임 통계(건수, 평균, 분산용 m2, 최근 20건, p90)를 입고 시점에 증분 갱신
+alter table "PURCHASE_ORDERS" add column if not exists received_at timestamptz;
+
+create table if not exists "SUPPLIER_LEAD_TIMES" (
+    supplier_id int not null,
+    item_id int not null,
+    n int not null default 0,
+    mean_days numeric not null default 0,
+    m2 numeric not null default 0,
+    recent_days numeric[] not null default '{}',
+    p90_days numeric,
+    updated_at timestamptz not null default now(),
+    primary key (supplier_id, item_id)
+);
+
+--입고 시각 기록 (before update)
+create or replace function stamp_received_at()
+returns trigger as $$
+begin
+    if old.status = '배송중' and new.status in ('입고완료', '배송완료') and new.received_at is null then
+        new.received_at = now();
+    end if;
+    return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists purchase_orders_stamp_received_at on "PURCHASE_ORDERS";
+create trigger purchase_orders_stamp_received_at
+before update on "PURCHASE_ORDERS"
+for each row
+execute function stamp_received_at();
+
+--최근 리드타임 목록의 p90
+create or replace function lead_time_p90(p_days numeric[])
+returns numeric as $$
+    select percentile_cont(0.9) within group (order by d)::numeric from unnest(p_days) d;
+$$ language sql immutable;
+
+--최근 20건만 유지
+create or replace function lead_time_recent(p_days numeric[])
+returns numeric[] as $$
+    select coalesce(p_days[greatest(1, cardinality(p_days) - 19):], '{}');
+$$ language sql immutable;
+
+--입고된 주문의 리드타임을 (공급처, 품목)별로 묶어 기존 통계와 병합 (평균/분산은 병렬 Welford 결합)
+create or replace function accumulate_lead_times()
+returns trigger as $$
+begin
+    insert into "SUPPLIER_LEAD_TIMES" as l (supplier_id, item_id, n, mean_days, m2, recent_days, p90_days, updated_at)
+    select b.supplier_id, b.item_id, b.n, b.mean_days, b.m2, lead_time_recent(b.days), lead_time_p90(lead_time_recent(b.days)), now()
+    from (
+        select n.supplier_id,
+               pi.item_id,
+               count(*) as n,
+               avg(d.days) as mean_days,
+               coalesce(var_pop(d.days), 0) * count(*) as m2,
+               array_agg(d.days order by n.received_at) as days
+        from new_orders n
+        join old_orders o on o.order_id = n.order_id
+        join "PURCHASE_ITEMS" pi on pi.order_id = n.order_id
+        cross join lateral (select extract(epoch from (n.received_at - n.ordered_at))::numeric / 86400 as days) d
+        where o.received_at is null
+        and n.received_at is not null
+        group by n.supplier_id, pi.item_id
+    ) b
+    on conflict (supplier_id, item_id) do update
+    set n = l.n + excluded.n,
+        mean_days = l.mean_days + (excluded.mean_days - l.mean_days) * excluded.n / (l.n + excluded.n),
+        m2 = l.m2 + excluded.m2 + power(excluded.mean_days - l.mean_days, 2) * l.n * excluded.n / (l.n + excluded.n),
+        recent_days = lead_time_recent(l.recent_days || excluded.recent_days),
+        p90_days = lead_time_p90(lead_time_recent(l.recent_days || excluded.recent_days)),
+        updated_at = now();
+    return null;
+end;
+$$ language plpgsql;
+
+drop trigger if exists purchase_orders_accumulate_lead_times on "PURCHASE_ORDERS";
+create trigger purchase_orders_accumulate_lead_times
+after update on "PURCHASE_ORDERS"
+referencing old table as old_orders new table as new_orders
+for each statement
+execute function accumulate_lead_times();
+
+--최초 적재 / 통계 보정용 전체 재계산 (received_at 이 기록된 주문만 대상)
+create or replace function refresh_lead_times()
+returns void as $$
+begin
+    truncate "SUPPLIER_LEAD_TIMES";
+    insert into "SUPPLIER_LEAD_TIMES" (supplier_id, item_id, n, mean_days, m2, recent_days, p90_days)
+    select b.supplier_id, b.item_id, b.n, b.mean_days, b.m2, lead_time_recent(b.days), lead_time_p90(lead_time_recent(b.days))
+    from (
+        select po.supplier_id,
+               pi.item_id,
+               count(*) as n,
+               avg(d.days) as mean_days,
+               coalesce(var_pop(d.days), 0) * count(*) as m2,
+               array_agg(d.days order by po.received_at) as days
+        from "PURCHASE_ORDERS" po
+        join "PURCHASE_ITEMS" pi on pi.order_id = po.order_id
+        cross join lateral (select extract(epoch from (po.received_at - po.ordered_at))::numeric / 86400 as days) d
+        where po.received_at is not null
+        group by po.supplier_id, pi.item_id
+    ) b;
+end;
+$$ language plpgsql;
+--[Functions/reorder_alerts.sql 의 이 시점 정의]
+--발주 알림 사전 계산 결과 (Streamlit/alert_worker.py 가 갱신)
+--예측 재고가 발주점 미만인 품목만 저장하므로 행 수는 전체 품목 수가 아니라 알림 수에 비례
+create table if not exists "REORDER_ALERTS" (
+    item_id int not null,
+    supplier_id int not null,
+    item_name text,
+    category text,
+    predicted_stock numeric,
+    reorder_point numeric,
+    safety_stock numeric,
+    lead_days numeric,
+    base_unit text,
+    computed_at timestamptz not null default now(),
+    primary key (item_id, supplier_id)
+);
+
+--마지막 계산 요약 (항상 id = 1 한 행)
+create table if not exists "REORDER_ALERT_STATUS" (
+    id int primary key default 1 check (id = 1),
+    computed_at timestamptz not null,
+    item_count int not null,
+    alert_count int not null,
+    duration_ms numeric
+);
+--집계 테이블 채우기는 보관 뷰가 생긴 뒤(0005)에 실행
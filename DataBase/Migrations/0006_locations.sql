@@ -0,0 +1,392 @@
+--여러 매장(location)을 한 인스턴스에서 운영
+--품목/공급처/공급처별 상세(카탈로그)는 매장 공용이고, 재고(STOCKS), 발주(PURCHASE_ORDERS),
+--실사 기록(STOCK_COUNTS)과 그 파생 테이블(알림, 월별 지출)은 매장별로 나뉜다.
+--기존 데이터는 모두 1번 매장(본점)으로 들어감
+create table if not exists "LOCATIONS" (
+    id int generated by default as identity primary key,
+    name text not null unique
+);
+
+insert into "LOCATIONS" (id, name) values (1, '본점') on conflict (id) do nothing;
+select setval(pg_get_serial_sequence('"LOCATIONS"', 'id'), (select max(id) from "LOCATIONS"));
+
+--재고: 매장이 기본키의 첫 칼럼 (매장별 조회가 기본키 인덱스 범위 검색이 됨)
+alter table "STOCKS" add column if not exists location_id int not null default 1 references "LOCATIONS" (id);
+alter table "STOCKS" drop constraint "STOCKS_pkey";
+alter table "STOCKS" add constraint "STOCKS_pkey" primary key (location_id, item_id, supplier_id);
+
+--발주 (archive_orders.sql 에서 칼럼이 먼저 생겼을 수 있음)
+alter table "PURCHASE_ORDERS" add column if not exists location_id int not null default 1;
+alter table "PURCHASE_ORDERS" add constraint purchase_orders_location_fk
+    foreign key (location_id) references "LOCATIONS" (id);
+
+--실사 기록: 실사 반영 때마다 (매장, 품목, 공급처)별 실사값을 남김
+create table if not exists "STOCK_COUNTS" (
+    id bigint generated by default as identity primary key,
+    location_id int not null references "LOCATIONS" (id),
+    item_id int not null,
+    supplier_id int not null,
+    counted_stock numeric not null,
+    avg_consumption numeric,
+    counted_at timestamptz not null default now()
+);
+
+--매장 기준 복합 인덱스 (기존 단일 칼럼 인덱스 대체)
+drop index if exists stocks_supplier_idx;
+create index if not exists stocks_location_supplier_idx on "STOCKS" (location_id, supplier_id);
+
+drop index if exists purchase_orders_open_idx;
+create index if not exists purchase_orders_open_idx
+    on "PURCHASE_ORDERS" (location_id, order_id) include (supplier_id, total_price, ordered_at)
+    where status = '배송중';
+
+create index if not exists stock_counts_location_time_idx on "STOCK_COUNTS" (location_id, counted_at desc);
+create index if not exists stock_counts_item_idx on "STOCK_COUNTS" (location_id, item_id, supplier_id, counted_at desc);
+
+--파생 테이블은 매장 칼럼이 키에 들어가도록 다시 만들고 재계산
+drop table if exists "PURCHASE_SPEND_MONTHLY";
+drop table if exists "REORDER_ALERTS";
+drop table if exists "REORDER_ALERT_STATUS";
+
+--분석 함수에 p_location_id 인자가 추가되어 이전 시그니처는 제거 (같은 이름의 오버로드가 남으면 호출이 모호해짐)
+drop function if exists spend_by_supplier_month(date, date);
+drop function if exists spend_by_category_month(date, date);
+drop function if exists top_items_by_spend(date, date, int);
+
+--[Functions/archive_orders.sql 의 이 시점 정의]
+--완료된 주문 보관(hot/cold 분리)
+--입고가 끝난 지 일정 기간이 지난 주문과 주문 상세를 보관 테이블로 옮겨서 운영 테이블
+--(PURCHASE_ORDERS/PURCHASE_ITEMS)은 최근 주문 + 배송중 주문 정도의 일정한 크기로 유지.
+--리포트/내보내기는 두 쪽을 합친 *_ALL 뷰를 읽는다.
+--PURCHASE_SPEND_MONTHLY / SUPPLIER_LEAD_TIMES 는 삭제 트리거가 없으므로 보관 후에도 그대로 유지됨
+
+--매장 구분 (LOCATIONS 외래키는 0006_locations.sql 에서 추가)
+alter table "PURCHASE_ORDERS" add column if not exists location_id int not null default 1;
+
+create table if not exists "PURCHASE_ORDERS_ARCHIVE" (
+    order_id int primary key,
+    supplier_id int not null,
+    total_price int not null default 0,
+    status text not null,
+    ordered_at timestamptz not null,
+    received_at timestamptz,
+    archived_at timestamptz not null default now(),
+    location_id int not null default 1
+);
+
+alter table "PURCHASE_ORDERS_ARCHIVE" add column if not exists location_id int not null default 1;
+
+create table if not exists "PURCHASE_ITEMS_ARCHIVE" (
+    id int primary key,
+    order_id int not null references "PURCHASE_ORDERS_ARCHIVE" (order_id) on delete cascade,
+    item_id int not null,
+    actual_qty int not null,
+    status text,
+    ordered_at timestamptz not null,
+    archived_at timestamptz not null default now()
+);
+
+create index if not exists purchase_orders_archive_supplier_idx on "PURCHASE_ORDERS_ARCHIVE" (supplier_id, ordered_at);
+create index if not exists purchase_items_archive_order_idx on "PURCHASE_ITEMS_ARCHIVE" (order_id);
+
+--보관 대상 탐색용 부분 인덱스 (운영 테이블의 완료 주문만)
+create index if not exists purchase_orders_closed_idx
+    on "PURCHASE_ORDERS" (order_id) include (received_at, ordered_at)
+    where status in ('입고완료', '배송완료');
+
+--운영 + 보관을 합친 조회용 뷰 (archived_at 이 null 이면 운영 테이블의 행)
+--create or replace view 는 칼럼을 뒤에 덧붙이는 것만 허용하므로 새 칼럼은 끝에 추가
+create or replace view "PURCHASE_ORDERS_ALL" as
+    select order_id, supplier_id, total_price, status, ordered_at, received_at, null::timestamptz as archived_at, location_id
+    from "PURCHASE_ORDERS"
+    union all
+    select order_id, supplier_id, total_price, status, ordered_at, received_at, archived_at, location_id
+    from "PURCHASE_ORDERS_ARCHIVE";
+
+create or replace view "PURCHASE_ITEMS_ALL" as
+    select id, order_id, item_id, actual_qty, status, ordered_at, null::timestamptz as archived_at
+    from "PURCHASE_ITEMS"
+    union all
+    select id, order_id, item_id, actual_qty, status, ordered_at, archived_at
+    from "PURCHASE_ITEMS_ARCHIVE";
+
+--입고(또는 주문) 후 p_older_than 이 지난 완료 주문을 최대 p_batch 건 보관 테이블로 이동.
+--한 문장(데이터 변경 CTE)으로 삭제와 복사를 같이 하므로 중간에 실패해도 반쯤 옮겨진 주문이 없고,
+--skip locked 로 입고 처리 중인 주문이나 동시에 도는 다른 보관 작업과 부딪히지 않음.
+--반환값: 이번에 옮긴 주문 수 (0 이면 더 옮길 것이 없음)
+create or replace function archive_purchase_orders(p_older_than interval default interval '180 days',
+                                                   p_batch int default 1000)
+returns int as $$
+declare
+    moved int;
+begin
+    with targets as (
+        select order_id
+        from "PURCHASE_ORDERS"
+        where status in ('입고완료', '배송완료')
+        and coalesce(received_at, ordered_at) < now() - p_older_than
+        order by order_id
+        limit p_batch
+        for update skip locked
+    ), moved_orders as (
+        delete from "PURCHASE_ORDERS" po
+        using targets t
+        where po.order_id = t.order_id
+        returning po.order_id, po.supplier_id, po.total_price, po.status, po.ordered_at, po.received_at, po.location_id
+    ), archived_orders as (
+        insert into "PURCHASE_ORDERS_ARCHIVE" (order_id, supplier_id, total_price, status, ordered_at, received_at, location_id)
+        select * from moved_orders
+        on conflict (order_id) do nothing
+    ), moved_items as (
+        delete from "PURCHASE_ITEMS" pi
+        using targets t
+        where pi.order_id = t.order_id
+        returning pi.id, pi.order_id, pi.item_id, pi.actual_qty, pi.status, pi.ordered_at
+    ), archived_items as (
+        insert into "PURCHASE_ITEMS_ARCHIVE" (id, order_id, item_id, actual_qty, status, ordered_at)
+        select * from moved_items
+        on conflict (id) do nothing
+    )
+    select count(*) into moved from moved_orders;
+    return moved;
+end;
+$$ language plpgsql;
+--[Functions/receive_orders.sql 의 이 시점 정의]
+--입고완료 일괄 처리: 배송중인 주문만 입고완료로 바꾸고 환산계수를 적용해 재고에 더함
+--이미 입고된 주문은 건너뛰므로 같은 요청을 재시도해도 재고가 두 번 더해지지 않음
+--재고는 주문한 매장(location_id)의 STOCKS 행에 더함
+create or replace function receive_orders(
+    p_order_ids INT[]
+)
+returns setof INT as $$
+begin
+    return query
+    with targets as (
+        update "PURCHASE_ORDERS"
+        set status = '입고완료'
+        where order_id = any(p_order_ids)
+        and status = '배송중'
+        returning order_id, supplier_id, location_id
+    ), incoming as (
+        select t.location_id, pi.item_id, t.supplier_id, sum(pi.actual_qty * coalesce(sd.conversion_factor, 1)) as qty
+        from targets t
+        join "PURCHASE_ITEMS" pi on pi.order_id = t.order_id
+        left join "SUPPLIER_DETAILS" sd on sd.item_id = pi.item_id and sd.supplier_id = t.supplier_id
+        group by t.location_id, pi.item_id, t.supplier_id
+    ), stocked as (
+        update "STOCKS" s
+        set stock = s.stock + i.qty
+        from incoming i
+        where s.location_id = i.location_id
+        and s.item_id = i.item_id
+        and s.supplier_id = i.supplier_id
+        returning s.item_id
+    )
+    select t.order_id from targets t;
+
+exception when others then
+raise exception '입고 처리 중 오류가 발생했습니다.%',sqlerrm;
+end;
+$$ language plpgsql;
+--[Functions/delivery_completed.sql 의 이 시점 정의]
+create or replace function delivery_completed(
+    p_order_id INT
+)
+returns void as $$
+begin
+    update "PURCHASE_ORDERS"
+    set status = '배송완료'
+    where order_id = p_order_id;
+
+    update "PURCHASE_ITEMS"
+    set status = '배송완료'
+    where order_id = p_order_id;
+
+    update "STOCKS" s
+    set stock = s.stock + pi.actual_qty
+    from "PURCHASE_ITEMS" pi
+    join "PURCHASE_ORDERS" po on po.order_id = pi.order_id
+    where pi.order_id = p_order_id
+    and s.location_id = po.location_id
+    and s.item_id = pi.item_id;
+
+exception when others then
+raise exception '입고 처리 중 오류가 발생했습니다.%',sqlerrm;
+end;
+$$ language plpgsql;
+--[Functions/purchase_analytics.sql 의 이 시점 정의]
+--구매 분석용 월별 집계 테이블 (주문월 x 매장 x 공급처 x 품목)
+--주문 상세가 들어올 때 / 주문이 입고될 때 트리거로 증분 반영하고,
+--분석 화면은 원본 PURCHASE_ORDERS/PURCHASE_ITEMS 대신 이 테이블을 집계한 작은 결과만 받아감
+create table if not exists "PURCHASE_SPEND_MONTHLY" (
+    month date not null,
+    location_id int not null default 1,
+    supplier_id int not null,
+    item_id int not null,
+    category text,
+    line_count int not null default 0,
+    ordered_qty numeric not null default 0,
+    ordered_spend numeric not null default 0,
+    received_qty numeric not null default 0,
+    received_spend numeric not null default 0,
+    primary key (month, location_id, supplier_id, item_id)
+);
+
+--주문 상세 insert: 문장 단위로 (주문월, 매장, 공급처, 품목)별로 묶어서 한 번에 더함
+create or replace function accumulate_ordered_spend()
+returns trigger as $$
+begin
+    insert into "PURCHASE_SPEND_MONTHLY" as m (month, location_id, supplier_id, item_id, category, line_count, ordered_qty, ordered_spend)
+    select date_trunc('month', po.ordered_at at time zone 'Asia/Seoul')::date,
+           po.location_id,
+           po.supplier_id,
+           n.item_id,
+           max(i.category),
+           count(*),
+           sum(n.actual_qty),
+           sum(n.actual_qty * coalesce(sd.order_unit_price, 0))
+    from new_lines n
+    join "PURCHASE_ORDERS" po on po.order_id = n.order_id
+    left join "SUPPLIER_DETAILS" sd on sd.item_id = n.item_id and sd.supplier_id = po.supplier_id
+    left join "ITEMS" i on i.id = n.item_id
+    group by 1, 2, 3, 4
+    on conflict (month, location_id, supplier_id, item_id) do update
+    set line_count = m.line_count + excluded.line_count,
+        ordered_qty = m.ordered_qty + excluded.ordered_qty,
+        ordered_spend = m.ordered_spend + excluded.ordered_spend,
+        category = coalesce(excluded.category, m.category);
+    return null;
+end;
+$$ language plpgsql;
+
+drop trigger if exists purchase_items_accumulate_spend on "PURCHASE_ITEMS";
+create trigger purchase_items_accumulate_spend
+after insert on "PURCHASE_ITEMS"
+referencing new table as new_lines
+for each statement
+execute function accumulate_ordered_spend();
+
+--주문 상태가 배송중 -> 입고완료/배송완료 로 바뀐 주문만 입고 금액에 더함 (주문월 기준)
+create or replace function accumulate_received_spend()
+returns trigger as $$
+begin
+    insert into "PURCHASE_SPEND_MONTHLY" as m (month, location_id, supplier_id, item_id, category, received_qty, received_spend)
+    select date_trunc('month', n.ordered_at at time zone 'Asia/Seoul')::date,
+           n.location_id,
+           n.supplier_id,
+           pi.item_id,
+           max(i.category),
+           sum(pi.actual_qty),
+           sum(pi.actual_qty * coalesce(sd.order_unit_price, 0))
+    from new_orders n
+    join old_orders o on o.order_id = n.order_id
+    join "PURCHASE_ITEMS" pi on pi.order_id = n.order_id
+    left join "SUPPLIER_DETAILS" sd on sd.item_id = pi.item_id and sd.supplier_id = n.supplier_id
+    left join "ITEMS" i on i.id = pi.item_id
+    where o.status = '배송중'
+    and n.status in ('입고완료', '배송완료')
+    group by 1, 2, 3, 4
+    on conflict (month, location_id, supplier_id, item_id) do update
+    set received_qty = m.received_qty + excluded.received_qty,
+        received_spend = m.received_spend + excluded.received_spend,
+        category = coalesce(excluded.category, m.category);
+    return null;
+end;
+$$ language plpgsql;
+
+drop trigger if exists purchase_orders_accumulate_received on "PURCHASE_ORDERS";
+create trigger purchase_orders_accumulate_received
+after update on "PURCHASE_ORDERS"
+referencing old table as old_orders new table as new_orders
+for each statement
+execute function accumulate_received_spend();
+
+--최초 적재 / 집계 보정용 전체 재계산 (보관된 주문 포함)
+create or replace function refresh_purchase_spend()
+returns void as $$
+begin
+    truncate "PURCHASE_SPEND_MONTHLY";
+    insert into "PURCHASE_SPEND_MONTHLY" (month, location_id, supplier_id, item_id, category, line_count,
+                                          ordered_qty, ordered_spend, received_qty, received_spend)
+    select date_trunc('month', po.ordered_at at time zone 'Asia/Seoul')::date,
+           po.location_id,
+           po.supplier_id,
+           pi.item_id,
+           max(i.category),
+           count(*),
+           sum(pi.actual_qty),
+           sum(pi.actual_qty * coalesce(sd.order_unit_price, 0)),
+           coalesce(sum(pi.actual_qty) filter (where po.status in ('입고완료', '배송완료')), 0),
+           coalesce(sum(pi.actual_qty * coalesce(sd.order_unit_price, 0)) filter (where po.status in ('입고완료', '배송완료')), 0)
+    from "PURCHASE_ITEMS_ALL" pi
+    join "PURCHASE_ORDERS_ALL" po on po.order_id = pi.order_id
+    left join "SUPPLIER_DETAILS" sd on sd.item_id = pi.item_id and sd.supplier_id = po.supplier_id
+    left join "ITEMS" i on i.id = pi.item_id
+    group by 1, 2, 3, 4;
+end;
+$$ language plpgsql;
+
+--공급처별 월 지출 (p_location_id 가 null 이면 전체 매장)
+create or replace function spend_by_supplier_month(p_from date, p_to date, p_location_id int default null)
+returns table (month date, supplier_id int, supplier_name text, line_count bigint,
+               ordered_spend numeric, received_spend numeric) as $$
+    select m.month, m.supplier_id, s.name, sum(m.line_count), sum(m.ordered_spend), sum(m.received_spend)
+    from "PURCHASE_SPEND_MONTHLY" m
+    left join "SUPPLIERS" s on s.id = m.supplier_id
+    where m.month between p_from and p_to
+    and (p_location_id is null or m.location_id = p_location_id)
+    group by m.month, m.supplier_id, s.name
+    order by m.month, m.supplier_id;
+$$ language sql stable;
+
+--카테고리별 월 지출 추이
+create or replace function spend_by_category_month(p_from date, p_to date, p_location_id int default null)
+returns table (month date, category text, ordered_spend numeric, received_spend numeric) as $$
+    select m.month, coalesce(m.category, '기타'), sum(m.ordered_spend), sum(m.received_spend)
+    from "PURCHASE_SPEND_MONTHLY" m
+    where m.month between p_from and p_to
+    and (p_location_id is null or m.location_id = p_location_id)
+    group by m.month, coalesce(m.category, '기타')
+    order by m.month, 2;
+$$ language sql stable;
+
+--기간 내 지출 상위 품목
+create or replace function top_items_by_spend(p_from date, p_to date, p_limit int default 20,
+                                              p_location_id int default null)
+returns table (item_id int, item_name text, category text, ordered_qty numeric, ordered_spend numeric) as $$
+    select m.item_id, i.name, max(m.category), sum(m.ordered_qty), sum(m.ordered_spend)
+    from "PURCHASE_SPEND_MONTHLY" m
+    left join "ITEMS" i on i.id = m.item_id
+    where m.month between p_from and p_to
+    and (p_location_id is null or m.location_id = p_location_id)
+    group by m.item_id, i.name
+    order by sum(m.ordered_spend) desc
+    limit p_limit;
+$$ language sql stable;
+--[Functions/reorder_alerts.sql 의 이 시점 정의]
+--발주 알림 사전 계산 결과 (Streamlit/alert_worker.py 가 갱신)
+--예측 재고가 발주점 미만인 품목만 저장하므로 행 수는 전체 품목 수가 아니라 알림 수에 비례
+create table if not exists "REORDER_ALERTS" (
+    location_id int not null default 1,
+    item_id int not null,
+    supplier_id int not null,
+    item_name text,
+    category text,
+    predicted_stock numeric,
+    reorder_point numeric,
+    safety_stock numeric,
+    lead_days numeric,
+    base_unit text,
+    computed_at timestamptz not null default now(),
+    primary key (location_id, item_id, supplier_id)
+);
+
+--매장별 마지막 계산 요약
+create table if not exists "REORDER_ALERT_STATUS" (
+    location_id int primary key,
+    computed_at timestamptz not null,
+    item_count int not null,
+    alert_count int not null,
+    duration_ms numeric
+);
+select refresh_purchase_spend();
@@ -0,0 +1,7 @@
+--바코드 스캔 실사: 공급처별 상세(카탈로그)에 바코드를 둔다
+--스캔 1회 = 재고 관리 단위(base_unit) 1개. 같은 바코드가 두 (품목, 공급처)를 가리키면 스캔 결과가 모호하므로 유일
+alter table "SUPPLIER_DETAILS" add column if not exists barcode text;
+
+--바코드가 없는 품목이 대부분이어도 인덱스가 커지지 않도록 부분 유일 인덱스
+create unique index if not exists supplier_details_barcode_idx
+    on "SUPPLIER_DETAILS" (barcode) where barcode is not null;
@@ -0,0 +1,46 @@
+--예측 정확도 추적: 실사 기록에 그 실사가 대체한 예측값을 함께 남긴다
+--predicted_stock: 실사 직전 화면에 보이던 예측 재고, predicted_usage: 마지막 실사 이후 예측 소모량
+--이전 실사 기록은 예측값이 없으므로 null (정확도 집계에서 제외)
+alter table "STOCK_COUNTS" add column if not exists predicted_stock numeric;
+alter table "STOCK_COUNTS" add column if not exists predicted_usage numeric;
+
+--[Functions/forecast_accuracy.sql 의 이 시점 정의]
+--예측 정확도: 실사값 vs 그 실사 직전의 예측 재고 (STOCK_COUNTS.predicted_stock)
+--오차 = 실사값 - 예측 재고 (양수: 예측보다 많이 남음 = 평균 소모량을 크게 잡음)
+--품목/카테고리/요일/월 네 가지 묶음을 grouping sets 로 한 번에 집계하고 합계만 돌려줌
+--(MAE, 편향, MAPE, 소모량 비율은 앱에서 합계를 나눠 계산하므로 묶음을 다시 합쳐도 정확함)
+--소모량 합계는 예측이 0 으로 잘리지 않은 실사만 사용 (잘린 경우 실제 소모량을 역산할 수 없음)
+create or replace function forecast_error_stats(p_from date, p_to date, p_location_id int default null)
+returns table (dim text, item_id int, supplier_id int, item_name text, category text, weekday int, month date,
+               n bigint, sum_error numeric, sum_abs_error numeric, n_pct bigint, sum_abs_pct numeric,
+               n_usage bigint, predicted_usage numeric, actual_usage numeric) as $$
+    with c as (
+        select sc.item_id, sc.supplier_id, i.name as item_name, coalesce(i.category, '기타') as category,
+               extract(isodow from sc.counted_at at time zone 'Asia/Seoul')::int - 1 as weekday,
+               date_trunc('month', sc.counted_at at time zone 'Asia/Seoul')::date as month,
+               sc.counted_stock - sc.predicted_stock as error,
+               sc.counted_stock, sc.predicted_stock, sc.predicted_usage
+        from "STOCK_COUNTS" sc
+        left join "ITEMS" i on i.id = sc.item_id
+        where sc.predicted_stock is not null
+        and sc.counted_at >= p_from::timestamp at time zone 'Asia/Seoul'
+        and sc.counted_at < (p_to + 1)::timestamp at time zone 'Asia/Seoul'
+        and (p_location_id is null or sc.location_id = p_location_id)
+    )
+    select case when grouping(c.item_id) = 0 then 'item'
+                when grouping(c.category) = 0 then 'category'
+                when grouping(c.weekday) = 0 then 'weekday'
+                else 'month' end,
+           c.item_id, c.supplier_id, c.item_name, c.category, c.weekday, c.month,
+           count(*),
+           sum(c.error),
+           sum(abs(c.error)),
+           count(*) filter (where c.counted_stock > 0),
+           coalesce(sum(abs(c.error) / c.counted_stock) filter (where c.counted_stock > 0), 0),
+           count(*) filter (where c.predicted_stock > 0),
+           coalesce(sum(c.predicted_usage) filter (where c.predicted_stock > 0), 0),
+           coalesce(sum(c.predicted_usage - c.error) filter (where c.predicted_stock > 0), 0)
+    from c
+    group by grouping sets ((c.item_id, c.supplier_id, c.item_name, c.category), (c.category), (c.weekday), (c.month))
+    order by 1, 2, 3, 5, 6, 7;
+$$ language sql stable;
\ No newline at end of file
@@ -0,0 +1,126 @@
+--실사 반영의 재고 쓰기와 실사 기록을 한 트랜잭션으로 묶는 write_stock_counts 추가
+--[Functions/row_versions.sql 의 이 시점 정의]
+--행 버전(낙관적 동시성 제어): STOCKS, SUPPLIER_DETAILS 는 수정될 때마다 트리거가 version 을 1 올린다
+--앱은 읽었을 때의 version 을 함께 보내고, write_* 함수가 version 이 그대로인 행만 한 문장(한 번의 요청)으로 반영한다
+--그 사이 다른 사람(실사, 입고, 관리자 편집)이 바꾼 행은 반영하지 않고 현재 서버 값(server)과 함께 돌려준다
+--version 이 없는 행은 새 행으로 보고 insert (이미 있으면 충돌). 한 번에 보내는 행의 키는 겹치지 않아야 함
+create or replace function bump_row_version()
+returns trigger as $$
+begin
+    new.version = old.version + 1;
+    return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists stocks_bump_version on "STOCKS";
+create trigger stocks_bump_version
+before update on "STOCKS"
+for each row
+execute function bump_row_version();
+
+drop trigger if exists supplier_details_bump_version on "SUPPLIER_DETAILS";
+create trigger supplier_details_bump_version
+before update on "SUPPLIER_DETAILS"
+for each row
+execute function bump_row_version();
+
+--p_rows: [{"location_id", "item_id", "supplier_id", "version", 바꿀 칼럼...}, ...]
+--보내지 않은 칼럼은 현재 값 유지 (jsonb_populate_record 의 기준 행으로 현재 행을 사용)
+create or replace function write_stocks(p_rows jsonb)
+returns table (location_id int, item_id int, supplier_id int, server jsonb) as $$
+    with input as (
+        select r.value as row,
+               (r.value->>'location_id')::int as location_id,
+               (r.value->>'item_id')::int as item_id,
+               (r.value->>'supplier_id')::int as supplier_id,
+               (r.value->>'version')::bigint as version
+        from jsonb_array_elements(p_rows) r
+    ),
+    updated as (
+        update "STOCKS" s
+        set (stock, avg_consumption, last_checked_at) = (
+            select n.stock, n.avg_consumption, n.last_checked_at from jsonb_populate_record(s, i.row) n
+        )
+        from input i
+        where s.location_id = i.location_id and s.item_id = i.item_id and s.supplier_id = i.supplier_id
+        and s.version = i.version
+        returning s.location_id, s.item_id, s.supplier_id
+    ),
+    inserted as (
+        insert into "STOCKS" as s (location_id, item_id, supplier_id, stock, avg_consumption, last_checked_at)
+        select i.location_id, i.item_id, i.supplier_id,
+               coalesce(n.stock, 0), coalesce(n.avg_consumption, 0), coalesce(n.last_checked_at, now())
+        from input i
+        cross join lateral jsonb_populate_record(null::"STOCKS", i.row) n
+        where i.version is null
+        on conflict do nothing
+        returning s.location_id, s.item_id, s.supplier_id
+    )
+    --반영되지 않은 행 = 충돌. 현재 값은 이 문장 시작 시점 기준 (삭제된 행이면 null)
+    select i.location_id, i.item_id, i.supplier_id, to_jsonb(s)
+    from input i
+    left join "STOCKS" s on s.location_id = i.location_id and s.item_id = i.item_id and s.supplier_id = i.supplier_id
+    where not exists (select 1 from updated u
+                      where u.location_id = i.location_id and u.item_id = i.item_id and u.supplier_id = i.supplier_id)
+    and not exists (select 1 from inserted n
+                    where n.location_id = i.location_id and n.item_id = i.item_id and n.supplier_id = i.supplier_id);
+$$ language sql;
+
+create or replace function write_supplier_details(p_rows jsonb)
+returns table (item_id int, supplier_id int, server jsonb) as $$
+    with input as (
+        select r.value as row,
+               (r.value->>'item_id')::int as item_id,
+               (r.value->>'supplier_id')::int as supplier_id,
+               (r.value->>'version')::bigint as version
+        from jsonb_array_elements(p_rows) r
+    ),
+    updated as (
+        update "SUPPLIER_DETAILS" d
+        set (order_url, order_unit, "MOQ", order_unit_price, safety_stock, base_unit, conversion_factor, barcode) = (
+            select n.order_url, n.order_unit, n."MOQ", n.order_unit_price, n.safety_stock, n.base_unit,
+                   n.conversion_factor, n.barcode
+            from jsonb_populate_record(d, i.row) n
+        )
+        from input i
+        where d.item_id = i.item_id and d.supplier_id = i.supplier_id
+        and d.version = i.version
+        returning d.item_id, d.supplier_id
+    ),
+    inserted as (
+        insert into "SUPPLIER_DETAILS" as d (item_id, supplier_id, order_url, order_unit, "MOQ", order_unit_price,
+                                             safety_stock, base_unit, conversion_factor, barcode)
+        select i.item_id, i.supplier_id, n.order_url, n.order_unit, coalesce(n."MOQ", 1), coalesce(n.order_unit_price, 0),
+               coalesce(n.safety_stock, 0), n.base_unit, coalesce(n.conversion_factor, 1), n.barcode
+        from input i
+        cross join lateral jsonb_populate_record(null::"SUPPLIER_DETAILS", i.row) n
+        where i.version is null
+        on conflict do nothing
+        returning d.item_id, d.supplier_id
+    )
+    select i.item_id, i.supplier_id, to_jsonb(d)
+    from input i
+    left join "SUPPLIER_DETAILS" d on d.item_id = i.item_id and d.supplier_id = i.supplier_id
+    where not exists (select 1 from updated u where u.item_id = i.item_id and u.supplier_id = i.supplier_id)
+    and not exists (select 1 from inserted n where n.item_id = i.item_id and n.supplier_id = i.supplier_id);
+$$ language sql;
+
+--실사 반영: write_stocks 와 같은 조건부 쓰기 + 반영된 행의 실사 기록(STOCK_COUNTS) insert 를 한 문장(한 트랜잭션)으로.
+--둘 중 하나가 실패하면 둘 다 반영되지 않으므로, 재시도가 자기 자신이 먼저 올린 version 과 충돌하지 않고 실사 기록도 빠지지 않음
+--p_counts: [{"location_id", "item_id", "supplier_id", "counted_stock", "avg_consumption", "predicted_stock", ...}, ...]
+create or replace function write_stock_counts(p_rows jsonb, p_counts jsonb)
+returns table (location_id int, item_id int, supplier_id int, server jsonb) as $$
+    with conflicts as materialized (
+        select * from write_stocks(p_rows)
+    ),
+    counted as (
+        insert into "STOCK_COUNTS" (location_id, item_id, supplier_id, counted_stock, avg_consumption,
+                                    predicted_stock, predicted_usage, counted_at)
+        select c.location_id, c.item_id, c.supplier_id, c.counted_stock, c.avg_consumption,
+               c.predicted_stock, c.predicted_usage, coalesce(c.counted_at, now())
+        from jsonb_populate_recordset(null::"STOCK_COUNTS", p_counts) c
+        where not exists (select 1 from conflicts x
+                          where x.location_id = c.location_id and x.item_id = c.item_id and x.supplier_id = c.supplier_id)
+    )
+    select * from conflicts;
+$$ language sql;
\ No newline at end of file
@@ -0,0 +1,228 @@
+"""
+발주 알림 사전 계산 워커
+
+대시보드가 열릴 때마다 전체 품목의 예측 재고를 다시 계산하지 않도록, 별도 프로세스가
+예측 재고와 발주점을 주기적으로(그리고 쓰기 이벤트 직후) 계산해서 발주점 미달 품목만
+REORDER_ALERTS 테이블에 저장한다. 대시보드는 선택한 매장의 작은 알림 목록과 요약 한 줄
+(REORDER_ALERT_STATUS)만 읽으므로 첫 화면 속도가 품목 수와 무관해진다.
+워커는 모든 매장을 한 번에 계산하고, 요약은 매장별로 한 줄씩 남긴다.
+
+재계산 시점
+- interval 초마다 (안전재고 수정 등 감지할 수 없는 변경 반영)
+- STOCKS 의 최신 last_checked_at 이 바뀌었을 때 (실사/입고 모두 트리거로 갱신됨, poll 초마다 1건 조회)
+- 같은 서버의 쓰기 큐가 반영을 마치고 신호 파일을 건드렸을 때
+
+계산 엔진 (--engine 또는 INVENTORY_PREDICT_ENGINE)
+- python: 재고 전체를 내려받아 stock_ops 로 계산 (기본값)
+- sql: 서버 함수 predicted_stocks(DataBase/Functions/predicted_stocks.sql)가 계산한 미달 품목만 받음
+  두 엔진의 결과가 같은지는 prediction_parity.py 로 확인
+
+사용법:
+    python alert_worker.py run --interval 300 --poll 15
+    python alert_worker.py once --engine sql
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from locations import DEFAULT_LOCATION
+from shared_cache import invalidate, alerts_scope
+from stock_ops import KST, predict_stocks, load_lead_times, attach_reorder_points
+
+SIGNAL_ENV = "INVENTORY_ALERT_SIGNAL"
+DEFAULT_SIGNAL = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".alerts_dirty")
+ENGINE_ENV = "INVENTORY_PREDICT_ENGINE"
+ENGINES = ("python", "sql")
+
+CHUNK_SIZE = 500
+ALERT_COLUMNS = ["location_id", "item_id", "supplier_id", "item_name", "category", "predicted_stock", "reorder_point",
+                 "safety_stock", "lead_days", "base_unit", "computed_at"]
+
+
+# --- [1. 계산] ---
+def predict_frame(supabase, location_id=None, now_kst=None):
+    """전체 재고 행의 예측 재고/발주점 (python 엔진, 요청 3건 + 리드타임 1건). location_id 가 None 이면 전체 매장"""
+    now_kst = now_kst or datetime.now(KST)
+    q = supabase.table("STOCKS").select(
+        "location_id, item_id, supplier_id, stock, avg_consumption, last_checked_at, ITEMS(name, category)"
+    )
+    if location_id is not None:
+        q = q.eq("location_id", location_id)
+    stocks = pd.DataFrame(q.execute().data)
+    if stocks.empty:
+        return pd.DataFrame(columns=ALERT_COLUMNS)
+    stocks['item_name'] = stocks['ITEMS'].map(lambda x: x.get('name') if isinstance(x, dict) else "N/A")
+    stocks['category'] = stocks['ITEMS'].map(lambda x: x.get('category') if isinstance(x, dict) else "기타")
+
+    res_d = supabase.table("SUPPLIER_DETAILS").select("item_id, supplier_id, safety_stock, base_unit").execute()
+    details = pd.DataFrame(res_d.data, columns=["item_id", "supplier_id", "safety_stock", "base_unit"])
+
+    df = stocks.drop(columns=['ITEMS']).merge(details, on=['item_id', 'supplier_id'], how='left')
+    df['predicted_stock'] = predict_stocks(df, now_kst)
+    return attach_reorder_points(df, load_lead_times(supabase))
+
+
+def predict_frame_sql(supabase, location_id=None, now_kst=None, only_alerts=False):
+    """predicted_stocks 서버 함수 결과 (요청 1건). item_count: 필터 전 재고 행 수"""
+    now_kst = now_kst or datetime.now(KST)
+    res = supabase.rpc("predicted_stocks", {"p_location_id": location_id, "p_only_alerts": only_alerts,
+                                            "p_now": now_kst.isoformat()}).execute()
+    df = pd.DataFrame(res.data or [])
+    for col in ("predicted_stock", "reorder_point", "safety_stock", "lead_days", "stock", "avg_consumption"):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def compute_alerts(supabase, location_id=None, now_kst=None, engine=None):
+    """발주점 미달 품목 계산. location_id 가 None 이면 전체 매장, engine: "python" / "sql" (기본값은 환경변수)
+
+    반환값: (알림 DataFrame, 계산한 재고 행 수)
+    """
+    now_kst = now_kst or datetime.now(KST)
+    engine = engine or os.environ.get(ENGINE_ENV, "python")
+    if engine == "sql":
+        alerts = predict_frame_sql(supabase, location_id, now_kst, only_alerts=True)
+        if alerts.empty:
+            # 미달 품목이 없으면 행 수를 실어 올 행도 없으므로 따로 셈 (head 요청이라 행은 받지 않음)
+            q = supabase.table("STOCKS").select("location_id", count="exact", head=True)
+            if location_id is not None:
+                q = q.eq("location_id", location_id)
+            return pd.DataFrame(columns=ALERT_COLUMNS), q.execute().count or 0
+        item_count = int(alerts['item_count'].iloc[0])
+    else:
+        df = predict_frame(supabase, location_id, now_kst)
+        item_count = len(df)
+        alerts = df[df['predicted_stock'] < df['reorder_point']].copy()
+    alerts['lead_days'] = alerts['lead_days'].round(2)
+    alerts['computed_at'] = now_kst.isoformat()
+    return alerts[ALERT_COLUMNS].sort_values(['location_id', 'category', 'item_name']).reset_index(drop=True), item_count
+
+
+def _records(df):
+    """NaN -> None 으로 바꿔 JSON으로 보낼 수 있는 dict 목록"""
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def _stock_count(supabase, location_id):
+    """매장의 STOCKS 행 수 (count=exact, head 요청이라 행은 받지 않음)"""
+    res = supabase.table("STOCKS").select("location_id", count="exact", head=True).eq("location_id", location_id).execute()
+    return int(res.count or 0)
+
+
+def refresh_alerts(supabase, now_kst=None, engine=None):
+    """전체 매장의 알림 테이블을 현재 계산 결과로 교체. 반환값: 전체 요약 dict"""
+    t0 = time.perf_counter()
+    now_kst = now_kst or datetime.now(KST)
+    res_l = supabase.table("LOCATIONS").select("id").execute()
+    location_ids = sorted({int(l['id']) for l in res_l.data} or {DEFAULT_LOCATION})
+    alerts, item_count = compute_alerts(supabase, None, now_kst, engine)
+    rows = _records(alerts)
+    for i in range(0, len(rows), CHUNK_SIZE):
+        supabase.table("REORDER_ALERTS").upsert(rows[i:i + CHUNK_SIZE], on_conflict="location_id,item_id,supplier_id").execute()
+
+    # 더 이상 미달이 아닌 알림 삭제 (알림 수만큼만 조회하므로 작음)
+    current = {(int(r['location_id']), int(r['item_id']), int(r['supplier_id'])) for r in rows}
+    existing = supabase.table("REORDER_ALERTS").select("location_id, item_id, supplier_id").execute().data
+    stale = {}
+    for r in existing:
+        k = (int(r['location_id']), int(r['item_id']), int(r['supplier_id']))
+        if k not in current:
+            stale.setdefault((k[0], k[2]), []).append(k[1])
+    for (loc_id, sup_id), item_ids in stale.items():
+        supabase.table("REORDER_ALERTS").delete().eq("location_id", loc_id).eq("supplier_id", sup_id).in_("item_id", item_ids).execute()
+
+    # 매장별 요약. 재고 행 수는 매장마다 개수만 받음 (행을 내려받지 않고, max-rows 제한에도 잘리지 않음)
+    duration = round((time.perf_counter() - t0) * 1000, 1)
+    alerts_by_loc = alerts['location_id'].astype("int64").value_counts()
+    statuses = [{
+        "location_id": loc_id,
+        "computed_at": now_kst.isoformat(),
+        "item_count": _stock_count(supabase, loc_id),
+        "alert_count": int(alerts_by_loc.get(loc_id, 0)),
+        "duration_ms": duration,
+    } for loc_id in location_ids]
+    supabase.table("REORDER_ALERT_STATUS").upsert(statuses, on_conflict="location_id").execute()
+    invalidate(*(alerts_scope(loc_id) for loc_id in location_ids))
+    return {"computed_at": now_kst.isoformat(), "locations": len(location_ids), "item_count": int(item_count),
+            "alert_count": len(rows), "duration_ms": duration}
+
+
+# --- [2. 대시보드 쪽 조회] ---
+def load_alerts(supabase, location_id=DEFAULT_LOCATION):
+    """매장의 사전 계산된 알림과 요약 조회. 워커가 그 매장을 한 번도 계산하지 않았으면 (None, None)"""
+    res = supabase.table("REORDER_ALERT_STATUS").select("*").eq("location_id", location_id).execute()
+    if not res.data:
+        return None, None
+    alerts = (supabase.table("REORDER_ALERTS").select("*").eq("location_id", location_id)
+              .order("category").order("item_name").execute())
+    return pd.DataFrame(alerts.data, columns=ALERT_COLUMNS), res.data[0]
+
+
+def mark_alerts_dirty(path=None):
+    """쓰기 직후 워커에게 재계산 요청 (같은 서버에서 도는 워커만 감지)"""
+    path = path or os.environ.get(SIGNAL_ENV, DEFAULT_SIGNAL)
+    try:
+        with open(path, "a"):
+            os.utime(path, None)
+    except OSError:
+        pass
+
+
+# --- [3. 워커 루프] ---
+def _signal_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def _stock_marker(supabase):
+    """STOCKS 가 마지막으로 바뀐 시각 (수정 시 트리거로 last_checked_at 갱신)"""
+    res = supabase.table("STOCKS").select("last_checked_at").order("last_checked_at", desc=True).limit(1).execute()
+    return res.data[0]['last_checked_at'] if res.data else None
+
+
+def run_worker(supabase, interval=300, poll=15, signal_path=None, log=print, stop=None, engine=None):
+    """interval 초마다, 또는 변경 감지 시 refresh_alerts() 실행. stop: 종료 여부를 돌려주는 함수(테스트용)"""
+    signal_path = signal_path or os.environ.get(SIGNAL_ENV, DEFAULT_SIGNAL)
+    last_run, last_marker, last_signal = 0.0, None, _signal_mtime(signal_path)
+    while not (stop and stop()):
+        reason = None
+        try:
+            marker = _stock_marker(supabase)
+            signal = _signal_mtime(signal_path)
+            if time.time() - last_run >= interval:
+                reason = "주기"
+            elif marker != last_marker:
+                reason = "재고 변경"
+            elif signal != last_signal:
+                reason = "쓰기 신호"
+            if reason:
+                status = refresh_alerts(supabase, engine=engine)
+                last_run, last_marker, last_signal = time.time(), marker, signal
+                log(f"[{datetime.now(timezone.utc).astimezone(KST):%H:%M:%S}] {reason}: "
+                    f"매장 {status['locations']}곳, 재고 {status['item_count']}행 중 알림 {status['alert_count']}건 ({status['duration_ms']}ms)")
+        except Exception as e:
+            log(f"알림 계산 실패: {e}")
+        time.sleep(poll)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="발주 알림 사전 계산 워커")
+    parser.add_argument("command", choices=["run", "once"])
+    parser.add_argument("--interval", type=float, default=300, help="정기 재계산 주기(초)")
+    parser.add_argument("--poll", type=float, default=15, help="변경 감지 주기(초)")
+    parser.add_argument("--engine", choices=ENGINES, default=os.environ.get(ENGINE_ENV, "python"),
+                        help="예측 재고 계산 위치 (python: 앱에서, sql: DB 서버 함수)")
+    args = parser.parse_args()
+
+    from db_backend import connect_from_env
+    client = connect_from_env()
+    if args.command == "once":
+        print(refresh_alerts(client, engine=args.engine))
+    else:
+        run_worker(client, args.interval, args.poll, engine=args.engine)
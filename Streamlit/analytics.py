@@ -0,0 +1,87 @@
+"""
+구매 분석 탭
+
+공급처별 월 지출, 카테고리별 비용 추이, 지출 상위 품목을 보여준다.
+원본 PURCHASE_ORDERS/PURCHASE_ITEMS를 pandas로 내려받지 않고, 트리거로 증분 유지되는
+PURCHASE_SPEND_MONTHLY 집계 테이블을 서버 함수(DataBase/Functions/purchase_analytics.sql)로
+한 번 더 묶은 작은 결과만 받아온다. 주문 이력이 수십만 줄이 되어도 요청 3번, 결과는
+(개월 수 x 공급처 수) 정도의 행이다. location_id 를 주면 그 매장만, None 이면 전체 매장 합계.
+"""
+from datetime import date
+
+import pandas as pd
+
+PERIODS = {"최근 3개월": 3, "최근 6개월": 6, "최근 12개월": 12, "최근 24개월": 24}
+
+
+def month_range(months, today=None):
+    """이번 달을 포함한 최근 months개월의 (첫 달 1일, 이번 달 1일)"""
+    today = today or date.today()
+    idx = today.year * 12 + today.month - 1 - (months - 1)
+    return date(idx // 12, idx % 12 + 1, 1), date(today.year, today.month, 1)
+
+
+def _frame(data, columns):
+    df = pd.DataFrame(data or [], columns=columns)
+    if not df.empty:
+        df["month"] = pd.to_datetime(df["month"])
+    return df
+
+
+# --- [1. 집계 조회] ---
+def load_spend_by_supplier(supabase, start, end, location_id=None):
+    res = supabase.rpc("spend_by_supplier_month", {"p_from": str(start), "p_to": str(end), "p_location_id": location_id}).execute()
+    return _frame(res.data, ["month", "supplier_id", "supplier_name", "line_count", "ordered_spend", "received_spend"])
+
+
+def load_spend_by_category(supabase, start, end, location_id=None):
+    res = supabase.rpc("spend_by_category_month", {"p_from": str(start), "p_to": str(end), "p_location_id": location_id}).execute()
+    return _frame(res.data, ["month", "category", "ordered_spend", "received_spend"])
+
+
+def load_top_items(supabase, start, end, limit=20, location_id=None):
+    res = supabase.rpc("top_items_by_spend", {"p_from": str(start), "p_to": str(end), "p_limit": limit,
+                                              "p_location_id": location_id}).execute()
+    return pd.DataFrame(res.data or [], columns=["item_id", "item_name", "category", "ordered_qty", "ordered_spend"])
+
+
+# --- [2. 화면] ---
+def render_analytics(supabase, location_id=None):
+    import streamlit as st
+
+    st.title("구매 분석")
+    c_period, c_top = st.columns([3, 1])
+    label = c_period.radio("기간", list(PERIODS), index=1, horizontal=True, key="analytics_period")
+    top_n = c_top.number_input("상위 품목 수", min_value=5, max_value=100, value=20, step=5, key="analytics_top_n")
+    if location_id is not None and st.toggle("전체 매장 합계", key="analytics_all_locations"):
+        location_id = None
+    start, end = month_range(PERIODS[label])
+
+    by_sup = load_spend_by_supplier(supabase, start, end, location_id)
+    if by_sup.empty:
+        st.info("선택한 기간의 발주 내역이 없습니다.")
+        return
+    by_cat = load_spend_by_category(supabase, start, end, location_id)
+    top = load_top_items(supabase, start, end, int(top_n), location_id)
+
+    c1, c2, c3 = st.columns(3)
+    c1.metric("발주 금액", f"{int(by_sup['ordered_spend'].sum()):,}원")
+    c2.metric("입고 금액", f"{int(by_sup['received_spend'].sum()):,}원")
+    c3.metric("발주 품목 줄 수", f"{int(by_sup['line_count'].sum()):,}")
+
+    st.subheader("공급처별 월 발주 금액")
+    by_sup["월"] = by_sup["month"].dt.strftime("%Y-%m")
+    sup_pivot = by_sup.pivot_table(index="월", columns="supplier_name", values="ordered_spend", aggfunc="sum", fill_value=0)
+    st.bar_chart(sup_pivot)
+
+    st.subheader("카테고리별 비용 추이")
+    by_cat["월"] = by_cat["month"].dt.strftime("%Y-%m")
+    cat_pivot = by_cat.pivot_table(index="월", columns="category", values="ordered_spend", aggfunc="sum", fill_value=0)
+    st.line_chart(cat_pivot)
+
+    st.subheader(f"지출 상위 {int(top_n)}개 품목")
+    st.dataframe(
+        top.rename(columns={"item_name": "품목", "category": "카테고리", "ordered_qty": "발주 수량", "ordered_spend": "발주 금액"})
+        .drop(columns=["item_id"]),
+        hide_index=True, use_container_width=True,
+    )
@@ -0,0 +1,74 @@
+"""
+완료 주문 보관 작업
+
+입고가 끝난 지 --older-than 일이 지난 주문을 PURCHASE_ORDERS/PURCHASE_ITEMS 에서
+보관 테이블(*_ARCHIVE)로 배치 단위로 옮긴다 (서버 함수 archive_purchase_orders,
+DataBase/Functions/archive_orders.sql). 배치마다 별도 트랜잭션이라 한 번에 큰 잠금을
+잡지 않고, 배치 사이에 --pause 초 쉬어 운영 쿼리에 여유를 준다.
+
+하루 한 번 정도 cron 으로 돌리면 운영 테이블은 최근 주문만 남아 크기가 일정하게 유지된다.
+보관된 주문은 *_ALL 뷰(Parquet 내보내기)와 집계 테이블(구매 분석 탭)로 계속 조회된다.
+
+보관 전에 PURCHASE_ITEMS 의 월 파티션을 --partitions-ahead 일 앞까지 미리 만든다
+(ensure_purchase_items_partitions, 0003_partition_purchase_items.sql). 파티션이 없는 달의 주문 상세는
+default 파티션에 쌓이고, 그 뒤에는 그 달 파티션을 만들 수 없게 되므로 매일 돌려서 여유를 유지한다.
+
+사용법:
+    python archive_job.py --older-than 180 --batch 1000
+    python archive_job.py --older-than 90 --max-batches 5
+    python archive_job.py --partitions-only          # 파티션만 만들고 보관은 하지 않음
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+DEFAULT_OLDER_THAN_DAYS = 180
+DEFAULT_BATCH = 1000
+DEFAULT_PARTITIONS_AHEAD_DAYS = 90
+
+
+def ensure_partitions(supabase, days_ahead=DEFAULT_PARTITIONS_AHEAD_DAYS, today=None, log=print):
+    """이번 달부터 days_ahead 일 뒤까지의 PURCHASE_ITEMS 월 파티션 생성 (있으면 건너뜀). 반환값: 새로 만든 수"""
+    today = today or date.today()
+    res = supabase.rpc("ensure_purchase_items_partitions",
+                       {"p_from": str(today), "p_to": str(today + timedelta(days=days_ahead))}).execute()
+    made = int(res.data or 0)
+    log(f"주문 상세 파티션 {made}개 생성 (~{today + timedelta(days=days_ahead)})")
+    return made
+
+
+def archive_orders(supabase, older_than_days=DEFAULT_OLDER_THAN_DAYS, batch=DEFAULT_BATCH,
+                   max_batches=None, pause=0.5, log=print):
+    """옮길 주문이 없거나 max_batches 에 도달할 때까지 배치 반복. 반환값: 옮긴 주문 수"""
+    total, batches = 0, 0
+    while max_batches is None or batches < max_batches:
+        t0 = time.perf_counter()
+        res = supabase.rpc("archive_purchase_orders",
+                           {"p_older_than": f"{older_than_days} days", "p_batch": batch}).execute()
+        moved = int(res.data or 0)
+        batches += 1
+        total += moved
+        log(f"배치 {batches}: {moved}건 보관 ({(time.perf_counter() - t0) * 1000:.0f}ms, 누적 {total}건)")
+        if moved < batch:
+            break
+        time.sleep(pause)
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="완료 주문 보관")
+    parser.add_argument("--older-than", type=int, default=DEFAULT_OLDER_THAN_DAYS, help="입고 후 경과 일수")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH, help="한 번에 옮길 주문 수")
+    parser.add_argument("--max-batches", type=int, help="이번 실행에서 돌릴 최대 배치 수")
+    parser.add_argument("--pause", type=float, default=0.5, help="배치 사이 대기(초)")
+    parser.add_argument("--partitions-ahead", type=int, default=DEFAULT_PARTITIONS_AHEAD_DAYS,
+                        help="주문 상세 월 파티션을 미리 만들어 둘 일수")
+    parser.add_argument("--partitions-only", action="store_true", help="파티션만 만들고 보관은 건너뜀")
+    args = parser.parse_args()
+
+    from db_backend import connect_from_env
+    client = connect_from_env()
+    ensure_partitions(client, args.partitions_ahead)
+    if not args.partitions_only:
+        moved = archive_orders(client, args.older_than, args.batch, args.max_batches, args.pause)
+        print(f"총 {moved}건 보관")
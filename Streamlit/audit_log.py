@@ -0,0 +1,118 @@
+"""
+변경 이력 조회
+
+재고(STOCKS), 공급처 상세(SUPPLIER_DETAILS), 주문(PURCHASE_ORDERS), 주문 상세(PURCHASE_ITEMS)의 변경은
+서버의 문장 단위 트리거(DataBase/Functions/audit_log.sql)가 바뀐 행을 모아 한 번에 AUDIT_LOG 에 기록한다.
+앱은 이력을 직접 쓰지 않으므로 입고/실사/발주/관리자 편집의 요청 수는 그대로이고, 이 화면만 AUDIT_LOG 를 읽는다.
+
+조회는 요청 1회: 기간 + 테이블 / 품목 / 주문 번호 / 작업자 필터를 서버에서 걸고 최신순으로 최대 MAX_ROWS 건.
+필터마다 AUDIT_LOG 의 (필터 칼럼, changed_at) 인덱스를 탄다.
+"""
+from datetime import timedelta
+from urllib.parse import unquote
+
+import pandas as pd
+
+from db_backend import actor_header
+from item_search import DEFAULT_LIMIT
+
+TABLE_LABELS = {"STOCKS": "재고", "SUPPLIER_DETAILS": "공급처 상세", "PURCHASE_ORDERS": "주문", "PURCHASE_ITEMS": "주문 상세"}
+OP_LABELS = {"insert": "추가", "update": "수정", "delete": "삭제"}
+MAX_ROWS = 500
+TZ = "Asia/Seoul"
+
+
+# --- [1. 조회] ---
+def _utc(day):
+    """KST 날짜 0시 -> UTC ISO 문자열 (changed_at 비교용)"""
+    return pd.Timestamp(day, tz=TZ).tz_convert("UTC").isoformat()
+
+
+def load_audit_log(supabase, start, end, tables=None, item_ids=None, order_id=None, actor=None, limit=MAX_ROWS):
+    """start ~ end(포함, KST 날짜) 의 변경 이력, 최신순 최대 limit 건 (요청 1회)
+
+    item_ids: 품목 id 목록 (None 이면 전체), actor: 작업자 이름 (INVENTORY_ACTOR 로 설정한 값)
+    """
+    q = (supabase.table("AUDIT_LOG").select("*")
+         .gte("changed_at", _utc(start)).lt("changed_at", _utc(end + timedelta(days=1))))
+    if tables:
+        q = q.in_("table_name", list(tables))
+    if item_ids is not None:
+        q = q.in_("item_id", [int(i) for i in item_ids])
+    if order_id:
+        q = q.eq("order_id", int(order_id))
+    if actor:
+        q = q.eq("actor", actor_header(actor))
+    return q.order("changed_at", desc=True).limit(limit).execute().data
+
+
+# --- [2. 표시용 가공] ---
+def _fmt(value):
+    return "∅" if value is None else str(value)
+
+
+def describe_change(row):
+    """한 줄 요약: 수정은 '칼럼: 이전 → 이후', 추가/삭제는 행 값"""
+    before, after = row.get("before") or {}, row.get("after") or {}
+    if row["op"] == "update":
+        return ", ".join(f"{c}: {_fmt(before.get(c))} → {_fmt(v)}" for c, v in after.items())
+    values = after if row["op"] == "insert" else before
+    return ", ".join(f"{c}={_fmt(v)}" for c, v in values.items() if c not in row.get("row_key", {}))
+
+
+def audit_frame(rows, item_names=None):
+    """AUDIT_LOG 행 -> 화면 표 (시각은 KST)"""
+    cols = ["시각", "테이블", "작업", "품목", "주문 번호", "매장", "변경 내용", "작업자", "트랜잭션"]
+    if not rows:
+        return pd.DataFrame(columns=cols)
+    df = pd.DataFrame(rows)
+    names = item_names or {}
+    out = pd.DataFrame({
+        "시각": pd.to_datetime(df["changed_at"], utc=True, format="ISO8601").dt.tz_convert(TZ).dt.strftime("%Y-%m-%d %H:%M:%S"),
+        "테이블": df["table_name"].map(TABLE_LABELS).fillna(df["table_name"]),
+        "작업": df["op"].map(OP_LABELS).fillna(df["op"]),
+        "품목": [names.get(int(i), f"#{int(i)}") if pd.notna(i) else "" for i in df["item_id"]],
+        "주문 번호": df["order_id"].astype("Int64"),
+        "매장": df["location_id"].astype("Int64"),
+        "변경 내용": [describe_change(r) for r in rows],
+        "작업자": df["actor"].map(unquote),
+        "트랜잭션": df["tx"],
+    })
+    return out[cols]
+
+
+# --- [3. 화면] ---
+def render_audit_log(supabase, index):
+    """관리자 탭: 필터 + 이력 표. index: 품목 검색 색인 (item_search)"""
+    import streamlit as st
+
+    from views import item_filter
+
+    st.subheader("📜 변경 이력")
+    today = pd.Timestamp.now(tz=TZ).date()
+    c1, c2, c3, c4 = st.columns([2, 2, 1, 1])
+    period = c1.date_input("기간", (today - timedelta(days=7), today), max_value=today, key="audit_period")
+    labels = c2.multiselect("테이블", list(TABLE_LABELS), format_func=TABLE_LABELS.get, key="audit_tables")
+    order_id = c3.number_input("주문 번호", min_value=0, step=1, key="audit_order", help="0 이면 전체")
+    actor = c4.text_input("작업자", key="audit_actor").strip()
+    query, category = item_filter(index, "audit_search")
+
+    if not isinstance(period, (tuple, list)):
+        period = (period,)
+    if len(period) < 2:
+        st.info("기간의 끝 날짜를 선택하세요.")
+        return
+    # 카테고리만 고르면 그 카테고리 전부, 검색어는 상위 결과만
+    item_ids = index.search(query, category, limit=DEFAULT_LIMIT if query else None) if (query or category) else None
+    if item_ids is not None and not item_ids:
+        st.info("검색어에 맞는 품목이 없습니다.")
+        return
+
+    rows = load_audit_log(supabase, period[0], period[1], labels, item_ids, order_id, actor)
+    if not rows:
+        st.info("조건에 맞는 변경 이력이 없습니다.")
+        return
+    st.dataframe(audit_frame(rows, dict(zip(index.ids, index.names))), hide_index=True, use_container_width=True)
+    if len(rows) >= MAX_ROWS:
+        st.caption(f"최근 {MAX_ROWS}건만 표시했습니다. 기간이나 필터를 좁혀 보세요.")
+    st.caption("같은 트랜잭션 번호는 한 번의 처리(입고, 실사 반영, 발주 등)에서 함께 바뀐 행입니다.")
@@ -0,0 +1,110 @@
+"""
+바코드 스캔 실사
+
+키보드 방식 바코드 스캐너(코드를 입력하고 Enter)나 직접 입력한 코드를 SUPPLIER_DETAILS.barcode 로
+(item_id, supplier_id) 에 연결하고, 스캔 수량을 세션 버퍼에 모았다가 한 번에 실사 반영한다.
+
+- 바코드 표는 카탈로그 버전마다 한 번 만들어 프로세스 메모리에 둔다 (스캔 1회 = dict 조회 1회)
+- 스캔 1회 = 재고 관리 단위 1개. "12*바코드" 로 입력하면 12개
+- 스캐너가 같은 코드를 연달아 두 번 읽는 경우(DUPLICATE_WINDOW 초 안에 같은 코드)는 한 번만 셈
+- 반영할 때는 버퍼 전체가 실사 입력 한 건(stock_count 메시지 1개)으로 쓰기 큐에 들어간다
+"""
+import time
+
+from shared_cache import cached_local, CATALOG
+from stock_ops import count_updates
+
+DUPLICATE_WINDOW = 0.8 # 초
+MAX_QTY = 100000
+
+
+# --- [1. 바코드 표] ---
+def _build(supabase):
+    res = supabase.table("SUPPLIER_DETAILS").select("item_id, supplier_id, barcode").execute()
+    return {str(d['barcode']).strip(): (int(d['item_id']), int(d['supplier_id']))
+            for d in res.data if d.get('barcode')}
+
+
+def load_barcode_index(supabase):
+    """{바코드: (item_id, supplier_id)} (현재 카탈로그 버전)"""
+    return cached_local(CATALOG, "barcode_index", lambda: _build(supabase))
+
+
+def barcode_index_from_frame(df):
+    """오프라인 모드: 로컬 미러 재고 목록의 barcode 컬럼으로 표 생성"""
+    if df.empty or 'barcode' not in df.columns:
+        return {}
+    rows = df[df['barcode'].notna() & (df['barcode'].astype(str).str.strip() != "")]
+    return {str(c).strip(): (int(i), int(s)) for c, i, s in zip(rows['barcode'], rows['item_id'], rows['supplier_id'])}
+
+
+def parse_scan(text):
+    """입력 문자열 -> (수량, 코드). "12*8801234567890" 은 12개, 코드만 있으면 1개
+
+    수량 형식이 잘못되면 ValueError
+    """
+    text = (text or "").strip()
+    if "*" in text:
+        raw_qty, code = (p.strip() for p in text.split("*", 1))
+        try:
+            qty = float(raw_qty)
+        except ValueError:
+            raise ValueError(f"수량이 숫자가 아닙니다: {raw_qty}")
+        if not 0 < qty <= MAX_QTY:
+            raise ValueError(f"수량은 0보다 크고 {MAX_QTY:,} 이하여야 합니다: {qty:g}")
+        return qty, code
+    return 1.0, text
+
+
+# --- [2. 스캔 버퍼 (세션)] ---
+class ScanBuffer:
+    """한 실사 세션의 스캔 기록과 품목별 누계"""
+
+    def __init__(self):
+        self.totals = {} # (item_id, supplier_id) -> 누계 수량
+        self.scans = [] # [(시각, 코드, 키, 수량)]
+        self.unknown = {} # 표에 없는 코드 -> 횟수
+
+    def __len__(self):
+        return len(self.totals)
+
+    def add(self, code, key, qty=1.0, now=None):
+        """스캔 1건 추가. 반환값: "added" | "duplicate" (스캐너 중복 읽기로 보고 무시)"""
+        now = time.time() if now is None else now
+        if self.scans:
+            last_ts, last_code, _, last_qty = self.scans[-1]
+            if last_code == code and last_qty == qty and now - last_ts < DUPLICATE_WINDOW:
+                return "duplicate"
+        self.scans.append((now, code, key, qty))
+        self.totals[key] = self.totals.get(key, 0) + qty
+        return "added"
+
+    def add_unknown(self, code):
+        self.unknown[code] = self.unknown.get(code, 0) + 1
+
+    def undo(self):
+        """마지막 스캔 취소. 반환값: 취소한 (시각, 코드, 키, 수량) 또는 None"""
+        if not self.scans:
+            return None
+        scan = self.scans.pop()
+        key, qty = scan[2], scan[3]
+        self.totals[key] -= qty
+        if not any(s[2] == key for s in self.scans):
+            del self.totals[key]
+        return scan
+
+    def clear(self):
+        self.totals.clear()
+        self.scans.clear()
+        self.unknown.clear()
+
+    def counts(self, key):
+        return sum(1 for s in self.scans if s[2] == key)
+
+
+def scan_updates(buffer, stock_df):
+    """버퍼 누계를 실사 입력 형태(compute_stock_counts 의 updates)로 변환
+
+    stock_df: 재고 실사 화면의 재고 목록. 스캔하지 않은 품목은 포함하지 않음
+    """
+    return count_updates(stock_df, buffer.totals)
@@ -0,0 +1,159 @@
+"""
+콜드 스타트 / 화면별 첫 렌더링 벤치마크 (헤드리스)
+
+화면마다 새 프로세스를 띄워서 (import 캐시가 없는 상태) Streamlit AppTest로 한 번 그려 보고
+- import_ms       : streamlit + AppTest import 시간 (모든 화면 공통 바닥값)
+- first_render_ms : 첫 실행 시간 (앱 모듈 import + DB 조회 + 렌더링)
+- rerun_ms        : 같은 세션 재실행 시간 (import/캐시가 채워진 상태)
+- requests        : 첫 실행의 DB 요청 수
+- modules         : 첫 실행 중 새로 import 된 모듈 수 (숨은 탭의 의존성을 불러오지 않는지 확인)
+를 측정한다. DB 대신 MemoryBackend(db_backend)를 쓴다.
+
+사용법:
+    python bench_startup.py --items 500 --repeat 3
+    python bench_startup.py --log startup.jsonl      # 결과를 JSON-lines 로 누적 기록 (추이 비교용)
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from profiler import _percentile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# (이름, 진입 스크립트, 완성.py 탭 선택)
+TARGETS = [
+    ("완성", "완성.py", None),
+    ("완성:발주 관리", "완성.py", "발주 관리"),
+    ("완성:재고 실사", "완성.py", "재고 실사"),
+    ("완성:구매 분석", "완성.py", "구매 분석"),
+    ("완성:마스터 관리창", "완성.py", "마스터 관리창"),
+    ("대시보드", "대시보드.py", None),
+    ("재고체크", "재고체크.py", None),
+    ("품목등록", "품목등록.py", None),
+    ("Order_Page", "Order_Page.py", None),
+]
+
+SECRETS = {"SUPABASE_URL": "http://bench.local", "SUPABASE_KEY": "bench"}
+
+
+# --- [1. 측정 (자식 프로세스)] ---
+def measure(script, tab, items):
+    """새 프로세스 안에서 한 화면을 그리고 측정값 반환"""
+    t0 = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    import_ms = (time.perf_counter() - t0) * 1000
+
+    from db_backend import MemoryBackend, QueryCounter, generate_demo_tables, set_backend
+    backend = MemoryBackend(generate_demo_tables(n_items=items, n_open_orders=10))
+    set_backend(backend)
+
+    at = AppTest.from_file(os.path.join(HERE, script), default_timeout=120)
+    at.secrets.update(SECRETS)
+    if tab:
+        at.session_state["main_tab"] = tab
+
+    before = set(sys.modules)
+    with QueryCounter(backend) as qc:
+        t1 = time.perf_counter()
+        at.run()
+        first_ms = (time.perf_counter() - t1) * 1000
+    modules = len(set(sys.modules) - before)
+
+    t2 = time.perf_counter()
+    at.run()
+    rerun_ms = (time.perf_counter() - t2) * 1000
+
+    return {
+        "import_ms": import_ms,
+        "first_render_ms": first_ms,
+        "rerun_ms": rerun_ms,
+        "requests": qc.requests,
+        "modules": modules,
+        "error": str(at.exception[0].value) if at.exception else None,
+    }
+
+
+def run_child(script, tab, items):
+    """화면 하나를 새 프로세스에서 측정 (쓰기 큐/미러 파일은 임시 폴더)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ,
+                   INVENTORY_QUEUE_DB=os.path.join(tmp, "queue.sqlite3"),
+                   INVENTORY_MIRROR_DB=os.path.join(tmp, "mirror.sqlite3"),
+                   INVENTORY_CACHE="memory")
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", script, "--items", str(items)]
+        if tab:
+            cmd += ["--tab", tab]
+        proc = subprocess.run(cmd, cwd=HERE, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+    # Streamlit 경고가 stdout 에 섞일 수 있으므로 마지막 줄만 결과로 사용
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# --- [2. 실행부] ---
+def run(items=500, repeat=3):
+    results = {}
+    for name, script, tab in TARGETS:
+        results[name] = [run_child(script, tab, items) for _ in range(repeat)]
+    return results
+
+
+def summarize(results):
+    """화면별 중앙값 (오류가 난 실행은 제외)"""
+    out = {}
+    for name, runs in results.items():
+        ok = [r for r in runs if not r.get("error")]
+        row = {"runs": len(runs), "errors": len(runs) - len(ok)}
+        for k in ("import_ms", "first_render_ms", "rerun_ms", "requests", "modules"):
+            vals = sorted(r[k] for r in ok)
+            row[k] = _percentile(vals, .5) if vals else None
+        if len(ok) < len(runs):
+            row["error"] = next(r["error"] for r in runs if r.get("error"))
+        out[name] = row
+    return out
+
+
+def report(summary):
+    print(f"{'page':<20} {'import(ms)':>11} {'first(ms)':>10} {'rerun(ms)':>10} {'requests':>9} {'modules':>8} {'errors':>7}")
+    for name, row in summary.items():
+        if row["first_render_ms"] is None:
+            print(f"{name:<20} {'-':>11} {'-':>10} {'-':>10} {'-':>9} {'-':>8} {row['errors']:>7}")
+        else:
+            print(f"{name:<20} {row['import_ms']:>11.0f} {row['first_render_ms']:>10.0f} {row['rerun_ms']:>10.0f} "
+                  f"{row['requests']:>9.0f} {row['modules']:>8.0f} {row['errors']:>7}")
+    for name, row in summary.items():
+        if row.get("error"):
+            print(f"[오류] {name}: {row['error']}")
+
+
+def append_log(path, summary, items, repeat):
+    """측정 결과를 화면당 한 줄씩 JSON-lines 로 누적"""
+    ts = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    with open(path, "a", encoding="utf-8") as f:
+        for name, row in summary.items():
+            f.write(json.dumps({"ts": ts, "page": name, "items": items, "repeat": repeat, **row},
+                               ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="화면별 콜드 스타트 벤치마크")
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3, help="화면마다 새 프로세스로 반복할 횟수")
+    parser.add_argument("--log", help="결과를 누적 기록할 JSON-lines 파일")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--tab", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.tab, args.items), ensure_ascii=False))
+    else:
+        summary = summarize(run(args.items, args.repeat))
+        report(summary)
+        if args.log:
+            append_log(args.log, summary, args.items, args.repeat)
@@ -0,0 +1,278 @@
+"""
+CSV/엑셀 카탈로그 일괄 등록
+
+신규 매장 품목 수백 개를 한 번에 등록하기 위한 기능.
+단건 등록 폼은 품목마다 최대 6번 왕복(SUPPLIERS 조회/추가, ITEMS 조회/추가,
+SUPPLIER_DETAILS upsert, STOCKS 조회/추가)하지만, 여기서는
+- 파일 전체를 벡터 연산으로 검증하고
+- 공급처/품목을 이름 기준으로 메모리에서 중복 제거한 뒤
+- 테이블별로 조회 1회 + 청크 단위 배치 insert/upsert 로 기록한다.
+카탈로그는 매장 공용이므로 재고(STOCKS) 행은 모든 매장에 만든다.
+"""
+import io
+
+import pandas as pd
+from datetime import datetime, timezone
+
+from locations import all_location_ids
+from shared_cache import invalidate, CATALOG, stocks_scope
+
+CHUNK_SIZE = 500
+
+# 파일 헤더(한글/영문) -> 내부 컬럼명
+COLUMN_ALIASES = {
+    "공급처": "supplier", "supplier": "supplier",
+    "품목": "name", "품목명": "name", "name": "name",
+    "카테고리": "category", "category": "category",
+    "주문URL": "order_url", "주문 URL": "order_url", "order_url": "order_url",
+    "주문단위": "order_unit", "주문 단위": "order_unit", "order_unit": "order_unit",
+    "MOQ": "MOQ", "moq": "MOQ",
+    "단가": "order_unit_price", "주문 단위당 가격": "order_unit_price", "order_unit_price": "order_unit_price",
+    "재고단위": "base_unit", "재고 관리 단위": "base_unit", "base_unit": "base_unit",
+    "환산계수": "conversion_factor", "환산 계수": "conversion_factor", "conversion_factor": "conversion_factor",
+    "안전재고": "safety_stock", "safety_stock": "safety_stock",
+    "바코드": "barcode", "barcode": "barcode",
+}
+
+REQUIRED_TEXT = ["supplier", "name", "category", "order_unit", "base_unit"]
+NUMERIC_RULES = {
+    # 컬럼: (기본값, 최소값, 정수 칼럼 여부) - 0001_schema.sql 의 int / numeric 과 맞춤
+    "MOQ": (1, 1, True),
+    "order_unit_price": (0, 0, True),
+    "conversion_factor": (1, 1, False),
+    "safety_stock": (0, 0, False),
+}
+TEMPLATE_COLUMNS = ["공급처", "품목", "카테고리", "주문URL", "주문단위", "MOQ", "단가", "재고단위", "환산계수", "안전재고", "바코드"]
+
+
+def template_csv():
+    """업로드 양식 (UTF-8 BOM: 엑셀에서 한글이 깨지지 않도록)"""
+    sample = pd.DataFrame([["A커피", "원두 1kg", "원두", "", "박스", 1, 15000, "개", 1, 5, ""]], columns=TEMPLATE_COLUMNS)
+    return sample.to_csv(index=False).encode("utf-8-sig")
+
+
+# --- [1. 파일 읽기] ---
+def read_catalog(uploaded):
+    """업로드 파일(csv/xlsx)을 DataFrame으로 읽고 헤더를 내부 컬럼명으로 변환"""
+    name = getattr(uploaded, "name", "")
+    data = uploaded.getvalue() if hasattr(uploaded, "getvalue") else uploaded.read()
+    if name.lower().endswith((".xlsx", ".xls")):
+        try:
+            df = pd.read_excel(io.BytesIO(data), dtype=str)
+        except ImportError:
+            raise ImportError("엑셀 파일을 읽으려면 openpyxl 패키지가 필요합니다. CSV로 저장해서 올려주세요.")
+    else:
+        df = pd.read_csv(io.BytesIO(data), dtype=str, encoding="utf-8-sig")
+    df = df.rename(columns=lambda c: COLUMN_ALIASES.get(str(c).strip(), str(c).strip()))
+    return df
+
+
+# --- [2. 검증 (벡터 연산)] ---
+def validate_catalog(df):
+    """반환값: (유효한 행 DataFrame, 오류 DataFrame[행번호, 사유])"""
+    missing = [c for c in REQUIRED_TEXT if c not in df.columns]
+    if missing:
+        raise ValueError(f"필수 컬럼이 없습니다: {', '.join(missing)}")
+
+    df = df.copy()
+    df["row"] = df.index + 2 # 헤더 다음 줄부터 1행
+    reasons = pd.Series("", index=df.index)
+
+    for col in REQUIRED_TEXT:
+        df[col] = df[col].fillna("").astype(str).str.strip()
+        reasons = reasons.mask(df[col] == "", reasons + f"{col} 누락; ")
+
+    df["order_url"] = df["order_url"].fillna("").astype(str).str.strip() if "order_url" in df.columns else ""
+
+    for col, (default, minimum, integer) in NUMERIC_RULES.items():
+        raw = df[col] if col in df.columns else pd.Series(None, index=df.index, dtype=object)
+        blank = raw.isna() | (raw.astype(str).str.strip() == "")
+        num = pd.to_numeric(raw.astype(str).str.replace(",", "").str.strip(), errors="coerce")
+        bad = ~blank & (num.isna() | (num < minimum))
+        if integer:
+            # 정수 칼럼에 소수가 들어오면 잘라내지 않고 오류로 (1.5 -> 1 로 조용히 바뀌지 않도록)
+            bad |= ~blank & num.notna() & (num % 1 != 0)
+        reasons = reasons.mask(bad, reasons + f"{col} 값 오류; ")
+        df[col] = num.where(~blank, default)
+
+    # 같은 파일 안에서 (품목, 공급처) 중복
+    dup = df.duplicated(subset=["name", "supplier"], keep="first") & (reasons == "")
+    reasons = reasons.mask(dup, reasons + "파일 내 중복 행; ")
+
+    # 바코드 (선택 컬럼): 문자열 그대로 (앞자리 0 유지), 빈 값은 없음으로, 한 바코드는 한 (품목, 공급처)만
+    if "barcode" in df.columns:
+        code = df["barcode"].fillna("").astype(str).str.strip()
+        df["barcode"] = code.replace({"": None})
+        dup_code = df["barcode"].notna() & df.duplicated(subset="barcode", keep=False) & (reasons == "")
+        reasons = reasons.mask(dup_code, reasons + "바코드 중복; ")
+
+    bad_rows = reasons != ""
+    errors = pd.DataFrame({"행": df.loc[bad_rows, "row"], "사유": reasons[bad_rows].str.rstrip("; ")})
+    valid = df.loc[~bad_rows].copy()
+    for col, (_, _, integer) in NUMERIC_RULES.items():
+        valid[col] = valid[col].astype(int if integer else float)
+    return valid.reset_index(drop=True), errors.reset_index(drop=True)
+
+
+# --- [3. 배치 기록] ---
+def _chunks(rows, size):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def import_catalog(supabase, valid, progress=None, chunk_size=CHUNK_SIZE):
+    """검증된 카탈로그를 테이블별 배치 요청으로 기록
+
+    progress(단계명, 완료 수, 전체 수) 콜백으로 진행 상황 전달
+    반환값: 새로 만든 공급처/품목/재고 행 수와 upsert한 상세정보 수
+    """
+    report = progress or (lambda *a: None)
+
+    # STEP 1: 공급처 - 기존 목록 1회 조회 후 없는 이름만 일괄 추가
+    existing = {s['name']: s['id'] for s in supabase.table("SUPPLIERS").select("id, name").execute().data}
+    new_sups = [n for n in valid["supplier"].drop_duplicates() if n not in existing]
+    for i, chunk in enumerate(_chunks(new_sups, chunk_size)):
+        res = supabase.table("SUPPLIERS").insert([{"name": n} for n in chunk]).execute()
+        existing.update({s['name']: s['id'] for s in res.data})
+        report("공급처", min((i + 1) * chunk_size, len(new_sups)), len(new_sups))
+    sup_ids = existing
+
+    # STEP 2: 품목 - 이름 기준 중복 제거 (같은 품목이 여러 공급처에 있으면 첫 카테고리 사용)
+    existing = {i['name']: i['id'] for i in supabase.table("ITEMS").select("id, name").execute().data}
+    first = valid.drop_duplicates(subset="name")
+    new_items = first[~first["name"].isin(existing.keys())]
+    new_records = new_items[["name", "category"]].to_dict(orient="records")
+    for i, chunk in enumerate(_chunks(new_records, chunk_size)):
+        res = supabase.table("ITEMS").insert(chunk).execute()
+        existing.update({r['name']: r['id'] for r in res.data})
+        report("품목", min((i + 1) * chunk_size, len(new_records)), len(new_records))
+    item_ids = existing
+
+    rows = valid.assign(
+        item_id=valid["name"].map(item_ids),
+        supplier_id=valid["supplier"].map(sup_ids),
+    )
+
+    # STEP 3: 상세정보(SUPPLIER_DETAILS) 청크 단위 upsert
+    # 바코드 컬럼이 없는 파일은 기존 바코드를 지우지 않도록 바코드를 보내지 않음
+    detail_cols = ["item_id", "supplier_id", "order_url", "order_unit", "MOQ", "order_unit_price",
+                   "safety_stock", "base_unit", "conversion_factor"] + (["barcode"] if "barcode" in rows.columns else [])
+    details = rows[detail_cols].to_dict(orient="records")
+    for i, chunk in enumerate(_chunks(details, chunk_size)):
+        supabase.table("SUPPLIER_DETAILS").upsert(chunk, on_conflict="item_id,supplier_id").execute()
+        report("상세정보", min((i + 1) * chunk_size, len(details)), len(details))
+
+    # STEP 4: 재고(STOCKS) 초기화 - 대상 품목의 기존 재고 행을 한 번에 조회 후 없는 것만 매장별로 추가
+    target_ids = sorted({int(x) for x in rows["item_id"]})
+    have = set()
+    for chunk in _chunks(target_ids, chunk_size):
+        res = supabase.table("STOCKS").select("location_id, item_id, supplier_id").in_("item_id", chunk).execute()
+        have.update((s['location_id'], s['item_id'], s['supplier_id']) for s in res.data)
+    now = datetime.now(timezone.utc).isoformat()
+    pairs = list(rows[["item_id", "supplier_id"]].drop_duplicates().itertuples(index=False))
+    new_stocks = [
+        {"location_id": loc_id, "item_id": int(r.item_id), "supplier_id": int(r.supplier_id),
+         "stock": 0, "avg_consumption": 0, "last_checked_at": now}
+        for loc_id in all_location_ids(supabase)
+        for r in pairs
+        if (loc_id, int(r.item_id), int(r.supplier_id)) not in have
+    ]
+    for i, chunk in enumerate(_chunks(new_stocks, chunk_size)):
+        supabase.table("STOCKS").insert(chunk).execute()
+        report("재고", min((i + 1) * chunk_size, len(new_stocks)), len(new_stocks))
+
+    # 다른 앱 워커가 들고 있는 카탈로그/재고 캐시 무효화
+    invalidate(CATALOG, *(stocks_scope(loc_id) for loc_id in {s["location_id"] for s in new_stocks}))
+
+    return {
+        "suppliers": len(new_sups),
+        "items": len(new_records),
+        "details": len(details),
+        "stocks": len(new_stocks),
+    }
+
+
+# --- [4. 단건 등록 (관리자 화면 폼)] ---
+def register_item(supabase, supplier, item_name, category, detail):
+    """공급처(id 또는 신규 이름) + 품목 하나를 등록하고 모든 매장에 재고 행 생성
+
+    detail: SUPPLIER_DETAILS 에 쓸 값 (order_url, order_unit, MOQ, order_unit_price,
+            safety_stock, base_unit, conversion_factor, barcode)
+    반환값: (item_id, supplier_id)
+    """
+    # STEP 1: 공급처(SUPPLIERS) ID 확보
+    if isinstance(supplier, str):
+        ex_sup = supabase.table("SUPPLIERS").select("id").eq("name", supplier).execute()
+        if ex_sup.data:
+            supplier_id = ex_sup.data[0]['id']
+        else:
+            supplier_id = supabase.table("SUPPLIERS").insert({"name": supplier}).execute().data[0]['id']
+    else:
+        supplier_id = supplier
+
+    # STEP 2: 품목(ITEMS) ID 확보
+    ex_itm = supabase.table("ITEMS").select("id").eq("name", item_name).execute()
+    if ex_itm.data:
+        item_id = ex_itm.data[0]['id']
+    else:
+        item_id = supabase.table("ITEMS").insert({"name": item_name, "category": category}).execute().data[0]['id']
+
+    # STEP 3: 상세정보(SUPPLIER_DETAILS) 등록
+    supabase.table("SUPPLIER_DETAILS").upsert({"item_id": item_id, "supplier_id": supplier_id, **detail}).execute()
+
+    # STEP 4: 재고(STOCKS) 초기화 (카탈로그는 매장 공용이므로 모든 매장에 행 생성)
+    ex_stk = supabase.table("STOCKS").select("location_id").match({"item_id": item_id, "supplier_id": supplier_id}).execute()
+    have_locs = {s['location_id'] for s in ex_stk.data}
+    now = datetime.now(timezone.utc).isoformat()
+    new_stk = [
+        {"location_id": loc_id, "item_id": item_id, "supplier_id": supplier_id, "stock": 0, "avg_consumption": 0, "last_checked_at": now}
+        for loc_id in all_location_ids(supabase) if loc_id not in have_locs
+    ]
+    if new_stk:
+        supabase.table("STOCKS").insert(new_stk).execute()
+
+    invalidate(CATALOG, *(stocks_scope(s['location_id']) for s in new_stk))
+    return item_id, supplier_id
+
+
+# --- [5. 업로드 화면] ---
+def render_bulk_import(supabase):
+    import streamlit as st
+
+    st.subheader("CSV/엑셀 일괄 등록")
+    st.caption("한 줄에 (품목, 공급처) 하나씩. 같은 이름의 공급처/품목은 기존 데이터를 재사용합니다.")
+    st.download_button("📄 양식 내려받기", template_csv(), file_name="catalog_template.csv", mime="text/csv")
+
+    uploaded = st.file_uploader("카탈로그 파일", type=["csv", "xlsx"], key="bulk_catalog_file")
+    if uploaded is None:
+        return
+
+    try:
+        valid, errors = validate_catalog(read_catalog(uploaded))
+    except Exception as e:
+        st.error(f"🚨 파일을 읽을 수 없습니다: {e}")
+        return
+
+    c1, c2 = st.columns(2)
+    c1.metric("등록 가능 행", len(valid))
+    c2.metric("오류 행", len(errors), delta_color="inverse")
+    if not errors.empty:
+        st.warning("아래 행은 등록에서 제외됩니다.")
+        st.dataframe(errors, hide_index=True, use_container_width=True)
+    st.dataframe(valid.drop(columns=["row"]).head(50), hide_index=True, use_container_width=True)
+
+    if not valid.empty and st.button(f"{len(valid)}개 행 일괄 등록", type="primary"):
+        bar = st.progress(0.0, text="등록 준비 중...")
+
+        def on_progress(step, done, total):
+            bar.progress(done / total if total else 1.0, text=f"{step} {done}/{total}")
+
+        try:
+            result = import_catalog(supabase, valid, progress=on_progress)
+            bar.progress(1.0, text="완료")
+            st.success(
+                f"✅ 공급처 {result['suppliers']}개, 품목 {result['items']}개 신규 등록 · "
+                f"상세정보 {result['details']}건 반영 · 재고 {result['stocks']}건 초기화"
+            )
+        except Exception as e:
+            st.error(f"❌ 일괄 등록 중 오류 발생: {e}")
@@ -0,0 +1,85 @@
+"""
+실사 입력 이상값 선별
+
+'실사 입력' 오타(10 대신 1000 등)가 그대로 STOCKS 에 들어가면 평균 소모량 학습(alpha 0.3)에 섞여
+몇 주 동안 예측을 망친다. 반영 전에 제출된 모든 행을 한 번의 벡터 연산으로 검사해서
+의심스러운 행은 확인 대기로 보류하고 나머지만 반영한다.
+
+품목마다 예상 범위 = [예측 재고 - K x 오차 규모, 예측 재고 + 배송 중 수량 + K x 오차 규모]
+- 오차 규모: 최근 실사의 예측 오차 MAE (실사 MIN_COUNTS 회 이상인 품목, forecast_error_stats),
+  없으면 마지막 실사 이후 예상 소모량. 최소 MIN_SCALE
+- 배송 중 수량: 입고 처리 전에 물건이 먼저 와서 세어진 경우를 허용
+- 예상 범위를 DIGIT_RATIO 배 넘게 벗어나면 '자릿수 오류 의심'
+
+필요한 조회는 품목별 오차 합계(서버 함수 1회)와 배송 중 주문 상세뿐이라 행마다 따로 조회하지 않는다.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from forecast_accuracy import MIN_COUNTS, load_forecast_errors
+from stock_ops import KST, total_weights
+
+K = 4.0 # 오차 규모의 몇 배까지 정상으로 볼지
+MIN_SCALE = 2.0 # 오차 규모 하한 (재고 관리 단위)
+DIGIT_RATIO = 5.0
+HISTORY_DAYS = 90 # 오차 규모를 계산할 최근 실사 기간
+EDIT_COLUMN = '새로운 재고량'
+
+
+# --- [1. 기준 데이터] ---
+def load_error_scale(supabase, location_id, today=None):
+    """품목별 최근 실사 예측 오차 (item_id, supplier_id, n, mae). 요청 1건"""
+    today = today or datetime.now(KST).date()
+    errors = load_forecast_errors(supabase, today - timedelta(days=HISTORY_DAYS), today, location_id)
+    return errors[errors["dim"] == "item"][["item_id", "supplier_id", "n", "mae"]].reset_index(drop=True)
+
+
+def incoming_qty(lines):
+    """배송 중 주문 상세(queries.load_shipping_orders) -> (item_id, supplier_id)별 도착 예정 수량 (재고 관리 단위)"""
+    if lines.empty:
+        return pd.Series(dtype=float)
+    qty = pd.to_numeric(lines["actual_qty"], errors="coerce").fillna(0) * \
+        pd.to_numeric(lines["conversion_factor"], errors="coerce").fillna(1)
+    return qty.groupby([lines["item_id"].astype(int), lines["supplier_id"].astype(int)]).sum()
+
+
+# --- [2. 선별] ---
+def screen_counts(updates, error_scale=None, incoming=None, now_kst=None):
+    """실사 입력 전체를 한 번에 검사
+
+    updates: compute_stock_counts 의 입력 (predicted_stock 포함)
+    반환값: updates + expected_low, expected_high, suspect(보류 여부), reason 컬럼
+    """
+    now_kst = now_kst or datetime.now(KST)
+    out = updates.copy()
+    if out.empty:
+        return out.assign(expected_low=[], expected_high=[], suspect=[], reason=[])
+    key = pd.MultiIndex.from_arrays([out["item_id"].astype(int), out["supplier_id"].astype(int)])
+    counted = pd.to_numeric(out[EDIT_COLUMN], errors="coerce").to_numpy()
+    predicted = pd.to_numeric(out["predicted_stock"], errors="coerce").fillna(0).clip(lower=0).to_numpy()
+
+    # 오차 규모: 실사 이력이 충분하면 과거 MAE, 아니면 마지막 실사 이후 예상 소모량
+    usage = (pd.to_numeric(out["avg_consumption"], errors="coerce").fillna(0)
+             * total_weights(out["last_checked_at"], now_kst)).to_numpy()
+    mae = np.full(len(out), np.nan)
+    if error_scale is not None and not error_scale.empty:
+        hist = error_scale.assign(item_id=error_scale["item_id"].astype(int),
+                                  supplier_id=error_scale["supplier_id"].astype(int)).set_index(["item_id", "supplier_id"])
+        mae = pd.to_numeric(hist["mae"].where(hist["n"] >= MIN_COUNTS), errors="coerce").reindex(key).to_numpy()
+    scale = np.fmax(np.where(np.isnan(mae), usage, mae), MIN_SCALE)
+    arriving = np.zeros(len(out)) if incoming is None or incoming.empty else incoming.reindex(key).fillna(0).to_numpy()
+
+    low = np.maximum(predicted - K * scale, 0)
+    high = predicted + arriving + K * scale
+    reason = np.select(
+        [counted > high * DIGIT_RATIO, (counted > 0) & (counted * DIGIT_RATIO < low), counted > high, counted < low],
+        ["자릿수 오류 의심 (예상보다 훨씬 많음)", "자릿수 오류 의심 (예상보다 훨씬 적음)", "예상보다 많음", "예상보다 적음"],
+        "",
+    )
+    out["expected_low"] = low.round(1)
+    out["expected_high"] = high.round(1)
+    out["suspect"] = reason != ""
+    out["reason"] = reason
+    return out
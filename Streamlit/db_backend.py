@@ -0,0 +1,1245 @@
+"""
+DB 백엔드 연결 계층
+
+각 페이지의 init_connection()은 이 모듈의 connect()를 통해 클라이언트를 받는다.
+- 기본값은 실제 Supabase 클라이언트(create_client)
+- INVENTORY_BACKEND=memory 이면 프로세스 내 메모리 백엔드(MemoryBackend)를 사용
+- set_backend()로 테스트/부하 측정용 백엔드를 직접 주입할 수 있음
+- connect()가 만든 클라이언트는 전송 계층(transport.py: 연결 풀, 동시 요청 제한, 재시도, 단일 비행)으로 감쌈.
+  set_backend()로 주입한 백엔드는 그대로 돌려준다
+- INVENTORY_ACTOR 를 주면 모든 요청에 x-inventory-actor 헤더로 실어 변경 이력(AUDIT_LOG)의 작업자로 남김
+
+MemoryBackend는 페이지에서 쓰는 table().select/insert/update/upsert/delete,
+match/eq/in_ 등 필터, ITEMS(name) 같은 임베디드 select, rpc 호출을 흉내 내고
+작업(op)별 요청 수, 행 수, 바이트 수를 집계한다.
+"""
+import copy
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+from numbers import Number
+from urllib.parse import quote
+
+from transport import http_client, pooled
+
+BACKEND_ENV = "INVENTORY_BACKEND"
+SEED_ENV = "INVENTORY_SEED_ITEMS"
+SEED_LOCATIONS_ENV = "INVENTORY_SEED_LOCATIONS"
+ACTOR_ENV = "INVENTORY_ACTOR"
+# 변경 이력(AUDIT_LOG)의 작업자로 기록되는 요청 헤더 (audit_log.sql 의 audit_actor())
+ACTOR_HEADER = "x-inventory-actor"
+
+# --- [1. 스키마 메타데이터] ---
+# 테이블별 기본키 (upsert 충돌 판정 기준)
+PRIMARY_KEYS = {
+    "LOCATIONS": ("id",),
+    "ITEMS": ("id",),
+    "SUPPLIERS": ("id",),
+    "SUPPLIER_DETAILS": ("item_id", "supplier_id"),
+    "STOCKS": ("location_id", "item_id", "supplier_id"),
+    "STOCK_COUNTS": ("id",),
+    "PURCHASE_ORDERS": ("order_id",),
+    "PURCHASE_ITEMS": ("id",),
+    "PURCHASE_ORDERS_ARCHIVE": ("order_id",),
+    "PURCHASE_ITEMS_ARCHIVE": ("id",),
+    "PURCHASE_SPEND_MONTHLY": ("month", "location_id", "supplier_id", "item_id"),
+    "SUPPLIER_LEAD_TIMES": ("supplier_id", "item_id"),
+    "REORDER_ALERTS": ("location_id", "item_id", "supplier_id"),
+    "REORDER_ALERT_STATUS": ("location_id",),
+    "WEEKDAY_WEIGHTS": ("weekday",),
+    "AUDIT_LOG": ("id",),
+}
+
+# insert 시 자동 증가되는 칼럼
+SERIAL_COLUMNS = {
+    "LOCATIONS": "id",
+    "STOCK_COUNTS": "id",
+    "ITEMS": "id",
+    "SUPPLIERS": "id",
+    "PURCHASE_ORDERS": "order_id",
+    "PURCHASE_ITEMS": "id",
+    "AUDIT_LOG": "id",
+}
+
+# 임베디드 select 관계: (조회 테이블, 임베드 테이블) -> (조회 칼럼, 임베드 칼럼, 다건 여부)
+RELATIONS = {
+    ("STOCKS", "ITEMS"): ("item_id", "id", False),
+    ("SUPPLIER_DETAILS", "ITEMS"): ("item_id", "id", False),
+    ("SUPPLIER_DETAILS", "SUPPLIERS"): ("supplier_id", "id", False),
+    ("PURCHASE_ORDERS", "SUPPLIERS"): ("supplier_id", "id", False),
+    ("PURCHASE_ITEMS", "ITEMS"): ("item_id", "id", False),
+    ("ITEMS", "SUPPLIER_DETAILS"): ("id", "item_id", True),
+    ("ITEMS", "STOCKS"): ("id", "item_id", True),
+    ("SUPPLIERS", "SUPPLIER_DETAILS"): ("id", "supplier_id", True),
+    ("PURCHASE_ORDERS", "PURCHASE_ITEMS"): ("order_id", "order_id", True),
+}
+
+
+def _union_view(hot, archive):
+    """archive_orders.sql 의 *_ALL 뷰: 운영 + 보관 테이블 (조회 전용, archived_at 이 None 이면 운영 행)"""
+    def rows(backend):
+        return [{**r, "archived_at": None} for r in backend.tables[hot]] + backend.tables[archive]
+    return rows
+
+
+# 조회 전용 뷰: 이름 -> fn(backend) -> 행 목록
+VIEWS = {
+    "PURCHASE_ORDERS_ALL": _union_view("PURCHASE_ORDERS", "PURCHASE_ORDERS_ARCHIVE"),
+    "PURCHASE_ITEMS_ALL": _union_view("PURCHASE_ITEMS", "PURCHASE_ITEMS_ARCHIVE"),
+}
+
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+# insert 시 DB default로 채워지는 값
+DEFAULTS = {
+    "PURCHASE_ORDERS": lambda: {"ordered_at": _now_iso(), "location_id": 1},
+    "STOCKS": lambda: {"last_checked_at": _now_iso(), "location_id": 1, "version": 1},
+    "STOCK_COUNTS": lambda: {"counted_at": _now_iso()},
+    "SUPPLIER_DETAILS": lambda: {"version": 1},
+}
+
+
+def _touch_last_checked_at(old, new):
+    """update_stocks_last_checked_at 트리거와 동일: STOCKS 수정 시 점검 시각 갱신"""
+    new["last_checked_at"] = _now_iso()
+
+
+def _bump_version(old, new):
+    """bump_row_version 트리거와 동일: 수정될 때마다 행 버전 +1 (row_versions.sql)"""
+    new["version"] = (old.get("version") or 1) + 1
+
+
+RECEIVED_STATUSES = ("입고완료", "배송완료")
+
+
+def _stamp_received_at(old, new):
+    """purchase_orders_stamp_received_at 트리거와 동일: 입고 처리 시각 기록"""
+    if old.get("status") == "배송중" and new.get("status") in RECEIVED_STATUSES and not new.get("received_at"):
+        new["received_at"] = _now_iso()
+
+
+# before update 트리거
+TRIGGERS = {
+    "STOCKS": [_touch_last_checked_at, _bump_version],
+    "SUPPLIER_DETAILS": [_bump_version],
+    "PURCHASE_ORDERS": [_stamp_received_at],
+}
+
+KST = timezone(timedelta(hours=9))
+
+# predicted_stocks.sql 이 WEEKDAY_WEIGHTS 에 넣는 초기값 (0 = 월요일). stock_ops.WEEKDAY_FACTORS 와 같게 유지
+DEFAULT_WEEKDAY_WEIGHTS = [{"weekday": d, "weight": w} for d, w in enumerate([0.8, 1.0, 1.0, 1.0, 1.2, 1.5, 1.3])]
+
+
+def _spend_month(ordered_at):
+    """date_trunc('month', ordered_at at time zone 'Asia/Seoul')"""
+    ts = datetime.fromisoformat(str(ordered_at)) if ordered_at else datetime.now(timezone.utc)
+    return ts.astimezone(KST).strftime("%Y-%m-01")
+
+
+def _add_spend(backend, lines, orders, prefix):
+    """주문 상세 행들을 (주문월, 매장, 공급처, 품목)별로 묶어 PURCHASE_SPEND_MONTHLY 에 더함"""
+    prices = {(_norm(d.get("item_id")), _norm(d.get("supplier_id"))): d.get("order_unit_price") or 0
+              for d in backend.tables["SUPPLIER_DETAILS"]}
+    categories = {_norm(i.get("id")): i.get("category") for i in backend.tables["ITEMS"]}
+    index = {backend._key("PURCHASE_SPEND_MONTHLY", r): r for r in backend.tables["PURCHASE_SPEND_MONTHLY"]}
+    for line in lines:
+        order = orders.get(_norm(line.get("order_id")))
+        if order is None:
+            continue
+        item_id, sup_id = line.get("item_id"), order.get("supplier_id")
+        row = {"month": _spend_month(order.get("ordered_at")), "location_id": order.get("location_id", 1),
+               "supplier_id": sup_id, "item_id": item_id}
+        k = backend._key("PURCHASE_SPEND_MONTHLY", row)
+        if k not in index:
+            row.update(category=categories.get(_norm(item_id)), line_count=0, ordered_qty=0,
+                       ordered_spend=0, received_qty=0, received_spend=0)
+            backend.tables["PURCHASE_SPEND_MONTHLY"].append(row)
+            index[k] = row
+        agg = index[k]
+        qty = line.get("actual_qty") or 0
+        if prefix == "ordered":
+            agg["line_count"] += 1
+        agg[f"{prefix}_qty"] += qty
+        agg[f"{prefix}_spend"] += qty * prices.get((_norm(item_id), _norm(sup_id)), 0)
+
+
+def _accumulate_ordered_spend(backend, changes):
+    """purchase_items_accumulate_spend 트리거와 동일: 주문 상세 insert 시 주문 금액 누적"""
+    wanted = {_norm(new.get("order_id")) for _, new in changes}
+    orders = {_norm(o["order_id"]): o for o in backend.tables["PURCHASE_ORDERS"] if _norm(o.get("order_id")) in wanted}
+    _add_spend(backend, [new for _, new in changes], orders, "ordered")
+
+
+def _accumulate_received_spend(backend, changes):
+    """purchase_orders_accumulate_received 트리거와 동일: 배송중 -> 입고된 주문의 금액 누적"""
+    orders = {_norm(new["order_id"]): new for old, new in changes
+              if old.get("status") == "배송중" and new.get("status") in RECEIVED_STATUSES}
+    if orders:
+        lines = [l for l in backend.tables["PURCHASE_ITEMS"] if _norm(l.get("order_id")) in orders]
+        _add_spend(backend, lines, orders, "received")
+
+
+LEAD_TIME_RECENT = 20
+
+
+def _percentile_cont(values, q):
+    """percentile_cont: 선형 보간 백분위수"""
+    vals = sorted(values)
+    if not vals:
+        return None
+    pos = (len(vals) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(vals) - 1)
+    return vals[lo] + (vals[hi] - vals[lo]) * (pos - lo)
+
+
+def _lead_days(order):
+    ordered = datetime.fromisoformat(str(order["ordered_at"]))
+    received = datetime.fromisoformat(str(order["received_at"]))
+    return (received - ordered).total_seconds() / 86400
+
+
+def _merge_lead_times(backend, orders, lines=None):
+    """입고된 주문들의 리드타임을 (공급처, 품목)별로 묶어 SUPPLIER_LEAD_TIMES 와 병합 (병렬 Welford 결합)"""
+    by_order = {_norm(o["order_id"]): o for o in orders}
+    samples = {}
+    for line in backend.tables["PURCHASE_ITEMS"] if lines is None else lines:
+        order = by_order.get(_norm(line.get("order_id")))
+        if order is not None:
+            k = (order.get("supplier_id"), line.get("item_id"))
+            samples.setdefault(k, []).append((order["received_at"], _lead_days(order)))
+    index = {backend._key("SUPPLIER_LEAD_TIMES", r): r for r in backend.tables["SUPPLIER_LEAD_TIMES"]}
+    for (sup_id, item_id), pairs in samples.items():
+        days = [d for _, d in sorted(pairs, key=lambda p: str(p[0]))]
+        n_b = len(days)
+        mean_b = sum(days) / n_b
+        m2_b = sum((d - mean_b) ** 2 for d in days)
+        row = {"supplier_id": sup_id, "item_id": item_id}
+        k = backend._key("SUPPLIER_LEAD_TIMES", row)
+        cur = index.get(k)
+        if cur is None:
+            cur = {**row, "n": 0, "mean_days": 0.0, "m2": 0.0, "recent_days": []}
+            backend.tables["SUPPLIER_LEAD_TIMES"].append(cur)
+            index[k] = cur
+        n_a, mean_a = cur["n"], cur["mean_days"]
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        cur["mean_days"] = mean_a + delta * n_b / n
+        cur["m2"] = cur["m2"] + m2_b + delta * delta * n_a * n_b / n
+        cur["n"] = n
+        cur["recent_days"] = (cur["recent_days"] + days)[-LEAD_TIME_RECENT:]
+        cur["p90_days"] = _percentile_cont(cur["recent_days"], 0.9)
+        cur["updated_at"] = _now_iso()
+
+
+def _accumulate_lead_times(backend, changes):
+    """purchase_orders_accumulate_lead_times 트리거와 동일: 처음 입고 시각이 찍힌 주문만 반영"""
+    received = [new for old, new in changes if not old.get("received_at") and new.get("received_at")]
+    if received:
+        _merge_lead_times(backend, received)
+
+
+# 변경 이력을 남기는 테이블과 자동으로 바뀌는 칼럼 (audit_log.sql)
+AUDITED_TABLES = ("STOCKS", "SUPPLIER_DETAILS", "PURCHASE_ORDERS", "PURCHASE_ITEMS")
+AUDIT_AUTO_COLUMNS = ("version", "last_checked_at")
+
+
+def _audit_entry(backend, table, op, row, before, after):
+    return {
+        "changed_at": _now_iso(), "table_name": table, "op": op,
+        **{c: row.get(c) for c in ("location_id", "item_id", "supplier_id", "order_id")},
+        "row_key": {c: row.get(c) for c in PRIMARY_KEYS[table]},
+        "before": before, "after": after, "actor": backend.actor, "tx": backend._tx,
+    }
+
+
+def _audit(table):
+    """audit_changes 트리거와 동일: 바뀐 행을 한 번에 AUDIT_LOG 에 추가 (update 는 바뀐 칼럼만)"""
+    def trig(backend, changes):
+        entries = []
+        for old, new in changes:
+            if old is None or new is None:
+                row = new if old is None else old
+                entries.append(_audit_entry(backend, table, "insert" if old is None else "delete", row, old, new))
+            elif backend._key(table, old) != backend._key(table, new):
+                # 키를 바꾼 update 는 delete + insert
+                entries.append(_audit_entry(backend, table, "delete", old, old, None))
+                entries.append(_audit_entry(backend, table, "insert", new, None, new))
+            else:
+                # 적재할 때 없던 칼럼은 null 로 봄
+                cols = [c for c in new if c not in AUDIT_AUTO_COLUMNS and _norm(new[c]) != _norm(old.get(c))]
+                if cols:
+                    entries.append(_audit_entry(backend, table, "update", new,
+                                                {c: old.get(c) for c in cols}, {c: new[c] for c in cols}))
+        for entry in entries:
+            backend.tables["AUDIT_LOG"].append(backend._prepare_insert("AUDIT_LOG", entry))
+    return trig
+
+
+# after 트리거 (문장 단위): (테이블, 이벤트) -> fn(backend, [(이전 행, 새 행), ...])
+# insert 는 이전 행, delete 는 새 행이 None
+AFTER_TRIGGERS = {
+    ("PURCHASE_ITEMS", "insert"): [_accumulate_ordered_spend],
+    ("PURCHASE_ORDERS", "update"): [_accumulate_received_spend, _accumulate_lead_times],
+}
+for _table in AUDITED_TABLES:
+    for _event in ("insert", "update", "delete"):
+        AFTER_TRIGGERS.setdefault((_table, _event), []).append(_audit(_table))
+
+
+def _fire_after(backend, table, event, changes):
+    if changes:
+        for trig in AFTER_TRIGGERS.get((table, event), []):
+            trig(backend, changes)
+
+
+# --- [2. select 문자열 파서] ---
+def parse_select(columns):
+    """'*, ITEMS(name, category)' 형태를 [(칼럼, None), (관계, 하위 트리)] 목록으로 변환"""
+    tokens, depth, buf = [], 0, ""
+    for ch in columns:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            tokens.append(buf)
+            buf = ""
+        else:
+            buf += ch
+    tokens.append(buf)
+
+    tree = []
+    for tok in tokens:
+        tok = " ".join(tok.split())
+        if not tok:
+            continue
+        if "(" in tok:
+            name, inner = tok.split("(", 1)
+            tree.append((name.strip(), parse_select(inner.rsplit(")", 1)[0])))
+        else:
+            tree.append((tok, None))
+    return tree
+
+
+def _norm(value):
+    """필터 비교용 정규화 (numpy 정수, 문자열 숫자 등)"""
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, Number):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _jsonable(value):
+    """응답/요청 페이로드를 JSON 왕복으로 복사하면서 바이트 수 계산"""
+    raw = json.dumps(value, ensure_ascii=False, default=_json_default)
+    return json.loads(raw), len(raw.encode("utf-8"))
+
+
+def _json_default(value):
+    if hasattr(value, "item"):  # numpy 스칼라
+        return value.item()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+# --- [3. 요청 통계] ---
+class QueryStats:
+    """작업(op)별 요청/행/바이트 집계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.ops = {}
+            self.log = []
+
+    def record(self, op, table, rows, nbytes):
+        with self._lock:
+            entry = self.ops.setdefault(op, {"requests": 0, "rows": 0, "bytes": 0})
+            entry["requests"] += 1
+            entry["rows"] += rows
+            entry["bytes"] += nbytes
+            self.log.append((op, table, rows, nbytes))
+
+    @property
+    def requests(self):
+        return sum(e["requests"] for e in self.ops.values())
+
+    @property
+    def rows(self):
+        return sum(e["rows"] for e in self.ops.values())
+
+    @property
+    def bytes(self):
+        return sum(e["bytes"] for e in self.ops.values())
+
+    def snapshot(self):
+        with self._lock:
+            return {"ops": copy.deepcopy(self.ops), "log_len": len(self.log)}
+
+    def since(self, snapshot):
+        """snapshot 이후에 발생한 요청 목록 [(op, table, rows, bytes)]"""
+        with self._lock:
+            return list(self.log[snapshot["log_len"]:])
+
+    def summary(self):
+        return {op: dict(v) for op, v in sorted(self.ops.items())}
+
+
+class QueryCounter:
+    """with 블록 안에서 발생한 요청을 세는 도우미 (쿼리 예산 검증용)
+
+    with QueryCounter(backend) as qc:
+        render_dashboard()
+    assert qc.requests <= 3
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.calls = []
+
+    def __enter__(self):
+        self._snap = self.backend.stats.snapshot()
+        return self
+
+    def __exit__(self, *exc):
+        self.calls = self.backend.stats.since(self._snap)
+        return False
+
+    @property
+    def requests(self):
+        return len(self.calls)
+
+    @property
+    def rows(self):
+        return sum(c[2] for c in self.calls)
+
+    @property
+    def bytes(self):
+        return sum(c[3] for c in self.calls)
+
+    def by_table(self):
+        out = {}
+        for op, table, _, _ in self.calls:
+            out[(op, table)] = out.get((op, table), 0) + 1
+        return out
+
+
+# --- [4. 메모리 백엔드] ---
+class MemoryResponse:
+    """postgrest APIResponse와 같은 모양(.data, .count)"""
+
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class MemoryQuery:
+    """supabase table() 빌더 흉내: 필터 체이닝 후 execute()"""
+
+    def __init__(self, backend, table):
+        self.backend = backend
+        self.table = table
+        self._op = "select"
+        self._columns = "*"
+        self._payload = None
+        self._filters = []
+        self._order = []
+        self._limit = None
+        self._range = None
+        self._on_conflict = None
+        self._count = None
+        self._head = False
+
+    # 작업 지정
+    def select(self, *columns, count=None, head=False, **kwargs):
+        # head=True: 행 없이 개수(count)만 (HEAD 요청)
+        self._op = "select"
+        self._columns = ",".join(columns) if columns else "*"
+        self._count = count
+        self._head = head
+        return self
+
+    def insert(self, json, count=None, returning=None, upsert=False, **kwargs):
+        self._op = "upsert" if upsert else "insert"
+        self._payload = json
+        return self
+
+    def upsert(self, json, on_conflict="", ignore_duplicates=False, **kwargs):
+        self._op = "upsert"
+        self._payload = json
+        self._on_conflict = on_conflict or None
+        return self
+
+    def update(self, json, count=None, returning=None, **kwargs):
+        self._op = "update"
+        self._payload = json
+        return self
+
+    def delete(self, count=None, returning=None, **kwargs):
+        self._op = "delete"
+        return self
+
+    # 필터
+    def eq(self, column, value):
+        self._filters.append((column, lambda v, t=_norm(value): _norm(v) == t))
+        return self
+
+    def neq(self, column, value):
+        self._filters.append((column, lambda v, t=_norm(value): _norm(v) != t))
+        return self
+
+    def gt(self, column, value):
+        self._filters.append((column, lambda v, t=_norm(value): v is not None and _norm(v) > t))
+        return self
+
+    def gte(self, column, value):
+        self._filters.append((column, lambda v, t=_norm(value): v is not None and _norm(v) >= t))
+        return self
+
+    def lt(self, column, value):
+        self._filters.append((column, lambda v, t=_norm(value): v is not None and _norm(v) < t))
+        return self
+
+    def lte(self, column, value):
+        self._filters.append((column, lambda v, t=_norm(value): v is not None and _norm(v) <= t))
+        return self
+
+    def in_(self, column, values):
+        targets = {_norm(v) for v in values}
+        self._filters.append((column, lambda v: _norm(v) in targets))
+        return self
+
+    def is_(self, column, value):
+        target = None if value in (None, "null") else value
+        self._filters.append((column, lambda v: v is target or v == target))
+        return self
+
+    def match(self, query):
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    def order(self, column, desc=False, **kwargs):
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size, **kwargs):
+        self._limit = size
+        return self
+
+    def range(self, start, end, **kwargs):
+        self._range = (start, end)
+        return self
+
+    def _matches(self, row):
+        return all(pred(row.get(col)) for col, pred in self._filters)
+
+    def execute(self):
+        return self.backend._execute(self)
+
+
+class MemoryRpc:
+    def __init__(self, backend, name, params):
+        self.backend = backend
+        self.name = name
+        self.params = params or {}
+
+    def execute(self):
+        return self.backend._execute_rpc(self.name, self.params)
+
+
+class MemoryBackend:
+    """프로세스 내 가짜 Supabase. 테이블은 {이름: [행 dict]} 로 보관
+
+    latency: 요청당 네트워크 왕복 시간(초)을 흉내 내는 지연 (락 밖에서 대기)
+    actor: 변경 이력에 남는 작업자 (실제 DB 에서 anon 키로 접속했을 때의 JWT role)
+    """
+
+    def __init__(self, tables=None, latency=0.0, actor="anon"):
+        self._lock = threading.RLock()
+        self.latency = latency
+        self.actor = actor
+        # 요청(= 트랜잭션) 번호: 변경 이력의 tx
+        self._tx = 0
+        self.tables = {name: [] for name in PRIMARY_KEYS}
+        self._serials = {}
+        self.rpcs = dict(DEFAULT_RPCS)
+        self.stats = QueryStats()
+        self.load("WEEKDAY_WEIGHTS", DEFAULT_WEEKDAY_WEIGHTS)
+        for name, rows in (tables or {}).items():
+            self.load(name, rows)
+        if tables and "PURCHASE_SPEND_MONTHLY" not in tables:
+            # 직접 적재한 데이터는 트리거를 거치지 않으므로 집계 테이블을 한 번 재계산
+            _rpc_refresh_purchase_spend(self)
+        if tables and "SUPPLIER_LEAD_TIMES" not in tables:
+            _rpc_refresh_lead_times(self)
+
+    # 데이터 적재 (통계에 잡히지 않음)
+    def load(self, table, rows):
+        with self._lock:
+            self.tables[table] = [dict(r) for r in rows]
+            serial = SERIAL_COLUMNS.get(table)
+            if serial:
+                self._serials[table] = max((r.get(serial) or 0 for r in self.tables[table]), default=0)
+
+    def rows(self, table):
+        """검증용 원본 행 복사본"""
+        with self._lock:
+            return copy.deepcopy(self.tables.get(table, []))
+
+    def table(self, name):
+        return MemoryQuery(self, name)
+
+    def from_(self, name):
+        return self.table(name)
+
+    def rpc(self, fn, params=None, **kwargs):
+        return MemoryRpc(self, fn, params)
+
+    def register_rpc(self, name, fn):
+        """fn(backend, **params) -> data"""
+        self.rpcs[name] = fn
+
+    # --- 실행부 ---
+    def _execute(self, q):
+        if self.latency:
+            time.sleep(self.latency)
+        _, req_bytes = _jsonable(q._payload) if q._payload is not None else (None, 0)
+        with self._lock:
+            self._tx += 1
+            if q.table in VIEWS and q._op != "select":
+                raise ValueError(f"cannot {q._op} view \"{q.table}\"")
+            if q.table not in self.tables and q.table not in VIEWS:
+                raise KeyError(f"relation \"{q.table}\" does not exist")
+            handler = getattr(self, f"_do_{q._op}")
+            data = handler(q)
+        count = len(data) if q._count else None
+        if q._head:
+            data = []
+        data, resp_bytes = _jsonable(data)
+        self.stats.record(q._op, q.table, len(data), req_bytes + resp_bytes)
+        return MemoryResponse(data, count)
+
+    def _execute_rpc(self, name, params):
+        if name not in self.rpcs:
+            raise KeyError(f"function {name} does not exist")
+        if self.latency:
+            time.sleep(self.latency)
+        _, req_bytes = _jsonable(params)
+        with self._lock:
+            self._tx += 1
+            data = self.rpcs[name](self, **params)
+        data, resp_bytes = _jsonable(data)
+        rows = len(data) if isinstance(data, list) else (0 if data is None else 1)
+        self.stats.record("rpc", name, rows, req_bytes + resp_bytes)
+        return MemoryResponse(data)
+
+    def _do_select(self, q):
+        source = VIEWS[q.table](self) if q.table in VIEWS else self.tables[q.table]
+        rows = [r for r in source if q._matches(r)]
+        for column, desc in reversed(q._order):
+            rows.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+        if q._range:
+            rows = rows[q._range[0]:q._range[1] + 1]
+        if q._limit is not None:
+            rows = rows[:q._limit]
+        tree = parse_select(q._columns)
+        indexes = {}
+        return [self._project(q.table, r, tree, indexes) for r in rows]
+
+    def _children(self, table, column, key, indexes):
+        """임베드 테이블을 칼럼 값 기준으로 한 번만 색인해서 조회 (select 한 번 동안 재사용)"""
+        index = indexes.get((table, column))
+        if index is None:
+            index = indexes[(table, column)] = {}
+            for c in self.tables[table]:
+                index.setdefault(_norm(c.get(column)), []).append(c)
+        return index.get(key, [])
+
+    def _project(self, table, row, tree, indexes):
+        out = {}
+        for name, sub in tree:
+            if sub is None:
+                if name == "*":
+                    out.update(row)
+                else:
+                    out[name] = row.get(name)
+                continue
+            rel = RELATIONS.get((table, name))
+            if rel is None:
+                # PGRST200: 관계를 찾을 수 없음
+                raise LookupError(f"Could not find a relationship between '{table}' and '{name}'")
+            local, remote, many = rel
+            children = self._children(name, remote, _norm(row.get(local)), indexes)
+            projected = [self._project(name, c, sub, indexes) for c in children]
+            out[name] = projected if many else (projected[0] if projected else None)
+        return out
+
+    def _prepare_insert(self, table, record):
+        row = dict(DEFAULTS[table]()) if table in DEFAULTS else {}
+        row.update(record)
+        serial = SERIAL_COLUMNS.get(table)
+        if serial:
+            if row.get(serial) is None:
+                self._serials[table] = self._serials.get(table, 0) + 1
+                row[serial] = self._serials[table]
+            else:
+                self._serials[table] = max(self._serials.get(table, 0), int(row[serial]))
+        return row
+
+    def _key(self, table, row, cols=None):
+        return tuple(_norm(row.get(c)) for c in (cols or PRIMARY_KEYS[table]))
+
+    def _do_insert(self, q):
+        records = q._payload if isinstance(q._payload, list) else [q._payload]
+        existing = {self._key(q.table, r) for r in self.tables[q.table]}
+        inserted = []
+        for rec in records:
+            row = self._prepare_insert(q.table, _jsonable(rec)[0])
+            k = self._key(q.table, row)
+            if k in existing:
+                raise ValueError(f"duplicate key value violates unique constraint on \"{q.table}\" {k}")
+            existing.add(k)
+            inserted.append(row)
+        self.tables[q.table].extend(inserted)
+        _fire_after(self, q.table, "insert", [(None, row) for row in inserted])
+        return inserted
+
+    def _do_upsert(self, q):
+        records = q._payload if isinstance(q._payload, list) else [q._payload]
+        cols = tuple(c.strip() for c in q._on_conflict.split(",")) if q._on_conflict else None
+        index = {self._key(q.table, r, cols): r for r in self.tables[q.table]}
+        out, inserted, updated = [], [], []
+        for rec in records:
+            rec = _jsonable(rec)[0]
+            # 보내지 않은 키 칼럼은 DB 기본값으로 충돌 판정 (예: location_id)
+            probe = {**DEFAULTS[q.table](), **rec} if q.table in DEFAULTS else rec
+            k = self._key(q.table, probe, cols)
+            if k in index and all(v is not None for v in k):
+                target = index[k]
+                new = dict(target)
+                new.update(rec)
+                for trig in TRIGGERS.get(q.table, []):
+                    trig(target, new)
+                updated.append((dict(target), new))
+                target.clear()
+                target.update(new)
+                out.append(target)
+            else:
+                row = self._prepare_insert(q.table, rec)
+                self.tables[q.table].append(row)
+                index[self._key(q.table, row, cols)] = row
+                inserted.append((None, row))
+                out.append(row)
+        _fire_after(self, q.table, "insert", inserted)
+        _fire_after(self, q.table, "update", updated)
+        return out
+
+    def _do_update(self, q):
+        payload = _jsonable(q._payload)[0]
+        out, changes = [], []
+        for row in self.tables[q.table]:
+            if q._matches(row):
+                new = dict(row)
+                new.update(payload)
+                for trig in TRIGGERS.get(q.table, []):
+                    trig(row, new)
+                changes.append((dict(row), new))
+                row.clear()
+                row.update(new)
+                out.append(row)
+        _fire_after(self, q.table, "update", changes)
+        return out
+
+    def _do_delete(self, q):
+        keep, out = [], []
+        for row in self.tables[q.table]:
+            (out if q._matches(row) else keep).append(row)
+        self.tables[q.table] = keep
+        _fire_after(self, q.table, "delete", [(row, None) for row in out])
+        return out
+
+
+# --- [5. 서버 함수(rpc) 구현] ---
+def _rpc_delivery_completed(backend, p_order_id):
+    """DataBase/Functions/delivery_completed.sql 과 동일한 처리"""
+    key = _norm(p_order_id)
+    changes = []
+    for row in backend.tables["PURCHASE_ORDERS"]:
+        if _norm(row.get("order_id")) == key:
+            new = {**row, "status": "배송완료"}
+            for trig in TRIGGERS["PURCHASE_ORDERS"]:
+                trig(row, new)
+            changes.append((dict(row), new))
+            row.update(new)
+    _fire_after(backend, "PURCHASE_ORDERS", "update", changes)
+    location = _norm(changes[0][1].get("location_id", 1)) if changes else None
+    lines = [r for r in backend.tables["PURCHASE_ITEMS"] if _norm(r.get("order_id")) == key]
+    line_changes, stock_changes = [], []
+    for line in lines:
+        line_changes.append((dict(line), {**line, "status": "배송완료"}))
+        line["status"] = "배송완료"
+    _fire_after(backend, "PURCHASE_ITEMS", "update", line_changes)
+    for line in lines:
+        for stock in backend.tables["STOCKS"]:
+            if _norm(stock.get("location_id")) == location and _norm(stock.get("item_id")) == _norm(line.get("item_id")):
+                new = dict(stock)
+                new["stock"] = (stock.get("stock") or 0) + (line.get("actual_qty") or 0)
+                for trig in TRIGGERS["STOCKS"]:
+                    trig(stock, new)
+                stock_changes.append((dict(stock), new))
+                stock.update(new)
+    _fire_after(backend, "STOCKS", "update", stock_changes)
+    return None
+
+
+def _rpc_receive_orders(backend, p_order_ids):
+    """DataBase/Functions/receive_orders.sql 과 동일: 배송중 주문만 입고 처리하고 처리된 order_id 반환"""
+    wanted = {_norm(o) for o in p_order_ids}
+    targets, changes = {}, []
+    for row in backend.tables["PURCHASE_ORDERS"]:
+        if _norm(row.get("order_id")) in wanted and row.get("status") == "배송중":
+            new = {**row, "status": "입고완료"}
+            for trig in TRIGGERS["PURCHASE_ORDERS"]:
+                trig(row, new)
+            changes.append((dict(row), new))
+            row.update(new)
+            targets[_norm(row["order_id"])] = (row.get("location_id", 1), row.get("supplier_id"))
+    _fire_after(backend, "PURCHASE_ORDERS", "update", changes)
+
+    factors = {(_norm(d.get("item_id")), _norm(d.get("supplier_id"))): d.get("conversion_factor") or 1
+               for d in backend.tables["SUPPLIER_DETAILS"]}
+    incoming = {}
+    for line in backend.tables["PURCHASE_ITEMS"]:
+        oid = _norm(line.get("order_id"))
+        if oid in targets:
+            location, supplier = targets[oid]
+            k = (_norm(location), _norm(line.get("item_id")), _norm(supplier))
+            incoming[k] = incoming.get(k, 0) + (line.get("actual_qty") or 0) * factors.get(k[1:], 1)
+
+    stock_changes = []
+    for stock in backend.tables["STOCKS"]:
+        k = (_norm(stock.get("location_id")), _norm(stock.get("item_id")), _norm(stock.get("supplier_id")))
+        if k in incoming:
+            new = dict(stock)
+            new["stock"] = (stock.get("stock") or 0) + incoming[k]
+            for trig in TRIGGERS["STOCKS"]:
+                trig(stock, new)
+            stock_changes.append((dict(stock), new))
+            stock.update(new)
+    _fire_after(backend, "STOCKS", "update", stock_changes)
+    return [int(o) for o in targets]
+
+
+def _rpc_refresh_purchase_spend(backend):
+    """purchase_analytics.sql 의 refresh_purchase_spend(): 집계 테이블 전체 재계산 (보관 주문 포함)"""
+    backend.tables["PURCHASE_SPEND_MONTHLY"] = []
+    orders = {_norm(o["order_id"]): o for o in VIEWS["PURCHASE_ORDERS_ALL"](backend)}
+    all_lines = VIEWS["PURCHASE_ITEMS_ALL"](backend)
+    _add_spend(backend, all_lines, orders, "ordered")
+    received = {k: o for k, o in orders.items() if o.get("status") in RECEIVED_STATUSES}
+    lines = [l for l in all_lines if _norm(l.get("order_id")) in received]
+    _add_spend(backend, lines, received, "received")
+    return None
+
+
+def _rpc_refresh_lead_times(backend):
+    """lead_times.sql 의 refresh_lead_times(): received_at 이 있는 주문으로 리드타임 통계 재계산 (보관 주문 포함)"""
+    backend.tables["SUPPLIER_LEAD_TIMES"] = []
+    orders = [o for o in VIEWS["PURCHASE_ORDERS_ALL"](backend) if o.get("received_at")]
+    _merge_lead_times(backend, orders, VIEWS["PURCHASE_ITEMS_ALL"](backend))
+    return None
+
+
+def _rpc_ensure_purchase_items_partitions(backend, p_from, p_to):
+    """0003_partition_purchase_items.sql 의 ensure_purchase_items_partitions(): 메모리 테이블은 파티션이 없으므로 0"""
+    return 0
+
+
+def _interval(value):
+    """'180 days', '12 hours' 같은 interval 문자열 -> timedelta"""
+    n, unit = str(value).split()[:2]
+    return timedelta(**{unit.rstrip("s") + "s": float(n)})
+
+
+def _rpc_archive_purchase_orders(backend, p_older_than="180 days", p_batch=1000):
+    """archive_orders.sql 의 archive_purchase_orders(): 오래된 완료 주문을 최대 p_batch 건 보관 테이블로 이동"""
+    cutoff = datetime.now(timezone.utc) - _interval(p_older_than)
+    targets = sorted(
+        (o for o in backend.tables["PURCHASE_ORDERS"]
+         if o.get("status") in RECEIVED_STATUSES
+         and datetime.fromisoformat(str(o.get("received_at") or o["ordered_at"])) < cutoff),
+        key=lambda o: _norm(o["order_id"]),
+    )[:int(p_batch)]
+    orders = {_norm(o["order_id"]): o for o in targets}
+    if not orders:
+        return 0
+    now = _now_iso()
+    archived = {_norm(o["order_id"]) for o in backend.tables["PURCHASE_ORDERS_ARCHIVE"]}
+    for k, o in orders.items():
+        if k not in archived:
+            backend.tables["PURCHASE_ORDERS_ARCHIVE"].append({**o, "archived_at": now})
+    archived_lines = {_norm(l["id"]) for l in backend.tables["PURCHASE_ITEMS_ARCHIVE"]}
+    keep = []
+    for line in backend.tables["PURCHASE_ITEMS"]:
+        order = orders.get(_norm(line.get("order_id")))
+        if order is None:
+            keep.append(line)
+        elif _norm(line["id"]) not in archived_lines:
+            backend.tables["PURCHASE_ITEMS_ARCHIVE"].append(
+                {"ordered_at": order["ordered_at"], **line, "archived_at": now})
+    backend.tables["PURCHASE_ITEMS"] = keep
+    backend.tables["PURCHASE_ORDERS"] = [o for o in backend.tables["PURCHASE_ORDERS"] if _norm(o["order_id"]) not in orders]
+    return len(orders)
+
+
+def _spend_rows(backend, p_from, p_to, p_location_id=None):
+    return [r for r in backend.tables["PURCHASE_SPEND_MONTHLY"] if str(p_from) <= r["month"] <= str(p_to)
+            and (p_location_id is None or _norm(r.get("location_id")) == _norm(p_location_id))]
+
+
+def _group_sum(rows, keys, fields):
+    out = {}
+    for r in rows:
+        k = tuple(r[c] for c in keys)
+        acc = out.setdefault(k, {**dict(zip(keys, k)), **{f: 0 for f in fields}})
+        for f in fields:
+            acc[f] += r[f]
+    return [out[k] for k in sorted(out, key=lambda k: tuple((v is None, v) for v in k))]
+
+
+def _rpc_spend_by_supplier_month(backend, p_from, p_to, p_location_id=None):
+    names = {_norm(s["id"]): s.get("name") for s in backend.tables["SUPPLIERS"]}
+    rows = _group_sum(_spend_rows(backend, p_from, p_to, p_location_id), ("month", "supplier_id"),
+                      ("line_count", "ordered_spend", "received_spend"))
+    return [{**r, "supplier_name": names.get(_norm(r["supplier_id"]))} for r in rows]
+
+
+def _rpc_spend_by_category_month(backend, p_from, p_to, p_location_id=None):
+    rows = [{**r, "category": r.get("category") or "기타"} for r in _spend_rows(backend, p_from, p_to, p_location_id)]
+    return _group_sum(rows, ("month", "category"), ("ordered_spend", "received_spend"))
+
+
+def _rpc_top_items_by_spend(backend, p_from, p_to, p_limit=20, p_location_id=None):
+    names = {_norm(i["id"]): i.get("name") for i in backend.tables["ITEMS"]}
+    rows = _group_sum(_spend_rows(backend, p_from, p_to, p_location_id), ("item_id",), ("ordered_qty", "ordered_spend"))
+    categories = {r["item_id"]: r.get("category") for r in backend.tables["PURCHASE_SPEND_MONTHLY"]}
+    rows.sort(key=lambda r: r["ordered_spend"], reverse=True)
+    return [{**r, "item_name": names.get(_norm(r["item_id"])), "category": categories.get(r["item_id"])}
+            for r in rows[:p_limit]]
+
+
+def _rpc_forecast_error_stats(backend, p_from, p_to, p_location_id=None):
+    """forecast_accuracy.sql 과 같은 결과: 품목/카테고리/요일/월 묶음별 예측 오차 합계"""
+    items = {_norm(i["id"]): i for i in backend.tables["ITEMS"]}
+    out = {}
+    for c in backend.tables.get("STOCK_COUNTS", []):
+        if c.get("predicted_stock") is None:
+            continue
+        if p_location_id is not None and _norm(c.get("location_id")) != _norm(p_location_id):
+            continue
+        ts = datetime.fromisoformat(str(c["counted_at"])).astimezone(KST)
+        if not str(p_from) <= ts.strftime("%Y-%m-%d") <= str(p_to):
+            continue
+        counted, predicted = float(c["counted_stock"]), float(c["predicted_stock"])
+        usage = float(c.get("predicted_usage") or 0)
+        error = counted - predicted
+        item, sup = _norm(c["item_id"]), _norm(c["supplier_id"])
+        name, cat = items.get(item, {}).get("name"), items.get(item, {}).get("category") or "기타"
+        for dim, key in (("item", (item, sup, name, cat, None, None)), ("category", (None, None, None, cat, None, None)),
+                         ("weekday", (None, None, None, None, ts.weekday(), None)),
+                         ("month", (None, None, None, None, None, ts.strftime("%Y-%m-01")))):
+            acc = out.setdefault((dim, key), {
+                "dim": dim, **dict(zip(("item_id", "supplier_id", "item_name", "category", "weekday", "month"), key)),
+                "n": 0, "sum_error": 0.0, "sum_abs_error": 0.0, "n_pct": 0, "sum_abs_pct": 0.0,
+                "n_usage": 0, "predicted_usage": 0.0, "actual_usage": 0.0,
+            })
+            acc["n"] += 1
+            acc["sum_error"] += error
+            acc["sum_abs_error"] += abs(error)
+            if counted > 0:
+                acc["n_pct"] += 1
+                acc["sum_abs_pct"] += abs(error) / counted
+            if predicted > 0:
+                acc["n_usage"] += 1
+                acc["predicted_usage"] += usage
+                acc["actual_usage"] += usage - error
+    return [out[k] for k in sorted(out, key=lambda k: (k[0], tuple((v is None, v) for v in k[1])))]
+
+
+def _calendar_cum(weights, day):
+    """CALENDAR.cum_weight 와 차이가 같은 누적 가중치 (0001-01-01 부터 day 까지, 달력 테이블 없이 주 단위로 계산)"""
+    n = day.toordinal()  # 0001-01-01(월요일) = 1
+    return (n // 7) * sum(weights) + sum(weights[:n % 7])
+
+
+def _rpc_predicted_stocks(backend, p_location_id=None, p_only_alerts=False, p_now=None, p_min_samples=3,
+                          p_default_lead_days=2.0):
+    """predicted_stocks.sql 과 같은 결과: 매장 재고 행별 예측 재고, 발주점, 미달 여부"""
+    now = datetime.fromisoformat(str(p_now)) if p_now else datetime.now(timezone.utc)
+    by_day = {int(w["weekday"]): float(w["weight"]) for w in backend.tables["WEEKDAY_WEIGHTS"]}
+    weights = [by_day.get(d, 1.0) for d in range(7)]
+    factor = sum(weights) / 7
+
+    item_lt, sup_acc = {}, {}
+    for l in backend.tables["SUPPLIER_LEAD_TIMES"]:
+        days = l.get("p90_days") if l.get("p90_days") is not None else l.get("mean_days")
+        key = (_norm(l["supplier_id"]), _norm(l["item_id"]))
+        n = float(l.get("n") or 0)
+        if n >= p_min_samples and days is not None:
+            item_lt[key] = float(days)
+        acc = sup_acc.setdefault(key[0], [0.0, 0.0])
+        acc[0] += float(days or 0) * n
+        acc[1] += n
+    sup_lt = {s: w / n for s, (w, n) in sup_acc.items() if n > 0}
+
+    items = {_norm(i["id"]): i for i in backend.tables["ITEMS"]}
+    details = {(_norm(d["item_id"]), _norm(d["supplier_id"])): d for d in backend.tables["SUPPLIER_DETAILS"]}
+    out = []
+    for s in backend.tables["STOCKS"]:
+        if p_location_id is not None and _norm(s.get("location_id", 1)) != _norm(p_location_id):
+            continue
+        item, sup = _norm(s["item_id"]), _norm(s["supplier_id"])
+        checked = datetime.fromisoformat(str(s["last_checked_at"]))
+        start = checked.astimezone(timezone.utc).date()
+        n_days = max(0, int((now - checked).total_seconds() // 86400))
+        weight = _calendar_cum(weights, start + timedelta(days=n_days)) - _calendar_cum(weights, start)
+        stock, cons = float(s.get("stock") or 0), float(s.get("avg_consumption") or 0)
+        detail = details.get((item, sup), {})
+        lead = item_lt.get((sup, item), sup_lt.get(sup, float(p_default_lead_days)))
+        predicted = round(max(0.0, stock - cons * weight), 2)
+        reorder = round(cons * factor * lead + float(detail.get("safety_stock") or 0), 2)
+        out.append({
+            "location_id": s.get("location_id", 1), "item_id": s["item_id"], "supplier_id": s["supplier_id"],
+            "item_name": items.get(item, {}).get("name") or "N/A", "category": items.get(item, {}).get("category") or "기타",
+            "stock": s.get("stock"), "avg_consumption": s.get("avg_consumption"), "last_checked_at": s["last_checked_at"],
+            "predicted_stock": predicted, "safety_stock": detail.get("safety_stock"), "lead_days": round(lead, 2),
+            "reorder_point": reorder, "base_unit": detail.get("base_unit"), "needs_reorder": predicted < reorder,
+        })
+    for row in out:
+        row["item_count"] = len(out)
+    out.sort(key=lambda r: (_norm(r["location_id"]), r["category"], r["item_name"]))
+    return [r for r in out if r["needs_reorder"] or not p_only_alerts]
+
+
+def _versioned_write(backend, table, keys, p_rows):
+    """DataBase/Functions/row_versions.sql 의 write_* 와 동일: version 이 그대로인 행만 반영하고
+    반영하지 못한 행을 (키, 현재 서버 값) 으로 반환"""
+    index = {backend._key(table, r, keys): r for r in backend.tables[table]}
+    conflicts, inserted, changes = [], [], []
+    for rec in p_rows:
+        rec = _jsonable(rec)[0]
+        k = tuple(_norm(rec.get(c)) for c in keys)
+        target = index.get(k)
+        if rec.get("version") is None and target is None:
+            row = backend._prepare_insert(table, {c: v for c, v in rec.items() if c != "version"})
+            backend.tables[table].append(row)
+            index[k] = row
+            inserted.append((None, row))
+        elif target is not None and _norm(target.get("version", 1)) == _norm(rec.get("version")):
+            new = {**target, **{c: v for c, v in rec.items() if c not in keys and c != "version"}}
+            for trig in TRIGGERS.get(table, []):
+                trig(target, new)
+            changes.append((dict(target), new))
+            target.clear()
+            target.update(new)
+        else:
+            conflicts.append({**{c: rec.get(c) for c in keys}, "server": dict(target) if target else None})
+    _fire_after(backend, table, "insert", inserted)
+    _fire_after(backend, table, "update", changes)
+    return conflicts
+
+
+def _rpc_write_stocks(backend, p_rows):
+    return _versioned_write(backend, "STOCKS", PRIMARY_KEYS["STOCKS"], p_rows)
+
+
+def _rpc_write_supplier_details(backend, p_rows):
+    return _versioned_write(backend, "SUPPLIER_DETAILS", PRIMARY_KEYS["SUPPLIER_DETAILS"], p_rows)
+
+
+def _rpc_write_stock_counts(backend, p_rows, p_counts):
+    """row_versions.sql 의 write_stock_counts(): write_stocks + 반영된 행의 실사 기록 insert (한 번에)"""
+    conflicts = _rpc_write_stocks(backend, p_rows)
+    keys = {tuple(_norm(c[k]) for k in PRIMARY_KEYS["STOCKS"]) for c in conflicts}
+    for rec in p_counts:
+        rec = _jsonable(rec)[0]
+        if tuple(_norm(rec.get(k)) for k in PRIMARY_KEYS["STOCKS"]) not in keys:
+            row = backend._prepare_insert("STOCK_COUNTS", {**rec, "counted_at": rec.get("counted_at") or _now_iso()})
+            backend.tables["STOCK_COUNTS"].append(row)
+    return conflicts
+
+
+DEFAULT_RPCS = {
+    "delivery_completed": _rpc_delivery_completed,
+    "receive_orders": _rpc_receive_orders,
+    "refresh_purchase_spend": _rpc_refresh_purchase_spend,
+    "refresh_lead_times": _rpc_refresh_lead_times,
+    "archive_purchase_orders": _rpc_archive_purchase_orders,
+    "spend_by_supplier_month": _rpc_spend_by_supplier_month,
+    "spend_by_category_month": _rpc_spend_by_category_month,
+    "top_items_by_spend": _rpc_top_items_by_spend,
+    "forecast_error_stats": _rpc_forecast_error_stats,
+    "predicted_stocks": _rpc_predicted_stocks,
+    "write_stocks": _rpc_write_stocks,
+    "write_supplier_details": _rpc_write_supplier_details,
+    "write_stock_counts": _rpc_write_stock_counts,
+    "ensure_purchase_items_partitions": _rpc_ensure_purchase_items_partitions,
+}
+
+
+# --- [6. 데모 데이터 생성] ---
+def generate_demo_tables(n_items=200, n_suppliers=8, n_open_orders=5, seed=0, n_history_orders=0, n_locations=1,
+                         n_count_days=0):
+    """부하/성능 측정용 합성 카탈로그 (n_history_orders: 지난 1년간 입고완료된 주문 수, n_locations: 매장 수,
+    n_count_days: 지난 n일간 품목마다 대략 주 1회 실사한 기록(STOCK_COUNTS, 예측값 포함))"""
+    rnd = random.Random(seed)
+    categories = ["원두", "유제품", "시럽", "파우더", "소모품", "베이커리", "과일", "포장재"]
+    units = ["개", "g", "ml", "팩"]
+    now = datetime.now(timezone.utc)
+
+    locations = [{"id": l + 1, "name": "본점" if l == 0 else f"{l + 1}호점"} for l in range(n_locations)]
+    suppliers = [{"id": s + 1, "name": f"공급처{s + 1:02d}"} for s in range(n_suppliers)]
+    items, details, stocks = [], [], []
+    for i in range(n_items):
+        item_id = i + 1
+        sup_id = rnd.randint(1, n_suppliers)
+        items.append({"id": item_id, "name": f"품목{item_id:05d}", "category": rnd.choice(categories)})
+        details.append({
+            "item_id": item_id, "supplier_id": sup_id,
+            "order_url": f"https://example.com/p/{item_id}",
+            "order_unit": "박스", "MOQ": rnd.choice([1, 2, 5]),
+            "order_unit_price": rnd.randrange(1000, 50000, 100),
+            "safety_stock": rnd.randint(5, 30), "base_unit": rnd.choice(units),
+            "conversion_factor": rnd.choice([1, 6, 12]),
+            "barcode": f"880{item_id:010d}",
+            "version": 1,
+        })
+        for loc in locations:
+            stocks.append({
+                "location_id": loc["id"], "item_id": item_id, "supplier_id": sup_id,
+                "stock": float(rnd.randint(0, 80)),
+                "avg_consumption": round(rnd.uniform(0, 5), 2),
+                "last_checked_at": (now - timedelta(days=rnd.randint(0, 14))).isoformat(),
+                "version": 1,
+            })
+
+    orders, lines = [], []
+    for o in range(n_history_orders + n_open_orders):
+        sup_id = rnd.randint(1, n_suppliers)
+        sup_items = [d for d in details if d["supplier_id"] == sup_id][:5] or details[:1]
+        history = o < n_history_orders
+        age = rnd.randint(4, 365) if history else rnd.randint(0, 3)
+        ordered_at = now - timedelta(days=age)
+        orders.append({
+            "order_id": o + 1, "location_id": 1 + o % n_locations,
+            "supplier_id": sup_id, "status": "입고완료" if history else "배송중",
+            "total_price": sum(d["order_unit_price"] for d in sup_items),
+            "ordered_at": ordered_at.isoformat(),
+            # 공급처마다 평균 리드타임이 다르도록 (1~4일 + 변동)
+            "received_at": (ordered_at + timedelta(days=1 + sup_id % 4 + rnd.random() * 2)).isoformat() if history else None,
+        })
+        for d in sup_items:
+            lines.append({"id": len(lines) + 1, "order_id": o + 1, "item_id": d["item_id"], "actual_qty": d["MOQ"]})
+
+    # 실사 기록: 품목마다 실제 소모량 / 예측 소모량 비율을 정해 두고 (대부분 1 근처, 일부는 크게 어긋남)
+    # 그 비율에 잡음을 더해 실사값을 만든다
+    counts = []
+    for s in (stocks if n_count_days else []):
+        bias = rnd.choice([0.4, 1.8]) if rnd.random() < 0.1 else rnd.uniform(0.85, 1.15)
+        day = rnd.randint(1, 7)
+        while day < n_count_days:
+            prior = rnd.uniform(20, 80)
+            usage = s["avg_consumption"] * rnd.randint(3, 9)
+            predicted = max(0.0, prior - usage)
+            counted = max(0.0, round(prior - usage * bias * rnd.uniform(0.8, 1.2)))
+            counts.append({
+                "id": len(counts) + 1, "location_id": s["location_id"], "item_id": s["item_id"],
+                "supplier_id": s["supplier_id"], "counted_stock": counted, "avg_consumption": s["avg_consumption"],
+                "predicted_stock": round(predicted, 2), "predicted_usage": round(usage, 4),
+                "counted_at": (now - timedelta(days=n_count_days - day, hours=rnd.randint(0, 12))).isoformat(),
+            })
+            day += rnd.randint(5, 9)
+
+    return {
+        "LOCATIONS": locations, "ITEMS": items, "SUPPLIERS": suppliers, "SUPPLIER_DETAILS": details,
+        "STOCKS": stocks, "PURCHASE_ORDERS": orders, "PURCHASE_ITEMS": lines, "STOCK_COUNTS": counts,
+    }
+
+
+# --- [7. 연결 진입점] ---
+_override = None
+
+
+def set_backend(client):
+    """connect()가 반환할 클라이언트를 강제로 지정 (None이면 해제)"""
+    global _override
+    _override = client
+
+
+def actor_header(name):
+    """작업자 이름 -> 헤더 값. HTTP 헤더라 ASCII 밖의 문자(한글 등)는 %-인코딩 (조회 화면에서 되돌림)"""
+    return quote(name.strip(), safe=" -_.@:/()")
+
+
+def actor_name():
+    """INVENTORY_ACTOR (예: 매장 태블릿 이름). 변경 이력의 작업자로 남음"""
+    actor = os.environ.get(ACTOR_ENV, "").strip()
+    return actor_header(actor) if actor else None
+
+
+def connect(url, key):
+    """페이지의 init_connection()에서 호출: 환경에 맞는 클라이언트 반환"""
+    if _override is not None:
+        return _override
+    actor = actor_name()
+    if os.environ.get(BACKEND_ENV, "supabase") == "memory":
+        n_items = int(os.environ.get(SEED_ENV, "200"))
+        n_locations = int(os.environ.get(SEED_LOCATIONS_ENV, "1"))
+        return pooled(MemoryBackend(generate_demo_tables(n_items=n_items, n_history_orders=n_items,
+                                                         n_locations=n_locations, n_count_days=90),
+                                    actor=actor or "anon"))
+    from supabase import ClientOptions, create_client
+    try:
+        options = ClientOptions(httpx_client=http_client())
+        if actor:
+            options.headers = {**options.headers, ACTOR_HEADER: actor}
+    except TypeError:
+        # httpx_client 옵션이 없는 구버전 supabase: 라이브러리 기본 연결 사용 (작업자는 JWT role 로 기록)
+        options = None
+    return pooled(create_client(url, key, options=options))
+
+
+def connect_from_env():
+    """Streamlit 밖(CLI, 배치 작업)에서 연결: 환경변수 또는 secrets.toml 사용"""
+    url = os.environ.get("SUPABASE_URL")
+    key = os.environ.get("SUPABASE_KEY")
+    if not (url and key):
+        import tomllib
+        here = os.path.dirname(os.path.abspath(__file__))
+        for path in (os.path.join(here, ".streamlit", "secrets.toml"), os.path.join(here, "secrets.toml")):
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    secrets = tomllib.load(f)
+                url, key = url or secrets.get("SUPABASE_URL"), key or secrets.get("SUPABASE_KEY")
+                break
+    return connect(url, key)
+
@@ -0,0 +1,117 @@
+"""
+예측 정확도 탭
+
+실사할 때마다 그 실사가 덮어쓴 예측값(predicted_stock: 직전 실사 재고 - 요일 가중 예상 소모량)을
+STOCK_COUNTS 에 함께 남겨 두고 (stock_ops.count_history), 예측과 실사값의 차이를 품목/카테고리/요일/월별로 본다.
+합계는 서버 함수(DataBase/Functions/forecast_accuracy.sql)가 한 번에 묶어서 주고, 지표는 pandas로 계산한다.
+
+- 오차 = 실사값 - 예측값. bias(평균 오차)가 음수면 예상보다 많이 쓴 것(소모량 과소 추정), 양수면 과대 추정
+- MAE = 평균 절대 오차, MAPE = 실사값이 0보다 큰 실사만의 평균 절대 백분율 오차
+- 소모 비율 = 실제 소모량 / 예측 소모량 (예측이 0까지 깎인 실사는 실제 소모량을 알 수 없어 제외)
+  품목의 avg_consumption 이 잘 맞으면 1 근처. 이 값이 크게 어긋난 품목을 보정 필요 품목으로 표시
+"""
+import numpy as np
+import pandas as pd
+
+from analytics import PERIODS, month_range
+
+WEEKDAYS = ["월", "화", "수", "목", "금", "토", "일"]
+MIN_COUNTS = 3  # 보정 필요 판정에 필요한 최소 실사 횟수
+RATIO_TOLERANCE = 1.5  # 소모 비율이 [1/1.5, 1.5] 밖이면 보정 필요
+COLUMNS = ["dim", "item_id", "supplier_id", "item_name", "category", "weekday", "month", "n", "sum_error",
+           "sum_abs_error", "n_pct", "sum_abs_pct", "n_usage", "predicted_usage", "actual_usage"]
+
+
+# --- [1. 집계 조회] ---
+def load_forecast_errors(supabase, start, end, location_id=None):
+    """기간 내 실사의 예측 오차 합계 + 지표. dim 컬럼: item / category / weekday / month"""
+    res = supabase.rpc("forecast_error_stats", {"p_from": str(start), "p_to": str(end), "p_location_id": location_id}).execute()
+    return add_metrics(pd.DataFrame(res.data or [], columns=COLUMNS))
+
+
+def add_metrics(df):
+    """합계 컬럼으로 mae, bias, mape(%), usage_ratio 추가 (행 단위 벡터 연산)"""
+    df = df.copy()
+    num = ["n", "sum_error", "sum_abs_error", "n_pct", "sum_abs_pct", "n_usage", "predicted_usage", "actual_usage"]
+    df[num] = df[num].apply(pd.to_numeric, errors="coerce").fillna(0)
+    n, n_pct = df["n"].replace(0, np.nan), df["n_pct"].replace(0, np.nan)
+    df["mae"] = df["sum_abs_error"] / n
+    df["bias"] = df["sum_error"] / n
+    df["mape"] = df["sum_abs_pct"] / n_pct * 100
+    # 예측 소모량 0인데 실제로 썼으면 무한대(= 소모량을 0으로 잡고 있음)
+    predicted = df["predicted_usage"].where(df["predicted_usage"] > 0)
+    df["usage_ratio"] = (df["actual_usage"] / predicted).where(predicted.notna(),
+                                                                np.where(df["actual_usage"] > 0, np.inf, np.nan))
+    return df
+
+
+def calibration_flags(items, min_counts=MIN_COUNTS, tolerance=RATIO_TOLERANCE):
+    """avg_consumption 보정이 필요한 품목 (소모 비율이 허용 범위 밖, 어긋난 정도 큰 순)"""
+    ratio = items["usage_ratio"]
+    bad = (items["n_usage"] >= min_counts) & ((ratio > tolerance) | (ratio < 1 / tolerance))
+    out = items[bad].copy()
+    out["판정"] = np.where(out["usage_ratio"] > 1, "소모량 과소 추정", "소모량 과대 추정")
+    skew = np.abs(np.log(out["usage_ratio"].clip(lower=1e-6)))
+    return out.assign(_skew=skew).sort_values("_skew", ascending=False).drop(columns="_skew")
+
+
+def summarize(df):
+    """여러 행의 합계를 합쳐 전체 지표 한 줄로 (월별 행의 합 = 기간 전체)"""
+    total = df[["n", "sum_error", "sum_abs_error", "n_pct", "sum_abs_pct", "n_usage", "predicted_usage", "actual_usage"]].sum()
+    return add_metrics(total.to_frame().T).iloc[0]
+
+
+# --- [2. 화면] ---
+def render_forecast_accuracy(supabase, location_id=None):
+    import streamlit as st
+
+    st.title("예측 정확도")
+    label = st.radio("기간", list(PERIODS), index=1, horizontal=True, key="forecast_period")
+    if location_id is not None and st.toggle("전체 매장 합계", key="forecast_all_locations"):
+        location_id = None
+    start, _ = month_range(PERIODS[label])
+
+    df = load_forecast_errors(supabase, start, pd.Timestamp.now(tz="Asia/Seoul").date(), location_id)
+    by_month = df[df["dim"] == "month"].copy()
+    if by_month.empty:
+        st.info("선택한 기간에 예측값이 기록된 실사가 없습니다.")
+        return
+
+    total = summarize(by_month)
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("실사 횟수", f"{int(total['n']):,}")
+    c2.metric("MAE", f"{total['mae']:.2f}")
+    c3.metric("Bias (실사-예측)", f"{total['bias']:+.2f}")
+    c4.metric("MAPE", "-" if pd.isna(total["mape"]) else f"{total['mape']:.1f}%")
+    st.caption("Bias가 음수면 예상보다 많이 쓴 것(소모량 과소 추정), 양수면 덜 쓴 것입니다.")
+
+    st.subheader("월별 추이")
+    by_month["월"] = pd.to_datetime(by_month["month"]).dt.strftime("%Y-%m")
+    st.line_chart(by_month.set_index("월")[["mae", "bias"]].rename(columns={"mae": "MAE", "bias": "Bias"}))
+
+    st.subheader("요일별 오차")
+    by_day = df[df["dim"] == "weekday"].copy()
+    by_day["요일"] = pd.Categorical(by_day["weekday"].astype(int).map(dict(enumerate(WEEKDAYS))), WEEKDAYS, ordered=True)
+    st.bar_chart(by_day.sort_values("요일").set_index("요일")[["mae", "bias"]].rename(columns={"mae": "MAE", "bias": "Bias"}))
+
+    metric_names = {"n": "실사 횟수", "mae": "MAE", "bias": "Bias", "mape": "MAPE(%)", "usage_ratio": "소모 비율"}
+    st.subheader("카테고리별 오차")
+    by_cat = df[df["dim"] == "category"].sort_values("mae", ascending=False)
+    st.dataframe(by_cat[["category", *metric_names]].rename(columns={"category": "카테고리", **metric_names}).round(2),
+                 hide_index=True, use_container_width=True)
+
+    items = df[df["dim"] == "item"]
+    flags = calibration_flags(items)
+    st.subheader(f"⚠️ 소모량 보정 필요 품목 ({len(flags)}개)")
+    st.caption(f"실사 {MIN_COUNTS}회 이상, 실제 소모량이 예측의 {1 / RATIO_TOLERANCE:.2f}~{RATIO_TOLERANCE:g}배를 벗어난 품목")
+    if flags.empty:
+        st.success("✅ 평균 소모량이 크게 어긋난 품목이 없습니다.")
+    else:
+        st.dataframe(flags[["category", "item_name", "판정", *metric_names]]
+                     .rename(columns={"category": "카테고리", "item_name": "품목명", **metric_names}).round(2),
+                     hide_index=True, use_container_width=True)
+
+    with st.expander(f"품목별 오차 ({len(items)}개 품목)"):
+        st.dataframe(items.sort_values("mae", ascending=False)[["category", "item_name", *metric_names]]
+                     .rename(columns={"category": "카테고리", "item_name": "품목명", **metric_names}).round(2),
+                     hide_index=True, use_container_width=True)
@@ -0,0 +1,217 @@
+"""
+품목 검색 색인 (초성/자모 검색)
+
+발주 화면의 상품 선택, 재고 실사 목록, 관리자 테이블 편집에서 공용으로 쓴다.
+품목명을 미리 세 가지 키로 풀어 두고 한 줄에 하나씩 이어 붙인 문자열(blob)에서 찾는다.
+- 이름   : 소문자, 공백 제거                 "아이스 아메리카노" -> "아이스아메리카노"
+- 초성   : 한글 음절 -> 첫소리                "ㅇㅇㅅㅇㅁㄹㅋㄴ"  ("ㅇㅁㄹ" 로 검색)
+- 자모   : 한글 음절 -> 낱자 (겹자모도 분해)   "ㅇㅏㅇㅣㅅㅡ..."   (치는 중인 "아메ㄹ", 오타/생략 "아메카노")
+
+순위: 이름 일치 > 이름 접두 > 이름 포함 > 초성 접두 > 초성 포함 > 자모 접두 > 자모 포함 > 자모 순서 일치(퍼지)
+접두 순위 안에서는 사전순, 포함 순위 안에서는 앞쪽에서 찾은 것/짧은 이름 순.
+앞 순위에서 limit 개가 차면 뒤 순위는 계산하지 않는다.
+
+색인은 카탈로그 캐시 범위(shared_cache.CATALOG) 버전마다 한 번 만든다. 만드는 일은 공유 캐시로
+워커 하나만 하고, 각 프로세스는 버전이 바뀔 때까지 꺼낸 색인을 메모리에 들고 있는다.
+"""
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+
+from shared_cache import cached_local, CATALOG
+
+CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+        "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+
+# 겹모음/겹받침은 두 글자로 (한 글자씩 치는 중인 검색어와 맞추기 위함)
+SPLIT = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+
+HANGUL_BASE = 0xAC00
+HANGUL_COUNT = 11172
+
+DEFAULT_LIMIT = 50
+SCAN_FACTOR = 20
+MIN_SCAN = 1000
+MAX_GAP = 3 # 퍼지 검색에서 건너뛸 수 있는 낱자 수 (음절 하나 정도)
+
+
+# --- [1. 한글 분해] ---
+def _split(s):
+    return "".join(SPLIT.get(c, c) for c in s)
+
+
+# str.translate 용 표 (음절 11,172자를 미리 풀어 둠)
+_CHO_TABLE = {HANGUL_BASE + i: CHO[i // 588] for i in range(HANGUL_COUNT)}
+_JAMO_TABLE = {
+    HANGUL_BASE + i: _split(CHO[i // 588] + JUNG[(i % 588) // 28] + JONG[i % 28])
+    for i in range(HANGUL_COUNT)
+}
+_JAMO_TABLE.update({ord(k): v for k, v in SPLIT.items()})
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(text):
+    """소문자, 공백 제거"""
+    return _SPACE.sub("", str(text)).lower()
+
+
+def chosung(text):
+    """한글 음절은 초성으로, 나머지 글자는 그대로"""
+    return normalize(text).translate(_CHO_TABLE)
+
+
+def jamo(text):
+    """한글 음절/겹자모를 낱자로 분해"""
+    return normalize(text).translate(_JAMO_TABLE)
+
+
+def _is_chosung_query(q):
+    """초성이 하나 이상 있고 완성 음절/모음이 없는 검색어 ("ㅇㅁㄹ", "ㅇㄷ1kg")"""
+    return any(c in CHO for c in q) and not any(ord(c) in _JAMO_TABLE or c in JUNG for c in q)
+
+
+# --- [2. 색인] ---
+class _Keys:
+    """품목별 검색 키 한 종류
+
+    - 접두 검색: 키를 정렬해 둔 목록에서 이분 탐색 (일치하는 만큼만 앞에서부터 꺼냄)
+    - 포함/퍼지 검색: 키를 한 줄씩 이어 붙인 문자열(blob)에서 찾고, 위치 -> 행 번호는 이분 탐색
+    """
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._derive()
+
+    def _derive(self):
+        self.sorted_keys = [self.keys[i] for i in self.order]
+        self.text = "\n".join(self.keys)
+        self.starts = []
+        pos = 0
+        for k in self.keys:
+            self.starts.append(pos)
+            pos += len(k) + 1
+
+    # 공유 캐시에는 이어 붙인 키와 정렬 순서만 저장 (작은 문자열 수만 개를 직렬화하는 것보다 빠름)
+    def __getstate__(self):
+        return {"n": len(self.keys), "text": self.text, "order": array("l", self.order)}
+
+    def __setstate__(self, state):
+        self.keys = state["text"].split("\n") if state["n"] else []
+        self.order = state["order"].tolist()
+        self._derive()
+
+    def exact(self, q):
+        lo, hi = bisect_left(self.sorted_keys, q), bisect_right(self.sorted_keys, q)
+        return (self.order[i] for i in range(lo, hi))
+
+    def prefix(self, q):
+        """키가 q 로 시작하는 행 (키 사전순)"""
+        i = bisect_left(self.sorted_keys, q)
+        while i < len(self.sorted_keys) and self.sorted_keys[i].startswith(q):
+            yield self.order[i]
+            i += 1
+
+    def _row(self, pos):
+        return bisect_right(self.starts, pos) - 1
+
+    def _line_end(self, row):
+        return self.starts[row + 1] if row + 1 < len(self.starts) else len(self.text)
+
+    def contains(self, q, cap=None):
+        """키에 q 가 들어 있는 행 (앞쪽에서 찾은 것, 짧은 키 순). cap 개를 찾으면 더 찾지 않음"""
+        hits = {}
+        pos = self.text.find(q)
+        while pos != -1 and (cap is None or len(hits) < cap):
+            row = self._row(pos)
+            hits[row] = pos - self.starts[row]
+            # 같은 행의 나머지는 건너뜀
+            pos = self.text.find(q, self._line_end(row))
+        return sorted(hits, key=lambda r: (hits[r], len(self.keys[r])))
+
+    def fuzzy(self, q, cap=None):
+        """q 의 글자가 순서대로 (사이에 낱자 MAX_GAP 개 이하) 나오는 행 (일치 구간이 짧은 순)"""
+        pattern = re.compile(f"[^\n]{{0,{MAX_GAP}}}?".join(re.escape(c) for c in q))
+        hits = {}
+        for m in pattern.finditer(self.text):
+            row = self._row(m.start())
+            span = m.end() - m.start()
+            if span < hits.get(row, len(self.text)):
+                hits[row] = span
+            if cap is not None and len(hits) >= cap:
+                break
+        return sorted(hits, key=lambda r: (hits[r], len(self.keys[r])))
+
+
+class SearchIndex:
+    """품목 검색 색인. rows: [{"id", "name", "category"}]"""
+
+    def __init__(self, rows):
+        rows = list(rows)
+        self.ids = [r["id"] for r in rows]
+        self.names = [r["name"] for r in rows]
+        self.categories = [r.get("category") or "기타" for r in rows]
+        self._by_category = {}
+        for i, cat in enumerate(self.categories):
+            self._by_category.setdefault(cat, set()).add(i)
+        self._name = _Keys([normalize(n) for n in self.names])
+        self._cho = _Keys([chosung(n) for n in self.names])
+        self._jamo = _Keys([jamo(n) for n in self.names])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def category_list(self):
+        return sorted(self._by_category)
+
+    def _tiers(self, q, cap):
+        """순위 순서대로 행 목록(지연 계산)을 생성. 앞 순위에서 결과가 차면 뒤는 계산하지 않음"""
+        yield self._name.exact(q)
+        yield self._name.prefix(q)
+        yield self._name.contains(q, cap)
+        if _is_chosung_query(q):
+            yield self._cho.prefix(q)
+            yield self._cho.contains(q, cap)
+        jq = q.translate(_JAMO_TABLE)
+        yield self._jamo.prefix(jq)
+        yield self._jamo.contains(jq, cap)
+        if len(jq) > 1:
+            yield self._jamo.fuzzy(jq, cap)
+
+    def search(self, query, category=None, limit=DEFAULT_LIMIT):
+        """검색어/카테고리로 찾은 품목 id 목록 (순위순). limit=None 이면 전부"""
+        q = normalize(query or "")
+        allowed = self._by_category.get(category, set()) if category else None
+        if not q:
+            rows = range(len(self.ids)) if allowed is None else sorted(allowed)
+            return [self.ids[r] for r in list(rows)[:limit]]
+
+        # 포함/퍼지 검색은 limit 의 몇 배까지만 찾음 (흔한 한 글자 검색어가 전체를 훑지 않도록)
+        cap = None if limit is None else max(limit * SCAN_FACTOR, MIN_SCAN)
+        seen, ranked = set(), []
+        for rows in self._tiers(q, cap):
+            for r in rows:
+                if r in seen or (allowed is not None and r not in allowed):
+                    continue
+                seen.add(r)
+                ranked.append(r)
+                if limit is not None and len(ranked) >= limit:
+                    return [self.ids[r] for r in ranked]
+        return [self.ids[r] for r in ranked]
+
+
+# --- [3. 카탈로그 버전별 색인] ---
+def _build(supabase):
+    rows = supabase.table("ITEMS").select("id, name, category").order("id").execute().data
+    return SearchIndex(rows)
+
+
+def load_search_index(supabase):
+    """현재 카탈로그 버전의 색인. 버전이 같으면 프로세스 안에서 그대로 재사용"""
+    return cached_local(CATALOG, "search_index", lambda: _build(supabase))
@@ -0,0 +1,303 @@
+"""
+다중 세션 부하 테스트 (헤드리스)
+
+태블릿 여러 대 + 사무실 PC가 한 앱 인스턴스를 동시에 쓰는 상황을 흉내 낸다.
+Streamlit AppTest로 완성.py 세션 N개를 띄우고, 공유 MemoryBackend(db_backend)를
+DB 대신 사용해서 시나리오별 지연 시간 백분위수, 세션당 메모리, 동작당 DB 요청 수를 보고한다.
+
+사용법:
+    python load_test.py --sessions 8 --rounds 5 --items 500 --latency-ms 20
+    python load_test.py --no-shared-cache        # 공유 캐시 없이 (세션마다 DB 조회) 비교
+    python load_test.py --no-transport           # 전송 계층(transport.py, 단일 비행) 없이 비교
+
+세션들은 한 프로세스 안에서 돌므로 공유 캐시(shared_cache.py)는 메모리 저장소를 쓴다.
+쓰기 큐/오프라인 미러/알림 신호 파일은 임시 폴더를 쓴다 (가짜 발주가 실제 앱의 쓰기 큐에 남지 않도록).
+여러 앱 워커가 같은 캐시 파일을 쓰는 배포에서 워커 수와 무관하게 변경당 조회가 한 번인 것과 같은 효과.
+
+시나리오 동작
+- open_dashboard : 페이지 열기 (첫 탭인 실시간 대시보드만 렌더링)
+- adjust_cart    : 발주 관리 탭으로 이동, 품목 직접 추가 후 수량 변경
+- submit_order   : 전체 발주 완료 처리 후 대시보드 탭으로 복귀
+- submit_count   : 100개 품목 실사 반영 (data_editor는 AppTest로 조작할 수 없으므로
+                   재고 실사 탭이 사용하는 stock_ops.apply_stock_counts 를 직접 호출)
+"""
+import argparse
+import os
+import random
+import resource
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.runtime.secrets import Secrets
+from streamlit.testing.v1 import AppTest
+
+from alert_worker import SIGNAL_ENV
+from db_backend import MemoryBackend, QueryCounter, generate_demo_tables, set_backend
+from offline_mirror import MIRROR_ENV
+from transport import pooled
+from profiler import _percentile
+from shared_cache import MemoryCache, NullCache, set_cache
+from stock_ops import apply_stock_counts
+from views import _write_queue
+from write_queue import QUEUE_ENV
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "완성.py")
+
+SECRETS = {"SUPABASE_URL": "http://load-test.local", "SUPABASE_KEY": "load-test"}
+
+# 세션 종류별 시나리오
+SCRIPTS = {
+    "tablet": ["open_dashboard", "adjust_cart", "submit_order"],
+    "office": ["open_dashboard", "submit_count"],
+}
+
+
+@contextmanager
+def scratch_files():
+    """쓰기 큐/미러/알림 신호 파일 경로를 임시 폴더로 바꿨다가 끝나면 되돌림"""
+    names = {QUEUE_ENV: "queue.sqlite3", MIRROR_ENV: "mirror.sqlite3", SIGNAL_ENV: "alerts_dirty"}
+    saved = {k: os.environ.get(k) for k in names}
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({k: os.path.join(tmp, v) for k, v in names.items()})
+        try:
+            yield tmp
+        finally:
+            for k, v in saved.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+
+
+@contextmanager
+def shared_runtime():
+    """AppTest 여러 개를 스레드로 동시에 돌리기 위한 준비
+
+    AppTest는 실행마다 전역 Runtime 싱글턴과 st.secrets 를 바꿔 끼우고, 끝나면 Runtime을
+    None으로 되돌린다. 다른 세션이 아직 실행 중이면 'Runtime hasn't been created!' 로
+    죽기 때문에, 마지막으로 만들어진 mock Runtime을 계속 돌려주도록 하고 secrets는
+    전역으로 한 번만 설정한다. 스크립트 컴파일(ast.parse)도 스레드 동시 실행 시
+    SystemError가 나는 경우가 있어 락으로 직렬화한다.
+    """
+    orig_instance = Runtime.__dict__["instance"]
+    orig_exists = Runtime.__dict__["exists"]
+    orig_bytecode = ScriptCache.get_bytecode
+    orig_secrets = st.secrets
+    compile_lock = threading.Lock()
+    last = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last["runtime"] = cls._instance
+        return last.get("runtime") or orig_instance.__func__(cls)
+
+    def exists(cls):
+        return cls._instance is not None or "runtime" in last
+
+    def get_bytecode(self, script_path):
+        with compile_lock:
+            return orig_bytecode(self, script_path)
+
+    secrets = Secrets()
+    secrets._secrets = dict(SECRETS)
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+    ScriptCache.get_bytecode = get_bytecode
+    st.secrets = secrets
+    try:
+        yield
+    finally:
+        Runtime.instance = orig_instance
+        Runtime.exists = orig_exists
+        ScriptCache.get_bytecode = orig_bytecode
+        st.secrets = orig_secrets
+
+
+# --- [1. 시나리오 동작] ---
+def new_session(timeout):
+    # secrets는 shared_runtime()에서 전역으로 설정 (세션별로 바꿔 끼우면 경합 발생)
+    return AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+
+def _button(at, label):
+    return next(b for b in at.button if b.label == label)
+
+
+def _open_tab(at, name):
+    # 완성.py 는 선택한 탭만 실행하므로 탭 상태를 바꿔서 다시 실행
+    if at.session_state["main_tab"] != name:
+        at.session_state["main_tab"] = name
+        at.run()
+
+
+def open_dashboard(at, backend, rnd):
+    at.run()
+
+
+def adjust_cart(at, backend, rnd):
+    _open_tab(at, "발주 관리")
+    _button(at, "리스트 추가").click().run()
+    inputs = [n for n in at.number_input if str(n.key).startswith("input_")]
+    if inputs:
+        target = rnd.choice(inputs)
+        target.set_value(int(target.value) + int(target.step or 1)).run()
+
+
+def submit_order(at, backend, rnd):
+    _button(at, "전체 발주 완료 처리").click().run()
+    _open_tab(at, "실시간 대시보드")
+
+
+def submit_count(at, backend, rnd, n_rows=100):
+    stocks = pd.DataFrame(backend.rows("STOCKS"))
+    updates = stocks.sample(n=min(n_rows, len(stocks)), random_state=rnd.randint(0, 10**6)).copy()
+    updates["새로운 재고량"] = [rnd.randint(0, 50) for _ in range(len(updates))]
+    updates["item_name"] = updates["item_id"].astype(str)
+    apply_stock_counts(backend, updates)
+
+
+ACTIONS = {
+    "open_dashboard": open_dashboard,
+    "adjust_cart": adjust_cart,
+    "submit_order": submit_order,
+    "submit_count": submit_count,
+}
+
+
+# --- [2. 실행부] ---
+def calibrate(backend, timeout):
+    """단일 세션으로 각 동작의 DB 요청 수와 세션당 메모리 측정 (동시성 간섭 없음)
+
+    tracemalloc은 실행 속도를 크게 떨어뜨리므로 이 단계에서만 켠다.
+    """
+    rnd = random.Random(0)
+    requests = {}
+    tracemalloc.start()
+    try:
+        at = new_session(timeout)
+        for name in ["open_dashboard", "adjust_cart", "submit_order", "submit_count"]:
+            with QueryCounter(backend) as qc:
+                ACTIONS[name](at, backend, rnd)
+            requests[name] = qc.requests
+        session_bytes = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return requests, session_bytes
+
+
+def run_session(idx, script, rounds, backend, timeout, results, lock):
+    rnd = random.Random(idx)
+    at = new_session(timeout)
+    for _ in range(rounds):
+        for name in SCRIPTS[script]:
+            t0 = time.perf_counter()
+            error = None
+            try:
+                ACTIONS[name](at, backend, rnd)
+                if at.exception:
+                    error = at.exception[0].value
+            except Exception as e:
+                error = repr(e)
+            ms = (time.perf_counter() - t0) * 1000
+            with lock:
+                results.append({"session": idx, "script": script, "action": name, "ms": ms, "error": error})
+    return at
+
+
+def run(sessions=8, rounds=3, items=500, latency_ms=0.0, timeout=120, office_every=4, shared_cache=True,
+        transport=True):
+    backend = MemoryBackend(generate_demo_tables(n_items=items, n_open_orders=10), latency=latency_ms / 1000)
+    # 앱과 같이 전송 계층으로 감싸서 주입 (동시에 같은 조회를 하는 세션들은 요청 1번을 함께 받음)
+    client = pooled(backend) if transport else backend
+    set_backend(client)
+    set_cache(MemoryCache() if shared_cache else NullCache())
+    try:
+        with scratch_files(), shared_runtime():
+            requests_per_action, session_bytes = calibrate(backend, timeout)
+
+            results, lock = [], threading.Lock()
+            backend.stats.reset()
+            rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=sessions) as pool:
+                futures = [
+                    pool.submit(run_session, i, "office" if i % office_every == office_every - 1 else "tablet",
+                                rounds, backend, timeout, results, lock)
+                    for i in range(sessions)
+                ]
+                apps = [f.result() for f in futures]
+            wall = time.perf_counter() - t0
+            # 세션들이 함께 쓰는 쓰기 큐 워커를 임시 폴더가 남아 있을 때 마저 처리하고 멈춤
+            # (늦게 도는 flush 가 원래 경로에 알림 신호를 남기지 않도록)
+            queue = _write_queue(client)
+            queue.flush()
+            queue.stop()
+            # ru_maxrss 단위: Linux KB
+            peak = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) * 1024
+            del apps
+    finally:
+        set_backend(None)
+        set_cache(None)
+
+    return {
+        "results": results,
+        "requests_per_action": requests_per_action,
+        "session_bytes": session_bytes,
+        "concurrent_peak_bytes": peak,
+        "wall_s": wall,
+        "backend": backend.stats.summary(),
+        "sessions": sessions,
+        "shared_cache": shared_cache,
+        "transport": dict(client.transport.stats) if transport else None,
+    }
+
+
+def report(out):
+    print(f"\n세션 {out['sessions']}개, 총 {out['wall_s']:.1f}s (공유 캐시 {'사용' if out['shared_cache'] else '없음'})")
+    print(f"세션당 메모리(단일 세션 기준): {out['session_bytes'] / 1024 / 1024:.2f} MB")
+    print(f"동시 실행 최대 RSS 증가분/세션: {out['concurrent_peak_bytes'] / out['sessions'] / 1024 / 1024:.2f} MB\n")
+
+    print(f"{'action':<16} {'n':>5} {'p50(ms)':>10} {'p95(ms)':>10} {'p99(ms)':>10} {'max(ms)':>10} {'req/action':>11} {'errors':>7}")
+    by_action = {}
+    for r in out["results"]:
+        by_action.setdefault(r["action"], []).append(r)
+    for name, rows in by_action.items():
+        vals = sorted(r["ms"] for r in rows)
+        errors = sum(1 for r in rows if r["error"])
+        print(f"{name:<16} {len(vals):>5} {_percentile(vals, .5):>10.1f} {_percentile(vals, .95):>10.1f} "
+              f"{_percentile(vals, .99):>10.1f} {vals[-1]:>10.1f} {out['requests_per_action'].get(name, 0):>11} {errors:>7}")
+
+    total_actions = len(out["results"])
+    total_requests = sum(v["requests"] for v in out["backend"].values())
+    print(f"\n동시 실행 중 DB 요청 {total_requests}건 (동작당 평균 {total_requests / max(total_actions, 1):.1f}건)")
+    for op, v in out["backend"].items():
+        print(f"  {op:<8} requests={v['requests']:<6} rows={v['rows']:<8} bytes={v['bytes']:,}")
+    if out["transport"]:
+        t = out["transport"]
+        print(f"전송 계층(보정 포함): 보냄 {t['sent']}건 / 진행 중인 조회 함께 받음 {t['shared']}건 / 재시도 {t['retries']}건")
+
+    first_errors = {r["action"]: r["error"] for r in out["results"] if r["error"]}
+    for name, err in first_errors.items():
+        print(f"[오류] {name}: {err}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="완성.py 다중 세션 부하 테스트")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="요청당 가상 네트워크 지연")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--no-shared-cache", action="store_true", help="공유 캐시 끄기")
+    parser.add_argument("--no-transport", action="store_true", help="전송 계층(단일 비행) 끄기")
+    args = parser.parse_args()
+    report(run(args.sessions, args.rounds, args.items, args.latency_ms, args.timeout,
+               shared_cache=not args.no_shared_cache, transport=not args.no_transport))
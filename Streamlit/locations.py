@@ -0,0 +1,53 @@
+"""
+매장(location) 선택과 매장별 조회 범위
+
+한 인스턴스에서 여러 매장을 운영한다. 카탈로그(ITEMS/SUPPLIERS/SUPPLIER_DETAILS)는 공용이고,
+STOCKS, PURCHASE_ORDERS, STOCK_COUNTS 와 파생 테이블(REORDER_ALERTS, PURCHASE_SPEND_MONTHLY)은
+location_id 로 나뉜다 (DataBase/Migrations/0006_locations.sql).
+페이지는 사이드바에서 고른 매장으로 모든 조회/쓰기를 한정하고, 세션에 들고 있는 캐시도
+매장별 키(location_key)로 나눠서 다른 매장 데이터가 섞이지 않게 한다.
+"""
+import os
+
+LOCATION_ENV = "INVENTORY_LOCATION"
+DEFAULT_LOCATION = 1
+SESSION_KEY = "location_id"
+
+
+def default_location():
+    """처음 열었을 때 선택되는 매장 (INVENTORY_LOCATION 으로 매장별 배포 기본값 지정)"""
+    return int(os.environ.get(LOCATION_ENV, DEFAULT_LOCATION))
+
+
+def load_locations(supabase):
+    """매장 목록 [{id, name}]. 매장 테이블이 비어 있으면 기본 매장 하나"""
+    res = supabase.table("LOCATIONS").select("id, name").order("id").execute()
+    return res.data or [{"id": DEFAULT_LOCATION, "name": "본점"}]
+
+
+def all_location_ids(supabase):
+    return [int(l["id"]) for l in load_locations(supabase)]
+
+
+def location_key(name, location_id):
+    """세션 캐시 키를 매장별로 분리"""
+    return f"{name}:{location_id}"
+
+
+def select_location(supabase):
+    """사이드바 매장 선택. 반환값: 선택한 location_id (매장이 하나면 선택 상자 없이 그 매장)"""
+    import streamlit as st
+
+    if "_locations" not in st.session_state:
+        st.session_state["_locations"] = load_locations(supabase)
+    locations = st.session_state["_locations"]
+    ids = [int(l["id"]) for l in locations]
+    if len(ids) == 1:
+        st.session_state[SESSION_KEY] = ids[0]
+        return ids[0]
+    names = {int(l["id"]): l["name"] for l in locations}
+    current = st.session_state.get(SESSION_KEY, default_location())
+    index = ids.index(current) if current in ids else 0
+    selected = st.sidebar.selectbox("🏪 매장", ids, index=index, format_func=names.get, key="location_select")
+    st.session_state[SESSION_KEY] = selected
+    return selected
@@ -0,0 +1,296 @@
+"""
+재고 실사 오프라인 모드 (로컬 SQLite 미러)
+
+워크인 냉장고처럼 와이파이가 약한 곳에서도 실사를 할 수 있도록
+STOCKS + ITEMS + SUPPLIER_DETAILS(단위) 조회 결과를 로컬 SQLite에 복사해 두고,
+실사 입력은 로컬에만 기록했다가 연결이 돌아오면 한 번의 일괄 쓰기로 서버에 반영한다.
+
+충돌 감지: 실사를 기록할 때 미러 행의 버전(version)을 실사 기록에 함께 저장해 두고, 동기화 때 그 버전을 보내
+서버가 버전이 그대로인 행만 반영한다 (row_versions.py). 그 사이 다른 사람이 입고/실사로 바꾼 행은 서버 현재 값과
+함께 충돌로 남긴다. 동기화 전에 미러를 다시 받아도 대기 중인 실사는 처음 기준 버전으로 비교된다.
+
+미러는 매장별로 따로 둔다 (기본 매장은 기존 파일, 다른 매장은 파일명 뒤에 .매장번호).
+"""
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from locations import DEFAULT_LOCATION
+from shared_cache import invalidate, stocks_scope
+from row_versions import write_versioned
+from stock_ops import count_history, stock_row
+
+MIRROR_ENV = "INVENTORY_MIRROR_DB"
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".stock_mirror.sqlite3")
+
+PENDING, CONFLICT = "pending", "conflict"
+
+SCHEMA = """
+create table if not exists mirror_stocks (
+    item_id integer not null,
+    supplier_id integer not null,
+    item_name text,
+    category text,
+    base_unit text,
+    barcode text,
+    stock real,
+    avg_consumption real,
+    last_checked_at text,
+    version integer,
+    primary key (item_id, supplier_id)
+);
+create table if not exists local_counts (
+    item_id integer not null,
+    supplier_id integer not null,
+    payload text not null,
+    counted_at real not null,
+    status text not null default 'pending',
+    server text,
+    base_version integer,
+    primary key (item_id, supplier_id)
+);
+create table if not exists mirror_meta (
+    key text primary key,
+    value text
+);
+"""
+
+MIRROR_COLUMNS = ["item_id", "supplier_id", "item_name", "category", "base_unit", "barcode", "stock", "avg_consumption",
+                  "last_checked_at", "version"]
+
+
+def mirror_path(path=None, location_id=DEFAULT_LOCATION):
+    """매장별 미러 파일 경로 (기본 매장은 접미사 없음)"""
+    path = path or os.environ.get(MIRROR_ENV, DEFAULT_PATH)
+    if int(location_id) == DEFAULT_LOCATION:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{int(location_id)}{ext}"
+
+
+class StockMirror:
+    def __init__(self, path=None, location_id=DEFAULT_LOCATION):
+        self.location_id = int(location_id)
+        self.path = mirror_path(path, self.location_id)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # 바코드/행 버전 컬럼이 생기기 전에 만든 미러 파일
+            columns = {c['name'] for c in conn.execute("pragma table_info(mirror_stocks)")}
+            if "barcode" not in columns:
+                conn.execute("alter table mirror_stocks add column barcode text")
+            if "version" not in columns:
+                conn.execute("alter table mirror_stocks add column version integer")
+            if "base_version" not in {c['name'] for c in conn.execute("pragma table_info(local_counts)")}:
+                conn.execute("alter table local_counts add column base_version integer")
+                conn.execute("update local_counts set base_version = (select m.version from mirror_stocks m "
+                             "where m.item_id = local_counts.item_id and m.supplier_id = local_counts.supplier_id)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # --- [1. 미러 생성] ---
+    def snapshot(self, supabase):
+        """서버에서 재고 목록을 받아 미러를 새로 만듦 (요청 2회). 로컬 실사 기록은 유지"""
+        res_stock = (supabase.table("STOCKS")
+                     .select("item_id, supplier_id, stock, avg_consumption, last_checked_at, version, ITEMS(name, category)")
+                     .eq("location_id", self.location_id).execute())
+        res_details = supabase.table("SUPPLIER_DETAILS").select("item_id, supplier_id, base_unit, barcode").execute()
+        details = {(d['item_id'], d['supplier_id']): d for d in res_details.data}
+
+        rows = []
+        for s in res_stock.data:
+            itm = s.get('ITEMS') if isinstance(s.get('ITEMS'), dict) else {}
+            det = details.get((s['item_id'], s['supplier_id']), {})
+            rows.append((
+                s['item_id'], s['supplier_id'], itm.get('name', "이름 없음"), itm.get('category', "기타"),
+                det.get('base_unit'), det.get('barcode'), s.get('stock'), s.get('avg_consumption'), s.get('last_checked_at'),
+                s.get('version'),
+            ))
+        with self._connect() as conn:
+            conn.execute("delete from mirror_stocks")
+            conn.executemany(f"insert into mirror_stocks ({', '.join(MIRROR_COLUMNS)}) "
+                             f"values ({', '.join('?' * len(MIRROR_COLUMNS))})", rows)
+            conn.execute("insert or replace into mirror_meta (key, value) values ('snapshot_at', ?)", (str(time.time()),))
+        return len(rows)
+
+    def snapshot_at(self):
+        with self._connect() as conn:
+            row = conn.execute("select value from mirror_meta where key = 'snapshot_at'").fetchone()
+        return float(row['value']) if row else None
+
+    # --- [2. 로컬 조회/기록] ---
+    def frame(self):
+        """미러 재고 목록 (로컬 실사 값이 있으면 덮어씀). '_pending' 컬럼은 미동기화 여부"""
+        with self._connect() as conn:
+            base = pd.read_sql_query(f"select {', '.join(MIRROR_COLUMNS)} from mirror_stocks", conn)
+            counts = conn.execute("select item_id, supplier_id, payload from local_counts").fetchall()
+        base['_pending'] = False
+        if base.empty or not counts:
+            return base
+        base = base.set_index(['item_id', 'supplier_id'])
+        for c in counts:
+            k = (c['item_id'], c['supplier_id'])
+            if k in base.index:
+                for col, val in json.loads(c['payload']).items():
+                    if col in base.columns:
+                        base.at[k, col] = val
+                base.at[k, '_pending'] = True
+        return base.reset_index()
+
+    def record_counts(self, rows):
+        """실사 결과 행(STOCKS에 쓸 dict)을 로컬에만 기록
+
+        기준 버전(base_version)은 지금 미러 행의 version. 이미 기록된 실사를 고쳐 쓰면 처음 기준 버전을 유지
+        (화면에는 내 실사값이 보였으므로 그 사이 서버 변경은 본 적이 없음)
+        """
+        now = time.time()
+        with self._connect() as conn:
+            versions = {
+                (r['item_id'], r['supplier_id']): r['version']
+                for r in conn.execute("select item_id, supplier_id, version from mirror_stocks").fetchall()
+            }
+            conn.executemany(
+                "insert into local_counts (item_id, supplier_id, payload, counted_at, status, base_version) "
+                "values (?, ?, ?, ?, ?, ?) "
+                "on conflict (item_id, supplier_id) do update set payload = excluded.payload, "
+                "counted_at = excluded.counted_at, status = excluded.status, server = null, "
+                "base_version = coalesce(local_counts.base_version, excluded.base_version)",
+                [(int(r['item_id']), int(r['supplier_id']), json.dumps(r, ensure_ascii=False, default=str), now, PENDING,
+                  versions.get((int(r['item_id']), int(r['supplier_id'])))) for r in rows],
+            )
+        return len(rows)
+
+    def pending(self):
+        with self._connect() as conn:
+            rows = conn.execute("select * from local_counts order by counted_at").fetchall()
+        return [{**dict(r), "payload": json.loads(r['payload']), "server": json.loads(r['server']) if r['server'] else None} for r in rows]
+
+    def conflicts(self):
+        return [r for r in self.pending() if r['status'] == CONFLICT]
+
+    # --- [3. 서버 동기화] ---
+    def sync(self, supabase):
+        """대기 중인 실사를 미러의 행 버전 조건부 일괄 쓰기 한 번으로 반영 (미러 이후 바뀐 행은 충돌)
+
+        반환값: {"synced": 반영 건수, "conflicts": 충돌 건수}
+        """
+        todo = [r for r in self.pending() if r['status'] == PENDING]
+        if not todo:
+            return {"synced": 0, "conflicts": len(self.conflicts())}
+
+        # 1. 실사를 기록할 때(또는 충돌 해결 때) 저장한 기준 버전으로 한 번에 반영. 서버가 충돌 행만 돌려줌
+        #    (미러를 다시 받아도 기준 버전은 그대로이므로 그 사이 서버 변경은 충돌로 잡힘)
+        #    반영된 행의 실사 기록(기기에 저장해 둔 예측값 포함)도 같은 트랜잭션에서 남김 -> 실패하면 둘 다 그대로
+        payload = [{**r['payload'], "location_id": self.location_id, "version": r['base_version']} for r in todo]
+        server = {c['key'][1:]: c['server']
+                  for c in write_versioned(supabase, "STOCKS", [stock_row(p) for p in payload], counts=count_history(payload))}
+        clean = [p for p in payload if (p['item_id'], p['supplier_id']) not in server]
+        conflicted = [(r, server[(r['item_id'], r['supplier_id'])]) for r in todo if (r['item_id'], r['supplier_id']) in server]
+        if clean:
+            invalidate(stocks_scope(self.location_id))
+
+        # 2. 미러 반영
+        with self._connect() as conn:
+            # 서버는 반영한 행의 버전을 1 올림 (기준 버전 + 1)
+            for p in clean:
+                conn.execute(
+                    "update mirror_stocks set stock = ?, avg_consumption = ?, last_checked_at = ?, version = ? "
+                    "where item_id = ? and supplier_id = ?",
+                    (p.get('stock'), p.get('avg_consumption'), p.get('last_checked_at'),
+                     None if p['version'] is None else p['version'] + 1, p['item_id'], p['supplier_id']),
+                )
+            conn.executemany(
+                "delete from local_counts where item_id = ? and supplier_id = ?",
+                [(r['item_id'], r['supplier_id']) for r in clean],
+            )
+            conn.executemany(
+                "update local_counts set status = ?, server = ? where item_id = ? and supplier_id = ?",
+                [(CONFLICT, json.dumps(srv, ensure_ascii=False, default=str), r['item_id'], r['supplier_id']) for r, srv in conflicted],
+            )
+        return {"synced": len(clean), "conflicts": len(conflicted)}
+
+    def resolve(self, item_id, supplier_id, keep_local):
+        """충돌 해결: keep_local=True면 서버 값을 기준으로 삼아 내 실사값을 다시 반영 대기,
+        False면 내 실사값을 버리고 서버 값을 미러에 반영"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "select server from local_counts where item_id = ? and supplier_id = ?", (item_id, supplier_id)
+            ).fetchone()
+            srv = json.loads(row['server']) if row and row['server'] else None
+            if srv:
+                conn.execute(
+                    "update mirror_stocks set stock = ?, avg_consumption = ?, last_checked_at = ?, version = ? "
+                    "where item_id = ? and supplier_id = ?",
+                    (srv.get('stock'), srv.get('avg_consumption'), srv.get('last_checked_at'), srv.get('version'),
+                     item_id, supplier_id),
+                )
+            if keep_local and srv:
+                conn.execute(
+                    "update local_counts set status = ?, server = null, base_version = ? where item_id = ? and supplier_id = ?",
+                    (PENDING, srv.get('version'), item_id, supplier_id),
+                )
+            else:
+                conn.execute("delete from local_counts where item_id = ? and supplier_id = ?", (item_id, supplier_id))
+
+
+# --- [4. 오프라인 모드 UI] ---
+def render_offline_controls(mirror, supabase, key_prefix="offline"):
+    """오프라인 모드 토글, 동기화 버튼, 충돌 목록 표시. 반환값: 오프라인 모드 여부"""
+    import streamlit as st
+
+    mode_key = f"{key_prefix}_mode"
+    was_offline = st.session_state.get(f"{mode_key}_prev", False)
+    offline = st.toggle("📴 오프라인 모드 (로컬 미러 사용)", key=mode_key)
+    st.session_state[f"{mode_key}_prev"] = offline
+
+    if offline and (mirror.snapshot_at() is None or not was_offline):
+        # 오프라인 전환 시점에 아직 연결이 살아 있으면 최신 목록으로 미러 갱신
+        try:
+            mirror.snapshot(supabase)
+        except Exception as e:
+            if mirror.snapshot_at() is None:
+                st.error(f"미러를 만들 수 없습니다. 연결 후 다시 시도하세요: {e}")
+                return False
+            st.warning("서버에 연결할 수 없어 이전에 받은 미러를 사용합니다.")
+
+    waiting = mirror.pending()
+    pending_n = sum(1 for r in waiting if r['status'] == PENDING)
+    c1, c2 = st.columns([3, 1])
+    snap = mirror.snapshot_at()
+    if snap:
+        c1.caption(f"미러 기준 시각: {pd.to_datetime(snap, unit='s', utc=True).tz_convert('Asia/Seoul'):%Y-%m-%d %H:%M} · 동기화 대기 {pending_n}건")
+
+    # 온라인으로 돌아오면 자동 동기화, 오프라인 중에도 수동 시도 가능
+    if pending_n and ((not offline and was_offline) or c2.button("🔄 서버와 동기화", key=f"{key_prefix}_sync", use_container_width=True)):
+        try:
+            result = mirror.sync(supabase)
+            st.toast(f"✅ {result['synced']}건 동기화, 충돌 {result['conflicts']}건")
+        except Exception as e:
+            st.warning(f"동기화 실패 (연결 확인 후 다시 시도하세요): {e}")
+
+    for r in mirror.conflicts():
+        srv = r['server'] or {}
+        with st.container(border=True):
+            st.warning(
+                f"⚠️ 충돌: 품목 #{r['item_id']} - 내 실사 {r['payload'].get('stock')} / "
+                f"서버 현재 {srv.get('stock', '삭제됨')} (미러 이후 서버에서 변경됨)"
+            )
+            k1, k2 = st.columns(2)
+            if k1.button("내 실사값으로 다시 반영", key=f"{key_prefix}_keep_{r['item_id']}_{r['supplier_id']}", use_container_width=True):
+                mirror.resolve(r['item_id'], r['supplier_id'], keep_local=True)
+                st.rerun()
+            if k2.button("서버 값 유지", key=f"{key_prefix}_drop_{r['item_id']}_{r['supplier_id']}", use_container_width=True):
+                mirror.resolve(r['item_id'], r['supplier_id'], keep_local=False)
+                st.rerun()
+    return offline
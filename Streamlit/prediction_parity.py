@@ -0,0 +1,102 @@
+"""
+예측 재고 엔진 일치 검사
+
+같은 DB에 대해 python 엔진(stock_ops.predict_stocks + attach_reorder_points, alert_worker.predict_frame)과
+sql 엔진(서버 함수 predicted_stocks)을 같은 기준 시각으로 실행해 행마다 비교한다.
+기준 시각을 며칠씩 옮겨 가며 여러 번 비교하므로 요일 가중치가 다른 구간도 함께 확인된다.
+
+- 예측 재고/발주점/리드타임 차이가 tolerance 를 넘는 행
+- 발주 필요 여부가 다른 행 (예측 재고와 발주점 차이가 tolerance 이내인 경계 행은 반올림 차이로 보고 제외)
+- 한쪽에만 있는 행
+이 하나라도 있으면 종료 코드 1.
+
+사용법:
+    python prediction_parity.py                     # SUPABASE_URL/KEY 또는 secrets.toml 의 DB
+    python prediction_parity.py --demo 2000         # 합성 데이터 MemoryBackend (서버 함수는 db_backend 구현)
+    python prediction_parity.py --offsets 0,1,3,7,30 --location 1
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from alert_worker import predict_frame, predict_frame_sql
+from stock_ops import KST
+
+KEYS = ["location_id", "item_id", "supplier_id"]
+VALUES = ["predicted_stock", "reorder_point", "lead_days"]
+TOLERANCE = 0.011  # 소수 둘째 자리 반올림 방식(float / numeric) 차이 허용
+
+
+def compare(py, sql, tolerance=TOLERANCE):
+    """두 엔진 결과 비교. 반환값: 요약 dict 와 어긋난 행 DataFrame"""
+    py = py[KEYS + VALUES].copy()
+    sql = sql[KEYS + VALUES].copy()
+    for df in (py, sql):
+        df[KEYS] = df[KEYS].astype("int64")
+        df[VALUES] = df[VALUES].apply(pd.to_numeric, errors="coerce")
+    merged = py.merge(sql, on=KEYS, how="outer", suffixes=("_py", "_sql"), indicator=True)
+    both = merged[merged["_merge"] == "both"]
+
+    diffs = pd.DataFrame({v: (both[f"{v}_py"] - both[f"{v}_sql"]).abs() for v in VALUES})
+    flag_py = both["predicted_stock_py"] < both["reorder_point_py"]
+    flag_sql = both["predicted_stock_sql"] < both["reorder_point_sql"]
+    borderline = (both["predicted_stock_py"] - both["reorder_point_py"]).abs() <= tolerance
+    bad = (diffs > tolerance).any(axis=1) | ((flag_py != flag_sql) & ~borderline)
+
+    summary = {
+        "rows": len(both),
+        "only_python": int((merged["_merge"] == "left_only").sum()),
+        "only_sql": int((merged["_merge"] == "right_only").sum()),
+        **{f"max_diff_{v}": round(float(diffs[v].max()) if len(diffs) else 0.0, 4) for v in VALUES},
+        "flag_mismatches": int(((flag_py != flag_sql) & ~borderline).sum()),
+        "alerts": int(flag_sql.sum()),
+    }
+    return summary, pd.concat([both[bad], merged[merged["_merge"] != "both"]])
+
+
+def run(supabase, location_id=None, offsets=(0,), tolerance=TOLERANCE, log=print):
+    """기준 시각을 offsets(일)만큼 옮겨 가며 비교. 반환값: 모두 일치하면 True"""
+    ok = True
+    base = datetime.now(KST)
+    for days in offsets:
+        now_kst = base + timedelta(days=days)
+        t0 = time.perf_counter()
+        py = predict_frame(supabase, location_id, now_kst)
+        t1 = time.perf_counter()
+        sql = predict_frame_sql(supabase, location_id, now_kst)
+        t2 = time.perf_counter()
+        if py.empty and sql.empty:
+            log(f"+{days}일: 재고 행 없음")
+            continue
+        summary, bad = compare(py, sql, tolerance)
+        passed = bad.empty
+        ok = ok and passed
+        log(f"+{days:>3}일 {'일치' if passed else '불일치'}: 행 {summary['rows']:,} / 알림 {summary['alerts']:,} / "
+            f"발주 판정 차이 {summary['flag_mismatches']} / 한쪽에만 {summary['only_python']}+{summary['only_sql']} / "
+            f"최대 차이 예측 {summary['max_diff_predicted_stock']} 발주점 {summary['max_diff_reorder_point']} "
+            f"리드타임 {summary['max_diff_lead_days']} | python {(t1 - t0) * 1000:.0f}ms, sql {(t2 - t1) * 1000:.0f}ms")
+        if not passed:
+            log(bad.head(10).to_string(index=False))
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="python / sql 예측 재고 엔진 일치 검사")
+    parser.add_argument("--demo", type=int, metavar="ITEMS", help="DB 대신 합성 데이터 MemoryBackend 사용 (품목 수)")
+    parser.add_argument("--location", type=int, help="이 매장만 비교 (기본값: 전체 매장)")
+    parser.add_argument("--offsets", default="0,1,2,3,4,5,6,14",
+                        help="기준 시각을 현재에서 옮길 일수 목록 (쉼표 구분)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    if args.demo:
+        from db_backend import MemoryBackend, generate_demo_tables
+        client = MemoryBackend(generate_demo_tables(n_items=args.demo, n_history_orders=args.demo * 2, n_locations=2))
+    else:
+        from db_backend import connect_from_env
+        client = connect_from_env()
+    offsets = [int(d) for d in args.offsets.split(",") if d.strip()]
+    sys.exit(0 if run(client, args.location, offsets, args.tolerance) else 1)
@@ -0,0 +1,229 @@
+"""
+리런(rerun) 단위 성능 측정
+
+- traced(client): DB 클라이언트를 감싸서 모든 execute() 호출의 시간/행 수/바이트를 기록
+- stage(name): 로드, 병합, 예측, 탭 렌더링 같은 주요 구간을 기록
+- render_sidebar(): 현재 리런의 측정 결과를 사이드바 프로파일러로 표시
+- INVENTORY_PERF_LOG=<경로> 를 지정하면 측정값을 회전(rotating) JSON-lines 로그로 저장
+
+로그 집계: python profiler.py perf.jsonl  -> 구간별 p50/p95
+"""
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+LOG_ENV = "INVENTORY_PERF_LOG"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+_local = threading.local()
+_logger = None
+_logger_lock = threading.Lock()
+
+
+# --- [1. JSON-lines 로그] ---
+def _get_logger():
+    """INVENTORY_PERF_LOG 가 설정된 경우에만 회전 로그 핸들러 생성"""
+    global _logger
+    path = os.environ.get(LOG_ENV)
+    if not path:
+        return None
+    with _logger_lock:
+        if _logger is None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            logger = logging.getLogger("inventory.perf")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            _logger = logger
+    return _logger
+
+
+# --- [2. 리런 단위 기록] ---
+def start_run(page):
+    """스크립트 시작 시 호출. 이전 리런이 st.rerun() 등으로 끊겼다면 그 기록도 저장"""
+    prev = getattr(_local, "run", None)
+    if prev is not None:
+        _flush(prev, interrupted=True)
+    _local.run = {"id": uuid.uuid4().hex[:12], "page": page, "started": time.perf_counter(), "records": []}
+    _local.depth = 0
+
+
+def current_records():
+    run = getattr(_local, "run", None)
+    return list(run["records"]) if run else []
+
+
+def finish_run():
+    """스크립트 끝에서 호출: 전체 시간 기록 후 로그로 내보냄"""
+    run = getattr(_local, "run", None)
+    if run is None:
+        return []
+    _local.run = None
+    return _flush(run, interrupted=False)
+
+
+def _flush(run, interrupted):
+    total_ms = (time.perf_counter() - run["started"]) * 1000
+    records = run["records"] + [{"stage": "total", "kind": "run", "ms": round(total_ms, 2), "rows": None, "bytes": None, "depth": 0}]
+    logger = _get_logger()
+    if logger is not None:
+        ts = time.time()
+        for rec in records:
+            logger.info(json.dumps({"ts": ts, "run": run["id"], "page": run["page"], "interrupted": interrupted, **rec}, ensure_ascii=False))
+    return records
+
+
+def _record(name, kind, ms, rows=None, nbytes=None):
+    run = getattr(_local, "run", None)
+    if run is None:
+        return
+    run["records"].append({
+        "stage": name, "kind": kind, "ms": round(ms, 2),
+        "rows": rows, "bytes": nbytes, "depth": getattr(_local, "depth", 0),
+    })
+
+
+@contextmanager
+def stage(name):
+    """주요 구간 측정. 필요하면 yield된 dict에 rows/bytes 를 채운다
+
+    with stage("merge") as s:
+        merged = pd.merge(...)
+        s["rows"] = len(merged)
+    """
+    info = {"rows": None, "bytes": None}
+    _local.depth = getattr(_local, "depth", 0) + 1
+    t0 = time.perf_counter()
+    try:
+        yield info
+    finally:
+        _local.depth -= 1
+        _record(name, "stage", (time.perf_counter() - t0) * 1000, info["rows"], info["bytes"])
+
+
+# --- [3. DB 호출 계측 래퍼] ---
+_WRITE_OPS = ("select", "insert", "update", "upsert", "delete")
+
+
+class _TracedBuilder:
+    """table()/rpc() 빌더를 감싸서 execute() 시간을 기록"""
+
+    def __init__(self, builder, label, op="select"):
+        self._builder = builder
+        self._label = label
+        self._op = op
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if hasattr(result, "execute"):
+                op = name if name in _WRITE_OPS else self._op
+                return _TracedBuilder(result, self._label, op)
+            return result
+        return call
+
+    def execute(self):
+        t0 = time.perf_counter()
+        res = self._builder.execute()
+        ms = (time.perf_counter() - t0) * 1000
+        data = getattr(res, "data", None)
+        rows = len(data) if isinstance(data, list) else (0 if data is None else 1)
+        nbytes = len(json.dumps(data, ensure_ascii=False, default=str).encode("utf-8")) if data is not None else 0
+        _record(f"db:{self._op} {self._label}", "db", ms, rows, nbytes)
+        return res
+
+
+class TracedClient:
+    """supabase 클라이언트(또는 MemoryBackend) 계측 래퍼"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name):
+        return _TracedBuilder(self._client.table(name), name)
+
+    def from_(self, name):
+        return self.table(name)
+
+    def rpc(self, fn, params=None, **kwargs):
+        return _TracedBuilder(self._client.rpc(fn, params, **kwargs), fn, "rpc")
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def traced(client):
+    return client if isinstance(client, TracedClient) else TracedClient(client)
+
+
+# --- [4. 사이드바 프로파일러] ---
+def render_sidebar(records=None):
+    """사이드바 토글이 켜져 있으면 이번 리런의 구간/DB 호출 기록을 표시"""
+    import streamlit as st
+
+    if not st.sidebar.toggle("⏱️ 성능 프로파일러", key="_profiler_on"):
+        return
+    records = current_records() if records is None else records
+    if not records:
+        st.sidebar.caption("측정된 구간이 없습니다.")
+        return
+    db = [r for r in records if r["kind"] == "db"]
+    st.sidebar.metric("DB 요청", len(db), f"{sum(r['ms'] for r in db):,.0f} ms")
+    st.sidebar.metric("전송량", f"{sum(r['bytes'] or 0 for r in db) / 1024:,.1f} KB")
+    st.sidebar.dataframe(
+        [{"구간": "  " * r["depth"] + r["stage"], "ms": r["ms"], "행": r["rows"], "바이트": r["bytes"]} for r in records],
+        hide_index=True,
+    )
+
+
+# --- [5. 로그 집계] ---
+def _percentile(sorted_vals, q):
+    """nearest-rank 백분위수"""
+    if not sorted_vals:
+        return None
+    idx = max(0, math.ceil(q * len(sorted_vals)) - 1)
+    return sorted_vals[idx]
+
+
+def aggregate(paths):
+    """JSON-lines 로그(회전 파일 포함)를 읽어 (page, stage) 별 p50/p95 계산"""
+    samples = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                rec = json.loads(line)
+                samples.setdefault((rec.get("page"), rec["stage"]), []).append(rec["ms"])
+    out = []
+    for (page, name), vals in sorted(samples.items()):
+        vals.sort()
+        out.append({
+            "page": page, "stage": name, "count": len(vals),
+            "p50": _percentile(vals, 0.50), "p95": _percentile(vals, 0.95), "max": vals[-1],
+        })
+    return out
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("사용법: python profiler.py <perf.jsonl> [perf.jsonl.1 ...]")
+        sys.exit(1)
+    print(f"{'page':<12} {'stage':<40} {'n':>6} {'p50(ms)':>10} {'p95(ms)':>10}")
+    for row in aggregate(sys.argv[1:]):
+        print(f"{str(row['page']):<12} {row['stage']:<40} {row['count']:>6} {row['p50']:>10.2f} {row['p95']:>10.2f}")
@@ -0,0 +1,74 @@
+"""
+화면 공용 조회 (데이터 접근)
+
+여러 화면이 같은 모양으로 쓰던 조회를 한 곳에 모았다. 모두 선택한 매장(location_id) 기준이고,
+캐시(shared_cache)를 쓸지는 호출하는 화면이 정한다.
+"""
+import pandas as pd
+
+
+# --- [1. 재고] ---
+def load_stock_frame(supabase, location_id):
+    """매장 재고 + 품목명/카테고리 + 재고 단위 (요청 2회)"""
+    res_stock = supabase.table("STOCKS").select("*, ITEMS(name, category)").eq("location_id", location_id).execute()
+    df_stock = pd.DataFrame(res_stock.data)
+    if 'ITEMS' in df_stock.columns:
+        df_stock['item_name'] = df_stock['ITEMS'].apply(lambda x: x.get('name') if isinstance(x, dict) else "이름 없음")
+        df_stock['category'] = df_stock['ITEMS'].apply(lambda x: x.get('category') if isinstance(x, dict) else "기타")
+        df_stock = df_stock.drop(columns=['ITEMS'])
+
+    res_details = supabase.table("SUPPLIER_DETAILS").select("item_id, supplier_id, base_unit").execute()
+    df_details = pd.DataFrame(res_details.data, columns=["item_id", "supplier_id", "base_unit"])
+    if df_stock.empty:
+        return df_stock
+    merged = pd.merge(df_stock, df_details, on=['item_id', 'supplier_id'], how='left')
+    return merged.loc[:, ~merged.columns.duplicated()]
+
+
+# --- [2. 발주용 품목 목록] ---
+def load_item_master(supabase, location_id):
+    """품목 + 공급처별 상세(카탈로그) + 매장 재고를 발주 화면이 쓰는 중첩 구조로 (요청 2회)"""
+    query = """
+        id, name,
+        SUPPLIER_DETAILS (
+            supplier_id, order_url, MOQ, safety_stock, order_unit_price,
+            SUPPLIERS ( name )
+        )
+    """
+    items = supabase.table("ITEMS").select(query).execute().data
+    res_stk = supabase.table("STOCKS").select("item_id, stock, supplier_id").eq("location_id", location_id).execute()
+    stocks = {}
+    for s in res_stk.data:
+        stocks.setdefault(s["item_id"], []).append({"stock": s["stock"], "supplier_id": s["supplier_id"]})
+    for item in items:
+        item["STOCKS"] = stocks.get(item["id"], [])
+    return items
+
+
+# --- [3. 배송 중인 주문] ---
+def load_shipping_orders(supabase, location_id):
+    """배송중 주문과 주문 상세(품목명, 단가, 환산 계수). 주문 수와 무관하게 요청 3회
+
+    반환값: (주문 DataFrame, 상세 DataFrame)
+    """
+    res_orders = (supabase.table("PURCHASE_ORDERS").select("*, SUPPLIERS(name)")
+                  .eq("location_id", location_id).eq("status", "배송중").order("order_id").execute())
+    df_orders = pd.DataFrame(res_orders.data)
+    if df_orders.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    df_orders['supplier_name'] = df_orders['SUPPLIERS'].apply(lambda x: x.get('name') if isinstance(x, dict) else "N/A")
+
+    res_items = (supabase.table("PURCHASE_ITEMS").select("order_id, item_id, actual_qty, ITEMS(name)")
+                 .in_("order_id", df_orders['order_id'].tolist()).execute())
+    df_items = pd.DataFrame(res_items.data)
+    if df_items.empty:
+        return df_orders, df_items
+    df_items['품목명'] = df_items['ITEMS'].apply(lambda x: x.get('name') if isinstance(x, dict) else "N/A")
+
+    # 단가 및 환산 계수(conversion_factor)
+    res_details = (supabase.table("SUPPLIER_DETAILS").select("item_id, supplier_id, order_unit_price, conversion_factor")
+                   .in_("item_id", sorted({int(i) for i in df_items['item_id']})).execute())
+    df_details = pd.DataFrame(res_details.data, columns=["item_id", "supplier_id", "order_unit_price", "conversion_factor"])
+    df_items = pd.merge(df_items, df_orders[['order_id', 'supplier_id']], on='order_id', how='left')
+    df_items = pd.merge(df_items, df_details, on=['item_id', 'supplier_id'], how='left')
+    return df_orders, df_items
@@ -0,0 +1,93 @@
+"""
+행 버전 기반 낙관적 동시성 제어 (DataBase/Functions/row_versions.sql)
+
+STOCKS, SUPPLIER_DETAILS 는 수정될 때마다 트리거가 version 을 1 올린다. 쓰는 쪽은 읽었을 때의 version 을
+함께 보내고, 서버 함수(write_stocks / write_supplier_details)가 version 이 그대로인 행만 한 번의 요청으로
+반영한다. 그 사이 다른 곳(실사, 입고, 관리자 편집)에서 바뀐 행은 반영하지 않고 현재 서버 값과 함께
+충돌로 돌려주므로, 행마다 다시 읽어 비교하는 왕복 없이 충돌한 행만 골라 재병합할 수 있다.
+
+version 이 없는 행은 새 행으로 보고 insert 한다 (이미 있으면 충돌).
+실사 반영은 재고 쓰기와 실사 기록(STOCK_COUNTS)을 write_stock_counts 한 번(한 트랜잭션)으로 보낸다.
+"""
+CHUNK_SIZE = 500 # 요청 한 번에 보내는 최대 행 수
+COUNTS_FUNCTION = "write_stock_counts" # STOCKS + 실사 기록
+
+# 테이블 -> (서버 함수, 키 칼럼)
+VERSIONED_TABLES = {
+    "STOCKS": ("write_stocks", ("location_id", "item_id", "supplier_id")),
+    "SUPPLIER_DETAILS": ("write_supplier_details", ("item_id", "supplier_id")),
+}
+
+
+def row_key(table, row):
+    """행의 키 (int 튜플)"""
+    return tuple(int(row[c]) for c in VERSIONED_TABLES[table][1])
+
+
+def _outgoing(table, row):
+    # 키와 version 은 int 로 (편집기에서 온 값은 float 일 수 있음)
+    out = dict(row)
+    for c in VERSIONED_TABLES[table][1]:
+        out[c] = int(row[c])
+    out["version"] = None if row.get("version") is None else int(row["version"])
+    return out
+
+
+def _same(a, b):
+    if a is None or b is None:
+        return a is None and b is None
+    try:
+        return float(a) == float(b)
+    except (TypeError, ValueError):
+        return str(a) == str(b)
+
+
+# --- [1. 일괄 쓰기] ---
+def write_versioned(client, table, rows, counts=None):
+    """rows 를 version 조건부로 일괄 반영 (CHUNK_SIZE 행마다 요청 1회)
+
+    같은 키가 여러 번 있으면 마지막 행만 보낸다.
+    counts: (STOCKS 만) 실사 기록 행 목록. 주면 반영된 행의 실사 기록을 재고와 같은 트랜잭션에서 insert
+    반환값: 반영하지 못한 행 [{"key": 키, "row": 보낸 행, "server": 현재 서버 행 (삭제됐으면 None)}]
+    """
+    fn, keys = VERSIONED_TABLES[table]
+    sent = {row_key(table, r): _outgoing(table, r) for r in rows}
+    batch = list(sent.values())
+    by_key = {}
+    for c in counts or []:
+        by_key.setdefault(row_key(table, c), []).append(c)
+    conflicts = []
+    for i in range(0, len(batch), CHUNK_SIZE):
+        chunk = batch[i:i + CHUNK_SIZE]
+        if counts is None:
+            res = client.rpc(fn, {"p_rows": chunk}).execute()
+        else:
+            history = [c for r in chunk for c in by_key.get(row_key(table, r), [])]
+            res = client.rpc(COUNTS_FUNCTION, {"p_rows": chunk, "p_counts": history}).execute()
+        for c in res.data or []:
+            k = row_key(table, c)
+            conflicts.append({"key": k, "row": sent[k], "server": c.get("server")})
+    return conflicts
+
+
+# --- [2. 재병합] ---
+def changed_columns(mine, base):
+    """내가 바꾼 칼럼 (키/version 제외)"""
+    return [c for c, v in mine.items() if c != "version" and not _same(v, base.get(c))]
+
+
+def rebase(mine, base, server):
+    """3-way 재병합: 내가 바꾼 칼럼(mine != base)만 서버 현재 값 위에 다시 얹고 서버 version 을 사용
+
+    반환값: (병합한 행, [양쪽이 서로 다르게 바꾼 칼럼]). 서버 행이 삭제됐으면 (None, [])
+    """
+    if server is None:
+        return None, []
+    merged, clashes = dict(server), []
+    for col in changed_columns(mine, base):
+        if col not in server:
+            continue
+        if not _same(server[col], base.get(col)) and not _same(server[col], mine[col]):
+            clashes.append(col)
+        merged[col] = mine[col]
+    return merged, clashes
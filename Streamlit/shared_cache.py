@@ -0,0 +1,310 @@
+"""
+앱 프로세스 간 공유 조회 캐시
+
+@st.cache_resource / st.cache_data 는 프로세스 안에서만 살아 있어서, 리버스 프록시 뒤에
+앱 워커를 여러 개 띄우면 워커마다 같은 조회를 따로 한다. 이 모듈은 재고 화면, 카탈로그,
+발주 알림처럼 자주 읽고 가끔 바뀌는 조회 결과를 같은 서버의 모든 워커가 함께 쓰도록 저장한다.
+
+- 키는 범위(scope) 버전을 포함한다. 쓰기 경로(write_queue, 입고/실사/등록 화면, 알림 워커)가
+  DB에 반영한 뒤 invalidate() 로 범위 버전을 올리면 그 범위의 키가 한 번에 무효화된다.
+- 같은 키를 여러 워커가 동시에 찾으면 임대(lease)를 잡은 한 워커만 DB를 조회하고
+  나머지는 그 결과가 저장되기를 잠깐 기다린다. 변경 한 번에 조회는 대략 한 번.
+- 우리 쓰기 경로를 거치지 않은 변경(SQL 직접 수정 등)에 대비해 항목마다 TTL 을 둔다.
+
+저장소 (INVENTORY_CACHE 환경변수)
+- SQLite 파일 경로 (기본값 Streamlit/.shared_cache.sqlite3). /dev/shm 아래 경로를 주면 공유 메모리에 둠
+- "memory": 프로세스 안에서만 공유 (워커 1개 또는 메모리 백엔드 데모/테스트)
+- "off": 캐시 사용 안 함
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from locations import location_key
+
+CACHE_ENV = "INVENTORY_CACHE"
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".shared_cache.sqlite3")
+
+DEFAULT_TTL = 300 # 초
+LEASE_SECONDS = 10 # 조회 중인 워커가 죽어도 이 시간이 지나면 다른 워커가 조회
+WAIT_POLL = 0.05
+
+# 캐시 범위: 카탈로그는 매장 공용, 나머지는 매장별
+CATALOG = "catalog"
+
+SCHEMA = """
+create table if not exists cache_versions (
+    scope text primary key,
+    version integer not null
+);
+create table if not exists cache_entries (
+    name text primary key,
+    version text not null,
+    value blob not null,
+    expires_at real not null
+);
+create table if not exists cache_leases (
+    name text primary key,
+    until real not null
+);
+"""
+
+
+def stocks_scope(location_id):
+    return location_key("stocks", location_id)
+
+
+def orders_scope(location_id):
+    return location_key("orders", location_id)
+
+
+def alerts_scope(location_id):
+    return location_key("alerts", location_id)
+
+
+def table_scopes(table, location_id):
+    """테이블을 직접 수정한 뒤 무효화할 범위 (관리자 데이터 에디터)"""
+    if table in ("ITEMS", "SUPPLIERS", "SUPPLIER_DETAILS"):
+        return (CATALOG,)
+    if table == "STOCKS":
+        return (stocks_scope(location_id),)
+    if table in ("PURCHASE_ORDERS", "PURCHASE_ITEMS"):
+        return (orders_scope(location_id),)
+    return ()
+
+
+def _scopes(scope):
+    return (scope,) if isinstance(scope, str) else tuple(scope)
+
+
+# --- [1. 공통 조회 로직] ---
+class SharedCache:
+    """저장소별 구현은 _versions/_bump/_get/_put/_lease/_release 만 제공"""
+
+    def get_or_load(self, scope, key, loader, ttl=DEFAULT_TTL):
+        """scope(하나 또는 여러 개) 버전이 같은 동안 loader() 결과를 공유. 반환값: loader() 결과"""
+        scopes = _scopes(scope)
+        name = f"{','.join(scopes)}:{key}"
+        version = ".".join(str(v) for v in self._versions(scopes))
+        hit, value = self._get(name, version)
+        if hit:
+            return value
+
+        # 다른 워커가 같은 키를 조회 중이면 결과를 기다림 (임대가 끝나면 직접 조회)
+        deadline = time.time() + LEASE_SECONDS
+        while not self._lease(name) and time.time() < deadline:
+            time.sleep(WAIT_POLL)
+            hit, value = self._get(name, version)
+            if hit:
+                return value
+        try:
+            value = loader()
+            self._put(name, version, value, ttl)
+        finally:
+            self._release(name)
+        return value
+
+    def invalidate(self, *scopes):
+        """DB 반영 후 호출: 해당 범위의 캐시 항목을 모두 무효화"""
+        if scopes:
+            self._bump(scopes)
+
+    def version(self, scope):
+        """범위 버전 문자열 (프로세스 안에 따로 들고 있는 파생 데이터를 언제 다시 만들지 판단)"""
+        return ".".join(str(v) for v in self._versions(_scopes(scope)))
+
+
+class NullCache(SharedCache):
+    """캐시 끔: 매번 loader() 실행"""
+
+    def get_or_load(self, scope, key, loader, ttl=DEFAULT_TTL):
+        return loader()
+
+    def invalidate(self, *scopes):
+        pass
+
+    def version(self, scope):
+        return None
+
+
+# --- [2. 프로세스 내 저장소] ---
+class MemoryCache(SharedCache):
+    """값은 SQLite 저장소와 같이 직렬화해서 보관 (꺼낸 DataFrame 을 고쳐도 캐시가 바뀌지 않음)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = {}
+        self._entries = {}
+        self._leases = {}
+
+    def _versions(self, scopes):
+        with self._lock:
+            return [self._version.get(s, 0) for s in scopes]
+
+    def _bump(self, scopes):
+        with self._lock:
+            for s in scopes:
+                self._version[s] = self._version.get(s, 0) + 1
+
+    def _get(self, name, version):
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry and entry[0] == version and entry[2] > time.time():
+            return True, pickle.loads(entry[1])
+        return False, None
+
+    def _put(self, name, version, value, ttl):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries[name] = (version, data, time.time() + ttl)
+
+    def _lease(self, name):
+        now = time.time()
+        with self._lock:
+            if self._leases.get(name, 0) > now:
+                return False
+            self._leases[name] = now + LEASE_SECONDS
+            return True
+
+    def _release(self, name):
+        with self._lock:
+            self._leases.pop(name, None)
+
+
+# --- [3. SQLite 파일 저장소 (프로세스 간 공유)] ---
+class SQLiteCache(SharedCache):
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_PATH
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("pragma journal_mode=wal")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _versions(self, scopes):
+        with self._connect() as conn:
+            rows = dict(conn.execute(
+                f"select scope, version from cache_versions where scope in ({', '.join('?' * len(scopes))})", scopes
+            ).fetchall())
+        return [rows.get(s, 0) for s in scopes]
+
+    def _bump(self, scopes):
+        with self._connect() as conn:
+            conn.executemany(
+                "insert into cache_versions (scope, version) values (?, 1) "
+                "on conflict (scope) do update set version = version + 1",
+                [(s,) for s in scopes],
+            )
+
+    def _get(self, name, version):
+        with self._connect() as conn:
+            row = conn.execute(
+                "select value from cache_entries where name = ? and version = ? and expires_at > ?",
+                (name, version, time.time()),
+            ).fetchone()
+        return (True, pickle.loads(row[0])) if row else (False, None)
+
+    def _put(self, name, version, value, ttl):
+        # 키마다 최신 버전 한 줄만 남기므로 무효화된 항목이 쌓이지 않음
+        with self._connect() as conn:
+            conn.execute(
+                "insert or replace into cache_entries (name, version, value, expires_at) values (?, ?, ?, ?)",
+                (name, version, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), time.time() + ttl),
+            )
+
+    def _lease(self, name):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("delete from cache_leases where name = ? and until <= ?", (name, now))
+            cur = conn.execute("insert or ignore into cache_leases (name, until) values (?, ?)", (name, now + LEASE_SECONDS))
+        return cur.rowcount == 1
+
+    def _release(self, name):
+        with self._connect() as conn:
+            conn.execute("delete from cache_leases where name = ?", (name,))
+
+
+# --- [4. 프로세스 기본 캐시] ---
+_default = None
+_default_lock = threading.Lock()
+
+
+def open_cache(spec=None):
+    """INVENTORY_CACHE 설정에 맞는 캐시. 메모리 DB 백엔드는 프로세스마다 데이터가 다르므로 기본값이 memory"""
+    if spec is None:
+        from db_backend import BACKEND_ENV
+        spec = os.environ.get(CACHE_ENV) or ("memory" if os.environ.get(BACKEND_ENV) == "memory" else DEFAULT_PATH)
+    if spec == "off":
+        return NullCache()
+    if spec == "memory":
+        return MemoryCache()
+    return SQLiteCache(spec)
+
+
+def get_cache():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = open_cache()
+        return _default
+
+
+def set_cache(cache):
+    """테스트/데모용: 프로세스 기본 캐시 교체"""
+    global _default
+    with _default_lock:
+        _default = cache
+    with _local_lock:
+        _local.clear()
+
+
+def cached(scope, key, loader, ttl=DEFAULT_TTL):
+    return get_cache().get_or_load(scope, key, loader, ttl)
+
+
+def scope_version(scope):
+    """범위 버전. 캐시를 끈 경우 None"""
+    return get_cache().version(scope)
+
+
+# --- [5. 프로세스 내 사본 (색인 등 큰 파생 데이터)] ---
+_local = {}
+_local_lock = threading.Lock()
+
+
+def cached_local(scope, key, loader, ttl=DEFAULT_TTL):
+    """cached() 와 같지만 꺼낸 값을 범위 버전이 바뀌거나 TTL 이 지날 때까지 프로세스 메모리에 들고 있음
+
+    검색 색인/바코드 표처럼 한 번 만들어 두고 rerun 마다 읽기만 하는 값용 (매번 역직렬화하지 않음).
+    반환값은 여러 세션이 같이 쓰므로 고치면 안 된다.
+    """
+    version = scope_version(scope)
+    if version is None:
+        return loader()
+    name = f"{','.join(_scopes(scope))}:{key}"
+    with _local_lock:
+        entry = _local.get(name)
+    if entry and entry[0] == version and entry[2] > time.time():
+        return entry[1]
+    value = cached(scope, key, loader, ttl)
+    with _local_lock:
+        _local[name] = (version, value, time.time() + ttl)
+    return value
+
+
+def invalidate(*scopes):
+    """쓰기 경로에서 호출. 캐시 오류가 쓰기 자체를 실패시키지 않도록 삼킴"""
+    try:
+        get_cache().invalidate(*scopes)
+    except Exception:
+        pass
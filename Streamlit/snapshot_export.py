@@ -0,0 +1,257 @@
+"""
+재고 테이블 Parquet 스냅샷 내보내기 / 불러오기
+
+구매 이력 분석을 관리자 데이터 에디터에서 긁어오지 않도록, 6개 테이블을 페이지 단위로
+받아서 타입이 지정된 Parquet 파일로 저장한다. 재고/발주/실사 기록은 location_id 로 매장을 구분한다.
+
+- 전체 교체(snapshot): LOCATIONS, ITEMS, SUPPLIERS, SUPPLIER_DETAILS, STOCKS (작고 수시로 수정되는 테이블)
+- 증분 추가(append): PURCHASE_ORDERS, PURCHASE_ITEMS, STOCK_COUNTS
+  보관된 주문까지 포함하도록 *_ALL 뷰(DataBase/Functions/archive_orders.sql)에서 읽는다.
+  지난번 내보낸 마지막 order_id 이후 행만 새 part 파일로 추가하고,
+  지난번에 '배송중'이던 주문은 상태가 바뀌었을 수 있으므로 다시 받아 part로 추가한다.
+  (불러올 때 같은 키는 마지막 part 값을 사용)
+
+불러오기(load_table)는 Parquet을 메모리 맵으로 읽으므로 운영 DB에 접속하지 않는다.
+
+사용법:
+    python snapshot_export.py export --out exports
+    python snapshot_export.py info --out exports
+"""
+import argparse
+import json
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PAGE_SIZE = 1000
+STATE_FILE = "_state.json"
+OPEN_STATUS = "배송중"
+
+TS = pa.timestamp("us", tz="UTC")
+
+# 테이블별 컬럼 타입
+SCHEMAS = {
+    "LOCATIONS": {"id": pa.int64(), "name": pa.string()},
+    "ITEMS": {"id": pa.int64(), "name": pa.string(), "category": pa.string()},
+    "SUPPLIERS": {"id": pa.int64(), "name": pa.string()},
+    "SUPPLIER_DETAILS": {
+        "item_id": pa.int64(), "supplier_id": pa.int64(), "order_url": pa.string(), "order_unit": pa.string(),
+        "MOQ": pa.int64(), "order_unit_price": pa.int64(), "safety_stock": pa.float64(),
+        "base_unit": pa.string(), "conversion_factor": pa.float64(), "barcode": pa.string(),
+        "version": pa.int64(),
+    },
+    "STOCKS": {
+        "location_id": pa.int64(), "item_id": pa.int64(), "supplier_id": pa.int64(), "stock": pa.float64(),
+        "avg_consumption": pa.float64(), "last_checked_at": TS, "version": pa.int64(),
+    },
+    "PURCHASE_ORDERS": {
+        "order_id": pa.int64(), "supplier_id": pa.int64(), "total_price": pa.int64(),
+        "status": pa.string(), "ordered_at": TS, "received_at": TS, "archived_at": TS, "location_id": pa.int64(),
+    },
+    "PURCHASE_ITEMS": {
+        "order_id": pa.int64(), "item_id": pa.int64(), "actual_qty": pa.int64(), "status": pa.string(),
+        "ordered_at": TS, "archived_at": TS,
+    },
+    "STOCK_COUNTS": {
+        "id": pa.int64(), "location_id": pa.int64(), "item_id": pa.int64(), "supplier_id": pa.int64(),
+        "counted_stock": pa.float64(), "avg_consumption": pa.float64(), "predicted_stock": pa.float64(),
+        "predicted_usage": pa.float64(), "counted_at": TS,
+    },
+}
+
+# 전체 교체 테이블: 정렬(페이지 나누기) 기준
+SNAPSHOT_TABLES = {
+    "LOCATIONS": ("id",),
+    "ITEMS": ("id",),
+    "SUPPLIERS": ("id",),
+    "SUPPLIER_DETAILS": ("item_id", "supplier_id"),
+    "STOCKS": ("location_id", "item_id", "supplier_id"),
+}
+
+# 증분 테이블: (커서 컬럼, 중복 제거 키)
+APPEND_TABLES = {
+    "PURCHASE_ORDERS": ("order_id", ("order_id",)),
+    "PURCHASE_ITEMS": ("order_id", ("order_id", "item_id")),
+    "STOCK_COUNTS": ("id", ("id",)),
+}
+
+# 증분 테이블을 읽어 올 뷰 (운영 + 보관)
+APPEND_SOURCES = {
+    "PURCHASE_ORDERS": "PURCHASE_ORDERS_ALL",
+    "PURCHASE_ITEMS": "PURCHASE_ITEMS_ALL",
+    "STOCK_COUNTS": "STOCK_COUNTS",
+}
+
+
+# --- [1. 타입 변환] ---
+def to_arrow(table, rows):
+    """API 응답(dict 목록)을 스키마에 맞춘 Arrow 테이블로 변환. 모르는 컬럼은 문자열로 보존"""
+    known = SCHEMAS[table]
+    df = pd.DataFrame(rows)
+    fields = []
+    for col, typ in known.items():
+        if col not in df.columns:
+            df[col] = None
+        if pa.types.is_timestamp(typ):
+            df[col] = pd.to_datetime(df[col], utc=True, format="ISO8601")
+        elif pa.types.is_integer(typ):
+            df[col] = pd.to_numeric(df[col], errors="coerce").round().astype("Int64")
+        elif pa.types.is_floating(typ):
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Float64")
+        else:
+            df[col] = df[col].astype("string")
+        fields.append(pa.field(col, typ))
+    for col in df.columns:
+        if col not in known:
+            df[col] = df[col].map(lambda v: None if v is None else json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else str(v)).astype("string")
+            fields.append(pa.field(col, pa.string()))
+    schema = pa.schema(fields)
+    return pa.Table.from_pandas(df[[f.name for f in fields]], schema=schema, preserve_index=False)
+
+
+# --- [2. 페이지 단위 조회] ---
+def _fetch_pages(supabase, table, order_cols, page_size, filters=None):
+    """order_cols 순서로 정렬해 page_size씩 받아오는 제너레이터"""
+    offset = 0
+    while True:
+        q = supabase.table(table).select("*")
+        for apply in filters or []:
+            q = apply(q)
+        for col in order_cols:
+            q = q.order(col)
+        rows = q.range(offset, offset + page_size - 1).execute().data
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        offset += page_size
+
+
+def _write_atomic(tbl, path):
+    tmp = path + ".tmp"
+    pq.write_table(tbl, tmp, compression="zstd")
+    os.replace(tmp, path)
+
+
+def _load_state(root):
+    path = os.path.join(root, STATE_FILE)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return {"cursors": {}, "open_orders": []}
+
+
+def _save_state(root, state):
+    tmp = os.path.join(root, STATE_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, os.path.join(root, STATE_FILE))
+
+
+# --- [3. 내보내기] ---
+def export_snapshot(supabase, root, page_size=PAGE_SIZE, log=print):
+    """전체 교체 테이블은 새로 쓰고, 구매 테이블은 지난번 이후 행만 part로 추가"""
+    os.makedirs(root, exist_ok=True)
+    state = _load_state(root)
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    run_no = state.get("run", 0) + 1 # part 파일 이름 순서 = 내보내기 순서
+    summary = {}
+
+    for table, order_cols in SNAPSHOT_TABLES.items():
+        os.makedirs(os.path.join(root, table), exist_ok=True)
+        parts = [to_arrow(table, page) for page in _fetch_pages(supabase, table, order_cols, page_size)]
+        tbl = pa.concat_tables(parts, promote_options="default") if parts else to_arrow(table, [])
+        _write_atomic(tbl, os.path.join(root, table, "snapshot.parquet"))
+        summary[table] = tbl.num_rows
+        log(f"{table}: {tbl.num_rows}행 (전체)")
+
+    # 지난번 '배송중' 주문의 현재 상태 (상태 변경 반영용)
+    refresh_ids = state.get("open_orders", [])
+    new_open = set()
+    for table, (cursor_col, _) in APPEND_TABLES.items():
+        os.makedirs(os.path.join(root, table), exist_ok=True)
+        cursor = state["cursors"].get(table)
+        filters = [lambda q, c=cursor_col, v=cursor: q.gt(c, v)] if cursor is not None else []
+        written, max_key, seq = 0, cursor, 0
+
+        source = APPEND_SOURCES[table]
+        for page in _fetch_pages(supabase, source, (cursor_col,), page_size, filters):
+            _write_atomic(to_arrow(table, page), os.path.join(root, table, f"part-{run_no:06d}-{seq:05d}.parquet"))
+            seq += 1
+            written += len(page)
+            max_key = max(max_key or 0, max(r[cursor_col] for r in page))
+            if table == "PURCHASE_ORDERS":
+                new_open.update(r["order_id"] for r in page if r.get("status") == OPEN_STATUS)
+
+        if refresh_ids and cursor_col == "order_id": # 실사 기록은 추가만 되므로 재확인 불필요
+            for i in range(0, len(refresh_ids), page_size):
+                chunk = refresh_ids[i:i + page_size]
+                rows = supabase.table(source).select("*").in_("order_id", chunk).execute().data
+                if rows:
+                    _write_atomic(to_arrow(table, rows), os.path.join(root, table, f"part-{run_no:06d}-{seq:05d}.parquet"))
+                    seq += 1
+                if table == "PURCHASE_ORDERS":
+                    new_open.update(r["order_id"] for r in rows if r.get("status") == OPEN_STATUS)
+
+        if max_key is not None:
+            state["cursors"][table] = max_key
+        summary[table] = written
+        log(f"{table}: 신규 {written}행 (커서 {cursor} -> {max_key}), 상태 재확인 {len(refresh_ids)}건")
+
+    state["open_orders"] = sorted(new_open)
+    state["run"] = run_no
+    state["exported_at"] = stamp
+    _save_state(root, state)
+    return summary
+
+
+# --- [4. 불러오기 (오프라인 분석용)] ---
+def _part_files(root, table):
+    folder = os.path.join(root, table)
+    if not os.path.isdir(folder):
+        return []
+    return [os.path.join(folder, f) for f in sorted(os.listdir(folder)) if f.endswith(".parquet")]
+
+
+def load_arrow(root, table, columns=None):
+    """part 파일을 메모리 맵으로 읽어 하나의 Arrow 테이블로 합침 (중복 제거 전)"""
+    parts = [pq.read_table(p, columns=columns, memory_map=True) for p in _part_files(root, table)]
+    if not parts:
+        return to_arrow(table, []).select(columns) if columns else to_arrow(table, [])
+    return pa.concat_tables(parts, promote_options="default")
+
+
+def load_table(root, table, columns=None):
+    """pandas DataFrame으로 불러오기. 증분 테이블은 같은 키의 마지막 값만 남김"""
+    if table in APPEND_TABLES:
+        keys = list(APPEND_TABLES[table][1])
+        need = None if columns is None else list(dict.fromkeys(keys + list(columns)))
+        df = load_arrow(root, table, need).to_pandas(types_mapper=pd.ArrowDtype)
+        df = df.drop_duplicates(subset=keys, keep="last").reset_index(drop=True)
+        return df if columns is None else df[list(columns)]
+    return load_arrow(root, table, columns).to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def load_all(root):
+    return {table: load_table(root, table) for table in SCHEMAS}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="재고 테이블 Parquet 스냅샷")
+    parser.add_argument("command", choices=["export", "info"])
+    parser.add_argument("--out", default="exports")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        from db_backend import connect_from_env
+        export_snapshot(connect_from_env(), args.out, args.page_size)
+    else:
+        state = _load_state(args.out)
+        print(f"마지막 내보내기: {state.get('exported_at', '-')}")
+        for table in SCHEMAS:
+            tbl = load_table(args.out, table)
+            print(f"{table:<18} {len(tbl):>10,}행  part {len(_part_files(args.out, table))}개")
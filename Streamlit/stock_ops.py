@@ -0,0 +1,215 @@
+"""
+재고 계산/반영 공통 로직 (재고 실사 화면, 부하 테스트에서 공용)
+"""
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone, timedelta
+
+from locations import DEFAULT_LOCATION
+from row_versions import write_versioned
+from shared_cache import invalidate, stocks_scope
+
+KST = timezone(timedelta(hours=9)) # 한국 표준시 설정
+LEARNING_ALPHA = 0.3 # 평균 소모량 학습률
+# 요일별 소모 가중치 (나머지 요일 1.0). DataBase/Functions/predicted_stocks.sql 의 WEEKDAY_WEIGHTS 초기값,
+# db_backend.DEFAULT_WEEKDAY_WEIGHTS 와 항상 같게 유지할 것 (바꾸면 세 곳을 같이 고침)
+WEEKDAY_FACTORS = {0: 0.8, 4: 1.2, 5: 1.5, 6: 1.3}
+DEFAULT_LEAD_DAYS = 2.0 # 리드타임 기록이 없을 때 가정하는 배송 소요일
+MIN_LEAD_SAMPLES = 3 # 품목별 통계를 쓰기 위한 최소 입고 건수
+
+# 실사 행 중 실사 기록(STOCK_COUNTS)에만 남기는 값 (STOCKS 칼럼이 아님)
+HISTORY_ONLY = ("predicted_stock", "predicted_usage")
+
+
+def get_total_weight(start_date, end_date):
+    """두 날짜 사이의 요일별 소모 가중치 합계 계산"""
+    total_weight = 0
+    current = start_date.astimezone(timezone.utc) + timedelta(days = 1)
+    now = end_date.astimezone(timezone.utc)
+    while current <= now:
+        factor = WEEKDAY_FACTORS.get(current.weekday(), 1.0)
+        total_weight += factor
+        current += timedelta(days=1)
+    return total_weight
+
+
+def total_weights(last_checked, now_kst):
+    """get_total_weight 의 벡터 버전: 각 행의 last_checked ~ now 사이 가중치 합계 (Series)
+
+    get_total_weight 와 같이 점검 다음 날부터 now 까지 UTC 기준 하루씩 세고, 7일 단위는
+    주간 합계로, 남은 날은 요일 누적합 표에서 한 번에 구한다.
+    """
+    start = pd.to_datetime(last_checked, utc=True, format="ISO8601") + pd.Timedelta(days=1)
+    now = pd.Timestamp(now_kst).tz_convert("UTC")
+    days = ((now - start) // pd.Timedelta(days=1) + 1).clip(lower=0).fillna(0).astype(int).to_numpy()
+    factors = np.array([WEEKDAY_FACTORS.get(d, 1.0) for d in range(7)])
+    cum = np.concatenate([[0.0], np.cumsum(np.tile(factors, 2))])
+    w0 = start.dt.weekday.fillna(0).astype(int).to_numpy()
+    rest = days % 7
+    return pd.Series((days // 7) * factors.sum() + cum[w0 + rest] - cum[w0], index=last_checked.index)
+
+
+def predict_stocks(df, now_kst=None):
+    """예측 재고 = max(0, 재고 - 평균 소모량 x 가중치 합계) 를 전체 행에 대해 한 번에 계산"""
+    now_kst = now_kst or datetime.now(KST)
+    usage = pd.to_numeric(df['avg_consumption'], errors="coerce").fillna(0) * total_weights(df['last_checked_at'], now_kst)
+    return (pd.to_numeric(df['stock'], errors="coerce").fillna(0) - usage).clip(lower=0).round(2)
+
+
+def _get_value(r, col):
+    """중복 컬럼 등으로 리스트/시리즈가 들어온 경우 첫 번째 값만 선택"""
+    v = r[col]
+    if isinstance(v, (pd.Series, list, pd.Index)):
+        return v.iloc[0] if hasattr(v, 'iloc') else v[0]
+    return v
+
+
+def compute_stock_counts(updates, now_kst=None, location_id=DEFAULT_LOCATION):
+    """실사 입력으로 location_id 매장의 STOCKS에 쓸 행 계산 (평균 소모량 학습 포함)
+
+    updates: '새로운 재고량', 'stock', 'avg_consumption', 'item_id', 'supplier_id',
+             'last_checked_at', 'item_name' 컬럼을 가진 DataFrame ('version' 이 있으면 행 버전도 함께 실음)
+    반환값: ([실사 행 dict], [(품목명, 에러, 입력값)])
+    실사 행에는 이 실사가 대체한 예측값(predicted_stock, predicted_usage)도 들어 있음 (예측 정확도 추적용).
+    STOCKS 에 쓸 때는 stock_row() 로 걸러서 사용
+    """
+    now_kst = now_kst or datetime.now(KST)
+    rows = []
+    errors = []
+
+    for _, row in updates.iterrows():
+        raw_val = None
+        try:
+            raw_val = row['새로운 재고량']
+            actual_qty = float(_get_value(row, '새로운 재고량'))
+
+            current_stock = float(_get_value(row, 'stock'))
+            avg_cons = float(_get_value(row, 'avg_consumption'))
+            item_id = int(_get_value(row, 'item_id'))
+            supplier_id = int(_get_value(row, 'supplier_id'))
+
+            # 시간대(Timezone) 정보가 없으면 UTC를 입힌 후 한국 시간(KST)으로 변환
+            last_check_dt = pd.to_datetime(_get_value(row, 'last_checked_at'))
+            if last_check_dt.tzinfo is None:
+                last_check_dt = last_check_dt.replace(tzinfo=timezone.utc).astimezone(KST)
+            else:
+                last_check_dt = last_check_dt.astimezone(KST)
+
+            weight_sum = get_total_weight(last_check_dt, now_kst)
+            # 실사 직전 화면에 보이던 예측 재고 (predict_stocks 와 같은 계산)
+            predicted_usage = avg_cons * weight_sum
+            usage_diff = current_stock - actual_qty
+            actual_daily_usage = usage_diff / max(weight_sum, 0.1)
+            new_avg = (avg_cons * (1 - LEARNING_ALPHA)) + (max(0, actual_daily_usage) * LEARNING_ALPHA)
+
+            out = {
+                "location_id": int(location_id),
+                "item_id": item_id,
+                "supplier_id": supplier_id,
+                "stock": actual_qty,
+                "avg_consumption": float(new_avg),
+                "last_checked_at": now_kst.strftime('%Y-%m-%dT%H:%M:%S+09:00'),
+                "predicted_stock": round(max(0.0, current_stock - predicted_usage), 2),
+                "predicted_usage": round(predicted_usage, 4),
+            }
+            # 읽었을 때의 행 버전: 그 사이 다른 곳에서 바뀐 행은 반영하지 않음 (row_versions.py)
+            version = _get_value(row, 'version') if 'version' in row.index else None
+            if version is not None and not pd.isna(version):
+                out["version"] = int(version)
+            rows.append(out)
+        except Exception as row_err:
+            errors.append((row.get('item_name'), row_err, raw_val))
+
+    return rows, errors
+
+
+def count_updates(stock_df, counts):
+    """{(item_id, supplier_id): 실사 수량} -> compute_stock_counts 의 updates (입력한 품목만)
+
+    stock_df: 재고 실사 화면의 재고 목록
+    """
+    if not counts or stock_df.empty:
+        return stock_df.iloc[0:0].assign(**{'새로운 재고량': []})
+    entered = pd.Series(counts, name='새로운 재고량')
+    entered.index = entered.index.set_names(['item_id', 'supplier_id'])
+    merged = stock_df.merge(entered.reset_index(), on=['item_id', 'supplier_id'], how='inner', suffixes=('_old', ''))
+    return merged.drop(columns=['새로운 재고량_old'], errors='ignore')
+
+
+def stock_row(row):
+    """실사 행 -> STOCKS 에 쓸 칼럼만"""
+    return {k: v for k, v in row.items() if k not in HISTORY_ONLY}
+
+
+def count_history(rows):
+    """실사 행 -> STOCK_COUNTS(실사 기록) 행 (대체한 예측값 포함)"""
+    return [{
+        "location_id": r.get("location_id", DEFAULT_LOCATION),
+        "item_id": r["item_id"],
+        "supplier_id": r["supplier_id"],
+        "counted_stock": r["stock"],
+        "avg_consumption": r.get("avg_consumption"),
+        "predicted_stock": r.get("predicted_stock"),
+        "predicted_usage": r.get("predicted_usage"),
+        "counted_at": r.get("last_checked_at") or datetime.now(timezone.utc).isoformat(),
+    } for r in rows]
+
+
+def apply_stock_counts(supabase, updates, now_kst=None, location_id=DEFAULT_LOCATION):
+    """실사 결과를 즉시(동기) 반영. 반환값: (성공 건수, [(품목명, 에러, 입력값)])
+
+    행 버전 조건부 일괄 쓰기 한 번으로 반영하고, 그 사이 다른 곳에서 바뀐 행은 에러로 돌려줌
+    """
+    rows, errors = compute_stock_counts(updates, now_kst, location_id)
+    # 재고와 실사 기록은 한 번에 (충돌한 행은 기록도 남지 않음)
+    conflicts = {c["key"]: c for c in write_versioned(supabase, "STOCKS", [stock_row(r) for r in rows],
+                                                       counts=count_history(rows))} if rows else {}
+    done = []
+    for r in rows:
+        c = conflicts.get((r["location_id"], r["item_id"], r["supplier_id"]))
+        if c is None:
+            done.append(r)
+        else:
+            srv = c["server"] or {}
+            errors.append((r["item_id"], f"다른 곳에서 먼저 수정됨 (서버 현재 {srv.get('stock', '삭제됨')})", r["stock"]))
+    if rows:
+        # 충돌이 났다면 화면이 보던 값도 이미 낡았음
+        invalidate(stocks_scope(location_id))
+    return len(done), errors
+
+
+# --- 리드타임 기반 발주점 ---
+def load_lead_times(supabase):
+    """(공급처, 품목)별 리드타임 통계 (lead_times.sql 트리거가 입고 시 갱신)"""
+    res = supabase.table("SUPPLIER_LEAD_TIMES").select("supplier_id, item_id, n, mean_days, p90_days").execute()
+    return pd.DataFrame(res.data, columns=["supplier_id", "item_id", "n", "mean_days", "p90_days"])
+
+
+def attach_reorder_points(df, lead_times, default_days=DEFAULT_LEAD_DAYS, min_samples=MIN_LEAD_SAMPLES):
+    """발주점 = 일평균 소모량 x 리드타임(p90) + 안전재고 (행 반복 없이 벡터 연산)
+
+    리드타임은 (공급처, 품목) 입고 건수가 min_samples 이상이면 그 p90, 아니면 공급처 전체 p90의
+    건수 가중 평균, 그것도 없으면 default_days 를 사용한다.
+    df: item_id, supplier_id, avg_consumption, safety_stock 컬럼 필요
+    추가 컬럼: lead_days, reorder_point
+    """
+    out = df.copy()
+    lt = lead_times.copy()
+    for col in ("n", "mean_days", "p90_days"):
+        lt[col] = pd.to_numeric(lt[col], errors="coerce")
+    lt["p90_days"] = lt["p90_days"].fillna(lt["mean_days"])
+
+    item_lt = lt[lt["n"] >= min_samples][["supplier_id", "item_id", "p90_days"]]
+    sup = lt.assign(w=lt["p90_days"] * lt["n"]).groupby("supplier_id")[["w", "n"]].sum()
+    sup_lt = (sup["w"] / sup["n"].where(sup["n"] > 0)).rename("sup_days")
+
+    out = out.merge(item_lt, on=["supplier_id", "item_id"], how="left")
+    out["lead_days"] = out["p90_days"].fillna(out["supplier_id"].map(sup_lt)).fillna(default_days)
+    out = out.drop(columns=["p90_days"])
+
+    # avg_consumption 은 요일 가중치 1.0 기준 소모량이므로 평균 요일 가중치를 곱해 하루 소모량으로 환산
+    daily_factor = (sum(WEEKDAY_FACTORS.values()) + (7 - len(WEEKDAY_FACTORS))) / 7
+    consumption = pd.to_numeric(out["avg_consumption"], errors="coerce").fillna(0) * daily_factor
+    safety = pd.to_numeric(out["safety_stock"], errors="coerce").fillna(0)
+    out["reorder_point"] = (consumption * out["lead_days"] + safety).round(2)
+    return out
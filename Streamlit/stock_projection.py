@@ -0,0 +1,185 @@
+"""
+재고 전망 (여러 날 품절 예측 + what-if)
+
+"지금 예측 재고가 발주점 아래인가" 대신, 앞으로 N일 동안 품목마다 재고가 어떻게 줄어드는지를
+(품목 x 날짜) 행렬로 한 번에 계산해서 품목별 첫 품절일과 늦어도 발주해야 하는 날을 보여준다.
+
+- 시작 재고: 지금의 예측 재고 (stock_ops.predict_stocks)
+- 날마다 소모량 = avg_consumption x 요일 가중치(WEEKDAY_FACTORS) x 행사 배수(what-if)
+- 배송 중인 주문은 주문일 + 리드타임(p90, attach_reorder_points) 날에 도착한다고 보고 더함.
+  이미 지난 주문은 내일 도착, 공급처 지연(what-if)만큼 늦춤
+- 재고는 0 아래로 내려가지 않음: X = 시작 재고 + 누적(도착 - 소모) 일 때 재고 = X - min(0, X 의 누적 최소)
+  (날짜 반복 없이 누적합/누적 최소로 전체 카탈로그를 한 번에 계산)
+
+입력 데이터는 캐시해 두고, what-if 를 바꿀 때는 행렬 계산만 다시 한다.
+"""
+import math
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from alert_worker import predict_frame
+from queries import load_shipping_orders
+from stock_ops import KST, WEEKDAY_FACTORS, DEFAULT_LEAD_DAYS
+
+DEFAULT_DAYS = 14
+MAX_DAYS = 60
+EPS = 1e-9
+
+
+# --- [1. 입력 조회] ---
+def in_transit(orders, lines, frame, today):
+    """배송 중인 주문 상세 -> 도착 예정 수량 (재고 관리 단위). eta: 도착 예정일 (today 이후 날짜)"""
+    columns = ["item_id", "supplier_id", "qty", "eta"]
+    if orders.empty or lines.empty:
+        return pd.DataFrame(columns=columns)
+    ship = lines.merge(orders[["order_id", "ordered_at"]], on="order_id", how="left")
+    ship["qty"] = pd.to_numeric(ship["actual_qty"], errors="coerce").fillna(0) * \
+        pd.to_numeric(ship["conversion_factor"], errors="coerce").fillna(1)
+    lead = frame.set_index(["item_id", "supplier_id"])["lead_days"]
+    days = pd.Series(lead.reindex(pd.MultiIndex.from_frame(ship[["item_id", "supplier_id"]])).to_numpy(), index=ship.index)
+    ordered = pd.to_datetime(ship["ordered_at"], utc=True, format="ISO8601").dt.tz_convert(KST).dt.tz_localize(None)
+    eta = (ordered + pd.to_timedelta(np.ceil(days.fillna(DEFAULT_LEAD_DAYS)), unit="D")).dt.normalize()
+    # 도착 예정일이 지났는데 아직 배송중이면(또는 주문일을 모르면) 내일 도착으로 봄
+    tomorrow = pd.Timestamp(today) + pd.Timedelta(days=1)
+    ship["eta"] = eta.fillna(tomorrow).clip(lower=tomorrow)
+    return ship[columns]
+
+
+def load_projection_inputs(supabase, location_id, now_kst=None):
+    """전망 계산 입력 (요청 7건): (예측 재고/리드타임 DataFrame, 도착 예정 DataFrame, 오늘 날짜)"""
+    now_kst = now_kst or datetime.now(KST)
+    today = now_kst.date()
+    frame = predict_frame(supabase, location_id, now_kst).reset_index(drop=True)
+    orders, lines = load_shipping_orders(supabase, location_id)
+    return frame, in_transit(orders, lines, frame, today), today
+
+
+# --- [2. 행렬 계산] ---
+def demand_matrix(frame, dates, events=()):
+    """품목 x 날짜 예상 소모량 = avg_consumption x 요일 가중치 x 행사 배수
+
+    events: [(시작일, 종료일, 배수, 카테고리 목록 또는 None(전체))]
+    """
+    weights = np.array([WEEKDAY_FACTORS.get(d, 1.0) for d in dates.weekday])
+    mult = np.ones((len(frame), len(dates)))
+    for start, end, factor, categories in events:
+        day = (dates >= pd.Timestamp(start)) & (dates <= pd.Timestamp(end))
+        rows = frame["category"].isin(categories).to_numpy() if categories else np.ones(len(frame), bool)
+        mult[np.ix_(rows, day)] *= factor
+    avg = pd.to_numeric(frame["avg_consumption"], errors="coerce").fillna(0).clip(lower=0).to_numpy()
+    return avg[:, None] * weights[None, :] * mult
+
+
+def arrival_matrix(frame, shipments, dates, supplier_delays=None):
+    """품목 x 날짜 도착 수량. supplier_delays: {공급처 id: 지연 일수}, 기간을 넘기면 제외"""
+    out = np.zeros((len(frame), len(dates)))
+    if shipments.empty:
+        return out
+    rows = pd.MultiIndex.from_frame(frame[["item_id", "supplier_id"]].astype(int)).get_indexer(
+        pd.MultiIndex.from_frame(shipments[["item_id", "supplier_id"]].astype(int)))
+    delay = shipments["supplier_id"].astype(int).map(supplier_delays or {}).fillna(0).to_numpy()
+    day = (pd.to_datetime(shipments["eta"]) - dates[0]).dt.days.to_numpy() + delay.astype(int)
+    ok = (rows >= 0) & (day >= 0) & (day < len(dates))
+    np.add.at(out, (rows[ok], day[ok]), shipments["qty"].to_numpy(dtype=float)[ok])
+    return out
+
+
+def project_stock(frame, shipments, today, days=DEFAULT_DAYS, events=(), supplier_delays=None):
+    """앞으로 days 일의 일별 재고 (하루 끝 기준)
+
+    반환값: (재고 행렬 [품목 x 날짜], 날짜 DatetimeIndex (내일부터), 품목 요약 DataFrame)
+    요약 컬럼: incoming(기간 내 도착 수량), end_stock, below_safety_date, stockout_date, order_by
+    """
+    dates = pd.date_range(pd.Timestamp(today) + pd.Timedelta(days=1), periods=days, freq="D")
+    demand = demand_matrix(frame, dates, events)
+    arrivals = arrival_matrix(frame, shipments, dates, supplier_delays)
+    start = pd.to_numeric(frame["predicted_stock"], errors="coerce").fillna(0).clip(lower=0).to_numpy()
+
+    level = start[:, None] + np.cumsum(arrivals - demand, axis=1)
+    floor = np.minimum.accumulate(np.minimum(level, start[:, None]), axis=1)
+    stock = level - np.minimum(floor, 0)
+
+    safety = pd.to_numeric(frame["safety_stock"], errors="coerce").fillna(0).to_numpy()
+    summary = frame[["item_id", "supplier_id", "category", "item_name", "base_unit", "predicted_stock",
+                     "safety_stock", "lead_days"]].copy()
+    summary["incoming"] = arrivals.sum(axis=1)
+    summary["end_stock"] = stock[:, -1].round(2)
+    summary["below_safety_date"] = _first_date(stock < safety[:, None], dates)
+    summary["stockout_date"] = _first_date((stock <= EPS) & (demand > 0), dates)
+
+    # 품절 전에 도착하려면 늦어도 (품절일 - 리드타임 - 공급처 지연) 에 발주. 이미 지났으면 오늘
+    delay = summary["supplier_id"].astype(int).map(supplier_delays or {}).fillna(0)
+    lead = np.ceil(pd.to_numeric(summary["lead_days"], errors="coerce").fillna(DEFAULT_LEAD_DAYS) + delay)
+    order_by = summary["stockout_date"] - pd.to_timedelta(lead, unit="D")
+    summary["order_by"] = order_by.where(order_by.isna() | (order_by > pd.Timestamp(today)), pd.Timestamp(today))
+    return stock, dates, summary
+
+
+def _first_date(mask, dates):
+    """행마다 처음 True 인 날짜 (없으면 NaT)"""
+    hit = mask.any(axis=1)
+    first = dates.to_numpy()[mask.argmax(axis=1)]
+    return pd.Series(np.where(hit, first, np.datetime64("NaT")), dtype="datetime64[ns]")
+
+
+# --- [3. 화면] ---
+def render_projection(supabase, location_id):
+    import streamlit as st
+
+    from shared_cache import cached, CATALOG, stocks_scope, orders_scope
+
+    frame, shipments, today = cached((CATALOG, stocks_scope(location_id), orders_scope(location_id)),
+                                     "projection_inputs", lambda: load_projection_inputs(supabase, location_id))
+    if frame.empty:
+        st.info("등록된 재고 품목이 없습니다.")
+        return
+    suppliers = cached(CATALOG, "supplier_names",
+                       lambda: {s["id"]: s["name"] for s in supabase.table("SUPPLIERS").select("id, name").execute().data})
+
+    days = st.slider("전망 기간(일)", 7, MAX_DAYS, DEFAULT_DAYS, key="projection_days")
+    with st.expander("What-if: 행사일 / 공급처 지연"):
+        c1, c2, c3 = st.columns([2, 1, 2])
+        event = c1.date_input("행사 기간", value=(), min_value=today, key="projection_event")
+        factor = c2.number_input("소모량 배수", 0.0, 10.0, 1.5, step=0.1, key="projection_factor")
+        categories = c3.multiselect("행사 카테고리 (비우면 전체)", sorted(frame["category"].dropna().unique()),
+                                    key="projection_categories")
+        d1, d2 = st.columns([3, 1])
+        late = d1.multiselect("지연되는 공급처", sorted(frame["supplier_id"].astype(int).unique()),
+                              format_func=lambda s: suppliers.get(s, f"공급처 #{s}"), key="projection_suppliers")
+        delay = d2.number_input("지연 일수", 0, 30, 2, key="projection_delay")
+    events = [(event[0], event[-1], factor, categories)] if event else []
+    delays = {int(s): int(delay) for s in late}
+
+    stock, dates, summary = project_stock(frame, shipments, today, days, events, delays)
+
+    at_risk = summary[summary["stockout_date"].notna()].sort_values(["stockout_date", "order_by"])
+    c1, c2, c3 = st.columns(3)
+    c1.metric("전체 품목", len(summary))
+    c2.metric(f"{days}일 내 품절 예상", len(at_risk), delta_color="inverse")
+    c3.metric("안전재고 미달 예상", int(summary["below_safety_date"].notna().sum()), delta_color="inverse")
+
+    st.subheader("날짜별 품절 품목 수")
+    uses = pd.to_numeric(frame["avg_consumption"], errors="coerce").fillna(0).to_numpy() > 0
+    st.bar_chart(pd.Series(((stock <= EPS) & uses[:, None]).sum(axis=0), index=dates.date, name="품절 품목 수"))
+
+    if at_risk.empty:
+        st.success(f"✅ 앞으로 {days}일 동안 품절이 예상되는 품목이 없습니다.")
+    else:
+        st.subheader("⚠️ 품절 예상 품목")
+        st.dataframe(
+            at_risk[["category", "item_name", "predicted_stock", "incoming", "stockout_date", "order_by", "lead_days",
+                     "base_unit"]]
+            .assign(stockout_date=at_risk["stockout_date"].dt.date, order_by=at_risk["order_by"].dt.date)
+            .rename(columns={"category": "카테고리", "item_name": "품목명", "predicted_stock": "현재 예측재고",
+                             "incoming": "도착 예정", "stockout_date": "품절 예상일", "order_by": "발주 마감일",
+                             "lead_days": "리드타임(일)", "base_unit": "단위"})
+            .round({"리드타임(일)": 1}),
+            use_container_width=True, hide_index=True)
+
+        names = dict(zip(at_risk.index, at_risk["item_name"]))
+        picked = st.multiselect("품목별 재고 추이", list(at_risk.index), default=list(at_risk.index[:3]),
+                                format_func=names.get, key="projection_items")
+        if picked:
+            st.line_chart(pd.DataFrame(stock[picked].T, index=dates.date, columns=[names[i] for i in picked]))
@@ -0,0 +1,19 @@
+"""
+테스트 공용 설정: Streamlit 폴더의 모듈을 import 할 수 있게 하고,
+앱이 쓰는 로컬 파일(쓰기 큐/미러/알림 신호)은 테스트마다 임시 폴더로 돌린다.
+"""
+import os
+import sys
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+
+@pytest.fixture(autouse=True)
+def scratch_files(tmp_path, monkeypatch):
+    monkeypatch.setenv("INVENTORY_QUEUE_DB", str(tmp_path / "queue.sqlite3"))
+    monkeypatch.setenv("INVENTORY_MIRROR_DB", str(tmp_path / "mirror.sqlite3"))
+    monkeypatch.setenv("INVENTORY_ALERT_SIGNAL", str(tmp_path / "alerts_dirty"))
+    monkeypatch.setenv("INVENTORY_CACHE", "memory")
@@ -0,0 +1,84 @@
+"""
+바코드 스캔 실사(barcode_scan.py): 중복 읽기 무시, 되돌리기, 수량 입력, 실사 입력 변환
+"""
+import pandas as pd
+import pytest
+
+from barcode_scan import DUPLICATE_WINDOW, MAX_QTY, ScanBuffer, barcode_index_from_frame, parse_scan, scan_updates
+
+A, B = (1, 10), (2, 10)
+
+
+def test_double_read_within_window_counts_once():
+    buf = ScanBuffer()
+    assert buf.add("880A", A, now=100.0) == "added"
+    assert buf.add("880A", A, now=100.0 + DUPLICATE_WINDOW / 2) == "duplicate"
+    assert buf.totals == {A: 1.0} and buf.counts(A) == 1
+
+
+def test_repeat_after_window_or_other_qty_is_added():
+    buf = ScanBuffer()
+    buf.add("880A", A, now=100.0)
+    assert buf.add("880A", A, now=100.0 + DUPLICATE_WINDOW + 0.01) == "added"
+    # 수량을 붙여 다시 입력한 것은 스캐너 중복이 아님
+    assert buf.add("880A", A, qty=12.0, now=100.0 + DUPLICATE_WINDOW + 0.1) == "added"
+    assert buf.totals == {A: 14.0} and buf.counts(A) == 3
+
+
+def test_other_code_is_not_duplicate():
+    buf = ScanBuffer()
+    buf.add("880A", A, now=100.0)
+    assert buf.add("880B", B, now=100.1) == "added"
+    assert buf.totals == {A: 1.0, B: 1.0} and len(buf) == 2
+
+
+def test_undo_reverts_last_scan():
+    buf = ScanBuffer()
+    assert buf.undo() is None
+    buf.add("880A", A, now=100.0)
+    buf.add("880B", B, qty=3.0, now=101.0)
+    buf.add("880A", A, now=102.0)
+
+    assert buf.undo() == (102.0, "880A", A, 1.0)
+    assert buf.totals == {A: 1.0, B: 3.0}
+    assert buf.undo()[2] == B
+    # 스캔이 남지 않은 품목은 누계에서 빠짐
+    assert buf.totals == {A: 1.0}
+    buf.undo()
+    assert buf.totals == {} and len(buf) == 0
+
+
+def test_clear_also_forgets_unknown_codes():
+    buf = ScanBuffer()
+    buf.add("880A", A, now=100.0)
+    buf.add_unknown("999")
+    buf.add_unknown("999")
+    assert buf.unknown == {"999": 2}
+    buf.clear()
+    assert (buf.totals, buf.scans, buf.unknown) == ({}, [], {})
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("8801234567890", (1.0, "8801234567890")),
+    (" 12 * 0880123 ", (12.0, "0880123")),  # 앞자리 0 유지
+    ("0.5*880A", (0.5, "880A")),
+])
+def test_parse_scan(text, expected):
+    assert parse_scan(text) == expected
+
+
+@pytest.mark.parametrize("text", ["x*880A", "0*880A", f"{MAX_QTY + 1}*880A"])
+def test_parse_scan_rejects_bad_qty(text):
+    with pytest.raises(ValueError):
+        parse_scan(text)
+
+
+def test_scan_updates_only_scanned_items():
+    stock = pd.DataFrame({"item_id": [1, 2, 3], "supplier_id": [10, 10, 10], "stock": [5.0, 6.0, 7.0],
+                          "barcode": ["880A", None, " "]})
+    assert barcode_index_from_frame(stock) == {"880A": A}
+    buf = ScanBuffer()
+    buf.add("880A", A, qty=4.0, now=100.0)
+    buf.add("880B", B, now=101.0)
+    updates = scan_updates(buf, stock)
+    assert updates[["item_id", "새로운 재고량"]].values.tolist() == [[1, 4.0], [2, 1.0]]
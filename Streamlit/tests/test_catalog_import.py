@@ -0,0 +1,32 @@
+"""
+카탈로그 일괄 등록 검증: 정수 칼럼(MOQ, 단가)의 소수는 오류, 숫자 칼럼(환산계수, 안전재고)은 소수 유지
+"""
+import pandas as pd
+
+from catalog_import import validate_catalog
+
+
+def _frame(**overrides):
+    row = {"supplier": "A커피", "name": "원두 1kg", "category": "원두", "order_unit": "박스", "base_unit": "개",
+           "MOQ": "1", "order_unit_price": "15,000", "conversion_factor": "1", "safety_stock": "5"}
+    return pd.DataFrame([{**row, **overrides}])
+
+
+def test_numeric_columns_keep_fractions():
+    valid, errors = validate_catalog(_frame(conversion_factor="1.5", safety_stock="1,200.7"))
+    assert errors.empty
+    assert valid.at[0, "conversion_factor"] == 1.5
+    assert valid.at[0, "safety_stock"] == 1200.7
+    assert valid.at[0, "order_unit_price"] == 15000
+
+
+def test_integer_columns_reject_fractions():
+    valid, errors = validate_catalog(_frame(MOQ="2.5", order_unit_price="1,200.7"))
+    assert valid.empty
+    assert errors.at[0, "사유"] == "MOQ 값 오류; order_unit_price 값 오류"
+
+
+def test_blank_numbers_use_defaults():
+    valid, errors = validate_catalog(_frame(MOQ="", conversion_factor=None, safety_stock=" "))
+    assert errors.empty
+    assert (valid.at[0, "MOQ"], valid.at[0, "conversion_factor"], valid.at[0, "safety_stock"]) == (1, 1.0, 0.0)
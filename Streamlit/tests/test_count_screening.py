@@ -0,0 +1,68 @@
+"""
+실사 이상값 선별(count_screening.screen_counts): 예상 범위와 보류 사유
+"""
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from count_screening import EDIT_COLUMN, K, MIN_SCALE, screen_counts
+from forecast_accuracy import MIN_COUNTS
+from stock_ops import KST
+
+NOW = datetime(2026, 3, 4, 9, 0, tzinfo=KST)  # 수요일
+
+
+def _updates(*counted, predicted=20.0, avg_consumption=0.0, last_checked_at="2026-03-04T00:00:00+00:00"):
+    return pd.DataFrame({
+        "item_id": range(1, len(counted) + 1), "supplier_id": 1, EDIT_COLUMN: counted,
+        "predicted_stock": predicted, "avg_consumption": avg_consumption, "last_checked_at": last_checked_at,
+    })
+
+
+def test_band_uses_min_scale_without_history():
+    # 오늘 점검한 품목은 예상 소모량 0 -> 오차 규모는 MIN_SCALE
+    out = screen_counts(_updates(20.0), now_kst=NOW)
+    assert (out.at[0, "expected_low"], out.at[0, "expected_high"]) == (20 - K * MIN_SCALE, 20 + K * MIN_SCALE)
+
+
+@pytest.mark.parametrize("counted, reason", [
+    (20.0, ""),
+    (12.0, ""),               # 하한 경계
+    (28.0, ""),               # 상한 경계
+    (29.0, "예상보다 많음"),
+    (11.0, "예상보다 적음"),
+    (0.0, "예상보다 적음"),    # 0 은 자릿수 오류로 보지 않음
+    (141.0, "자릿수 오류 의심 (예상보다 훨씬 많음)"),
+    (2.0, "자릿수 오류 의심 (예상보다 훨씬 적음)"),
+])
+def test_thresholds(counted, reason):
+    out = screen_counts(_updates(counted), now_kst=NOW)
+    assert out.at[0, "reason"] == reason
+    assert out.at[0, "suspect"] == (reason != "")
+
+
+def test_usage_since_last_count_widens_band():
+    # 일주일 전 점검, 하루 3개씩 소모 -> 오차 규모가 MIN_SCALE 보다 커짐
+    narrow = screen_counts(_updates(40.0), now_kst=NOW)
+    wide = screen_counts(_updates(40.0, avg_consumption=3.0, last_checked_at="2026-02-25T00:00:00+00:00"), now_kst=NOW)
+    assert narrow.at[0, "suspect"] and not wide.at[0, "suspect"]
+
+
+def test_history_mae_needs_min_counts():
+    history = pd.DataFrame({"item_id": [1, 2], "supplier_id": [1, 1], "n": [MIN_COUNTS, MIN_COUNTS - 1], "mae": [10.0, 10.0]})
+    out = screen_counts(_updates(50.0, 50.0), error_scale=history, now_kst=NOW)
+    assert out["expected_high"].tolist() == [20 + K * 10, 20 + K * MIN_SCALE]
+    assert out["suspect"].tolist() == [False, True]
+
+
+def test_incoming_orders_raise_upper_bound():
+    incoming = pd.Series([30.0], index=pd.MultiIndex.from_tuples([(1, 1)]))
+    out = screen_counts(_updates(50.0, 50.0), incoming=incoming, now_kst=NOW)
+    assert out["expected_high"].tolist() == [58.0, 28.0]
+    assert out["suspect"].tolist() == [False, True]
+
+
+def test_empty_updates():
+    out = screen_counts(_updates().iloc[0:0], now_kst=NOW)
+    assert out.empty and {"suspect", "reason"} <= set(out.columns)
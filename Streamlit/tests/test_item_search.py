@@ -0,0 +1,63 @@
+"""
+품목 검색 색인(item_search.SearchIndex): 초성/자모 검색과 순위
+"""
+import pickle
+
+from item_search import SearchIndex, chosung, jamo
+
+ITEMS = [
+    {"id": 1, "name": "아이스 아메리카노 컵", "category": "포장재"},
+    {"id": 2, "name": "아메리카노 원두", "category": "원두"},
+    {"id": 3, "name": "우유", "category": "유제품"},
+    {"id": 4, "name": "오트 우유", "category": "유제품"},
+    {"id": 5, "name": "바닐라 시럽", "category": "시럽"},
+    {"id": 6, "name": "아메리칸 쿠키", "category": "베이커리"},
+    {"id": 7, "name": "꿀", "category": None},
+]
+
+
+def test_keys():
+    assert chosung("아이스 아메리카노") == "ㅇㅇㅅㅇㅁㄹㅋㄴ"
+    assert jamo("꿀") == "ㄲㅜㄹ"
+    assert jamo("괜찮") == "ㄱㅗㅐㄴㅊㅏㄴㅎ"  # 겹모음/겹받침은 두 낱자
+
+
+def test_name_ranking_exact_then_prefix_then_contains():
+    index = SearchIndex(ITEMS)
+    assert index.search("우유") == [3, 4]
+    # 접두 일치(2, 6) 가 포함(1) 보다 앞, 접두끼리는 사전순
+    assert index.search("아메리") == [2, 6, 1]
+
+
+def test_chosung_query():
+    index = SearchIndex(ITEMS)
+    # 초성 접두(2: ㅇㅁㄹㅋㄴ, 6: ㅇㅁㄹㅋ) 가 초성 포함(1) 보다 앞
+    assert index.search("ㅇㅁㄹ") == [2, 6, 1]
+    assert index.search("ㅂㄴㄹ") == [5]
+    # 초성이 섞인 검색어에 완성 음절이 있으면 초성 검색이 아님 (자모로 찾음)
+    assert index.search("바닐ㄹ") == [5]
+
+
+def test_typing_and_fuzzy():
+    index = SearchIndex(ITEMS)
+    # 치는 중인 마지막 글자: 자모 접두(2, 6 - 자모 사전순) 다음에 자모 포함(1)
+    assert index.search("아메ㄹ") == [6, 2, 1]
+    # 음절을 빼먹은 검색어는 자모 순서 일치로
+    assert index.search("아메카노") == [2, 1]
+
+
+def test_category_filter_and_limit():
+    index = SearchIndex(ITEMS)
+    assert index.search("ㅇ", category="유제품") == [3, 4]
+    assert index.search("", category="기타") == [7]
+    assert index.search("아", limit=2) == [2, 6]
+    assert index.category_list() == sorted({"포장재", "원두", "유제품", "시럽", "베이커리", "기타"})
+
+
+def test_pickle_round_trip():
+    """공유 캐시에 넣었다 꺼낸 색인도 같은 결과"""
+    index = SearchIndex(ITEMS)
+    restored = pickle.loads(pickle.dumps(index))
+    for q in ("우유", "ㅇㅁㄹ", "아메카노", "꿀"):
+        assert restored.search(q) == index.search(q)
+    assert pickle.loads(pickle.dumps(SearchIndex([]))).search("아") == []
@@ -0,0 +1,74 @@
+"""
+마이그레이션: 각 파일이 함수 정의를 직접 담는지, 전체를 순서대로 적용한 결과가 현재 Functions/*.sql 과 같은지
+
+Postgres 검사는 INVENTORY_TEST_DSN 이 있을 때만 (전용 스키마를 만들었다가 지움). psycopg 필요
+"""
+import os
+import re
+import sys
+
+import pytest
+
+DB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "DataBase")
+sys.path.insert(0, DB_DIR)
+
+from migrate import load_sql, migrate, migration_files  # noqa: E402
+
+DSN_ENV = "INVENTORY_TEST_DSN"
+SCHEMA = "inventory_migration_test"
+MARKER = re.compile(r"^--\[Functions/(\S+\.sql) 의 이 시점 정의\]$", re.MULTILINE)
+
+
+def test_migrations_do_not_include_function_files():
+    for _, _, path in migration_files():
+        load_sql(path)
+
+
+def _function_files():
+    """Functions 파일을 마지막으로 담은 마이그레이션 순서대로"""
+    last = {}
+    for version, _, path in migration_files():
+        for name in MARKER.findall(load_sql(path)):
+            last[name] = version
+    return sorted(last, key=last.get)
+
+
+def _definitions(conn):
+    return conn.execute("""
+        select 'function', p.oid::regprocedure::text, pg_get_functiondef(p.oid)
+        from pg_proc p where p.pronamespace = current_schema()::regnamespace
+        union all
+        select 'trigger', t.tgname, pg_get_triggerdef(t.oid)
+        from pg_trigger t join pg_class c on c.oid = t.tgrelid
+        where c.relnamespace = current_schema()::regnamespace and not t.tgisinternal
+        union all
+        select 'view', c.relname, pg_get_viewdef(c.oid)
+        from pg_class c where c.relnamespace = current_schema()::regnamespace and c.relkind = 'v'
+        order by 1, 2
+    """).fetchall()
+
+
+def test_migrations_end_at_current_functions():
+    dsn = os.environ.get(DSN_ENV)
+    if not dsn:
+        pytest.skip(f"{DSN_ENV} 가 없어 Postgres 검사는 건너뜀")
+    psycopg = pytest.importorskip("psycopg")
+
+    with psycopg.connect(dsn) as conn:
+        conn.execute(f'drop schema if exists "{SCHEMA}" cascade')
+        conn.execute(f'create schema "{SCHEMA}"')
+        conn.execute(f'set search_path to "{SCHEMA}"')
+        conn.commit()
+        try:
+            assert len(migrate(conn, log=lambda *a: None)) == len(migration_files())
+            migrated = _definitions(conn)
+            # Functions 파일을 고치고 새 마이그레이션을 빠뜨렸으면 다시 적용한 정의가 달라짐
+            for name in _function_files():
+                with open(os.path.join(DB_DIR, "Functions", name), encoding="utf-8") as f:
+                    conn.execute(f.read())
+            conn.commit()
+            assert _definitions(conn) == migrated
+        finally:
+            conn.rollback()
+            conn.execute(f'drop schema if exists "{SCHEMA}" cascade')
+            conn.commit()
@@ -0,0 +1,89 @@
+"""
+오프라인 미러 동기화: 실사를 기록할 때의 행 버전으로 충돌을 잡는지 (미러를 다시 받아도)
+"""
+import pytest
+
+from db_backend import MemoryBackend, generate_demo_tables
+from offline_mirror import StockMirror
+
+
+@pytest.fixture
+def backend():
+    return MemoryBackend(generate_demo_tables(n_items=10, n_open_orders=0))
+
+
+def _server_row(backend, item_id):
+    return next(r for r in backend.tables["STOCKS"] if r["item_id"] == item_id and r["location_id"] == 1)
+
+
+def _count(row, stock):
+    return {"item_id": row["item_id"], "supplier_id": row["supplier_id"], "stock": stock,
+            "avg_consumption": row["avg_consumption"], "last_checked_at": "2026-01-05T09:00:00+00:00",
+            "predicted_stock": row["stock"], "predicted_usage": 0.0}
+
+
+def _change_on_server(backend, row, stock):
+    (backend.table("STOCKS").update({"stock": stock})
+     .eq("location_id", 1).eq("item_id", row["item_id"]).eq("supplier_id", row["supplier_id"]).execute())
+
+
+def test_sync_writes_counts_and_history(backend):
+    mirror = StockMirror()
+    mirror.snapshot(backend)
+    row = _server_row(backend, 1)
+    mirror.record_counts([_count(row, 7.0)])
+
+    assert mirror.sync(backend) == {"synced": 1, "conflicts": 0}
+    assert _server_row(backend, 1)["stock"] == 7.0
+    assert [c["counted_stock"] for c in backend.tables["STOCK_COUNTS"] if c["item_id"] == 1] == [7.0]
+    assert mirror.pending() == []
+
+
+def test_resnapshot_keeps_base_version(backend):
+    mirror = StockMirror()
+    mirror.snapshot(backend)
+    row = dict(_server_row(backend, 1))
+    mirror.record_counts([_count(row, 7.0)])
+
+    # 실사 후 서버에서 입고로 바뀌고, 온라인 전환 때 자동 동기화가 실패한 뒤 다시 오프라인으로 미러를 받음
+    _change_on_server(backend, row, 99.0)
+    mirror.snapshot(backend)
+
+    assert mirror.sync(backend) == {"synced": 0, "conflicts": 1}
+    assert _server_row(backend, 1)["stock"] == 99.0
+    (conflict,) = mirror.conflicts()
+    assert conflict["server"]["stock"] == 99.0
+    assert not [c for c in backend.tables["STOCK_COUNTS"] if c["item_id"] == 1]
+
+    # 내 실사값으로 다시 반영하면 서버 현재 버전 기준으로 반영됨
+    mirror.resolve(row["item_id"], row["supplier_id"], keep_local=True)
+    assert mirror.sync(backend) == {"synced": 1, "conflicts": 0}
+    assert _server_row(backend, 1)["stock"] == 7.0
+
+
+def test_recount_keeps_first_base_version(backend):
+    mirror = StockMirror()
+    mirror.snapshot(backend)
+    row = dict(_server_row(backend, 2))
+    mirror.record_counts([_count(row, 3.0)])
+    _change_on_server(backend, row, 50.0)
+    mirror.snapshot(backend)
+    mirror.record_counts([_count(row, 4.0)])
+
+    assert mirror.sync(backend) == {"synced": 0, "conflicts": 1}
+    assert _server_row(backend, 2)["stock"] == 50.0
+
+
+def test_drop_local_takes_server_value(backend):
+    mirror = StockMirror()
+    mirror.snapshot(backend)
+    row = dict(_server_row(backend, 3))
+    mirror.record_counts([_count(row, 1.0)])
+    _change_on_server(backend, row, 20.0)
+    mirror.sync(backend)
+
+    mirror.resolve(row["item_id"], row["supplier_id"], keep_local=False)
+    assert mirror.pending() == []
+    frame = mirror.frame().set_index("item_id")
+    assert frame.at[3, "stock"] == 20.0
+    assert frame.at[3, "version"] == _server_row(backend, 3)["version"]
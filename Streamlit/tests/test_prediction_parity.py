@@ -0,0 +1,42 @@
+"""
+예측 재고 엔진 일치: python 엔진과 sql 엔진(서버 함수 predicted_stocks, MemoryBackend 구현)이 같은 결과인지
+(prediction_parity.py 를 CI 에서 실행)
+"""
+import pytest
+
+import prediction_parity
+import stock_ops
+from db_backend import MemoryBackend, generate_demo_tables
+
+OFFSETS = (0, 1, 2, 3, 4, 5, 6, 14, 45)
+
+
+@pytest.fixture(scope="module")
+def backend():
+    return MemoryBackend(generate_demo_tables(n_items=150, n_history_orders=300, n_locations=2, seed=7))
+
+
+@pytest.mark.parametrize("location_id", [None, 2])
+def test_engines_agree(backend, location_id):
+    lines = []
+    assert prediction_parity.run(backend, location_id, offsets=OFFSETS, log=lines.append), "\n".join(lines)
+
+
+def test_engines_agree_after_weight_change(monkeypatch):
+    """요일 가중치를 바꿔도 (세 곳을 같이 고치면) 두 엔진이 같음"""
+    backend = MemoryBackend(generate_demo_tables(n_items=60, n_history_orders=100, seed=3))
+    factors = {0: 0.5, 2: 1.4, 5: 2.0}
+    monkeypatch.setattr(stock_ops, "WEEKDAY_FACTORS", factors)
+    for row in backend.tables["WEEKDAY_WEIGHTS"]:
+        row["weight"] = factors.get(row["weekday"], 1.0)
+    lines = []
+    assert prediction_parity.run(backend, offsets=OFFSETS, log=lines.append), "\n".join(lines)
+
+
+def test_compare_reports_drift(backend):
+    py = prediction_parity.predict_frame(backend, 1)
+    sql = prediction_parity.predict_frame_sql(backend, 1)
+    sql.loc[sql.index[0], "reorder_point"] += 1
+    summary, bad = prediction_parity.compare(py, sql)
+    assert len(bad) == 1
+    assert summary["max_diff_reorder_point"] == pytest.approx(1, abs=prediction_parity.TOLERANCE)
@@ -0,0 +1,89 @@
+"""
+조회 예산 테스트: 화면 한 번 그릴 때의 DB 요청 수가 데이터 양(배송 중인 주문 수)과 무관하게 예산 안인지
+
+MemoryBackend + QueryCounter(db_backend.py)로 요청 수를 센다. 예산은 매장 목록 1 + 발주 알림 + 배송 중인 주문 3.
+- 알림 워커(alert_worker.py)가 미리 계산해 둔 경우: 알림 2 (상태 + 미달 품목) -> 6
+- 워커가 돈 적이 없어 화면이 직접 계산하는 경우: 알림 4 (상태 + 재고 + 상세 + 리드타임) -> 8
+- 같은 세션에서 다시 그리면 공유 캐시로 0
+"""
+import os
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from alert_worker import compute_alerts, refresh_alerts
+from db_backend import MemoryBackend, QueryCounter, generate_demo_tables, set_backend
+from queries import load_shipping_orders
+from shared_cache import MemoryCache, set_cache
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECRETS = {"SUPABASE_URL": "http://memory", "SUPABASE_KEY": "test"}
+
+DASHBOARD_BUDGET = 6
+DASHBOARD_BUDGET_NO_WORKER = 8
+SHIPPING_BUDGET = 3
+ORDER_COUNTS = (3, 60)
+
+
+@pytest.fixture
+def backend_for():
+    """배송 중인 주문 n건인 메모리 백엔드를 앱 연결로 주입 (Streamlit 캐시와 공유 캐시는 비움)"""
+    def make(n_open_orders):
+        backend = MemoryBackend(generate_demo_tables(n_items=100, n_open_orders=n_open_orders))
+        set_backend(backend)
+        set_cache(MemoryCache())
+        st.cache_resource.clear()
+        st.cache_data.clear()
+        return backend
+    yield make
+    set_backend(None)
+    set_cache(None)
+
+
+def _render_dashboard(backend):
+    """대시보드.py 를 처음 그릴 때와 다시 그릴 때의 요청 수"""
+    at = AppTest.from_file(os.path.join(APP_DIR, "대시보드.py"), default_timeout=60)
+    at.secrets.update(SECRETS)
+    with QueryCounter(backend) as first:
+        at.run()
+    assert not at.exception, [e.value for e in at.exception]
+    with QueryCounter(backend) as again:
+        at.run()
+    return first.requests, again.requests
+
+
+@pytest.mark.parametrize("with_worker, budget", [(True, DASHBOARD_BUDGET), (False, DASHBOARD_BUDGET_NO_WORKER)])
+def test_dashboard_requests_do_not_grow_with_orders(backend_for, with_worker, budget):
+    counts = []
+    for n in ORDER_COUNTS:
+        backend = backend_for(n)
+        if with_worker:
+            refresh_alerts(backend)
+        first, again = _render_dashboard(backend)
+        assert first <= budget
+        assert again == 0
+        counts.append(first)
+    assert len(set(counts)) == 1, dict(zip(ORDER_COUNTS, counts))
+
+
+@pytest.mark.parametrize("n_open_orders", ORDER_COUNTS)
+def test_shipping_orders_budget(backend_for, n_open_orders):
+    backend = backend_for(n_open_orders)
+    with QueryCounter(backend) as qc:
+        orders, _ = load_shipping_orders(backend, 1)
+    assert len(orders) == n_open_orders
+    assert qc.requests <= SHIPPING_BUDGET
+
+
+def test_sql_engine_without_alerts_counts_rows_only(backend_for):
+    """미달 품목이 없을 때 재고 행 수는 head 요청으로만 셈 (재고 행을 내려받지 않음)"""
+    backend = backend_for(3)
+    for row in backend.tables["STOCKS"]:
+        row["stock"] = 1e6
+    with QueryCounter(backend) as qc:
+        alerts, item_count = compute_alerts(backend, engine="sql")
+    assert alerts.empty
+    assert item_count == len(backend.tables["STOCKS"])
+    assert qc.requests == 2
+    assert qc.rows == 0
@@ -0,0 +1,134 @@
+"""
+행 버전 조건부 쓰기(row_versions.py): 충돌 감지, 3-way 재병합 후 다시 반영, 실사 기록과 한 번에 쓰기
+"""
+import pytest
+
+import row_versions
+from db_backend import MemoryBackend, QueryCounter, generate_demo_tables
+from offline_mirror import StockMirror
+from row_versions import rebase, write_versioned
+
+
+@pytest.fixture
+def backend():
+    return MemoryBackend(generate_demo_tables(n_items=10, n_open_orders=0))
+
+
+def _detail(backend, item_id):
+    return next(r for r in backend.tables["SUPPLIER_DETAILS"] if r["item_id"] == item_id)
+
+
+def _stock(backend, item_id):
+    return next(r for r in backend.tables["STOCKS"] if r["item_id"] == item_id and r["location_id"] == 1)
+
+
+def _edit(row, **changes):
+    return {c: row[c] for c in ("item_id", "supplier_id", "MOQ", "safety_stock", "version")} | changes
+
+
+# --- [1. 일괄 쓰기] ---
+def test_write_bumps_version(backend):
+    base = dict(_detail(backend, 1))
+    assert write_versioned(backend, "SUPPLIER_DETAILS", [_edit(base, MOQ=7)]) == []
+    assert (_detail(backend, 1)["MOQ"], _detail(backend, 1)["version"]) == (7, base["version"] + 1)
+
+
+def test_stale_version_returns_server_row(backend):
+    base = dict(_detail(backend, 1))
+    write_versioned(backend, "SUPPLIER_DETAILS", [_edit(base, safety_stock=40)])
+
+    (conflict,) = write_versioned(backend, "SUPPLIER_DETAILS", [_edit(base, MOQ=9)])
+    assert conflict["key"] == (1, base["supplier_id"])
+    assert conflict["row"]["MOQ"] == 9
+    assert conflict["server"]["safety_stock"] == 40 and conflict["server"]["version"] == base["version"] + 1
+    assert _detail(backend, 1)["MOQ"] == base["MOQ"]
+
+
+def test_missing_version_inserts_new_rows_only(backend):
+    new = {"location_id": 1, "item_id": 1, "supplier_id": 99, "stock": 3.0}
+    existing = {"location_id": 1, "item_id": 2, "supplier_id": _stock(backend, 2)["supplier_id"], "stock": 4.0}
+    conflicts = write_versioned(backend, "STOCKS", [new, existing])
+    assert [c["key"] for c in conflicts] == [(1, 2, existing["supplier_id"])]
+    assert any(r["supplier_id"] == 99 for r in backend.tables["STOCKS"])
+
+
+def test_duplicate_keys_send_last_row(backend, monkeypatch):
+    monkeypatch.setattr(row_versions, "CHUNK_SIZE", 2)
+    rows = [_edit(dict(_detail(backend, i)), MOQ=i) for i in range(1, 6)]
+    with QueryCounter(backend) as qc:
+        assert write_versioned(backend, "SUPPLIER_DETAILS", rows + [{**rows[0], "MOQ": 100}]) == []
+    assert qc.by_table() == {("rpc", "write_supplier_details"): 3}
+    assert _detail(backend, 1)["MOQ"] == 100
+
+
+def test_counts_written_only_for_applied_rows(backend):
+    ok, stale = dict(_stock(backend, 1)), dict(_stock(backend, 2))
+    rows = [{**ok, "stock": 1.0}, {**stale, "stock": 2.0, "version": stale["version"] - 1}]
+    counts = [{"location_id": 1, "item_id": r["item_id"], "supplier_id": r["supplier_id"], "counted_stock": r["stock"]}
+              for r in rows]
+    with QueryCounter(backend) as qc:
+        conflicts = write_versioned(backend, "STOCKS", rows, counts=counts)
+    assert qc.by_table() == {("rpc", "write_stock_counts"): 1}
+    assert [c["key"][1] for c in conflicts] == [2]
+    assert [c["item_id"] for c in backend.tables["STOCK_COUNTS"]] == [1]
+
+
+# --- [2. 재병합] ---
+def test_rebase_keeps_server_changes_and_flags_clashes():
+    base = {"MOQ": 1, "safety_stock": 5, "order_unit": "박스", "version": 3}
+    mine = {"MOQ": 2, "safety_stock": 8, "order_unit": "박스", "version": 3}
+    server = {"MOQ": 1, "safety_stock": 10, "order_unit": "팩", "version": 4}
+    merged, clashes = rebase(mine, base, server)
+    assert merged == {"MOQ": 2, "safety_stock": 8, "order_unit": "팩", "version": 4}
+    assert clashes == ["safety_stock"]
+    assert rebase(mine, base, None) == (None, [])
+
+
+def test_conflict_round_trip(backend):
+    """관리자 편집 흐름: 충돌 -> 서버 값 위에 재병합 -> 다시 반영"""
+    base = dict(_detail(backend, 3))
+    write_versioned(backend, "SUPPLIER_DETAILS", [_edit(base, safety_stock=base["safety_stock"] + 10)])
+
+    (conflict,) = write_versioned(backend, "SUPPLIER_DETAILS", [_edit(base, MOQ=base["MOQ"] + 1)])
+    merged, clashes = rebase(conflict["row"], base, conflict["server"])
+    assert clashes == []
+    assert write_versioned(backend, "SUPPLIER_DETAILS", [merged]) == []
+
+    row = _detail(backend, 3)
+    assert (row["MOQ"], row["safety_stock"]) == (base["MOQ"] + 1, base["safety_stock"] + 10)
+    assert row["version"] == base["version"] + 2
+
+
+# --- [3. 오프라인 동기화 재시도] ---
+class _FlakyCounts:
+    """write_stock_counts 를 처음 한 번 실패시키는 클라이언트 (서버에 아무것도 반영되지 않은 상태)"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.failed = False
+
+    def table(self, name):
+        return self.backend.table(name)
+
+    def rpc(self, fn, params=None, **kwargs):
+        if fn == "write_stock_counts" and not self.failed:
+            self.failed = True
+            raise ConnectionError("timeout")
+        return self.backend.rpc(fn, params, **kwargs)
+
+
+def test_offline_sync_retry_does_not_conflict_with_itself(backend):
+    client = _FlakyCounts(backend)
+    mirror = StockMirror()
+    mirror.snapshot(client)
+    row = dict(_stock(backend, 4))
+    mirror.record_counts([{"item_id": 4, "supplier_id": row["supplier_id"], "stock": 2.5,
+                           "avg_consumption": row["avg_consumption"], "last_checked_at": "2026-01-05T09:00:00+00:00"}])
+
+    with pytest.raises(ConnectionError):
+        mirror.sync(client)
+    assert len(mirror.pending()) == 1 and not backend.tables["STOCK_COUNTS"]
+
+    assert mirror.sync(client) == {"synced": 1, "conflicts": 0}
+    assert _stock(backend, 4)["stock"] == 2.5
+    assert [c["counted_stock"] for c in backend.tables["STOCK_COUNTS"]] == [2.5]
@@ -0,0 +1,91 @@
+"""
+재고 전망(stock_projection.project_stock): 요일 가중치를 반영한 품절일, 발주 기한, 도착/지연/행사 what-if
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from stock_projection import in_transit, project_stock
+
+TODAY = date(2026, 3, 2)  # 월요일 -> 전망은 화요일(3/3)부터
+
+
+def _frame(*items):
+    """items: (item_id, 예측 재고, 일평균 소모량, 안전재고, 리드타임)"""
+    return pd.DataFrame([{
+        "item_id": i, "supplier_id": 1, "category": "원두", "item_name": f"품목{i}", "base_unit": "개",
+        "predicted_stock": stock, "avg_consumption": avg, "safety_stock": safety, "lead_days": lead,
+    } for i, stock, avg, safety, lead in items])
+
+
+def _ship(*rows):
+    return pd.DataFrame([{"item_id": i, "supplier_id": 1, "qty": qty, "eta": pd.Timestamp(eta)} for i, qty, eta in rows],
+                        columns=["item_id", "supplier_id", "qty", "eta"])
+
+
+def _row(summary, item_id):
+    return summary.set_index("item_id").loc[item_id]
+
+
+def test_stockout_and_order_by_dates():
+    # 하루 2개 소모, 금 x1.2 토 x1.5: 화 8, 수 6, 목 4, 금 1.6, 토 0
+    frame = _frame((1, 10.0, 2.0, 5.0, 2.0), (2, 10.0, 0.0, 0.0, 2.0), (3, 1.0, 2.0, 0.0, 3.0))
+    stock, dates, summary = project_stock(frame, _ship(), TODAY, days=7)
+
+    assert dates[0] == pd.Timestamp("2026-03-03")
+    np.testing.assert_allclose(stock[0, :5], [8.0, 6.0, 4.0, 1.6, 0.0])
+    a = _row(summary, 1)
+    assert a["stockout_date"] == pd.Timestamp("2026-03-07")
+    assert a["below_safety_date"] == pd.Timestamp("2026-03-05")
+    assert a["order_by"] == pd.Timestamp("2026-03-05")  # 품절일 - 리드타임 2일
+
+    # 소모가 없으면 품절 없음
+    assert pd.isna(_row(summary, 2)["stockout_date"]) and pd.isna(_row(summary, 2)["order_by"])
+    # 발주 기한이 이미 지났으면 오늘
+    c = _row(summary, 3)
+    assert c["stockout_date"] == pd.Timestamp("2026-03-03")
+    assert c["order_by"] == pd.Timestamp(TODAY)
+
+
+def test_arrival_after_stockout_starts_from_zero():
+    frame = _frame((1, 1.0, 2.0, 0.0, 2.0))
+    stock, _, summary = project_stock(frame, _ship((1, 5.0, "2026-03-05")), TODAY, days=3)
+    # 품절된 동안의 부족분은 빚으로 남지 않음
+    np.testing.assert_allclose(stock[0], [0.0, 0.0, 3.0])
+    assert _row(summary, 1)["incoming"] == 5.0
+
+
+def test_incoming_order_delays_stockout_unless_supplier_late():
+    frame = _frame((1, 10.0, 2.0, 0.0, 2.0))
+    ship = _ship((1, 10.0, "2026-03-05"))
+    _, _, base = project_stock(frame, _ship(), TODAY, days=14)
+    _, _, arriving = project_stock(frame, ship, TODAY, days=14)
+    _, _, late = project_stock(frame, ship, TODAY, days=14, supplier_delays={1: 30})
+
+    assert _row(arriving, 1)["stockout_date"] > _row(base, 1)["stockout_date"]
+    # 기간 밖으로 밀린 도착은 없는 것과 같음
+    assert _row(late, 1)["stockout_date"] == _row(base, 1)["stockout_date"]
+    assert _row(late, 1)["incoming"] == 0
+    # 공급처 지연만큼 발주 기한도 당겨짐 (이미 지났으면 오늘)
+    assert _row(late, 1)["order_by"] == pd.Timestamp(TODAY)
+
+
+def test_promotion_brings_stockout_forward():
+    frame = _frame((1, 10.0, 2.0, 0.0, 2.0))
+    _, _, base = project_stock(frame, _ship(), TODAY, days=7)
+    _, _, promo = project_stock(frame, _ship(), TODAY, days=7, events=[(date(2026, 3, 3), date(2026, 3, 4), 2.0, ["원두"])])
+    _, _, other = project_stock(frame, _ship(), TODAY, days=7, events=[(date(2026, 3, 3), date(2026, 3, 4), 2.0, ["유제품"])])
+
+    assert _row(promo, 1)["stockout_date"] == pd.Timestamp("2026-03-05")  # 화 6, 수 2, 목 0
+    assert _row(other, 1)["stockout_date"] == _row(base, 1)["stockout_date"]
+
+
+def test_overdue_shipment_arrives_tomorrow():
+    frame = _frame((1, 10.0, 1.0, 0.0, 2.0))
+    orders = pd.DataFrame({"order_id": [7, 8], "ordered_at": ["2026-02-01T01:00:00+00:00", "2026-03-02T01:00:00+00:00"]})
+    lines = pd.DataFrame({"order_id": [7, 8], "item_id": 1, "supplier_id": 1, "actual_qty": [2, 1],
+                          "conversion_factor": [6, 6]})
+    ship = in_transit(orders, lines, frame, TODAY)
+    assert ship["eta"].tolist() == [pd.Timestamp("2026-03-03"), pd.Timestamp("2026-03-04")]
+    assert ship["qty"].tolist() == [12.0, 6.0]
@@ -0,0 +1,23 @@
+"""
+요일 가중치 세 곳(stock_ops.WEEKDAY_FACTORS, db_backend.DEFAULT_WEEKDAY_WEIGHTS, predicted_stocks.sql 초기값)이 같은지
+"""
+import os
+import re
+
+from db_backend import DEFAULT_WEEKDAY_WEIGHTS
+from stock_ops import WEEKDAY_FACTORS
+
+SQL_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "DataBase", "Functions", "predicted_stocks.sql")
+
+
+def _sql_weights():
+    with open(SQL_PATH, encoding="utf-8") as f:
+        sql = f.read()
+    values = re.search(r'insert into "WEEKDAY_WEIGHTS" \(weekday, weight\)\s*values (.*?)\s*on conflict', sql, re.S)
+    return {int(d): float(w) for d, w in re.findall(r"\((\d), ([\d.]+)\)", values.group(1))}
+
+
+def test_weekday_weights_match():
+    python = {d: WEEKDAY_FACTORS.get(d, 1.0) for d in range(7)}
+    memory = {int(w["weekday"]): float(w["weight"]) for w in DEFAULT_WEEKDAY_WEIGHTS}
+    assert python == memory == _sql_weights()
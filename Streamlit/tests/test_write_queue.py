@@ -0,0 +1,183 @@
+"""
+쓰기 지연 큐(write_queue.py): 같은 품목 실사 합치기, idem_key 재전송, 임대(owner/lease) 기반 가져가기, 행 버전 충돌
+"""
+import sqlite3
+import time
+
+import pytest
+
+import write_queue
+from db_backend import MemoryBackend, QueryCounter, generate_demo_tables
+from write_queue import DONE, FAILED, INFLIGHT, PENDING, WriteQueue
+
+
+@pytest.fixture
+def backend():
+    return MemoryBackend(generate_demo_tables(n_items=10, n_open_orders=3))
+
+
+@pytest.fixture
+def queue(backend, tmp_path):
+    return WriteQueue(backend, str(tmp_path / "queue.sqlite3"))
+
+
+def _stock(backend, item_id):
+    return next(r for r in backend.tables["STOCKS"] if r["item_id"] == item_id and r["location_id"] == 1)
+
+
+def _count_row(backend, item_id, stock, version=None):
+    row = _stock(backend, item_id)
+    return {"location_id": 1, "item_id": item_id, "supplier_id": row["supplier_id"], "stock": stock,
+            "avg_consumption": row["avg_consumption"], "last_checked_at": "2026-01-05T09:00:00+00:00",
+            "version": row["version"] if version is None else version}
+
+
+def _statuses(queue):
+    with sqlite3.connect(queue.path) as conn:
+        return dict(conn.execute("select id, status from mutations order by id").fetchall())
+
+
+# --- [1. 합치기] ---
+def test_stock_counts_coalesce_to_latest_value(backend, queue):
+    queue.enqueue("stock_count", {"rows": [_count_row(backend, 1, 10.0), _count_row(backend, 2, 20.0)]})
+    queue.enqueue("stock_count", {"rows": [_count_row(backend, 1, 11.0)]})
+
+    with QueryCounter(backend) as qc:
+        assert queue.flush() == 2
+    assert qc.by_table() == {("rpc", "write_stock_counts"): 1}
+    assert (_stock(backend, 1)["stock"], _stock(backend, 2)["stock"]) == (11.0, 20.0)
+    # 실사 기록도 품목마다 마지막 값 한 건
+    assert sorted((c["item_id"], c["counted_stock"]) for c in backend.tables["STOCK_COUNTS"]) == [(1, 11.0), (2, 20.0)]
+    assert set(_statuses(queue).values()) == {DONE}
+
+
+def test_receive_orders_batch_into_one_call(backend, queue):
+    open_ids = [o["order_id"] for o in backend.tables["PURCHASE_ORDERS"] if o["status"] == "배송중"]
+    for order_id in open_ids:
+        queue.enqueue("receive_order", {"order_id": order_id, "location_id": 1})
+
+    with QueryCounter(backend) as qc:
+        assert queue.flush() == len(open_ids)
+    assert qc.by_table() == {("rpc", "receive_orders"): 1}
+    assert all(o["status"] == "입고완료" for o in backend.tables["PURCHASE_ORDERS"] if o["order_id"] in open_ids)
+
+
+# --- [2. 중복 요청] ---
+def test_same_idem_key_returns_existing_mutation(backend, queue):
+    order = {"location_id": 1, "supplier_id": 1, "total_price": 5000, "items": [{"item_id": 1, "actual_qty": 2}]}
+    first = queue.enqueue("place_order", order, idem_key="click-1")
+    assert queue.enqueue("place_order", order, idem_key="click-1") == first
+    queue.flush()
+    # 처리가 끝난 뒤 다시 눌러도 완료 요청이 남아 있는 동안은 새 주문이 생기지 않음
+    assert queue.enqueue("place_order", order, idem_key="click-1") == first
+    assert queue.flush() == 0
+    assert len([o for o in backend.tables["PURCHASE_ORDERS"] if o["total_price"] == 5000]) == 1
+
+
+class _FailingItems:
+    """PURCHASE_ITEMS insert 를 처음 한 번만 실패시키는 클라이언트"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.failed = False
+
+    def table(self, name):
+        if name == "PURCHASE_ITEMS" and not self.failed:
+            self.failed = True
+            raise ConnectionError("timeout")
+        return self.backend.table(name)
+
+    def rpc(self, *args, **kwargs):
+        return self.backend.rpc(*args, **kwargs)
+
+
+def test_place_order_retry_reuses_saved_order_id(backend, tmp_path):
+    queue = WriteQueue(_FailingItems(backend), str(tmp_path / "queue.sqlite3"))
+    before = len(backend.tables["PURCHASE_ORDERS"])
+    mutation_id = queue.enqueue("place_order", {"location_id": 1, "supplier_id": 2, "total_price": 7000,
+                                                "items": [{"item_id": 3, "actual_qty": 1}]})
+    queue.flush()
+    (pending,) = queue.status()
+    assert pending["status"] == PENDING and pending["payload"]["order_id"] is not None
+
+    with sqlite3.connect(queue.path) as conn:
+        conn.execute("update mutations set next_attempt_at = 0 where id = ?", (mutation_id,))
+    queue.flush()
+    assert _statuses(queue) == {mutation_id: DONE}
+    assert len(backend.tables["PURCHASE_ORDERS"]) == before + 1
+    assert [i["item_id"] for i in backend.tables["PURCHASE_ITEMS"] if i["order_id"] == pending["payload"]["order_id"]] == [3]
+
+
+# --- [3. 임대] ---
+def test_claim_is_exclusive_until_lease_expires(backend, queue):
+    other = WriteQueue(backend, queue.path)
+    mutation_id = queue.enqueue("receive_order", {"order_id": 1, "location_id": 1})
+
+    assert [m["id"] for m in queue._claim()] == [mutation_id]
+    assert other._claim() == []
+    with sqlite3.connect(queue.path) as conn:
+        assert conn.execute("select status, owner from mutations").fetchone() == (INFLIGHT, queue.owner)
+
+    # 새 워커가 떠도 임대 중인 요청은 그대로
+    WriteQueue(backend, queue.path)
+    assert other._claim() == []
+
+    # 임대가 끝나면 다른 워커가 가져감
+    with sqlite3.connect(queue.path) as conn:
+        conn.execute("update mutations set lease_until = ?", (time.time() - 1,))
+    assert [m["id"] for m in other._claim()] == [mutation_id]
+    with sqlite3.connect(queue.path) as conn:
+        assert conn.execute("select owner from mutations").fetchone() == (other.owner,)
+
+
+def test_startup_requeues_expired_inflight(backend, queue):
+    queue.enqueue("receive_order", {"order_id": 1, "location_id": 1})
+    queue._claim()
+    with sqlite3.connect(queue.path) as conn:
+        conn.execute("update mutations set lease_until = ?", (time.time() - 1,))
+    WriteQueue(backend, queue.path)
+    with sqlite3.connect(queue.path) as conn:
+        assert conn.execute("select status, owner from mutations").fetchone() == (PENDING, None)
+
+
+def test_purge_done_keeps_recent(backend, queue):
+    old = queue.enqueue("receive_order", {"order_id": 1, "location_id": 1})
+    recent = queue.enqueue("receive_order", {"order_id": 2, "location_id": 1})
+    queue.flush()
+    with sqlite3.connect(queue.path) as conn:
+        conn.execute("update mutations set updated_at = ? where id = ?", (time.time() - write_queue.DONE_RETENTION - 1, old))
+    queue.purge_done()
+    assert list(_statuses(queue)) == [recent]
+
+
+# --- [4. 행 버전 충돌] ---
+def test_conflict_is_rejected_then_rebased(backend, queue):
+    stale = _stock(backend, 1)["version"]
+    (backend.table("STOCKS").update({"stock": 99.0})
+     .eq("location_id", 1).eq("item_id", 1).eq("supplier_id", _stock(backend, 1)["supplier_id"]).execute())
+    mutation_id = queue.enqueue("stock_count", {"rows": [_count_row(backend, 1, 5.0, version=stale),
+                                                         _count_row(backend, 2, 6.0)]})
+    queue.flush()
+
+    # 충돌한 행만 서버 값과 함께 실패로 남고, 재시도하지 않음
+    (failed,) = queue.status()
+    assert (failed["id"], failed["status"], failed["attempts"]) == (mutation_id, FAILED, 1)
+    assert [r["item_id"] for r in failed["payload"]["rows"]] == [1]
+    assert failed["payload"]["server"][0]["stock"] == 99.0
+    assert (_stock(backend, 1)["stock"], _stock(backend, 2)["stock"]) == (99.0, 6.0)
+    assert queue.flush() == 0
+
+    # 서버 현재 버전 기준으로 내 실사값을 다시 반영
+    queue.rebase(mutation_id)
+    queue.flush()
+    assert _statuses(queue) == {mutation_id: DONE}
+    assert _stock(backend, 1)["stock"] == 5.0
+
+
+def test_discard_conflict(backend, queue):
+    stale = _stock(backend, 3)["version"] - 1
+    mutation_id = queue.enqueue("stock_count", {"rows": [_count_row(backend, 3, 1.0, version=stale)]})
+    queue.flush()
+    assert _statuses(queue) == {mutation_id: FAILED}
+    queue.discard(mutation_id)
+    assert _statuses(queue) == {}
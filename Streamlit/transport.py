@@ -0,0 +1,207 @@
+"""
+DB 요청 전송 계층
+
+db_backend.connect() 가 돌려주는 클라이언트는 이 계층으로 감싸져 있어 모든 execute() 가 여기를 지난다.
+앱 프로세스 하나가 클라이언트 하나를 공유하므로(views._connection) 아래 제한과 공유도 프로세스 단위다.
+
+- 연결 풀: Supabase 클라이언트의 httpx.Client 를 keep-alive 풀 크기를 정해서 만든다 (http_client)
+- 동시 요청 제한: DB로 동시에 나가는 요청을 max_in_flight 개로 제한 (세마포어)
+- 재시도: 조회(select)와 여러 번 실행해도 결과가 같은 서버 함수(IDEMPOTENT_RPCS)만 연결 오류/타임아웃/
+  429·502·503·504·520 응답일 때 full jitter 지수 백오프로 다시 보낸다. 쓰기(insert/update/upsert/delete)와
+  그 밖의 서버 함수는 한 번만 보내고, 실패는 쓰기 큐(write_queue.py)가 재시도한다
+- 단일 비행(single-flight): 같은 조회가 이미 진행 중이면 새로 보내지 않고 그 결과를 함께 받는다
+  (캐시가 비었을 때 여러 세션이 동시에 같은 화면을 열어도 요청 1번)
+
+설정: INVENTORY_DB_POOL (동시 요청/연결 수, 기본 10), INVENTORY_DB_RETRIES (재시도 횟수, 기본 3)
+"""
+import copy
+import json
+import os
+import random
+import threading
+import time
+
+POOL_ENV = "INVENTORY_DB_POOL"
+RETRIES_ENV = "INVENTORY_DB_RETRIES"
+DEFAULT_POOL = 10
+DEFAULT_RETRIES = 3
+BACKOFF_BASE = 0.2  # 첫 재시도 대기 상한(초)
+BACKOFF_CAP = 3.0
+KEEPALIVE_EXPIRY = 60.0  # 쉬는 연결을 유지하는 시간(초)
+
+# 다시 실행해도 결과가 같은 서버 함수 (조회 함수 + 배송중 주문만 처리하는 receive_orders, 집계 재계산)
+READ_RPCS = {"spend_by_supplier_month", "spend_by_category_month", "top_items_by_spend", "forecast_error_stats",
+             "predicted_stocks"}
+IDEMPOTENT_RPCS = READ_RPCS | {"receive_orders", "refresh_purchase_spend", "refresh_lead_times"}
+TRANSIENT_STATUS = {"429", "502", "503", "504", "520"}
+
+_BUILDER_OPS = ("select", "insert", "update", "upsert", "delete")
+
+
+def is_transient(exc):
+    """다시 보내면 성공할 수 있는 오류인지 (연결 끊김, 타임아웃, 게이트웨이/과부하 응답)"""
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        import httpx
+        if isinstance(exc, httpx.TransportError):
+            return True
+    except ImportError:
+        pass
+    return str(getattr(exc, "code", "")) in TRANSIENT_STATUS
+
+
+def backoff_delay(attempt):
+    """attempt 번째 실패 후 대기 시간 (full jitter)"""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** (attempt - 1))))
+
+
+def http_client(max_connections=None):
+    """keep-alive 연결 풀을 가진 httpx.Client (Supabase ClientOptions(httpx_client=...) 용)"""
+    import httpx
+
+    n = max_connections or int(os.environ.get(POOL_ENV, DEFAULT_POOL))
+    return httpx.Client(
+        limits=httpx.Limits(max_connections=n, max_keepalive_connections=n, keepalive_expiry=KEEPALIVE_EXPIRY),
+        timeout=httpx.Timeout(30.0, connect=5.0),
+    )
+
+
+class _Flight:
+    """진행 중인 조회 하나. 같은 조회를 기다리는 호출들이 결과(또는 예외)를 함께 받는다"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.waiters = 0
+        self.result = None
+        self.error = None
+
+
+class _Request:
+    """table()/rpc() 빌더를 감싸서 호출한 메서드를 기록 (단일 비행 키) 하고 execute() 를 전송 계층으로 보냄"""
+
+    def __init__(self, transport, builder, label, op="select", calls=()):
+        self._transport = transport
+        self._builder = builder
+        self._label = label
+        self._op = op
+        self._calls = calls
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if hasattr(result, "execute"):
+                op = name if name in _BUILDER_OPS else self._op
+                return _Request(self._transport, result, self._label, op, self._calls + ((name, args, kwargs),))
+            return result
+        return call
+
+    @property
+    def retryable(self):
+        return self._op == "select" or (self._op == "rpc" and self._label in IDEMPOTENT_RPCS)
+
+    def flight_key(self):
+        """함께 받아도 되는 조회면 요청 내용 키, 아니면 None"""
+        if self._op == "select" or (self._op == "rpc" and self._label in READ_RPCS):
+            return json.dumps([self._op, self._label, self._calls], sort_keys=True, ensure_ascii=False, default=str)
+        return None
+
+    def execute(self):
+        return self._transport.execute(self)
+
+
+class Transport:
+    """동시 요청 제한 + 재시도 + 단일 비행. stats: 보낸 요청/재시도/함께 받은 조회 수"""
+
+    def __init__(self, max_in_flight=None, retries=None, sleep=time.sleep):
+        self.max_in_flight = max_in_flight or int(os.environ.get(POOL_ENV, DEFAULT_POOL))
+        self.retries = int(os.environ.get(RETRIES_ENV, DEFAULT_RETRIES)) if retries is None else retries
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._sleep = sleep
+        self.stats = {"sent": 0, "retries": 0, "shared": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _send(self, request):
+        builder = request._builder
+        if hasattr(builder, "retry"):
+            # postgrest 자체 재시도(GET 503/520만)는 끄고 여기서 한 번에 관리
+            builder.retry(False)
+        attempts = 1 + (self.retries if request.retryable else 0)
+        for attempt in range(1, attempts + 1):
+            with self._slots:
+                self._count("sent")
+                try:
+                    return builder.execute()
+                except Exception as e:
+                    if attempt == attempts or not is_transient(e):
+                        raise
+            self._count("retries")
+            self._sleep(backoff_delay(attempt))
+
+    def execute(self, request):
+        key = request.flight_key()
+        if key is None:
+            return self._send(request)
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.waiters += 1
+        if not leader:
+            flight.done.wait()
+            self._count("shared")
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+
+        result = None
+        try:
+            result = self._send(request)
+            return result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                waiters = flight.waiters
+            if waiters and flight.error is None:
+                # 먼저 보낸 쪽이 결과를 고쳐 쓰기 전에 기다리던 쪽에 줄 사본을 떠 둠
+                flight.result = copy.deepcopy(result)
+            flight.done.set()
+
+
+class PooledClient:
+    """supabase 클라이언트(또는 MemoryBackend)를 Transport 로 감싼 것. 그 밖의 속성은 원래 클라이언트로 위임"""
+
+    def __init__(self, client, transport=None):
+        self._client = client
+        self.transport = transport or Transport()
+
+    def table(self, name):
+        return _Request(self.transport, self._client.table(name), name)
+
+    def from_(self, name):
+        return self.table(name)
+
+    def rpc(self, fn, params=None, **kwargs):
+        return _Request(self.transport, self._client.rpc(fn, params, **kwargs), fn, "rpc", ((fn, (params,), kwargs),))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def pooled(client, transport=None):
+    return client if isinstance(client, PooledClient) else PooledClient(client, transport)
@@ -0,0 +1,113 @@
+"""
+화면(page) 모듈
+
+진입 스크립트(완성.py, 대시보드.py, 재고체크.py, 품목등록.py, Order_Page.py)는 bootstrap() 으로
+연결/쓰기 큐/매장 선택을 준비하고, 열린 화면의 모듈만 render_page() 로 import 해서 그린다.
+무거운 의존성(엑셀 읽기, 오프라인 미러, 분석 차트 등)은 그 화면을 처음 열 때 불러온다.
+
+각 화면 모듈은 render(ctx) 하나를 제공한다.
+ctx: {"supabase": DB 클라이언트, "write_queue": WriteQueue, "location_id": 선택한 매장}
+"""
+import importlib
+
+import streamlit as st
+
+from db_backend import connect
+from locations import select_location
+from profiler import traced, stage, start_run, finish_run, render_sidebar
+from write_queue import WriteQueue, render_queue_status
+
+# 탭 이름 -> 화면 모듈 (완성.py 의 탭 순서)
+PAGES = {
+    "실시간 대시보드": "views.dashboard",
+    "발주 관리": "views.ordering",
+    "재고 실사": "views.stock_check",
+    "구매 분석": "views.purchase_analysis",
+    "마스터 관리창": "views.admin",
+}
+
+APP_CSS = """
+    <style>
+    /* 1. 최상단 메인 제목 (st.title) 스타일 */
+    .stApp h1 {
+        font-size: 28px !important;
+        font-weight: 700 !important;
+        padding-top: 0px !important;
+        padding-bottom: 15px !important;
+    }
+    /* 상단 탭 메뉴(실시간 대시보드, 발주 관리 등)의 글자 크기 조절 */
+    .stTabs [data-baseweb="tab"] p {
+        font-size: 18px !important;
+    }
+    /* Primary 버튼 색상을 강렬한 빨간색에서 차분한 네이비 블루로 변경 */
+    div.stButton > button[kind="primary"] {
+        background-color: #2E4053;
+        color: white;
+        border-color: #2E4053;
+    }
+    div.stButton > button[kind="primary"]:hover {
+        background-color: #1B2631;
+        border-color: #1B2631;
+    }
+    /* 수량 조절 버튼 크기 미세 조정 */
+    .stButton button { font-size: 12px; padding: 2px 5px; }
+    </style>
+"""
+
+
+@st.cache_resource
+def _connection(url, key):
+    # 모든 DB 호출이 프로파일러에 기록되도록 계측 래퍼로 감쌈
+    return traced(connect(url, key))
+
+
+@st.cache_resource
+def _write_queue(_supabase):
+    # 입고/실사/발주 쓰기는 로컬 큐에 기록하고 백그라운드 워커가 모아서 반영
+    return WriteQueue(_supabase).start()
+
+
+def bootstrap(run_name, page_title):
+    """페이지 설정, DB 연결, 쓰기 큐, 사이드바 매장 선택. 반환값: ctx"""
+    start_run(run_name)
+    st.set_page_config(page_title=page_title, layout="wide")
+    st.markdown(APP_CSS, unsafe_allow_html=True)
+    supabase = _connection(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
+    return {
+        "supabase": supabase,
+        "write_queue": _write_queue(supabase),
+        # 재고/발주/알림/분석은 모두 사이드바에서 고른 매장 기준으로 조회
+        "location_id": select_location(supabase),
+    }
+
+
+def lazy_tabs(labels, key):
+    """선택한 탭만 실행할 수 있는 탭. 반환값: [(라벨, 탭, 열림 여부)]
+
+    탭 상태(on_change="rerun")를 지원하지 않는 Streamlit 에서는 예전처럼 모든 탭을 실행.
+    """
+    try:
+        tabs = st.tabs(labels, key=key, on_change="rerun")
+    except TypeError:
+        tabs = st.tabs(labels)
+    return [(label, tab, getattr(tab, "open", None) is not False) for label, tab in zip(labels, tabs)]
+
+
+def item_filter(index, key):
+    """품목 검색어(초성 가능) + 카테고리 선택. 반환값: (검색어, 카테고리 또는 None)"""
+    c1, c2 = st.columns([3, 1])
+    query = c1.text_input("품목 검색", key=f"{key}_query", placeholder="품목명 또는 초성 (예: ㅇㅁㄹ)")
+    category = c2.selectbox("카테고리", ["전체"] + index.category_list(), key=f"{key}_category")
+    return query.strip(), (None if category == "전체" else category)
+
+
+def render_page(name, ctx):
+    """화면 모듈을 (처음이면) import 해서 그림"""
+    with stage(f"render:{name}"):
+        importlib.import_module(PAGES[name]).render(ctx)
+
+
+def finish(ctx):
+    """쓰기 큐 상태, 성능 측정 결과 기록 및 사이드바 프로파일러"""
+    render_queue_status(ctx["write_queue"])
+    render_sidebar(finish_run())
@@ -0,0 +1,197 @@
+"""
+마스터 관리창
+
+신규 품목/공급처 단건 등록, CSV/엑셀 일괄 등록(catalog_import.py), DB 테이블 직접 수정,
+변경 이력 조회(audit_log.py). 하위 탭도 선택한 탭만 실행한다.
+
+테이블 직접 수정은 바뀐 행만 보낸다. STOCKS, SUPPLIER_DETAILS 는 읽었을 때의 행 버전과 함께 보내서
+그 사이 다른 곳(실사, 입고, 다른 관리자)에서 바뀐 행은 덮어쓰지 않고 서버 현재 값과 함께 보여준 뒤
+내 변경을 서버 값 위에 다시 얹어(재병합) 반영할 수 있다 (row_versions.py).
+"""
+import pandas as pd
+import streamlit as st
+
+from audit_log import render_audit_log
+from catalog_import import register_item, render_bulk_import
+from item_search import load_search_index
+from row_versions import VERSIONED_TABLES, changed_columns, rebase, row_key, write_versioned
+from shared_cache import invalidate, table_scopes
+from views import item_filter, lazy_tabs
+
+NEW_SUPPLIER = "+ 신규 공급처 직접 입력"
+EDITABLE_TABLES = ["ITEMS", "STOCKS", "SUPPLIERS", "SUPPLIER_DETAILS", "PURCHASE_ORDERS", "PURCHASE_ITEMS", "LOCATIONS"]
+# 품목 검색으로 행을 좁힐 수 있는 테이블: 품목 id 컬럼
+ITEM_COLUMNS = {"ITEMS": "id", "STOCKS": "item_id", "SUPPLIER_DETAILS": "item_id", "PURCHASE_ITEMS": "item_id"}
+
+
+def render_registration(supabase):
+    st.subheader("품목 등록")
+    # 기존 공급처 목록 로드
+    res_sup = supabase.table("SUPPLIERS").select("id, name").execute()
+    sup_dict = {s['name']: s['id'] for s in res_sup.data}
+    sup_list = [NEW_SUPPLIER] + list(sup_dict.keys())
+
+    with st.form("new_registration_form", clear_on_submit=False):
+        c1, c2 = st.columns(2)
+
+        with c1:
+            st.markdown("### **기본 정보**")
+            sel_sup = st.selectbox("공급처 선택", options=sup_list)
+            new_sup_name = st.text_input("신규 공급처 이름 (신규 선택 시 필수)")
+            item_name = st.text_input("품목 이름 (예: 원두 1kg)")
+            category = st.text_input("카테고리 (예: 시럽)")
+
+        with c2:
+            st.markdown("### **발주 설정**")
+            order_url = st.text_input("주문 URL (선택 사항)")
+            order_unit = st.text_input("주문 단위 (예: 박스, 팩)")
+            moq = st.number_input("MOQ (최소 주문 수량)", min_value=1, value=1)
+            unit_price = st.number_input("주문 단위당 가격 (원)", min_value=0, step=100)
+            barcode = st.text_input("바코드 (선택 사항, 스캔 1회 = 재고 관리 단위 1개)")
+
+        st.divider() # --- 구분선 ---
+
+        st.markdown("### **재고 및 단위 환산 설정**")
+        cc1, cc2, cc3 = st.columns(3)
+        # 사장님 요청 순서: 재고관리단위 -> 환산계수 -> 안전재고
+        base_unit = cc1.text_input("재고 관리 단위 (예: 개, g, ml)")
+        conv_factor = cc2.number_input("환산 계수 (1주문단위당 낱개 수)", min_value=1, value=1)
+        safety_stock = cc3.number_input("안전재고 (낱개 기준)", min_value=0)
+
+        if st.form_submit_button("전체 데이터 등록 실행", type="primary"):
+            # --- [필수 값 검증 로직] ---
+            # URL, 바코드를 제외한 모든 필드가 채워졌는지 확인
+            is_sup_valid = sel_sup != NEW_SUPPLIER or bool(new_sup_name)
+            required_fields = [item_name, category, order_unit, base_unit]
+
+            if not all(required_fields) or not is_sup_valid:
+                st.error("🚨 오류: 주문 URL을 제외한 모든 항목을 정확히 입력해주세요.")
+                return
+            try:
+                register_item(
+                    supabase,
+                    new_sup_name if sel_sup == NEW_SUPPLIER else sup_dict[sel_sup],
+                    item_name, category,
+                    {
+                        "order_url": order_url,
+                        "order_unit": order_unit,
+                        "MOQ": moq,
+                        "order_unit_price": unit_price,
+                        "safety_stock": safety_stock,
+                        "base_unit": base_unit,
+                        "conversion_factor": conv_factor,
+                        "barcode": barcode.strip() or None,
+                    },
+                )
+                st.success(f"✅ '{item_name}' 등록이 완료되었습니다!")
+                st.balloons()
+            except Exception as e:
+                st.error(f"❌ 등록 중 오류 발생: {e}")
+
+
+def _records(df):
+    """NaN -> None 으로 바꿔 JSON으로 보낼 수 있는 dict 목록"""
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def changed_rows(before, after):
+    """데이터 에디터 편집 전후 비교: 값이 바뀌었거나 새로 추가된 행만 (dict 목록)"""
+    old = before.reindex(index=after.index, columns=after.columns)
+    same = (after == old) | (after.isna() & old.isna())
+    return _records(after[~after.index.isin(before.index) | ~same.all(axis=1)])
+
+
+def render_conflicts(supabase, table, location_id, state_key):
+    """행 버전 충돌: 내 변경과 서버 현재 값을 보여주고, 재병합해서 다시 반영하거나 내 변경을 버림"""
+    conflicts = st.session_state[state_key]
+    st.warning(f"⚠️ 다른 곳에서 먼저 수정된 {len(conflicts)}개 행은 반영하지 않았습니다. 서버 현재 값을 확인하세요.")
+    view, merged = [], []
+    for c in conflicts:
+        row, clashes = rebase(c["row"], c["base"], c["server"])
+        if row is not None:
+            merged.append((c, row))
+        for col in changed_columns(c["row"], c["base"]):
+            view.append({
+                "행": ", ".join(map(str, c["key"])), "칼럼": col, "원래 값": c["base"].get(col),
+                "내 값": c["row"][col], "서버 현재 값": "삭제됨" if c["server"] is None else c["server"].get(col),
+                "양쪽 모두 변경": col in clashes,
+            })
+    st.dataframe(pd.DataFrame(view).astype(str), use_container_width=True, hide_index=True)
+    st.caption("재병합: 서버 현재 값을 기준으로 내가 바꾼 칼럼만 다시 적용합니다 (양쪽 모두 바꾼 칼럼은 내 값, 삭제된 행은 제외).")
+
+    c1, c2 = st.columns(2)
+    if c1.button("재병합 후 다시 반영", type="primary", disabled=not merged, use_container_width=True):
+        try:
+            bases = {c["key"]: c["server"] for c, _ in merged}
+            again = write_versioned(supabase, table, [row for _, row in merged])
+            invalidate(*table_scopes(table, location_id))
+        except Exception as e:
+            st.error(f"❌ 반영 실패: {e}")
+            return
+        if again:
+            # 그 사이 또 바뀐 행: 방금 기준으로 삼은 서버 값이 새 원래 값
+            st.session_state[state_key] = [{**c, "base": bases[c["key"]]} for c in again]
+        else:
+            del st.session_state[state_key]
+        st.rerun()
+    if c2.button("내 변경 버리기", use_container_width=True):
+        del st.session_state[state_key]
+        st.rerun()
+
+
+def render_table_editor(supabase, location_id):
+    st.subheader("🛠️ DB 테이블 즉시 편집")
+    target_tab = st.selectbox("수정할 테이블 선택", EDITABLE_TABLES)
+
+    # 매장별 테이블은 선택한 매장 행만 표시
+    q_admin = supabase.table(target_tab).select("*")
+    if target_tab in ("STOCKS", "PURCHASE_ORDERS"):
+        q_admin = q_admin.eq("location_id", location_id)
+    df = pd.DataFrame(q_admin.execute().data)
+
+    item_col = ITEM_COLUMNS.get(target_tab)
+    if item_col and not df.empty:
+        index = load_search_index(supabase)
+        query, category = item_filter(index, "admin_search")
+        if query or category:
+            df = df[df[item_col].isin(set(index.search(query, category, limit=None)))]
+
+    # version(행 버전)은 서버 트리거가 올리므로 편집 불가
+    edited_df = st.data_editor(df, num_rows="dynamic", use_container_width=True, key=f"admin_editor_{target_tab}",
+                               disabled=["version"] if "version" in df.columns else False)
+
+    conflict_key = f"admin_conflicts_{target_tab}"
+    if st.button(f"{target_tab} 데이터 반영", type="primary"):
+        rows = changed_rows(df, edited_df)
+        if not rows:
+            st.info("바뀐 행이 없습니다.")
+            return
+        try:
+            if target_tab in VERSIONED_TABLES:
+                base = {row_key(target_tab, r): r for r in _records(df)}
+                conflicts = write_versioned(supabase, target_tab, rows)
+                st.session_state[conflict_key] = [{**c, "base": base.get(c["key"], {})} for c in conflicts]
+            else:
+                supabase.table(target_tab).upsert(rows).execute()
+            invalidate(*table_scopes(target_tab, location_id))
+            st.success(f"✅ {target_tab} 업데이트 성공!")
+            st.rerun()
+        except Exception as e:
+            st.error(f"❌ 반영 실패: {e}")
+    if st.session_state.get(conflict_key):
+        render_conflicts(supabase, target_tab, location_id, conflict_key)
+
+
+def render(ctx):
+    supabase, location_id = ctx["supabase"], ctx["location_id"]
+    st.title("🔐 시스템 마스터 관리자")
+    sections = {
+        "신규 품목/공급처 등록": lambda: render_registration(supabase),
+        "CSV/엑셀 일괄 등록": lambda: render_bulk_import(supabase),
+        "DB 테이블 직접 수정": lambda: render_table_editor(supabase, location_id),
+        "변경 이력": lambda: render_audit_log(supabase, load_search_index(supabase)),
+    }
+    for label, tab, is_open in lazy_tabs(list(sections), "admin_tab"):
+        if is_open:
+            with tab:
+                sections[label]()
@@ -0,0 +1,117 @@
+"""
+실시간 대시보드 & 입고
+
+발주 알림은 alert_worker.py 가 미리 계산해 둔 미달 품목만 조회하고 (워커가 돈 적이 없으면 직접 계산),
+배송 중인 주문은 주문 상세/환산 계수까지 요청 3번으로 받아 입고완료를 쓰기 큐에 등록한다.
+조회 예산(주문 수와 무관): 처음 그릴 때 매장 목록 포함 6회 (알림 워커가 돈 적이 없으면 8회), 다시 그릴 때 0회
+(tests/test_query_budget.py).
+'재고 전망' 탭은 앞으로 N일의 품목별 재고와 품절 예상일을 what-if 조건과 함께 계산한다 (stock_projection.py).
+"""
+import pandas as pd
+import streamlit as st
+
+from alert_worker import load_alerts, compute_alerts
+from profiler import stage
+from queries import load_shipping_orders
+from shared_cache import cached, CATALOG, stocks_scope, orders_scope, alerts_scope
+from views import lazy_tabs
+
+
+def render_alerts(supabase, location_id):
+    # 조회 결과는 앱 워커들이 공유 캐시로 함께 사용
+    with stage("load") as s:
+        danger, alert_status = cached(alerts_scope(location_id), "alerts", lambda: load_alerts(supabase, location_id))
+        s["rows"] = 0 if danger is None else len(danger)
+    if alert_status is None:
+        with stage("predict") as s:
+            danger, total_items = cached((CATALOG, stocks_scope(location_id)), "computed_alerts",
+                                         lambda: compute_alerts(supabase, location_id))
+            s["rows"] = total_items
+    else:
+        total_items = alert_status['item_count']
+        computed = pd.to_datetime(alert_status['computed_at']).tz_convert('Asia/Seoul')
+        st.caption(f"발주 알림 계산 시각: {computed:%m-%d %H:%M}")
+
+    c1, c2 = st.columns(2)
+    c1.metric("전체 품목", total_items)
+    c2.metric("발주 필요", len(danger), delta_color="inverse")
+
+    if not danger.empty:
+        st.subheader("⚠️ 발주점 미달 품목")
+        st.dataframe(
+            danger[['category', 'item_name', 'predicted_stock', 'reorder_point', 'safety_stock', 'lead_days', 'base_unit']]
+            .rename(columns={'category': '카테고리', 'item_name': '품목명', 'predicted_stock': '예측재고',
+                             'reorder_point': '발주점', 'safety_stock': '안전재고', 'lead_days': '리드타임(일)',
+                             'base_unit': '단위'})
+            .round({'리드타임(일)': 1}),
+            use_container_width=True, hide_index=True)
+    else:
+        st.success("✅ 모든 품목의 재고가 충분합니다.")
+
+
+def render_shipping(supabase, write_queue, location_id):
+    st.subheader("🚚 배송 중인 주문 및 입고 처리")
+    orders, items = cached((CATALOG, orders_scope(location_id)), "shipping_orders",
+                           lambda: load_shipping_orders(supabase, location_id))
+
+    # 입고 요청은 했지만 아직 DB에 반영되지 않은 주문
+    pending_receipts = {int(m['payload']['order_id']): m for m in write_queue.status("receive_order")}
+
+    if orders.empty:
+        st.info("배송 중인 내역이 없습니다.")
+        return
+    for _, order in orders.iterrows():
+        oid = order['order_id']
+        col_info, col_btn = st.columns([5, 1])
+        with col_info:
+            # 주문마다 한 번만 그려야 버튼 key가 중복되지 않음
+            with st.expander(f"📦 주문 #{oid} | 공급처: {order['supplier_name']} (총 {order['total_price']:,}원)"):
+                detail = items[items['order_id'] == oid] if not items.empty else items
+                if detail.empty:
+                    st.write("상세 품목 정보가 없습니다.")
+                else:
+                    display_df = detail[['품목명', 'actual_qty', 'conversion_factor', 'order_unit_price']].copy()
+                    # 입고예정량 = 주문수량(묶음) x 환산계수
+                    display_df['입고예정량'] = display_df['actual_qty'] * display_df['conversion_factor'].fillna(1)
+                    display_df.columns = ['품목명', '주문수량(묶음)', '환산계수', '단가', '입고예정량(개)']
+                    st.table(display_df.style.format({
+                        "주문수량(묶음)": "{:,.0f}",
+                        "환산계수": "x{:,.0f}",
+                        "단가": "{:,.0f}원",
+                        "입고예정량(개)": "{:,.0f}"
+                    }, na_rep="-"))
+        with col_btn:
+            st.write("<div style='height: 5px;'></div>", unsafe_allow_html=True)
+            pending = pending_receipts.get(int(oid))
+            if pending is not None:
+                if pending['status'] == "failed":
+                    st.error("입고 실패")
+                else:
+                    st.caption("⏳ 입고 반영 중")
+            elif st.button("입고완료", key=f"rec_{oid}", use_container_width=True):
+                # 입고 처리(단위 환산 포함)는 receive_orders 서버 함수로 일괄 반영
+                write_queue.enqueue("receive_order", {"order_id": int(oid), "location_id": location_id},
+                                    idem_key=f"receive_order:{oid}")
+                st.toast(f"📦 주문 #{oid} 입고 요청이 등록되었습니다.")
+                st.rerun()
+
+
+def render_current(ctx):
+    render_alerts(ctx["supabase"], ctx["location_id"])
+    st.divider()
+    render_shipping(ctx["supabase"], ctx["write_queue"], ctx["location_id"])
+
+
+def render_projection(ctx):
+    # 전망 탭을 열 때만 불러옴
+    from stock_projection import render_projection as render_stock_projection
+    render_stock_projection(ctx["supabase"], ctx["location_id"])
+
+
+def render(ctx):
+    st.title("실시간 재고 모니터링")
+    sections = {"현황 및 입고": render_current, "재고 전망": render_projection}
+    for label, tab, is_open in lazy_tabs(list(sections), "dashboard_tab"):
+        if is_open:
+            with tab:
+                sections[label](ctx)
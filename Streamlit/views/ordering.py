@@ -0,0 +1,252 @@
+"""
+발주 관리
+
+시스템 추천(매장 재고 < 안전재고) 또는 커스텀 장바구니를 공급처별로 묶어 발주한다.
+발주 기록(PURCHASE_ORDERS/PURCHASE_ITEMS)은 쓰기 큐 워커가 처리한다.
+"""
+import uuid
+
+import streamlit as st
+
+from item_search import load_search_index
+from locations import location_key
+from queries import load_item_master
+from shared_cache import cached, CATALOG, stocks_scope
+from views import item_filter
+
+
+def init_state(supabase, location_id):
+    """세션 상태 초기화. 품목 목록은 매장별로 세션에 보관 (매장을 바꿔도 다른 매장 재고가 섞이지 않음)"""
+    if 'show_toast' not in st.session_state:
+        st.session_state.show_toast = False
+    if 'order_mode' not in st.session_state:
+        st.session_state.order_mode = "추천"
+    if 'manual_cart' not in st.session_state:
+        st.session_state.manual_cart = {}
+
+    master_key = location_key("item_master", location_id)
+    if master_key not in st.session_state:
+        st.session_state[master_key] = cached((CATALOG, stocks_scope(location_id)), "item_master",
+                                              lambda: load_item_master(supabase, location_id))
+    st.session_state.item_master = st.session_state[master_key]
+
+
+def order_page(write_queue, location_id, search_index):
+    st.title("만월경 발주 관리")
+    
+    # --- 1. 발주 모드 선택 영역  ---
+    st.write("### 📂 발주 모드 선택")
+    col_rec, col_cus = st.columns(2)
+    
+    with col_rec:
+        rec_style = "primary" if st.session_state.order_mode == "추천" else "secondary"
+        if st.button("시스템 추천 발주", use_container_width=True, type=rec_style):
+            st.session_state.order_mode = "추천"
+            st.session_state.manual_cart = {}
+            st.rerun()
+
+    with col_cus:
+        cus_style = "primary" if st.session_state.order_mode == "커스텀" else "secondary"
+        if st.button("커스텀 발주", use_container_width=True, type=cus_style):
+            st.session_state.order_mode = "커스텀"
+            st.session_state.manual_cart = {}
+            st.rerun()
+
+    # --- 2. 품목 직접 추가 섹션 수정 ---
+    with st.container(border=True):
+        st.subheader("품목 직접 추가")
+        # 검색어/카테고리가 있으면 검색 색인의 순위대로 상위 품목만 후보로 표시
+        query, category = item_filter(search_index, "order_search")
+        c1, c2, c3 = st.columns([4, 4, 1.5])
+        
+        # [수정] item_names 가져오기 (item_name -> name)
+        if query or category:
+            by_id = {i["id"]: i["name"] for i in st.session_state.item_master}
+            item_names = [by_id[i] for i in search_index.search(query, category) if i in by_id]
+        else:
+            item_names = [i["name"] for i in st.session_state.item_master]
+        sel_name = c1.selectbox("상품 선택", options=item_names, key="p_box", placeholder="검색 결과 없음")
+        
+        # [수정] 선택된 아이템의 상세 정보 찾기 (검색 결과가 없으면 빈 값)
+        item_info = next((i for i in st.session_state.item_master if i["name"] == sel_name), {})
+        
+        # [수정] 공급처 목록 추출: SUPPLIER_DETAILS 리스트 안의 SUPPLIERS['name']을 가져옴
+        # ERD의 관계를 따라가야 합니다.
+        supplier_options = [sd["SUPPLIERS"]["name"] for sd in item_info.get("SUPPLIER_DETAILS", [])]
+        
+        sel_sup = c2.selectbox(
+            "공급처 선택", 
+            options=supplier_options, 
+            disabled=len(supplier_options) <= 1, 
+            key="s_box"
+        )
+        
+        with c3:
+            st.write("<div style='height: 28px;'></div>", unsafe_allow_html=True)
+            if st.button("리스트 추가", use_container_width=True, disabled=not supplier_options):
+                key = (sel_name, sel_sup)
+                # 발주 단위(unit)도 이제 SUPPLIER_DETAILS에서 가져와야 합니다.
+                # 선택된 공급처의 상세 정보를 찾음
+                detail = next(sd for sd in item_info["SUPPLIER_DETAILS"] if sd["SUPPLIERS"]["name"] == sel_sup)
+                MOQ = detail.get("MOQ", 1) # 기본값 1
+                
+                st.session_state.manual_cart[key] = st.session_state.manual_cart.get(key, 0) + MOQ
+                st.rerun()
+
+    # --- 3. 발주 목록 표시 (ERD 구조에 맞게 수정) ---
+        st.write("---")
+        st.subheader(f"{st.session_state.order_mode} 발주 목록")
+        
+        display_items = {}
+        if st.session_state.order_mode == "추천":
+            for item in st.session_state.item_master:
+                # [수정] 데이터 존재 여부 확인 후 중첩 구조 접근
+                if item.get("STOCKS") and item.get("SUPPLIER_DETAILS"):
+                    current_stock = item["STOCKS"][0]["stock"]
+                    safety_stock = item["SUPPLIER_DETAILS"][0]["safety_stock"]
+                    
+                    if current_stock < safety_stock:
+                        # [수정] 공급처명과 기본 발주 단위 가져오기
+                        sup = item["SUPPLIER_DETAILS"][0]["SUPPLIERS"]["name"]
+                        unit = item["SUPPLIER_DETAILS"][0].get("MOQ", 1)
+                        # unit이 문자열일 경우를 대비해 숫자로 변환 (ERD상 int8이지만 안전하게 처리)
+                        unit = int(unit) if str(unit).isdigit() else 1
+                        
+                        display_items[(item["name"], sup)] = st.session_state.manual_cart.get((item["name"], sup), unit)
+            display_items.update(st.session_state.manual_cart)
+        else:
+            display_items = st.session_state.manual_cart
+
+        total_price = 0 
+
+        if not display_items:
+            st.info("현재 발주 대기 목록이 비어 있습니다.")
+        else:
+            active_sups = sorted(list(set(k[1] for k in display_items.keys())))
+            # [삭제] 기존의 total_price = 0 줄은 지워주세요.
+
+            for sup in active_sups:         
+                with st.expander(f"🏢 공급처: {sup}", expanded=True):
+                    sup_items = {k: v for k, v in display_items.items() if k[1] == sup}
+                    for (name, s), qty in sup_items.items():
+                        
+                        # --- [추가] 삭제된 항목은 행 자체를 그리지 않음 ---
+                        if 'deleted_keys' in st.session_state and (name, sup) in st.session_state.deleted_keys:
+                            continue
+                        # -----------------------------------------------
+
+                        item_data = next(i for i in st.session_state.item_master if i["name"] == name)
+                        detail = next(sd for sd in item_data["SUPPLIER_DETAILS"] if sd["SUPPLIERS"]["name"] == sup)
+                        stock_val = next((stk["stock"] for stk in item_data["STOCKS"] if stk["supplier_id"] == detail["supplier_id"]), 0)
+                        MOQ = int(detail.get("MOQ", 1)) if str(detail.get("MOQ")).isdigit() else 1
+
+                        cols = st.columns([0.5, 2.5, 1.2, 3.5, 2, 1.5]) 
+                        
+                        if cols[0].button("⊖", key=f"del_{name}_{sup}"):
+                            # 1. 수동 추가 품목 삭제
+                            if (name, sup) in st.session_state.manual_cart:
+                                del st.session_state.manual_cart[(name, sup)]
+                            
+                            # 2. 추천 품목은 숨김 리스트에 등록 (행 제거용)
+                            if 'deleted_keys' not in st.session_state:
+                                st.session_state.deleted_keys = set()
+                            st.session_state.deleted_keys.add((name, sup))
+                            
+                            st.rerun()
+
+                        # 이 아래 코드들이 실행되지 않아야 행이 남지 않습니다.
+                        cols[1].write(f"**{name}**")
+                        cols[2].caption(f"재고:{stock_val}")                            
+                        with cols[3]:
+                            new_qty = st.number_input(
+                                label="수량", min_value=0, value=int(qty), step=int(MOQ),
+                                key=f"input_{name}_{sup}", label_visibility="collapsed"
+                            )
+                            if new_qty != qty:
+                                st.session_state.manual_cart[(name, s)] = new_qty
+                                st.rerun()
+
+                        raw_price = detail.get("order_unit_price")
+                        unit_price = int(raw_price) if raw_price is not None else 0
+                        price = qty * unit_price
+                        total_price += price
+
+                        if unit_price > 0:
+                            cols[4].write(f"**{price:,}원**")
+                        else:
+                            cols[4].error("단가없음")
+
+                        cols[5].link_button("🔗발주", detail.get("order_url", "#"), use_container_width=True)
+
+        # --- 4. 최종 발주 승인 ---
+        st.divider()
+        fb1, fb2 = st.columns([2, 1])
+        fb1.metric("최종 발주 합계 금액", f"{total_price:,} 원")
+
+        # 같은 장바구니를 두 번 제출해도 발주가 중복 기록되지 않도록 제출 단위 ID 부여
+        if 'order_batch_id' not in st.session_state:
+            st.session_state.order_batch_id = uuid.uuid4().hex
+
+        if fb2.button("전체 발주 완료 처리", type="primary", use_container_width=True):
+            try:
+                # 1. 공통 order_id 생성: DB에서 현재 가장 큰 order_id를 찾아 +1 합니다.
+                #max_order_res = supabase.table("PURCHASE_ORDERS").select("order_id").order("order_id", desc=True).limit(1).execute()
+                #shared_order_id = (max_order_res.data[0]["order_id"] + 1) if max_order_res.data else 1
+
+                # 2. 공급처별로 데이터 그룹화
+                orders_by_supplier = {}
+                for (name, sup_name), qty in display_items.items():
+                    if sup_name not in orders_by_supplier:
+                        orders_by_supplier[sup_name] = []
+                    orders_by_supplier[sup_name].append({"name": name, "qty": qty})
+
+                # 3. 공급처별 데이터 기록 시작
+                for sup_name, items in orders_by_supplier.items():
+                    # 해당 공급처의 ID 및 단가 정보 추출
+                    temp_item_data = next(i for i in st.session_state.item_master if i["name"] == items[0]["name"])
+                    detail_info = next(sd for sd in temp_item_data["SUPPLIER_DETAILS"] if sd["SUPPLIERS"]["name"] == sup_name)
+                    target_sup_id = detail_info["supplier_id"]
+                    
+                    # 공급처별 소계 금액 계산
+                    subtotal = 0
+                    for itm in items:
+                        i_data = next(i for i in st.session_state.item_master if i["name"] == itm["name"])
+                        d_info = next(sd for sd in i_data["SUPPLIER_DETAILS"] if sd["SUPPLIERS"]["name"] == sup_name)
+                        price = d_info.get("order_unit_price", 0)
+                        subtotal += itm["qty"] * (int(price) if price is not None else 0)
+
+                    # --- [핵심 수정 구간] ---
+                    # PURCHASE_ORDERS / PURCHASE_ITEMS 기록은 쓰기 큐 워커가 처리
+                    # (ordered_at, order_id는 DB에서 자동 생성)
+                    insert_items = []
+                    for itm in items:
+                        item_ref = next(i for i in st.session_state.item_master if i["name"] == itm["name"])
+                        insert_items.append({
+                            "item_id": item_ref["id"],
+                            "actual_qty": itm["qty"]
+                        })
+
+                    write_queue.enqueue("place_order", {
+                        "location_id": location_id,
+                        "supplier_id": target_sup_id,
+                        "total_price": int(subtotal),
+                        "items": insert_items
+                    }, idem_key=f"place_order:{st.session_state.order_batch_id}:{target_sup_id}")
+
+                # 4. 처리 완료 후 후속 작업 (재고 업데이트는 생략)
+                st.session_state.show_toast = True
+                st.session_state.manual_cart = {}
+                del st.session_state.order_batch_id
+                st.rerun()
+
+            except Exception as e:
+                st.error(f"발주 기록 저장 중 오류가 발생했습니다: {e}")
+
+
+def render(ctx):
+    init_state(ctx["supabase"], ctx["location_id"])
+    # 토스트 메시지는 한 번 보여준 후 다시 꺼줌
+    if st.session_state.show_toast:
+        st.toast("발주 완료 처리되었습니다.")
+        st.session_state.show_toast = False
+    order_page(ctx["write_queue"], ctx["location_id"], load_search_index(ctx["supabase"]))
@@ -0,0 +1,19 @@
+"""
+구매 분석 (서버 집계 결과만 조회)
+
+지출 분석(analytics.py)과 예측 정확도(forecast_accuracy.py). 선택한 하위 탭만 실행한다.
+"""
+from analytics import render_analytics
+from forecast_accuracy import render_forecast_accuracy
+from views import lazy_tabs
+
+
+def render(ctx):
+    sections = {
+        "지출 분석": lambda: render_analytics(ctx["supabase"], ctx["location_id"]),
+        "예측 정확도": lambda: render_forecast_accuracy(ctx["supabase"], ctx["location_id"]),
+    }
+    for label, tab, is_open in lazy_tabs(list(sections), "analysis_tab"):
+        if is_open:
+            with tab:
+                sections[label]()
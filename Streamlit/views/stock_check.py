@@ -0,0 +1,331 @@
+"""
+재고 실사
+
+매장 재고를 한 개의 표(가상 스크롤)로 보여주고 실사 입력을 쓰기 큐(온라인) 또는 로컬 미러(오프라인)에 기록한다.
+'예측 재고'는 마지막 실사 이후 요일 가중 소모량을 뺀 현재 예상치 (stock_ops.predict_stocks).
+목록 입력은 편집한 셀만 세션에 (품목, 공급처) 기준으로 모아 두므로, 검색/카테고리/점검 상태로 목록을 좁혀도
+입력이 유지되고 반영할 때는 입력한 품목만 처리한다.
+바코드 스캔 모드는 스캔 수량을 세션 버퍼에 모았다가 한 번에 반영한다 (barcode_scan.py).
+반영 전에 입력 전체를 한 번에 검사해서 예상 범위를 크게 벗어난 품목은 보류하고, 확인(또는 수정)한 뒤
+따로 반영한다 (count_screening.py).
+"""
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from barcode_scan import ScanBuffer, load_barcode_index, barcode_index_from_frame, parse_scan, scan_updates
+from count_screening import screen_counts, load_error_scale, incoming_qty
+from item_search import load_search_index
+from locations import location_key
+from offline_mirror import StockMirror, render_offline_controls
+from profiler import stage
+from queries import load_stock_frame, load_shipping_orders
+from shared_cache import cached, CATALOG, stocks_scope, orders_scope
+from stock_ops import KST, predict_stocks, compute_stock_counts, count_updates
+from views import item_filter
+
+AGE_SIGNALS = ["🔴", "🟡", "🟢"]
+EDIT_COLUMN = '새로운 재고량'
+
+
+@st.cache_resource
+def init_stock_mirror(location_id):
+    # 재고 실사 오프라인 모드용 로컬 미러 (매장별 파일)
+    return StockMirror(location_id=location_id)
+
+
+def age_signals(last_checked):
+    """마지막 실사 후 경과일 신호등 (3일 이내 🟢, 7일 이내 🟡, 그 외/기록 없음 🔴)"""
+    days = (datetime.now(timezone.utc) - pd.to_datetime(last_checked, utc=True, format="ISO8601")).dt.days
+    return np.select([days <= 3, days <= 7], ["🟢", "🟡"], "🔴")
+
+
+def get_stock_data_with_prediction(supabase, location_id, stock_mirror, offline=False):
+    if offline:
+        # 오프라인 모드: 로컬 미러(+ 아직 동기화 안 된 실사값)에서 읽음
+        with stage("load:mirror") as s:
+            merged_df = stock_mirror.frame()
+            s["rows"] = len(merged_df)
+    else:
+        # 온라인 조회는 앱 워커들이 공유 캐시로 함께 사용
+        with stage("load") as s:
+            merged_df = cached((CATALOG, stocks_scope(location_id)), "stock_frame",
+                               lambda: load_stock_frame(supabase, location_id))
+            s["rows"] = len(merged_df)
+
+    # 접속 시점 기준 실시간 예측 재고 계산
+    with stage("predict") as s:
+        if not merged_df.empty:
+            merged_df['predicted_stock'] = predict_stocks(merged_df, datetime.now(KST))
+            merged_df['상태'] = age_signals(merged_df['last_checked_at'])
+        s["rows"] = len(merged_df)
+    return merged_df
+
+
+def screening_inputs(supabase, location_id, offline):
+    """이상값 선별 기준: (품목별 최근 예측 오차, 배송 중 수량). 오프라인이면 기준 없이 예상 소모량만 사용"""
+    if offline:
+        return None, None
+    errors = cached((CATALOG, stocks_scope(location_id)), "count_error_scale", lambda: load_error_scale(supabase, location_id))
+    # 대시보드의 배송 중 주문 조회와 같은 캐시
+    _, lines = cached((CATALOG, orders_scope(location_id)), "shipping_orders",
+                      lambda: load_shipping_orders(supabase, location_id))
+    return errors, incoming_qty(lines)
+
+
+def hold_counts(suspects, location_id):
+    """이상값으로 보이는 입력을 확인 대기 목록에 추가 (같은 품목은 새 입력으로 교체)"""
+    held_key = location_key("check_held", location_id)
+    held = st.session_state.get(held_key)
+    if held is not None:
+        keys = set(zip(suspects['item_id'], suspects['supplier_id']))
+        held = held[[k not in keys for k in zip(held['item_id'], held['supplier_id'])]]
+        suspects = pd.concat([held, suspects], ignore_index=True)
+    st.session_state[held_key] = suspects.reset_index(drop=True)
+    gen_key = location_key("check_held_gen", location_id)
+    st.session_state[gen_key] = st.session_state.get(gen_key, 0) + 1
+
+
+def submit_counts(updates, write_queue, location_id, stock_mirror, offline, supabase=None):
+    """실사 입력을 계산해 쓰기 큐(온라인) 또는 로컬 미러(오프라인)에 한 건으로 기록
+
+    supabase 를 주면 먼저 이상값을 선별해서 의심 품목은 확인 대기로 보류하고 나머지만 기록.
+    반환값: 기록하거나 보류한 품목 수
+    """
+    held = 0
+    if supabase is not None:
+        checked = screen_counts(updates, *screening_inputs(supabase, location_id, offline))
+        suspects = checked[checked['suspect']]
+        if not suspects.empty:
+            hold_counts(suspects, location_id)
+            st.toast(f"⚠️ {len(suspects)}개 품목은 입력값이 예상 범위를 크게 벗어나 보류했습니다. 확인 후 반영하세요.")
+        updates, held = updates[~checked['suspect'].to_numpy()], len(suspects)
+
+    # 재고 계산 및 학습 후 쓰기 큐에 등록 (STOCKS upsert는 워커가 일괄 처리)
+    rows, row_errors = compute_stock_counts(updates, datetime.now(KST), location_id)
+
+    for item_name, row_err, raw_val in row_errors:
+        # 어떤 품목에서, 어떤 값 때문에 에러가 났는지 상세히 출력
+        st.error(f"⚠️ '{item_name}' 처리 중 에러: {row_err}")
+        st.write("문제가 된 데이터 실제 형태:", raw_val)
+
+    if rows and offline:
+        stock_mirror.record_counts(rows)
+        st.toast(f"📴 {len(rows)}개 품목의 실사 결과를 기기에 저장했습니다. 연결되면 동기화하세요.")
+    elif rows:
+        write_queue.enqueue("stock_count", {"rows": rows})
+        st.toast(f"✅ {len(rows)}개 품목의 실사 결과가 반영 대기열에 등록되었습니다.")
+    return len(rows) + held
+
+
+def render_held_counts(write_queue, location_id, stock_mirror, offline):
+    """확인 대기 중인 이상값 입력: 값을 확인/수정해서 반영하거나 버림"""
+    held_key = location_key("check_held", location_id)
+    held = st.session_state.get(held_key)
+    if held is None or held.empty:
+        return
+    with st.container(border=True):
+        st.warning(f"⚠️ 확인이 필요한 실사 입력 {len(held)}개: 예상 범위를 크게 벗어났습니다. "
+                   "실제 값이 맞는지 확인하고, 틀렸다면 고친 뒤 반영하세요.")
+        edited = st.data_editor(
+            held[['item_name', 'predicted_stock', 'expected_low', 'expected_high', EDIT_COLUMN, 'reason']],
+            column_config={
+                "item_name": "품목명",
+                "predicted_stock": st.column_config.NumberColumn("예측 재고", format="%.2f"),
+                "expected_low": st.column_config.NumberColumn("예상 하한", format="%.1f"),
+                "expected_high": st.column_config.NumberColumn("예상 상한(배송 중 포함)", format="%.1f"),
+                EDIT_COLUMN: st.column_config.NumberColumn("실사 입력", min_value=0, step=1, help="비우면 반영하지 않습니다."),
+                "reason": "사유",
+            },
+            disabled=['item_name', 'predicted_stock', 'expected_low', 'expected_high', 'reason'],
+            hide_index=True, use_container_width=True,
+            key=f"check_held_editor_{st.session_state.get(location_key('check_held_gen', location_id), 0)}",
+        )
+        c1, c2 = st.columns([3, 1])
+        if c1.button("확인한 값으로 반영", type="primary", use_container_width=True):
+            confirmed = held.assign(**{EDIT_COLUMN: edited[EDIT_COLUMN]})
+            try:
+                # 사람이 확인한 값이므로 다시 선별하지 않음
+                submit_counts(confirmed[confirmed[EDIT_COLUMN].notnull()], write_queue, location_id, stock_mirror, offline)
+                del st.session_state[held_key]
+                st.rerun()
+            except Exception as e:
+                st.error(f"오류 발생: {e}")
+        if c2.button("보류 입력 버리기", use_container_width=True):
+            del st.session_state[held_key]
+            st.rerun()
+
+
+def track_edits(editor_key, entered_key, keys):
+    """목록 에디터 on_change: 편집된 셀(화면 행 위치 기준)만 (품목, 공급처) 기준 실사 입력으로 옮김"""
+    entered = st.session_state[entered_key]
+    for pos, cells in st.session_state[editor_key]["edited_rows"].items():
+        if EDIT_COLUMN in cells:
+            if cells[EDIT_COLUMN] is None:
+                entered.pop(keys[int(pos)], None)
+            else:
+                entered[keys[int(pos)]] = cells[EDIT_COLUMN]
+
+
+def render_scan_mode(df, barcodes, supabase, write_queue, location_id, stock_mirror, offline):
+    """바코드 스캔 실사: 스캔할 때마다 세션 버퍼에 누계, '일괄 반영' 으로 한 번에 기록"""
+    buf_key = location_key("scan_buffer", location_id)
+    if buf_key not in st.session_state:
+        st.session_state[buf_key] = ScanBuffer()
+    buffer = st.session_state[buf_key]
+    names = dict(zip(zip(df['item_id'], df['supplier_id']), df['item_name']))
+
+    def on_scan():
+        # 스캐너는 코드 + Enter 를 입력하므로 Enter 마다 호출됨. 다음 스캔을 위해 입력칸을 비움
+        raw = st.session_state.scan_input
+        st.session_state.scan_input = ""
+        try:
+            qty, code = parse_scan(raw)
+        except ValueError as e:
+            st.session_state.scan_message = ("error", f"입력 형식 오류: {e}")
+            return
+        if not code:
+            return
+        key = barcodes.get(code)
+        if key not in names:
+            buffer.add_unknown(code)
+            reason = "등록되지 않은 바코드" if key is None else "이 매장 재고에 없는 품목"
+            st.session_state.scan_message = ("error", f"{reason}: {code}")
+        elif buffer.add(code, key, qty) == "duplicate":
+            st.session_state.scan_message = ("warning", f"중복 스캔으로 보고 무시했습니다: {names[key]}")
+        else:
+            st.session_state.scan_message = ("success", f"{names[key]} +{qty:g} (누계 {buffer.totals[key]:g})")
+
+    st.text_input("바코드", key="scan_input", on_change=on_scan,
+                  placeholder="스캔하거나 코드 입력 후 Enter (여러 개: 수량*코드, 예: 12*8801234567890)")
+    level, text = st.session_state.pop("scan_message", (None, None))
+    if level:
+        getattr(st, level)(text)
+
+    if buffer.totals:
+        view = scan_updates(buffer, df)
+        view['스캔 횟수'] = [buffer.counts(k) for k in zip(view['item_id'], view['supplier_id'])]
+        st.dataframe(
+            view[['category', 'item_name', 'base_unit', 'predicted_stock', '새로운 재고량', '스캔 횟수']]
+            .rename(columns={'category': '카테고리', 'item_name': '품목명', 'base_unit': '단위',
+                             'predicted_stock': '예측 재고', '새로운 재고량': '스캔 합계'})
+            .round({'예측 재고': 2}),
+            use_container_width=True, hide_index=True)
+    else:
+        st.info("스캔한 품목이 없습니다. 바코드 칸을 누른 뒤 스캔하세요.")
+    if buffer.unknown:
+        st.caption("인식하지 못한 코드: " + ", ".join(f"{c} ({n}회)" for c, n in buffer.unknown.items()))
+    st.caption("스캔한 품목만 반영됩니다. 스캔하지 않은 품목의 재고는 바뀌지 않습니다.")
+
+    c1, c2, c3 = st.columns([1, 1, 2])
+    if c1.button("마지막 스캔 취소", disabled=not buffer.scans, use_container_width=True):
+        buffer.undo()
+        st.rerun()
+    if c2.button("스캔 기록 비우기", disabled=not (buffer.scans or buffer.unknown), use_container_width=True):
+        buffer.clear()
+        st.rerun()
+    if c3.button(f"스캔 결과 일괄 반영 ({len(buffer)}개 품목)", type="primary", disabled=not buffer.totals,
+                 use_container_width=True):
+        try:
+            if submit_counts(scan_updates(buffer, df), write_queue, location_id, stock_mirror, offline, supabase):
+                buffer.clear()
+                st.rerun()
+        except Exception as e:
+            st.error(f"오류 발생: {e}")
+
+
+def render(ctx):
+    supabase, write_queue, location_id = ctx["supabase"], ctx["write_queue"], ctx["location_id"]
+    stock_mirror = init_stock_mirror(location_id)
+
+    st.title("재고 실사")
+    offline = render_offline_controls(stock_mirror, supabase, key_prefix="check")
+
+    df = get_stock_data_with_prediction(supabase, location_id, stock_mirror, offline)
+    if df.empty:
+        st.info("등록된 재고 품목이 없습니다.")
+        return
+
+    render_held_counts(write_queue, location_id, stock_mirror, offline)
+    mode = st.radio("입력 방식", ["목록 입력", "바코드 스캔"], horizontal=True, key="check_input")
+    if mode == "바코드 스캔":
+        barcodes = barcode_index_from_frame(df) if offline else load_barcode_index(supabase)
+        render_scan_mode(df, barcodes, supabase, write_queue, location_id, stock_mirror, offline)
+        return
+    render_list_mode(df, supabase, write_queue, location_id, stock_mirror, offline)
+
+
+def render_list_mode(df, supabase, write_queue, location_id, stock_mirror, offline):
+    """목록 입력: 조건에 맞는 품목을 표 하나로 그리고, 입력한 셀만 세션에 모았다가 한 번에 반영"""
+    # 입력값 {(item_id, supplier_id): 수량}. 반영하면 비우고 에디터 세대를 올려 새 표로 시작
+    entered_key, gen_key = location_key("check_entered", location_id), location_key("check_editor_gen", location_id)
+    entered = st.session_state.setdefault(entered_key, {})
+
+    st.subheader("오늘의 재고 점검 리스트")
+    st.info("💡 '예측 재고'는 시스템이 계산한 현재 예상치입니다. 실제 개수를 '실사 입력'에 적어주세요.")
+
+    # 검색어/카테고리/점검 상태로 목록 좁히기 (검색 순위순, 아니면 카테고리순). 좁혀도 입력값은 유지됨
+    search_index = load_search_index(supabase)
+    query, category = item_filter(search_index, "check_search")
+    ages = st.multiselect("점검 상태", AGE_SIGNALS, key="check_age",
+                          placeholder="전체 (🔴: 7일 이상 미점검 | 🟡: 4~7일 | 🟢: 3일 이내)")
+    view = df
+    if query or category:
+        rank = {item_id: n for n, item_id in enumerate(search_index.search(query, category, limit=None))}
+        view = view[view['item_id'].isin(rank)].sort_values('item_id', key=lambda s: s.map(rank), kind="stable")
+    else:
+        view = view.sort_values(['category', 'item_name'], kind="stable")
+    if ages:
+        view = view[view['상태'].isin(ages)]
+
+    if view.empty:
+        st.info("조건에 맞는 품목이 없습니다.")
+    else:
+        if query or category or ages:
+            st.caption(f"조건에 맞는 품목 {len(view)}개")
+        keys = list(zip(view['item_id'].astype(int), view['supplier_id'].astype(int)))
+        view = view[['category', '상태', 'item_name', 'predicted_stock', 'base_unit', 'last_checked_at']].assign(
+            **{EDIT_COLUMN: [entered.get(k) for k in keys]})
+        # 목록 조건이나 행 수가 바뀌면 새 에디터 (편집 기록은 화면 행 위치 기준이므로)
+        editor_key = f"check_editor_{st.session_state.get(gen_key, 0)}_{query}_{category}_{''.join(ages)}_{len(view)}"
+        st.data_editor(
+            view,
+            column_config={
+                "category": st.column_config.TextColumn("카테고리", width="small"),
+                "상태": st.column_config.TextColumn("상태", width="small"),
+                "item_name": "품목명",
+                "predicted_stock": st.column_config.NumberColumn("예측 재고(장부)", format="%.2f"),
+                "base_unit": "단위",
+                EDIT_COLUMN: st.column_config.NumberColumn("실사 입력", min_value=0, step=1, help="실제 매장에 남은 개수를 입력하세요."),
+                "last_checked_at": st.column_config.DatetimeColumn("마지막 실사일", format="YYYY-MM-DD HH:mm")
+            },
+            column_order=['category', '상태', 'item_name', 'predicted_stock', 'base_unit', EDIT_COLUMN, 'last_checked_at'],
+            disabled=['category', "상태", "item_name", "predicted_stock", "base_unit", "last_checked_at"],
+            hide_index=True,
+            use_container_width=True,
+            height=min(600, 38 + 35 * len(view)),
+            key=editor_key,
+            on_change=track_edits,
+            args=(editor_key, entered_key, keys),
+        )
+
+    # 재고 반영 및 학습 버튼 (목록에 보이지 않는 품목의 입력도 함께 반영)
+    c1, c2 = st.columns([3, 1])
+    if c2.button("입력 비우기", disabled=not entered, use_container_width=True):
+        entered.clear()
+        st.session_state[gen_key] = st.session_state.get(gen_key, 0) + 1
+        st.rerun()
+    if c1.button(f"실사 반영 ({len(entered)}개 품목)", type="primary", use_container_width=True):
+        if not entered:
+            st.warning("입력된 새로운 재고 수량이 없습니다.")
+            return
+        try:
+            # 읽었을 때의 행 버전(version)도 함께 실림: 그 사이 바뀐 품목은 충돌로 돌려받음
+            if submit_counts(count_updates(df, entered), write_queue, location_id, stock_mirror, offline, supabase):
+                entered.clear()
+                st.session_state[gen_key] = st.session_state.get(gen_key, 0) + 1
+                st.rerun()
+        except Exception as e:
+            st.error(f"오류 발생: {e}")
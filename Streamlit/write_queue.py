@@ -0,0 +1,422 @@
+"""
+쓰기 지연(write-behind) 큐
+
+입고완료, 실사 반영, 발주 완료 같은 버튼이 Supabase 왕복을 기다리지 않도록
+변경 요청(mutation)을 로컬 SQLite 파일에 먼저 기록하고 바로 반환한다.
+백그라운드 워커가 대기 중인 요청을 모아서(coalesce) 배치 호출로 반영하며,
+실패 시 지수 백오프로 재시도한다.
+
+mutation 종류
+- receive_order : {"order_id", "location_id"}       -> receive_orders RPC 한 번으로 여러 주문 입고
+- stock_count   : {"rows": [STOCKS 행, ...]}        -> (매장, 품목)별 마지막 값만 남겨 행 버전 조건부 쓰기와
+                                                       STOCK_COUNTS(실사 기록) insert 를 한 트랜잭션으로 (write_stock_counts).
+                                                       그 사이 다른 곳에서 바뀐 행은 서버 값과 함께 실패로 남김
+- place_order   : {"location_id", "supplier_id", "total_price", "items": [{"item_id", "actual_qty"}]}
+                  -> PURCHASE_ORDERS insert 후 PURCHASE_ITEMS insert (order_id는 큐에 저장해서
+                     재시도 시 주문이 중복 생성되지 않음)
+
+같은 idem_key 로 다시 넣으면 기존 요청을 그대로 돌려준다 (버튼 중복 클릭 방지).
+여러 앱 워커(프로세스)가 같은 큐 파일을 공유하므로, 요청은 쓰기 잠금(begin immediate) 안에서
+owner + 임대 만료 시각(lease_until)을 찍어 가져간다. 처리 도중 종료된 워커의 요청은 임대가 끝난 뒤 다른 워커가 다시 가져감.
+처리한 요청의 매장 재고/발주 캐시(shared_cache)는 반영 직후 무효화한다.
+"""
+import hashlib
+import json
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from alert_worker import mark_alerts_dirty
+from locations import DEFAULT_LOCATION
+from row_versions import row_key, write_versioned
+from shared_cache import invalidate, stocks_scope, orders_scope
+from stock_ops import count_history, stock_row
+
+QUEUE_ENV = "INVENTORY_QUEUE_DB"
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".write_queue.sqlite3")
+
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 2.0 # 초
+BACKOFF_CAP = 60.0
+POLL_INTERVAL = 0.5
+BATCH_LIMIT = 200
+LEASE_SECONDS = 300.0 # 가져간 요청을 처리할 수 있는 시간 (넘기면 다른 워커가 다시 가져감)
+DONE_RETENTION = 24 * 3600 # 완료 요청(과 idem_key)을 남겨 두는 시간: 그 안의 중복 클릭만 걸러짐
+PURGE_INTERVAL = 3600.0
+
+PENDING, INFLIGHT, DONE, FAILED = "pending", "inflight", "done", "failed"
+
+SCHEMA = """
+create table if not exists mutations (
+    id integer primary key autoincrement,
+    kind text not null,
+    payload text not null,
+    idem_key text not null unique,
+    status text not null default 'pending',
+    attempts integer not null default 0,
+    next_attempt_at real not null default 0,
+    last_error text,
+    created_at real not null,
+    updated_at real not null,
+    owner text,
+    lease_until real
+);
+create index if not exists mutations_status_idx on mutations (status, next_attempt_at);
+"""
+
+
+def _idem_key(kind, payload):
+    raw = json.dumps([kind, payload], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def backoff_delay(attempts):
+    """attempts 번 실패 후 다음 시도까지 대기 시간 (full jitter)"""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** (attempts - 1))))
+
+
+class WriteQueue:
+    def __init__(self, client, path=None):
+        self.client = client
+        self.path = path or os.environ.get(QUEUE_ENV, DEFAULT_PATH)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        # 이 큐 객체(워커)를 구분하는 값. 요청을 가져갈 때 owner 로 기록
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # owner/lease_until 컬럼이 생기기 전에 만든 큐 파일
+            columns = {c["name"] for c in conn.execute("pragma table_info(mutations)")}
+            if "owner" not in columns:
+                conn.execute("alter table mutations add column owner text")
+            if "lease_until" not in columns:
+                conn.execute("alter table mutations add column lease_until real")
+            # 처리 도중 종료된 요청 중 임대가 끝난 것만 다시 대기 상태로 (다른 워커가 처리 중인 요청은 그대로)
+            conn.execute(
+                "update mutations set status = ?, owner = null where status = ? and coalesce(lease_until, 0) < ?",
+                (PENDING, INFLIGHT, time.time()),
+            )
+
+    @contextmanager
+    def _connect(self):
+        """스레드마다 따로 연결을 열고, 블록이 끝나면 커밋 후 닫음"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("pragma journal_mode=wal")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # --- [1. UI 쪽 API] ---
+    def enqueue(self, kind, payload, idem_key=None):
+        """요청 기록 후 즉시 반환. 반환값: mutation id"""
+        if kind not in HANDLERS:
+            raise ValueError(f"알 수 없는 mutation 종류: {kind}")
+        key = idem_key or _idem_key(kind, payload)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "insert or ignore into mutations (kind, payload, idem_key, created_at, updated_at) values (?, ?, ?, ?, ?)",
+                (kind, json.dumps(payload, ensure_ascii=False, default=str), key, now, now),
+            )
+            row = conn.execute("select id from mutations where idem_key = ?", (key,)).fetchone()
+        self._wake.set()
+        return row["id"]
+
+    def status(self, kind=None):
+        """완료되지 않은 요청 목록 (대기/처리중/실패)"""
+        sql = "select * from mutations where status != ?"
+        args = [DONE]
+        if kind:
+            sql += " and kind = ?"
+            args.append(kind)
+        with self._connect() as conn:
+            rows = conn.execute(sql + " order by id", args).fetchall()
+        return [{**dict(r), "payload": json.loads(r["payload"])} for r in rows]
+
+    def counts(self):
+        with self._connect() as conn:
+            rows = conn.execute("select status, count(*) as n from mutations group by status").fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    def retry(self, mutation_id):
+        with self._connect() as conn:
+            conn.execute(
+                "update mutations set status = ?, attempts = 0, next_attempt_at = 0, updated_at = ? where id = ? and status = ?",
+                (PENDING, time.time(), mutation_id, FAILED),
+            )
+        self._wake.set()
+
+    def rebase(self, mutation_id):
+        """행 버전 충돌로 실패한 실사: 서버 현재 버전을 기준으로 내 실사값을 다시 반영 대기 (삭제된 행은 제외)"""
+        with self._connect() as conn:
+            row = conn.execute("select payload from mutations where id = ? and status = ?", (mutation_id, FAILED)).fetchone()
+            if row is None:
+                return
+            payload = json.loads(row["payload"])
+            rows = [{**r, "version": srv["version"]}
+                    for r, srv in zip(payload["rows"], payload.pop("server", [])) if srv is not None]
+            if not rows:
+                conn.execute("delete from mutations where id = ?", (mutation_id,))
+                return
+            conn.execute(
+                "update mutations set payload = ?, status = ?, attempts = 0, next_attempt_at = 0, last_error = null, "
+                "updated_at = ? where id = ?",
+                (json.dumps({**payload, "rows": rows}, ensure_ascii=False, default=str), PENDING, time.time(), mutation_id),
+            )
+        self._wake.set()
+
+    def discard(self, mutation_id):
+        with self._connect() as conn:
+            conn.execute("delete from mutations where id = ? and status = ?", (mutation_id, FAILED))
+
+    def purge_done(self, older_than=DONE_RETENTION):
+        with self._connect() as conn:
+            conn.execute("delete from mutations where status = ? and updated_at < ?", (DONE, time.time() - older_than))
+
+    # --- [2. 백그라운드 워커] ---
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        last_purge = 0.0
+        while not self._stop.is_set():
+            # 워커 시작 시, 이후 PURGE_INTERVAL 마다 오래된 완료 요청 정리
+            if time.time() - last_purge >= PURGE_INTERVAL:
+                try:
+                    self.purge_done()
+                except sqlite3.Error:
+                    pass
+                last_purge = time.time()
+            try:
+                processed = self.flush()
+            except Exception:
+                processed = 0
+            if not processed:
+                self._wake.wait(POLL_INTERVAL)
+                self._wake.clear()
+
+    def _claim(self):
+        """처리할 차례가 된 요청(과 임대가 끝난 inflight 요청)을 이 워커 몫의 inflight 로 바꾸고 가져옴
+
+        조회와 상태 변경을 쓰기 잠금 한 번 안에서 하므로 두 프로세스가 같은 요청을 가져가지 않음
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("begin immediate")
+            rows = conn.execute(
+                "select * from mutations where (status = ? and next_attempt_at <= ?) "
+                "or (status = ? and coalesce(lease_until, 0) < ?) order by id limit ?",
+                (PENDING, now, INFLIGHT, now, BATCH_LIMIT),
+            ).fetchall()
+            if rows:
+                conn.executemany(
+                    "update mutations set status = ?, owner = ?, lease_until = ?, updated_at = ? where id = ?",
+                    [(INFLIGHT, self.owner, now + LEASE_SECONDS, now, r["id"]) for r in rows],
+                )
+        return [{**dict(r), "payload": json.loads(r["payload"])} for r in rows]
+
+    def flush(self):
+        """대기 중인 요청을 종류별로 모아 한 번씩 처리. 반환값: 처리한 요청 수"""
+        claimed = self._claim()
+        by_kind = {}
+        for m in claimed:
+            by_kind.setdefault(m["kind"], []).append(m)
+        for kind, batch in by_kind.items():
+            try:
+                marked = HANDLERS[kind](self, batch)
+            except Exception as e:
+                self._fail(batch, e)
+            else:
+                # 핸들러가 건별로 결과를 이미 기록한 경우(True)는 건너뜀
+                if not marked:
+                    self._mark(batch, DONE)
+        if claimed:
+            # 재고가 바뀌었으니 다른 앱 워커의 캐시를 무효화하고 발주 알림 워커에게 재계산 요청
+            invalidate(*sorted({s for m in claimed for s in _cache_scopes(m)}))
+            mark_alerts_dirty()
+        return len(claimed)
+
+    def _mark(self, batch, status):
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "update mutations set status = ?, last_error = null, owner = null, updated_at = ? where id = ?",
+                [(status, now, m["id"]) for m in batch],
+            )
+
+    def _fail(self, batch, error):
+        now = time.time()
+        with self._connect() as conn:
+            for m in batch:
+                attempts = m["attempts"] + 1
+                status = FAILED if attempts >= MAX_ATTEMPTS else PENDING
+                conn.execute(
+                    "update mutations set status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, owner = null, "
+                    "updated_at = ? where id = ?",
+                    (status, attempts, now + backoff_delay(attempts), str(error), now, m["id"]),
+                )
+
+    def _reject(self, batch, error):
+        """다시 시도해도 결과가 같은 실패 (행 버전 충돌): 재시도 없이 바로 실패로 기록"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "update mutations set status = ?, attempts = attempts + 1, last_error = ?, owner = null, updated_at = ? "
+                "where id = ?",
+                [(FAILED, str(error), now, m["id"]) for m in batch],
+            )
+
+    def _save_payload(self, m):
+        with self._connect() as conn:
+            conn.execute(
+                "update mutations set payload = ?, updated_at = ? where id = ?",
+                (json.dumps(m["payload"], ensure_ascii=False, default=str), time.time(), m["id"]),
+            )
+
+
+# --- [3. 종류별 배치 처리] ---
+def _handle_receive_order(queue, batch):
+    """입고완료: 서버 함수 한 번으로 여러 주문 처리 (배송중인 주문만 반영되므로 재시도해도 중복 입고 없음)"""
+    order_ids = sorted({int(m["payload"]["order_id"]) for m in batch})
+    queue.client.rpc("receive_orders", {"p_order_ids": order_ids}).execute()
+
+
+def _handle_stock_count(queue, batch):
+    """실사 반영: 같은 품목은 마지막 실사값만 남겨 행 버전 조건부 쓰기 + 실사 기록 insert 를 한 번에
+    (둘이 같이 실패하므로 재시도가 자기 자신이 먼저 쓴 행과 충돌하지 않음)
+
+    읽은 뒤 다른 곳에서 바뀐 행(충돌)은 반영하지 않고, 요청마다 충돌한 행만 남겨 서버 현재 값과 함께
+    실패로 기록한다 (사이드바에서 확인 후 내 실사값으로 다시 반영하거나 삭제)
+    """
+    latest = {}
+    for m in batch:
+        for row in m["payload"]["rows"]:
+            row = {"location_id": DEFAULT_LOCATION, **row}
+            latest[row_key("STOCKS", row)] = (m, row)
+    if not latest:
+        return False
+    rows = [r for _, r in latest.values()]
+    conflicts = {c["key"]: c["server"]
+                 for c in write_versioned(queue.client, "STOCKS", [stock_row(r) for r in rows], counts=count_history(rows))}
+    if not conflicts:
+        return False
+
+    rejected = {}
+    for k, srv in conflicts.items():
+        m, row = latest[k]
+        entry = rejected.setdefault(m["id"], (m, {"rows": [], "server": []}))[1]
+        entry["rows"].append(row)
+        entry["server"].append(srv)
+    for m, payload in rejected.values():
+        m["payload"] = payload
+        queue._save_payload(m)
+    queue._mark([m for m in batch if m["id"] not in rejected], DONE)
+    for m, payload in rejected.values():
+        queue._reject([m], f"다른 곳에서 먼저 수정된 품목 {len(payload['rows'])}개")
+    return True
+
+
+def _handle_place_order(queue, batch):
+    """발주 기록: 요청마다 주문/상세 insert. 한 건이 실패해도 나머지는 계속 처리하고 건별로 결과 기록"""
+    failed = []
+    for m in batch:
+        p = m["payload"]
+        try:
+            if p.get("order_id") is None:
+                res = queue.client.table("PURCHASE_ORDERS").insert({
+                    "location_id": p.get("location_id", DEFAULT_LOCATION),
+                    "supplier_id": p["supplier_id"],
+                    "total_price": p["total_price"],
+                    "status": "배송중",
+                }).execute()
+                p["order_id"] = res.data[0]["order_id"]
+                queue._save_payload(m)
+            queue.client.table("PURCHASE_ITEMS").insert(
+                [{"order_id": p["order_id"], **itm} for itm in p["items"]]
+            ).execute()
+        except Exception as e:
+            failed.append((m, e))
+    done = [m for m in batch if all(m is not f for f, _ in failed)]
+    if done:
+        queue._mark(done, DONE)
+    for m, e in failed:
+        queue._fail([m], e)
+    return True
+
+
+def _cache_scopes(m):
+    """요청이 바꾸는 캐시 범위"""
+    p = m["payload"]
+    if m["kind"] == "stock_count":
+        return {stocks_scope(r.get("location_id", DEFAULT_LOCATION)) for r in p["rows"]}
+    location = p.get("location_id", DEFAULT_LOCATION)
+    if m["kind"] == "receive_order":
+        return {stocks_scope(location), orders_scope(location)}
+    return {orders_scope(location)}
+
+
+HANDLERS = {
+    "receive_order": _handle_receive_order,
+    "stock_count": _handle_stock_count,
+    "place_order": _handle_place_order,
+}
+
+KIND_LABELS = {
+    "receive_order": "입고",
+    "stock_count": "실사",
+    "place_order": "발주",
+}
+
+
+# --- [4. 대기/실패 상태 표시] ---
+def render_queue_status(queue):
+    """사이드바에 반영 대기/실패 요청 표시, 실패 건은 재시도/삭제 가능"""
+    import streamlit as st
+
+    pending = queue.status()
+    if not pending:
+        return
+    waiting = [m for m in pending if m["status"] != FAILED]
+    failed = [m for m in pending if m["status"] == FAILED]
+    with st.sidebar.expander(f"🔄 DB 반영 대기 {len(waiting)}건 / 실패 {len(failed)}건", expanded=bool(failed)):
+        for m in waiting:
+            label = KIND_LABELS.get(m["kind"], m["kind"])
+            note = f" (재시도 {m['attempts']}회: {m['last_error']})" if m["attempts"] else ""
+            st.caption(f"⏳ #{m['id']} {label}{note}")
+        for m in failed:
+            label = KIND_LABELS.get(m["kind"], m["kind"])
+            st.error(f"#{m['id']} {label} 실패: {m['last_error']}")
+            conflicts = m["payload"].get("server") if m["kind"] == "stock_count" else None
+            for row, srv in zip(m["payload"]["rows"], conflicts or []):
+                st.caption(f"품목 #{row['item_id']}: 내 실사 {row['stock']} / 서버 현재 "
+                           f"{'삭제됨' if srv is None else srv.get('stock')}")
+            c1, c2 = st.columns(2)
+            if conflicts is not None:
+                if c1.button("내 실사값으로 다시 반영", key=f"wq_rebase_{m['id']}", use_container_width=True):
+                    queue.rebase(m["id"])
+                    st.rerun()
+            elif c1.button("재시도", key=f"wq_retry_{m['id']}", use_container_width=True):
+                queue.retry(m["id"])
+                st.rerun()
+            if c2.button("삭제", key=f"wq_discard_{m['id']}", use_container_width=True):
+                queue.discard(m["id"])
+                st.rerun()